@@ -7,6 +7,7 @@ Exports processed data in Parquet format for optimal Power BI performance.
 
 Usage:
     python scripts/export_for_powerbi.py [--format parquet|csv] [--tables table1,table2,...]
+                                         [--parquet-profile vertipaq|plain] [--compression zstd|snappy|...]
 
 Author: Torre Control Engineering Team
 Date: 2026-02-04
@@ -16,16 +17,17 @@ import argparse
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config import get_settings
-from src.etl.load import DataLoader
-from src.etl.utils import export_to_csv, export_to_parquet, get_file_size_mb
 from src.logging_config import get_logger
 
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
 
 class PowerBIExporter:
     """
@@ -34,14 +36,42 @@ class PowerBIExporter:
     Supports multiple formats with optimization for Power BI DirectQuery.
     """
     
-    def __init__(self):
-        """Initialize Power BI exporter."""
+    def __init__(
+        self,
+        output_dir: Optional[Path] = None,
+        loader: Optional["DataLoader"] = None,
+        parquet_profile: str = "vertipaq",
+        compression: Optional[str] = None
+    ):
+        """
+        Initialize Power BI exporter.
+        
+        Args:
+            output_dir: Export directory (default: data/processed)
+            loader: DataLoader instance (default: new from settings)
+            parquet_profile: "vertipaq" (compact types, dictionaries, sorted
+                rows) or "plain" (DataFrame.to_parquet with snappy)
+            compression: Parquet codec of the vertipaq profile (default: from settings)
+        """
+        from src.etl.load import DataLoader
+        from src.etl.parquet_export import VertiPaqParquetProfile, key_map_path
+        
         self.settings = get_settings()
         self.logger = get_logger("PowerBIExporter")
-        self.loader = DataLoader()
+        self.loader = loader or DataLoader()
+        self.output_dir = Path(output_dir or self.settings.data_processed_dir)
+        # One profile for all tables, so hash keys get the same ids everywhere
+        self.parquet_profile = VertiPaqParquetProfile(compression=compression) \
+            if parquet_profile == "vertipaq" else None
+        # ...and across exports, so --tables keeps matching the files on disk
+        self.key_map_file = key_map_path(self.output_dir)
+        if self.parquet_profile is not None:
+            self.parquet_profile.load_key_maps(self.key_map_file)
+        self.compression_reports = {}
         
         # Ensure directories exist
         self.settings.ensure_directories()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
         
         self.logger.info("=" * 70)
         self.logger.info("TORRE CONTROL - POWER BI DATA EXPORT UTILITY")
@@ -64,23 +94,29 @@ class PowerBIExporter:
         Returns:
             str: Path to exported file, or None if failed
         """
+        from src.etl.utils import export_to_csv, export_to_parquet, get_file_size_mb
+        
         self.logger.info(f"Exporting {schema}.{table_name}...")
         
         try:
             # Query data from database
             query = f"SELECT * FROM {schema}.{table_name}"
-            df = self.loader.execute_query(query)
+            df = self.loader.execute_query(query, arrow=True)
             
             if len(df) == 0:
                 self.logger.warning(f"  ⚠️  {table_name} is empty, skipping export")
                 return None
             
             # Determine output path
-            if output_format == "parquet":
-                output_file = self.settings.data_processed_dir / f"{table_name}.parquet"
+            if output_format == "parquet" and self.parquet_profile is not None:
+                output_file = self.output_dir / f"{table_name}.parquet"
+                self.compression_reports[table_name] = self.parquet_profile.write(df, output_file)
+                self.parquet_profile.save_key_maps(self.key_map_file)
+            elif output_format == "parquet":
+                output_file = self.output_dir / f"{table_name}.parquet"
                 export_to_parquet(df, str(output_file))
             else:
-                output_file = self.settings.data_processed_dir / f"{table_name}.csv"
+                output_file = self.output_dir / f"{table_name}.csv"
                 export_to_csv(df, str(output_file))
             
             # Get file info
@@ -112,11 +148,15 @@ class PowerBIExporter:
         Returns:
             dict: Export results with file paths
         """
+        from src.etl.utils import get_file_size_mb
+        
         self.logger.info(f"\nExporting data in {output_format.upper()} format...")
         self.logger.info("-" * 70)
         
-        # Default tables to export
+        # Default tables to export: the star schema and its aggregation tables
         if tables is None:
+            from src.etl.aggregates import AGGREGATE_TABLES
+            
             tables = [
                 "dim_customer",
                 "dim_product",
@@ -124,6 +164,7 @@ class PowerBIExporter:
                 "dim_date",
                 "fact_orders"
             ]
+            tables += [table for table in AGGREGATE_TABLES if self.loader.table_exists(table, schema="dw")]
         
         results = {}
         total_rows = 0
@@ -138,10 +179,8 @@ class PowerBIExporter:
                 file_size = get_file_size_mb(output_path)
                 total_size += file_size
                 
-                # Count rows
-                query = f"SELECT COUNT(*) as count FROM dw.{table}"
-                count_df = self.loader.execute_query(query)
-                total_rows += count_df["count"].iloc[0]
+                # Count rows (catalog estimate: the summary is informational)
+                total_rows += self.loader.get_table_count(table, "dw", mode="estimated")
         
         # Summary
         self.logger.info("-" * 70)
@@ -149,11 +188,45 @@ class PowerBIExporter:
         self.logger.info(f"  Tables exported: {len([p for p in results.values() if p])}/{len(tables)}")
         self.logger.info(f"  Total rows: {total_rows:,}")
         self.logger.info(f"  Total size: {total_size:.2f} MB")
-        self.logger.info(f"  Output directory: {self.settings.data_processed_dir}")
+        self.logger.info(f"  Output directory: {self.output_dir}")
         self.logger.info("-" * 70)
         
+        if self.compression_reports:
+            self.write_compression_report()
+        
         return results
     
+    def write_compression_report(self) -> Path:
+        """
+        Log and save the per-column compression of the Parquet files written.
+        
+        The report goes to logs/ rather than the export directory, which
+        Power BI may import as a folder.
+        
+        Returns:
+            Path: CSV report (table, column, sizes and compression_ratio)
+        """
+        import pandas as pd
+        
+        report = pd.concat(
+            [frame.assign(table=table) for table, frame in self.compression_reports.items()],
+            ignore_index=True
+        )
+        report = report[["table", *[column for column in report.columns if column != "table"]]]
+        
+        self.logger.info("Parquet compression per column (in-memory bytes / Parquet bytes):")
+        for row in report.itertuples(index=False):
+            self.logger.info(
+                f"  {row.table}.{row.column:<32} {row.parquet_type[:24]:<24} "
+                f"{row.parquet_bytes / 1e6:>9.2f} MB  {row.compression_ratio:>8.1f}x"
+            )
+        
+        report_file = self.settings.logs_dir / "parquet_compression_report.csv"
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        report.to_csv(report_file, index=False)
+        self.logger.info(f"  Report saved to {report_file}")
+        return report_file
+    
     def generate_connection_info(self):
         """
         Generate Power BI connection information.
@@ -162,7 +235,7 @@ class PowerBIExporter:
         self.logger.info("POWER BI CONNECTION INFORMATION")
         self.logger.info("=" * 70)
         self.logger.info("\n📊 Option 1: Import from Files (Recommended)")
-        self.logger.info(f"  Location: {self.settings.data_processed_dir}")
+        self.logger.info(f"  Location: {self.output_dir}")
         self.logger.info("  Files: dim_*.parquet/csv, fact_*.parquet/csv")
         self.logger.info("  Method: Get Data > Folder > Select processed directory")
         
@@ -198,6 +271,9 @@ Examples:
   
   # Export specific tables only
   python scripts/export_for_powerbi.py --tables dim_customer,fact_orders
+  
+  # Parquet as written by DataFrame.to_parquet, without the VertiPaq profile
+  python scripts/export_for_powerbi.py --parquet-profile plain
         """
     )
     
@@ -214,6 +290,19 @@ Examples:
         help="Comma-separated list of tables to export (default: all)"
     )
     
+    parser.add_argument(
+        "--parquet-profile",
+        choices=["vertipaq", "plain"],
+        default="vertipaq",
+        help="Parquet layout: vertipaq (int32 keys, dictionaries, sorted rows) or plain (default: vertipaq)"
+    )
+    
+    parser.add_argument(
+        "--compression",
+        choices=["zstd", "snappy", "gzip", "lz4", "none"],
+        help="Parquet codec of the vertipaq profile (default: parquet_compression setting)"
+    )
+    
     parser.add_argument(
         "--show-connection-info",
         action="store_true",
@@ -228,7 +317,7 @@ Examples:
         tables = [t.strip() for t in args.tables.split(",")]
     
     # Initialize exporter
-    exporter = PowerBIExporter()
+    exporter = PowerBIExporter(parquet_profile=args.parquet_profile, compression=args.compression)
     
     try:
         # Export data
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Power BI Semantic Model Generator CLI
+=====================================================
+
+Regenerates the TMDL files of the Power BI semantic model (tables,
+relationships, measures, storage modes) from the live dw catalog.
+
+Usage:
+    python scripts/generate_semantic_model.py [--schema dw] [--output DIR] [--dry-run]
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Generate the Torre Control Power BI semantic model (TMDL)")
+    parser.add_argument("--schema", default="dw", help="Warehouse schema (default: dw)")
+    parser.add_argument("--output", type=Path, help="TMDL definition folder (default: semantic_model_path setting)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without writing files")
+    args = parser.parse_args()
+
+    from src.etl.load import DataLoader
+    from src.etl.semantic_model import SemanticModelGenerator
+
+    loader = DataLoader()
+    try:
+        generator = SemanticModelGenerator(loader=loader, schema=args.schema, output_dir=args.output)
+        plan = generator.plan()
+        if not args.dry_run:
+            generator.write(plan)
+    finally:
+        loader.close()
+
+    print("\n" + "=" * 70)
+    print(f"📐 Semantic model for {args.schema}: {len(plan['tables'])} tables")
+    print("=" * 70)
+    for table in plan["tables"]:
+        print(f"  {table:<32} {plan['modes'][table]:<12} {plan['sizes'].get(table) or 0:>14,} rows")
+    print(f"\nRelationships ({len(plan['relationships'])}):")
+    for relationship in plan["relationships"]:
+        print(f"  {relationship['from_table']}.{relationship['from_column']} -> "
+              f"{relationship['to_table']}.{relationship['to_column']}")
+    if not args.dry_run:
+        print(f"\n✓ Written to {generator.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Analytics Query Runner
+=======================================
+
+Runs the analytics SQL files (strategic questions, deep dive queries)
+statement by statement through DataLoader. Results are served from the
+local query cache while the warehouse data version is unchanged, so
+reruns between ETL loads come back instantly.
+
+Usage:
+    python scripts/run_analysis_queries.py [SQL_FILE ...] [--no-cache] [--rows N]
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SQL_DIR = Path(__file__).parent.parent / "src" / "sql"
+DEFAULT_FILES = [
+    SQL_DIR / "q1_q5_strategic_questions.sql",
+    SQL_DIR / "analysis_queries.sql",
+]
+
+_COMMENT_LINE = re.compile(r"^\s*--.*$", re.MULTILINE)
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a SQL script into statements.
+
+    Whole-line comments are dropped first; statements are separated by
+    semicolons (the analytics scripts have none inside literals).
+
+    Args:
+        sql: SQL script
+
+    Returns:
+        list: Statements without their trailing semicolon
+    """
+    body = _COMMENT_LINE.sub("", sql)
+    return [statement.strip() for statement in body.split(";") if statement.strip()]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Run the Torre Control analytics queries")
+    parser.add_argument("files", nargs="*", type=Path, default=DEFAULT_FILES, help="SQL files to run")
+    parser.add_argument("--no-cache", action="store_true", help="Always query the warehouse")
+    parser.add_argument("--rows", type=int, default=10, help="Rows printed per result")
+    args = parser.parse_args()
+
+    from src.etl.load import DataLoader
+
+    loader = DataLoader()
+    try:
+        for sql_file in args.files:
+            print("\n" + "=" * 70)
+            print(f"📄 {sql_file.name}")
+            print("=" * 70)
+
+            for number, statement in enumerate(split_statements(sql_file.read_text(encoding="utf-8")), start=1):
+                started = time.perf_counter()
+                result = loader.execute_query(statement, cache=not args.no_cache)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                print(f"\n[{number}] {len(result):,} rows in {elapsed_ms:.0f} ms")
+                print(result.head(args.rows).to_string(index=False))
+
+        if loader.query_cache is not None and not args.no_cache:
+            cache = loader.query_cache
+            print(f"\nQuery cache: {cache.hits} hits, {cache.misses} misses")
+    finally:
+        loader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,8 @@ Main orchestration script for complete ETL pipeline execution.
 Coordinates extraction, transformation, loading, and validation.
 
 Usage:
-    python scripts/run_etl.py [--skip-extract] [--skip-transform] [--skip-validate]
+    python scripts/run_etl.py [--skip-extract] [--skip-transform] [--skip-validate] [--skip-enrich]
+                                [--blue-green] [--async] [--incremental-validation] [--resume RUN_ID]
 
 Author: Torre Control Engineering Team
 Date: 2026-02-04
@@ -16,17 +17,21 @@ Date: 2026-02-04
 import argparse
 import sys
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import get_settings
-from src.etl.extract import DataExtractor
-from src.etl.load import DataLoader
-from src.etl.transform import DataTransformer
-from src.etl.validate import DataValidator
-from src.logging_config import get_logger
+# ETL modules pull in pandas and SQLAlchemy; they are imported when a stage
+# needs them, so --help and skipped stages start fast
+if TYPE_CHECKING:
+    from src.etl.checkpoint import RunState
+    from src.etl.extract import DataExtractor
+    from src.etl.load import DataLoader
+    from src.etl.transform import DataTransformer
+    from src.etl.validate import DataValidator
 
 
 class ETLOrchestrator:
@@ -36,17 +41,27 @@ class ETLOrchestrator:
     Coordinates all ETL steps with proper error handling and logging.
     """
     
-    def __init__(self):
-        """Initialize ETL orchestrator."""
+    def __init__(self, run_state: Optional["RunState"] = None):
+        """
+        Initialize ETL orchestrator.
+        
+        ETL components are built on first use, so stages that are skipped
+        never import or construct them.
+        
+        Args:
+            run_state: Checkpoint of the run (default: a new run)
+        """
+        from src.config import get_settings
+        from src.etl.checkpoint import RunState
+        from src.logging_config import get_logger
+        
         self.settings = get_settings()
         self.logger = get_logger("ETLOrchestrator")
         self.start_time = datetime.now()
-        
-        # Initialize ETL components
-        self.extractor = DataExtractor()
-        self.loader = DataLoader()
-        self.transformer = DataTransformer(loader=self.loader)
-        self.validator = DataValidator(loader=self.loader)
+        self.shadow_validation = None
+        self.run_state = run_state or RunState()
+        self.last_error = None
+        self.stage_details = {}
         
         self.logger.info("=" * 70)
         self.logger.info("TORRE CONTROL - ETL PIPELINE ORCHESTRATOR")
@@ -54,50 +69,134 @@ class ETLOrchestrator:
         self.logger.info(f"Environment: {self.settings.environment}")
         self.logger.info(f"Database: {self.settings.database_url.split('@')[1]}")
         self.logger.info(f"Start time: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        self.logger.info(f"Run ID: {self.run_state.run_id}")
         self.logger.info("=" * 70)
     
+    @cached_property
+    def extractor(self) -> "DataExtractor":
+        """Get the data extractor (built on first use)."""
+        from src.etl.extract import DataExtractor
+        return DataExtractor()
+    
+    @cached_property
+    def loader(self) -> "DataLoader":
+        """Get the data loader (built on first use)."""
+        from src.etl.load import DataLoader
+        return DataLoader()
+    
+    @cached_property
+    def transformer(self) -> "DataTransformer":
+        """Get the star schema transformer (built on first use)."""
+        from src.etl.transform import DataTransformer
+        return DataTransformer(loader=self.loader)
+    
+    @cached_property
+    def validator(self) -> "DataValidator":
+        """Get the data validator (built on first use)."""
+        from src.etl.validate import DataValidator
+        return DataValidator(loader=self.loader)
+    
     def extract_stage(self) -> bool:
         """
         Execute extraction stage.
         
+        The CSV is loaded in chunks into a staging table created from the fixed
+        staging schema; every committed chunk is checkpointed so a resumed run
+        continues after the last one. Each chunk is appended in one
+        transaction and in file order, so on resume the staging row count is
+        the true offset (a chunk committed just before a crash, but not yet
+        checkpointed, is not loaded twice).
+        
         Returns:
             bool: True if successful
         """
-        self.logger.info("\n[STAGE 1/4] EXTRACT - Loading raw data from CSV")
+        self.logger.info("\n[STAGE 1/5] EXTRACT - Loading raw data from CSV")
         self.logger.info("-" * 70)
         
         try:
-            # Extract and sanitize data
-            df = self.extractor.extract_and_sanitize()
-            
-            # Load into staging table
-            self.loader.load_dataframe(
-                df=df,
-                table_name="stg_raw_orders",
-                schema="dw",
-                if_exists="replace"
-            )
+            from src.etl.extract import conform_to_staging, staging_table_ddl
+            
+            offset = self.run_state.rows_committed("extract")
+            create = offset == 0
+            
+            if not create:
+                staged = self.loader.get_table_count("stg_raw_orders", "dw")
+                if staged != offset:
+                    self.logger.warning(
+                        f"Checkpoint has {offset:,} staged rows but dw.stg_raw_orders has {staged:,}; "
+                        f"resuming from the table"
+                    )
+                    if staged > offset:
+                        self.run_state.record_chunk("extract", offset=offset, rows=staged - offset)
+                    offset = staged
             
-            self.logger.info("✅ Extract stage completed successfully")
+            # Extract, sanitize and load into staging table chunk by chunk
+            for chunk in self.extractor.iter_csv_chunks(skip_rows=offset):
+                chunk = conform_to_staging(chunk)
+                
+                # Staging types come from the fixed schema, not from the first chunk
+                if create:
+                    for statement in staging_table_ddl(chunk.columns):
+                        self.loader.execute_statement(statement)
+                    create = False
+                
+                self.loader.load_dataframe(
+                    df=chunk,
+                    table_name="stg_raw_orders",
+                    schema="dw",
+                    if_exists="append"
+                )
+                self.run_state.record_chunk("extract", offset=offset, rows=len(chunk))
+                offset += len(chunk)
+            
+            self.logger.info(f"✅ Extract stage completed successfully ({offset:,} rows)")
             return True
             
         except Exception as e:
+            self.last_error = str(e)
             self.logger.error(f"❌ Extract stage failed: {e}")
             return False
     
-    def transform_stage(self) -> bool:
+    def transform_stage(self, blue_green: bool = False) -> bool:
         """
         Execute transformation stage.
         
+        Args:
+            blue_green: Build into the shadow schema, validate it and swap it live
+        
         Returns:
             bool: True if successful
         """
-        self.logger.info("\n[STAGE 2/4] TRANSFORM - Creating star schema")
+        self.logger.info("\n[STAGE 2/5] TRANSFORM - Creating star schema")
         self.logger.info("-" * 70)
         
         try:
+            # Remember which days this batch writes, for incremental validation;
+            # the calendar dimension is extended to cover all of them
+            from src.etl.incremental_validation import batch_date_key_range
+            
+            date_key_range = batch_date_key_range(self.loader)
+            if date_key_range:
+                self.transformer.calendar_since, self.transformer.calendar_through = date_key_range
+            
             # Execute all transformations
-            results = self.transformer.transform_all()
+            if blue_green:
+                from src.etl.swap import SchemaSwapper
+                
+                swapper = SchemaSwapper(loader=self.loader)
+                outcome = swapper.refresh(self.transformer, self.validator)
+                results = outcome["tables"]
+                self.shadow_validation = outcome["validation"]
+            else:
+                results = self.transformer.transform_all()
+            
+            # New data: cached analytics results are no longer valid
+            from src.etl.query_cache import bump_data_version
+            
+            bump_data_version(self.loader)
+            
+            if date_key_range:
+                self.stage_details["transform"] = {"date_key_range": list(date_key_range)}
             
             # Log results
             self.logger.info("Transformation results:")
@@ -108,22 +207,39 @@ class ETLOrchestrator:
             return True
             
         except Exception as e:
+            self.last_error = str(e)
             self.logger.error(f"❌ Transform stage failed: {e}")
             return False
     
-    def validate_stage(self) -> bool:
+    def validate_stage(self, incremental: bool = False) -> bool:
         """
         Execute validation stage.
         
+        Args:
+            incremental: Only validate the rows written by this run's batch
+        
         Returns:
             bool: True if all validations passed
         """
-        self.logger.info("\n[STAGE 3/4] VALIDATE - Data quality checks")
+        self.logger.info("\n[STAGE 3/5] VALIDATE - Data quality checks")
         self.logger.info("-" * 70)
         
         try:
-            # Run all validations
-            summary = self.validator.validate_all()
+            # Run all validations (a blue/green swap already validated these tables)
+            if self.shadow_validation is not None:
+                self.logger.info("Reusing validation of the swapped shadow schema")
+                summary = self.shadow_validation
+            else:
+                scope = None
+                if incremental:
+                    from src.etl.incremental_validation import ValidationScope
+                    
+                    try:
+                        scope = ValidationScope.for_run(self.run_state)
+                    except ValueError as e:
+                        self.logger.warning(f"{e}; validating all rows")
+                
+                summary = self.validator.validate_all(scope=scope)
             
             # Print summary
             self.validator.print_summary()
@@ -143,6 +259,79 @@ class ETLOrchestrator:
             self.logger.error(f"❌ Validate stage failed: {e}")
             return False
     
+    def enrichments(self) -> dict:
+        """
+        Get the enrichment steps, derived tables scored from the loaded facts.
+        
+        Returns:
+            dict: Step name -> callable returning the rows it wrote
+        """
+        from src.etl.enrichment import enrichment_steps
+        from src.etl.incremental_validation import ValidationScope
+        
+        # Row-level scores only need the days of this run's batch
+        try:
+            scope = ValidationScope.for_run(self.run_state)
+        except ValueError:
+            scope = None
+        
+        return enrichment_steps(self.loader, scope)
+    
+    def enrich_stage(self) -> bool:
+        """
+        Execute enrichment stage.
+        
+        Enrichments are derived tables, so a failed step (missing model or
+        optional dependency, scoring error, ...) is logged as a warning and
+        recorded in the stage details instead of holding back the export of
+        the star schema.
+        
+        Returns:
+            bool: Always True; failed steps are reported in stage details
+        """
+        self.logger.info("\n[STAGE 4/5] ENRICH - Scoring loaded data")
+        self.logger.info("-" * 70)
+        
+        failed_steps = {}
+        built = 0
+        try:
+            enrichments = self.enrichments()
+        except Exception as e:
+            self.logger.warning(f"⚠️  Enrichments unavailable: {e}")
+            enrichments, failed_steps["enrich"] = {}, str(e)
+        
+        for step, enrich in enrichments.items():
+            if self.run_state.item_completed("enrich", step):
+                self.logger.info(f"  ⏭️  {step}: already built in this run")
+                continue
+            
+            try:
+                rows = enrich()
+            except Exception as e:
+                failed_steps[step] = str(e)
+                self.logger.warning(f"  ⚠️  {step} failed: {e}")
+                continue
+            
+            self.run_state.complete_item("enrich", step, rows=rows)
+            built += 1
+            self.logger.info(f"  ✅ {step}: {rows:,} rows")
+        
+        # Enrichments rewrote derived tables: results cached since the
+        # transform's version bump may hold their old rows
+        if built:
+            from src.etl.query_cache import bump_data_version
+            
+            bump_data_version(self.loader)
+        
+        self.stage_details["enrich"] = {"failed_steps": failed_steps}
+        if failed_steps:
+            self.logger.warning(
+                f"⚠️  Enrich stage completed with {len(failed_steps)} failed steps: {', '.join(failed_steps)}"
+            )
+        else:
+            self.logger.info("✅ Enrich stage completed successfully")
+        return True
+    
     def export_stage(self) -> bool:
         """
         Execute export stage.
@@ -150,13 +339,15 @@ class ETLOrchestrator:
         Returns:
             bool: True if successful
         """
-        self.logger.info("\n[STAGE 4/4] EXPORT - Exporting data for Power BI")
+        self.logger.info("\n[STAGE 5/5] EXPORT - Exporting data for Power BI")
         self.logger.info("-" * 70)
         
         try:
             # Ensure processed data directory exists
             self.settings.ensure_directories()
             
+            from src.etl.aggregates import AGGREGATE_TABLES
+            
             # Export each table as CSV
             tables = {
                 "dim_customer": "dim_customer.csv",
@@ -166,32 +357,83 @@ class ETLOrchestrator:
                 "fact_orders": "fact_orders.csv"
             }
             
+            # Aggregation tables, when the enrich stage has built them
+            for table in AGGREGATE_TABLES:
+                if self.loader.table_exists(table, schema="dw"):
+                    tables[table] = f"{table}.csv"
+            
             for table, filename in tables.items():
+                if self.run_state.item_completed("export", table):
+                    self.logger.info(f"  ⏭️  {filename}: already exported in this run")
+                    continue
+                
                 self.logger.info(f"Exporting {table}...")
                 
                 # Query data
                 query = f"SELECT * FROM dw.{table}"
-                df = self.loader.execute_query(query)
+                df = self.loader.execute_query(query, arrow=True)
                 
                 # Export to CSV
                 output_path = self.settings.data_processed_dir / filename
                 df.to_csv(output_path, index=False)
                 
+                self.run_state.complete_item("export", table, rows=len(df))
+                
                 self.logger.info(f"  ✅ {filename}: {len(df):,} rows")
             
             self.logger.info("✅ Export stage completed successfully")
             return True
             
         except Exception as e:
+            self.last_error = str(e)
             self.logger.error(f"❌ Export stage failed: {e}")
             return False
     
+    def _run_checkpointed(self, stage: str, stage_func, **kwargs) -> bool:
+        """
+        Run a stage and record its outcome in the run checkpoint.
+        
+        Args:
+            stage: Stage name
+            stage_func: Stage method returning True on success
+            **kwargs: Arguments for the stage method
+        
+        Returns:
+            bool: True if the stage succeeded
+        """
+        self.run_state.start_stage(stage)
+        self.last_error = None
+        
+        if stage_func(**kwargs):
+            self.run_state.complete_stage(stage, **self.stage_details.pop(stage, {}))
+            return True
+        
+        self.run_state.fail_stage(stage, self.last_error or f"{stage} stage failed")
+        return False
+    
+    def _fail_run(self) -> bool:
+        """
+        Mark the run as failed and explain how to resume it.
+        
+        Returns:
+            bool: Always False
+        """
+        self.run_state.finish("failed")
+        self.logger.error(
+            f"Run {self.run_state.run_id} failed. Resume with: "
+            f"python scripts/run_etl.py --resume {self.run_state.run_id}"
+        )
+        return False
+    
     def run(
         self,
         skip_extract: bool = False,
         skip_transform: bool = False,
         skip_validate: bool = False,
-        skip_export: bool = False
+        skip_enrich: bool = False,
+        skip_export: bool = False,
+        blue_green: bool = False,
+        incremental_validation: bool = False
     ) -> bool:
         """
         Run complete ETL pipeline.
@@ -200,39 +442,61 @@ class ETLOrchestrator:
             skip_extract: Skip extraction stage
             skip_transform: Skip transformation stage
             skip_validate: Skip validation stage
+            skip_enrich: Skip enrichment stage
             skip_export: Skip export stage
+            blue_green: Rebuild the star schema in a shadow schema and swap it live
+            incremental_validation: Validate only the rows written by this run
         
         Returns:
             bool: True if pipeline completed successfully
         """
         try:
             # Stage 1: Extract
-            if not skip_extract:
-                if not self.extract_stage():
-                    return False
-            else:
-                self.logger.info("\n[STAGE 1/4] EXTRACT - SKIPPED")
+            if skip_extract:
+                self.logger.info("\n[STAGE 1/5] EXTRACT - SKIPPED")
+            elif self.run_state.stage_completed("extract"):
+                self.logger.info("\n[STAGE 1/5] EXTRACT - ALREADY COMPLETED")
+            elif not self._run_checkpointed("extract", self.extract_stage):
+                return self._fail_run()
             
             # Stage 2: Transform
-            if not skip_transform:
-                if not self.transform_stage():
-                    return False
-            else:
-                self.logger.info("\n[STAGE 2/4] TRANSFORM - SKIPPED")
+            if skip_transform:
+                self.logger.info("\n[STAGE 2/5] TRANSFORM - SKIPPED")
+            elif self.run_state.stage_completed("transform"):
+                self.logger.info("\n[STAGE 2/5] TRANSFORM - ALREADY COMPLETED")
+            elif not self._run_checkpointed("transform", self.transform_stage, blue_green=blue_green):
+                return self._fail_run()
             
             # Stage 3: Validate
             validation_passed = True
-            if not skip_validate:
-                validation_passed = self.validate_stage()
+            if skip_validate:
+                self.logger.info("\n[STAGE 3/5] VALIDATE - SKIPPED")
+            elif self.run_state.stage_completed("validate"):
+                self.logger.info("\n[STAGE 3/5] VALIDATE - ALREADY COMPLETED")
+                validation_passed = self.run_state.stage_details("validate").get("passed", True)
             else:
-                self.logger.info("\n[STAGE 3/4] VALIDATE - SKIPPED")
+                self.run_state.start_stage("validate")
+                validation_passed = self.validate_stage(incremental=incremental_validation)
+                self.run_state.complete_stage("validate", passed=validation_passed)
             
-            # Stage 4: Export
-            if not skip_export:
-                if not self.export_stage():
-                    return False
-            else:
-                self.logger.info("\n[STAGE 4/4] EXPORT - SKIPPED")
+            # Stage 4: Enrich
+            if skip_enrich:
+                self.logger.info("\n[STAGE 4/5] ENRICH - SKIPPED")
+            elif self.run_state.stage_completed("enrich"):
+                self.logger.info("\n[STAGE 4/5] ENRICH - ALREADY COMPLETED")
+            elif not self._run_checkpointed("enrich", self.enrich_stage):
+                return self._fail_run()
+            enrich_passed = not self.run_state.stage_details("enrich").get("failed_steps")
+            
+            # Stage 5: Export
+            if skip_export:
+                self.logger.info("\n[STAGE 5/5] EXPORT - SKIPPED")
+            elif self.run_state.stage_completed("export"):
+                self.logger.info("\n[STAGE 5/5] EXPORT - ALREADY COMPLETED")
+            elif not self._run_checkpointed("export", self.export_stage):
+                return self._fail_run()
+            
+            passed = validation_passed and enrich_passed
             
             # Calculate execution time
             elapsed = (datetime.now() - self.start_time).total_seconds()
@@ -241,7 +505,7 @@ class ETLOrchestrator:
             self.logger.info("\n" + "=" * 70)
             self.logger.info("PIPELINE EXECUTION SUMMARY")
             self.logger.info("=" * 70)
-            self.logger.info(f"Status: {'SUCCESS ✅' if validation_passed else 'COMPLETED WITH WARNINGS ⚠️ '}")
+            self.logger.info(f"Status: {'SUCCESS ✅' if passed else 'COMPLETED WITH WARNINGS ⚠️ '}")
             self.logger.info(f"Duration: {elapsed:.2f} seconds")
             self.logger.info(f"End time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             self.logger.info("=" * 70)
@@ -251,18 +515,28 @@ class ETLOrchestrator:
                     "\n⚠️  Pipeline completed but validation checks failed. "
                     "Review logs for details."
                 )
+            if not enrich_passed:
+                self.logger.warning(
+                    "\n⚠️  Pipeline completed but enrichment steps failed: "
+                    f"{', '.join(self.run_state.stage_details('enrich')['failed_steps'])}. "
+                    "Review logs for details."
+                )
             
-            return validation_passed
+            self.run_state.finish("completed" if passed else "completed_with_warnings")
+            return passed
             
         except KeyboardInterrupt:
             self.logger.warning("\n⚠️  Pipeline interrupted by user")
-            return False
+            return self._fail_run()
         except Exception as e:
             self.logger.error(f"\n❌ Pipeline failed with unexpected error: {e}")
-            return False
+            return self._fail_run()
         finally:
-            # Cleanup
-            self.loader.close()
+            # Report where database time went, then cleanup (if the loader was used)
+            if "loader" in self.__dict__:
+                if self.loader.query_profiler:
+                    self.loader.query_profiler.log_report()
+                self.loader.close()
 
 
 def main():
@@ -279,7 +553,19 @@ Examples:
   python scripts/run_etl.py --skip-extract
   
   # Run only transformation
-  python scripts/run_etl.py --skip-extract --skip-validate --skip-export
+  python scripts/run_etl.py --skip-extract --skip-validate --skip-enrich --skip-export
+  
+  # Rebuild into dw_next and swap it live (no half-built tables for Power BI)
+  python scripts/run_etl.py --skip-extract --blue-green
+  
+  # Overlap I/O-bound stages with asyncio + asyncpg
+  python scripts/run_etl.py --async
+  
+  # Validate only the days loaded by this run (running summary for global KPIs)
+  python scripts/run_etl.py --incremental-validation
+  
+  # Resume a failed run, redoing only the incomplete stages/chunks/tables
+  python scripts/run_etl.py --resume 20260204_153012_a1b2c3
         """
     )
     
@@ -301,22 +587,88 @@ Examples:
         help="Skip validation stage"
     )
     
+    parser.add_argument(
+        "--skip-enrich",
+        action="store_true",
+        help="Skip enrichment stage (customer risk, anomaly and late-delivery scoring, OTIF forecasts, aggregation tables)"
+    )
+    
     parser.add_argument(
         "--skip-export",
         action="store_true",
         help="Skip export stage"
     )
     
+    parser.add_argument(
+        "--blue-green",
+        action="store_true",
+        help="Build the star schema in the shadow schema and swap it into dw atomically"
+    )
+    
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio orchestrator (asyncpg) to overlap I/O-bound stages"
+    )
+    
+    parser.add_argument(
+        "--incremental-validation",
+        action="store_true",
+        help="Validate only the rows written by this run's batch"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume a failed run from its checkpoint (logs/runs/<RUN_ID>.json)"
+    )
+    
     args = parser.parse_args()
     
+    if args.use_async and args.blue_green:
+        parser.error("--blue-green is not supported with --async")
+    if args.use_async and args.resume:
+        parser.error("--resume is not supported with --async")
+    if args.use_async and args.incremental_validation:
+        parser.error("--incremental-validation is not supported with --async")
+    
+    options = {
+        "skip_extract": args.skip_extract,
+        "skip_transform": args.skip_transform,
+        "skip_validate": args.skip_validate,
+        "skip_enrich": args.skip_enrich,
+        "skip_export": args.skip_export,
+        "blue_green": args.blue_green,
+        "incremental_validation": args.incremental_validation,
+    }
+    
     # Initialize and run orchestrator
-    orchestrator = ETLOrchestrator()
-    success = orchestrator.run(
-        skip_extract=args.skip_extract,
-        skip_transform=args.skip_transform,
-        skip_validate=args.skip_validate,
-        skip_export=args.skip_export
-    )
+    if args.use_async:
+        from src.etl.async_orchestrator import AsyncETLOrchestrator
+        
+        success = AsyncETLOrchestrator().run(
+            skip_extract=args.skip_extract,
+            skip_transform=args.skip_transform,
+            skip_validate=args.skip_validate,
+            skip_enrich=args.skip_enrich,
+            skip_export=args.skip_export
+        )
+    else:
+        from src.etl.checkpoint import RunState
+        
+        if args.resume:
+            # A resumed run keeps the options it was started with
+            try:
+                run_state = RunState.load(args.resume)
+            except FileNotFoundError as e:
+                parser.error(str(e))
+            options = run_state.options
+        else:
+            run_state = RunState(options=options)
+        
+        orchestrator = ETLOrchestrator(run_state=run_state)
+        success = orchestrator.run(**options)
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Torre Control - OTIF Forecast CLI
+==================================
+
+Refits the monthly OTIF % and revenue-at-risk series whose history changed
+and prints the next months' forecast of every market and customer
+segment from dw.forecast_otif.
+
+Usage:
+    python scripts/run_forecast.py [--horizon N] [--workers N] [--refit]
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Forecast Torre Control OTIF and revenue at risk")
+    parser.add_argument("--horizon", type=int, help="Months to forecast (default: forecast_horizon_months)")
+    parser.add_argument("--workers", type=int, help="Fitting processes (default: forecast_workers)")
+    parser.add_argument("--refit", action="store_true", help="Refit every series, ignoring cached forecasts")
+    args = parser.parse_args()
+
+    from src.etl.forecast import OTIFForecaster
+    from src.etl.load import DataLoader
+
+    loader = DataLoader()
+    try:
+        forecaster = OTIFForecaster(loader=loader, horizon=args.horizon, workers=args.workers)
+        forecaster.run(refit=args.refit)
+        forecasts = loader.execute_query(f"""
+            SELECT dimension, member, metric, forecast_month, forecast, lower_bound, upper_bound, method
+            FROM {forecaster.table}
+            ORDER BY dimension, member, metric, forecast_month
+        """)
+    finally:
+        loader.close()
+
+    for metric, rows in forecasts.groupby("metric", sort=False):
+        print("\n" + "=" * 70)
+        print(f"📈 {metric} forecast ({forecaster.horizon} months)")
+        print("=" * 70)
+        table = rows.pivot_table(
+            index=["dimension", "member"], columns="forecast_month", values="forecast", aggfunc="first"
+        )
+        print(table.to_string(float_format=lambda value: f"{value:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
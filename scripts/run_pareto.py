@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Pareto Analysis CLI
+====================================
+
+Prints the 80/20 distribution of late deliveries (or late revenue, items,
+sales) over a dimension: which members make up the vital few. All
+dimensions are rolled up from one cached grouped query over fact_orders.
+
+Usage:
+    python scripts/run_pareto.py [--dimension product] [--measure late_items]
+                                 [--threshold 80] [--top N] [--no-cache] [--export]
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+DIMENSIONS = ["product", "category", "department", "market", "shipping_mode"]
+MEASURES = ["late_items", "late_sales", "total_items", "sales"]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Pareto (80/20) analysis of Torre Control deliveries")
+    parser.add_argument("--dimension", choices=DIMENSIONS + ["all"], default="product", help="Dimension to rank")
+    parser.add_argument("--measure", choices=MEASURES, default="late_items", help="Measure to distribute")
+    parser.add_argument("--threshold", type=float, default=80.0, help="Cumulative %% defining the vital few")
+    parser.add_argument("--top", type=int, default=20, help="Rows printed per dimension")
+    parser.add_argument("--no-cache", action="store_true", help="Always query the warehouse")
+    parser.add_argument("--export", action="store_true", help="Write results to data/processed as Parquet")
+    args = parser.parse_args()
+
+    from src.config import get_settings
+    from src.etl.load import DataLoader
+    from src.etl.pareto import ParetoAnalyzer
+
+    dimensions = DIMENSIONS if args.dimension == "all" else [args.dimension]
+    loader = DataLoader()
+    try:
+        analyzer = ParetoAnalyzer(loader=loader, cache=not args.no_cache)
+        for dimension in dimensions:
+            result = analyzer.analyze(dimension, args.measure, args.threshold)
+            vital = int(result["is_vital_few"].sum())
+
+            print("\n" + "=" * 70)
+            print(f"📊 {args.measure} by {dimension}: {vital:,} of {len(result):,} members "
+                  f"make up {args.threshold:.0f}%")
+            print("=" * 70)
+            print(result.head(args.top).to_string(index=False, float_format=lambda value: f"{value:,.2f}"))
+
+            if args.export:
+                output_dir = get_settings().data_processed_dir
+                output_dir.mkdir(parents=True, exist_ok=True)
+                output_file = output_dir / f"pareto_{dimension}_{args.measure}.parquet"
+                result.to_parquet(output_file, index=False)
+                print(f"\n✓ Exported to {output_file}")
+    finally:
+        loader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Late-Delivery Model Training
+=============================================
+
+Builds features from fact_orders and the dimensions, trains the
+late-delivery classifier on the older 80% of the orders, reports its
+holdout metrics and saves it to models/ for the pipeline's ENRICH stage.
+
+Usage:
+    python scripts/train_late_delivery_model.py [--algorithm hist_gradient_boosting|xgboost]
+                                                [--max-rows N] [--output FILE]
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Train the Torre Control late-delivery risk model")
+    parser.add_argument(
+        "--algorithm",
+        choices=["hist_gradient_boosting", "xgboost"],
+        help="Classifier (default: late_model_algorithm setting)"
+    )
+    parser.add_argument("--max-rows", type=int, help="Train on the newest N order items only")
+    parser.add_argument("--output", type=Path, help="Model file (default: models/<late_model_file>)")
+    args = parser.parse_args()
+
+    from src.etl.late_delivery_model import train_model
+    from src.etl.load import DataLoader
+
+    loader = DataLoader()
+    try:
+        bundle = train_model(loader, algorithm=args.algorithm, max_rows=args.max_rows, path=args.output)
+    finally:
+        loader.close()
+
+    print("\n" + "=" * 70)
+    print(f"🤖 Late-delivery model {bundle['version']} ({bundle['algorithm']})")
+    print("=" * 70)
+    print(f"Trained on: {bundle['trained_rows']:,} order items")
+    for metric, value in bundle["metrics"].items():
+        print(f"  {metric:<18} {value}")
+    print(f"\n✓ Saved to {bundle['path']}")
+
+
+if __name__ == "__main__":
+    main()
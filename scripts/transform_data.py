@@ -16,6 +16,7 @@ Deprecated: 2026-02-04
 
 import logging
 import os
+import sys
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -26,6 +27,10 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.etl.date_dimension import generate_calendar
+
 # ============================================================================
 # CONFIGURATION & SETUP
 # ============================================================================
@@ -335,47 +340,28 @@ def populate_dim_date(engine):
         
         log(f"  📅 Date range: {min_date} to {max_date}", "INFO")
         
-        date_range = pd.date_range(start=min_date, end=max_date, freq="D")
-        df_dates = pd.DataFrame({"order_date": date_range})
-        
-        df_dates["date_id"] = df_dates["order_date"].dt.strftime("%Y%m%d").astype(int)
-        df_dates["year"] = df_dates["order_date"].dt.year
-        df_dates["quarter"] = df_dates["order_date"].dt.quarter
-        df_dates["month"] = df_dates["order_date"].dt.month
-        df_dates["week"] = df_dates["order_date"].dt.isocalendar().week
-        df_dates["day_of_month"] = df_dates["order_date"].dt.day
-        df_dates["day_of_week"] = df_dates["order_date"].dt.dayofweek + 1
-        df_dates["month_name"] = df_dates["order_date"].dt.strftime("%B")
-        df_dates["day_name"] = df_dates["order_date"].dt.strftime("%A")
-        df_dates["is_weekend"] = df_dates["day_of_week"].isin([6, 7]).astype(int)
+        # Vectorized calendar (see src/etl/date_dimension.py), inserted in one batch
+        df_dates = generate_calendar(pd.Timestamp(min_date).date(), pd.Timestamp(max_date).date())
         
         log(f"  📅 Generated {len(df_dates):,} calendar dates", "INFO")
         
-        insert_count = 0
-        
         # Note: dim_date schema has fewer columns - simplified insert
+        records = (
+            df_dates.rename(columns={"full_date": "order_date", "day_of_month": "day"})
+            [["order_date", "year", "month", "day"]]
+            .to_dict("records")
+        )
         with engine.begin() as conn:
-            for _, row in tqdm(df_dates.iterrows(), total=len(df_dates), desc="  Inserting dates"):
-                upsert_query = text("""
+            conn.execute(
+                text("""
                     INSERT INTO dw.dim_date 
                     (order_date, year, month, day)
                     VALUES (:order_date, :year, :month, :day)
                     ON CONFLICT (date_key) DO NOTHING
-                """)
-                
-                try:
-                    conn.execute(
-                        upsert_query,
-                        {
-                            "order_date": row["order_date"],
-                            "year": int(row["year"]),
-                            "month": int(row["month"]),
-                            "day": int(row["day_of_month"])
-                        }
-                    )
-                    insert_count += 1
-                except (SQLAlchemyError, IntegrityError, ValueError) as e:
-                    log(f"  ⚠️  Error inserting date {row['order_date']}: {e}", "WARNING")
+                """),
+                records
+            )
+        insert_count = len(records)
         
         log(f"✅ dim_date: {insert_count:,} inserted", "INFO")
         
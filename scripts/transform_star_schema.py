@@ -14,6 +14,11 @@ from datetime import datetime
 import psycopg2
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.etl.query_cache import BUMP_DATA_VERSION_SQL  # noqa: E402
+from src.etl.row_counts import estimate_from_stats  # noqa: E402
+
 # Load environment variables
 load_dotenv()
 
@@ -95,46 +100,61 @@ def verify_results(conn):
     print("📊 STAR SCHEMA VERIFICATION")
     print("="*60)
 
-    verification_query = """
-    SELECT 'dim_customer' as tabla, COUNT(*) as registros FROM dw.dim_customer
-    UNION ALL SELECT 'dim_geography', COUNT(*) FROM dw.dim_geography
-    UNION ALL SELECT 'dim_product', COUNT(*) FROM dw.dim_product
-    UNION ALL SELECT 'dim_date', COUNT(*) FROM dw.dim_date
-    UNION ALL SELECT 'fact_orders', COUNT(*) FROM dw.fact_orders
-    ORDER BY tabla;
+    star_tables = ["dim_customer", "dim_date", "dim_geography", "dim_product", "fact_orders"]
+
+    # Sizes come from the catalog instead of a COUNT(*) scan per table;
+    # ANALYZE (sampled, cheap) refreshes them after the bulk population
+    estimate_query = """
+    SELECT c.relname AS tabla,
+           c.reltuples::bigint AS reltuples,
+           s.n_live_tup
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE n.nspname = 'dw' AND c.relname = ANY(%(tables)s)
+    ORDER BY c.relname;
     """
 
     try:
         with conn.cursor() as cursor:
-            cursor.execute(verification_query)
-            results = cursor.fetchall()
-
-            print(f"\n{'Tabla':<20} {'Registros':>15}")
-            print("-" * 36)
-
-            total_records = 0
-            for tabla, registros in results:
-                print(f"{tabla:<20} {registros:>15,}")
-                total_records += registros
-
-            print("-" * 36)
-            print(f"{'TOTAL':<20} {total_records:>15,}\n")
-
-            # Validate minimum expected records
-            fact_count = [r[1] for r in results if r[0] == 'fact_orders'][0]
-
-            if fact_count == 0:
-                print("❌ CRITICAL: fact_orders table is empty")
-                print("   Action: Check staging table (stg_raw_orders) has data")
-                raise DataValidationError(
-                    "fact_orders is empty - ETL transformation failed")
-
-            if fact_count < 1000:
-                print("⚠️  WARNING: fact_orders has fewer than expected records")
-                print(f"   Found: {fact_count:,} | Expected: 100,000+ orders")
-
-            print("✅ All tables populated successfully")
-            return True
+            cursor.execute(
+                "ANALYZE " + ", ".join(f"dw.{table}" for table in star_tables))
+            cursor.execute(estimate_query, {"tables": star_tables})
+            results = [
+                (tabla, estimate_from_stats(reltuples, n_live_tup) or 0)
+                for tabla, reltuples, n_live_tup in cursor.fetchall()
+            ]
+            # Emptiness is decisive, so it is checked exactly (and cheaply)
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM dw.fact_orders)")
+            fact_has_rows = cursor.fetchone()[0]
+        conn.commit()
+
+        print(f"\n{'Tabla':<20} {'Registros (est.)':>15}")
+        print("-" * 36)
+
+        total_records = 0
+        for tabla, registros in results:
+            print(f"{tabla:<20} {registros:>15,}")
+            total_records += registros
+
+        print("-" * 36)
+        print(f"{'TOTAL':<20} {total_records:>15,}\n")
+
+        # Validate minimum expected records
+        fact_count = dict(results).get('fact_orders', 0)
+
+        if not fact_has_rows:
+            print("❌ CRITICAL: fact_orders table is empty")
+            print("   Action: Check staging table (stg_raw_orders) has data")
+            raise DataValidationError(
+                "fact_orders is empty - ETL transformation failed")
+
+        if fact_count < 1000:
+            print("⚠️  WARNING: fact_orders has fewer than expected records")
+            print(f"   Found: {fact_count:,} | Expected: 100,000+ orders")
+
+        print("✅ All tables populated successfully")
+        return True
 
     except psycopg2.Error as e:
         print(f"❌ Database error during verification: {e}")
@@ -177,6 +197,11 @@ def main():
 
         execute_sql_file(conn, sql_file)
 
+        # New data: cached analytics query results are no longer valid
+        with conn.cursor() as cursor:
+            cursor.execute(BUMP_DATA_VERSION_SQL)
+        conn.commit()
+
         # Verify results
         verify_results(conn)
 
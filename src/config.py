@@ -11,6 +11,8 @@ Date: 2026-02-04
 """
 
 import os
+from datetime import date
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -34,9 +36,46 @@ class Settings(BaseSettings):
         csv_file_path: Path to raw CSV data file
         staging_table: Staging table name
         batch_size: Batch size for data loading
+        extract_chunk_size: CSV rows per checkpointed staging chunk
+        staging_cache_enabled: Cache the sanitized CSV as Parquet in data/interim
+        query_profiling_enabled: Record per-statement SQL timings in DataLoader
+        slow_query_threshold_ms: Statements slower than this are reported as slow
+        explain_slow_queries: Sample an EXPLAIN plan for slow statements
+        query_cache_enabled: Allow DataLoader to serve cached query results
+        query_cache_max_mb: Size limit of the query result cache
+        arrow_block_size_mb: COPY output parsed per Arrow record batch
+        shadow_schema: Schema used to build the star schema before swapping it live
+        swap_lock_timeout_ms: Lock timeout for the blue/green swap transaction
+        validation_workers: Validation checks run concurrently by DataValidator
+        validation_check_timeout_s: Time limit of a single validation check
+        validation_count_mode: Row count mode of the validation size checks
+        validation_sample_percent: Table percentage read by sampled checks (0 = exhaustive)
+        validation_sample_method: TABLESAMPLE method of sampled checks
+        validation_sample_seed: REPEATABLE seed of sampled checks
+        validation_confidence: Confidence level of sampled estimates
+        calendar_start_date: First day of the generated date dimension
+        calendar_end_date: Last day of the generated date dimension (default: end of next year)
+        fiscal_year_start_month: First month of the fiscal year
+        calendar_holidays: Holiday calendar used for the is_holiday flag
+        async_pool_size: Connection pool size for the async orchestrator
+        async_chunk_size: CSV rows per COPY batch in the async orchestrator
         otif_target: Target OTIF percentage
         revenue_at_risk_threshold: Alert threshold for revenue at risk
         churn_risk_ltv_threshold: VIP customer LTV threshold
+        risk_sketch_relative_accuracy: Relative error of the quantile sketches behind RFM quintiles
+        anomaly_score_threshold: Modified z-score from which a fact row is flagged as anomalous
+        anomaly_baseline_max_age_days: Age after which the anomaly baselines are refitted
+        late_model_file: File (in models/) holding the late-delivery model
+        late_model_algorithm: Classifier trained for late-delivery risk
+        late_risk_threshold: Predicted probability from which an order is at risk
+        forecast_horizon_months: Months ahead forecast for OTIF and revenue at risk
+        forecast_workers: Processes fitting forecast series in parallel
+        semantic_model_path: Power BI semantic model folder (relative to the project root)
+        semantic_directquery_min_rows: Fact rows from which the semantic model uses DirectQuery
+        semantic_aggregation_max_ratio: Largest aggregation/detail row ratio worth an aggregation table
+        parquet_compression: Codec of the VertiPaq Parquet export profile
+        parquet_compression_level: Codec level of the VertiPaq Parquet export profile (None: codec default)
+        parquet_row_group_size: Rows per row group of the VertiPaq Parquet export profile
     """
     
     model_config = SettingsConfigDict(
@@ -64,6 +103,94 @@ class Settings(BaseSettings):
     )
     staging_table: str = Field(default="dw.stg_raw_orders", description="Staging table")
     batch_size: int = Field(default=1000, description="Batch size for loading")
+    extract_chunk_size: int = Field(
+        default=50000,
+        description="CSV rows per committed (resumable) staging chunk"
+    )
+    staging_cache_enabled: bool = Field(
+        default=True,
+        description="Reuse a Parquet copy of the sanitized CSV while the file is unchanged"
+    )
+    
+    # Query Profiling Configuration
+    query_profiling_enabled: bool = Field(default=True, description="Profile SQL statements run by DataLoader")
+    slow_query_threshold_ms: float = Field(default=1000.0, description="Slow statement threshold (ms)")
+    explain_slow_queries: bool = Field(default=False, description="Capture EXPLAIN plans of slow statements")
+    
+    # Query Result Cache Configuration
+    query_cache_enabled: bool = Field(
+        default=True,
+        description="Serve repeated analytics queries (execute_query(cache=True)) from a local cache"
+    )
+    query_cache_max_mb: int = Field(default=512, ge=0, description="Query result cache size limit (MB)")
+    
+    # Arrow Result Configuration
+    arrow_block_size_mb: int = Field(
+        default=16,
+        ge=1,
+        description="COPY output (MB) parsed into each Arrow record batch by arrow query results"
+    )
+    
+    # Blue/Green Refresh Configuration
+    shadow_schema: str = Field(
+        default="dw_next",
+        description="Shadow schema where the star schema is rebuilt before the swap"
+    )
+    swap_lock_timeout_ms: int = Field(
+        default=5000,
+        description="Maximum wait for table locks during the schema swap"
+    )
+    
+    # Validation Configuration
+    validation_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Concurrent validation checks (each holds one pooled connection)"
+    )
+    validation_check_timeout_s: float = Field(
+        default=120.0,
+        gt=0,
+        description="Time limit of a single validation check (seconds)"
+    )
+    validation_count_mode: str = Field(
+        default="exact",
+        description="Row counts for size checks: exact (COUNT(*)), estimated (catalog, opt-in) or cached"
+    )
+    validation_sample_percent: float = Field(
+        default=0.0,
+        ge=0,
+        le=100,
+        description="Percentage of large tables sampled by validation checks (0 = exhaustive)"
+    )
+    validation_sample_method: str = Field(
+        default="SYSTEM",
+        description="TABLESAMPLE method: SYSTEM (random pages) or BERNOULLI (random rows)"
+    )
+    validation_sample_seed: int = Field(default=42, description="REPEATABLE seed for sampled validation")
+    validation_confidence: float = Field(
+        default=0.95,
+        gt=0,
+        lt=1,
+        description="Confidence level of sampled validation estimates"
+    )
+    
+    # Calendar (dim_date) Configuration
+    calendar_start_date: date = Field(default=date(2015, 1, 1), description="First day of dim_date")
+    calendar_end_date: Optional[date] = Field(
+        default=None,
+        description="Last day of dim_date (default: December 31 of next year)"
+    )
+    fiscal_year_start_month: int = Field(
+        default=1,
+        ge=1,
+        le=12,
+        description="First month of the fiscal year (fiscal years are named after the year they end in)"
+    )
+    calendar_holidays: str = Field(default="us_federal", description="Holiday calendar: us_federal or none")
+    
+    # Async Orchestrator Configuration
+    async_pool_size: int = Field(default=5, description="asyncpg pool size for the async orchestrator")
+    async_chunk_size: int = Field(default=50000, description="CSV rows per COPY batch (async orchestrator)")
     
     # Analytics Configuration
     otif_target: float = Field(default=95.0, description="Target OTIF percentage")
@@ -75,6 +202,82 @@ class Settings(BaseSettings):
         default=50000.0,
         description="VIP customer LTV threshold"
     )
+    risk_sketch_relative_accuracy: float = Field(
+        default=0.01,
+        gt=0,
+        lt=1,
+        description="Relative error of the quantile sketches used for the customer_risk RFM quintiles"
+    )
+    
+    # Anomaly Scoring Configuration
+    anomaly_score_threshold: float = Field(
+        default=3.5,
+        gt=0,
+        description="Modified z-score (vs. the market x shipping mode baseline) flagging an anomaly"
+    )
+    anomaly_baseline_max_age_days: int = Field(
+        default=7,
+        ge=0,
+        description="Refit the anomaly baselines once they are older than this many days"
+    )
+    
+    # Late-Delivery Model Configuration
+    late_model_file: str = Field(default="late_delivery.joblib", description="Model file in models/")
+    late_model_algorithm: str = Field(
+        default="hist_gradient_boosting",
+        description="Late-delivery classifier: hist_gradient_boosting (scikit-learn) or xgboost"
+    )
+    late_risk_threshold: float = Field(
+        default=0.5,
+        gt=0,
+        lt=1,
+        description="Late probability from which an order is shown as at risk"
+    )
+    
+    # Forecasting Configuration
+    forecast_horizon_months: int = Field(
+        default=6,
+        ge=1,
+        le=24,
+        description="Months ahead forecast for OTIF % and revenue at risk"
+    )
+    forecast_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Worker processes fitting forecast series in parallel"
+    )
+    
+    # Power BI Semantic Model Configuration
+    semantic_model_path: str = Field(
+        default="PBIX/Torre_Control_v0.1.SemanticModel",
+        description="Semantic model folder written by the TMDL generator"
+    )
+    semantic_directquery_min_rows: int = Field(
+        default=20_000_000,
+        ge=1,
+        description="Fact tables with at least this many rows are DirectQuery, smaller ones Import"
+    )
+    semantic_aggregation_max_ratio: float = Field(
+        default=0.1,
+        gt=0,
+        le=1,
+        description="Aggregation tables are used when they have at most this share of the detail rows"
+    )
+    
+    # Parquet Export Configuration
+    parquet_compression: str = Field(
+        default="zstd",
+        description="Parquet codec of the Power BI export: zstd, snappy, gzip, lz4 or none"
+    )
+    parquet_compression_level: Optional[int] = Field(
+        default=None,
+        description="Codec level (e.g. 1-22 for zstd); codec default when unset"
+    )
+    parquet_row_group_size: int = Field(
+        default=1_048_576,
+        ge=1,
+        description="Rows per Parquet row group (default: one VertiPaq segment)"
+    )
     
     @property
     def database_url(self) -> str:
@@ -103,6 +306,42 @@ class Settings(BaseSettings):
             raise ValueError(f"environment must be one of {valid_envs}")
         return v.lower()
     
+    @field_validator("validation_count_mode")
+    @classmethod
+    def validate_count_mode(cls, v: str) -> str:
+        """Validate row count mode."""
+        valid_modes = ["estimated", "exact", "cached"]
+        if v.lower() not in valid_modes:
+            raise ValueError(f"validation_count_mode must be one of {valid_modes}")
+        return v.lower()
+    
+    @field_validator("calendar_holidays")
+    @classmethod
+    def validate_calendar_holidays(cls, v: str) -> str:
+        """Validate holiday calendar."""
+        valid_calendars = ["us_federal", "none"]
+        if v.lower() not in valid_calendars:
+            raise ValueError(f"calendar_holidays must be one of {valid_calendars}")
+        return v.lower()
+    
+    @field_validator("late_model_algorithm")
+    @classmethod
+    def validate_late_model_algorithm(cls, v: str) -> str:
+        """Validate late-delivery classifier."""
+        valid_algorithms = ["hist_gradient_boosting", "xgboost"]
+        if v.lower() not in valid_algorithms:
+            raise ValueError(f"late_model_algorithm must be one of {valid_algorithms}")
+        return v.lower()
+    
+    @field_validator("parquet_compression")
+    @classmethod
+    def validate_parquet_compression(cls, v: str) -> str:
+        """Validate Parquet codec."""
+        valid_codecs = ["zstd", "snappy", "gzip", "lz4", "none"]
+        if v.lower() not in valid_codecs:
+            raise ValueError(f"parquet_compression must be one of {valid_codecs}")
+        return v.lower()
+    
     @property
     def project_root(self) -> Path:
         """Get project root directory."""
@@ -118,30 +357,60 @@ class Settings(BaseSettings):
         """Get processed data directory."""
         return self.project_root / "data" / "processed"
     
+    @property
+    def data_interim_dir(self) -> Path:
+        """Get interim data directory (Parquet staging cache)."""
+        return self.project_root / "data" / "interim"
+    
+    @property
+    def query_cache_dir(self) -> Path:
+        """Get query result cache directory."""
+        return self.data_interim_dir / "query_cache"
+    
     @property
     def logs_dir(self) -> Path:
         """Get logs directory."""
         return self.project_root / "logs"
     
+    @property
+    def run_state_dir(self) -> Path:
+        """Get directory holding pipeline run checkpoints."""
+        return self.logs_dir / "runs"
+    
+    @property
+    def models_dir(self) -> Path:
+        """Get directory holding trained models."""
+        return self.project_root / "models"
+    
+    @property
+    def semantic_model_dir(self) -> Path:
+        """Get the TMDL definition folder of the Power BI semantic model."""
+        return self.project_root / self.semantic_model_path / "definition"
+    
+    @property
+    def benchmark_dir(self) -> Path:
+        """Get directory holding benchmark results."""
+        return self.logs_dir / "benchmarks"
+    
     def ensure_directories(self) -> None:
         """Create necessary directories if they don't exist."""
         self.data_raw_dir.mkdir(parents=True, exist_ok=True)
         self.data_processed_dir.mkdir(parents=True, exist_ok=True)
+        self.data_interim_dir.mkdir(parents=True, exist_ok=True)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
 
 
-# Global settings instance
-settings = Settings()
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Get application settings instance.
     
+    Settings are read from the environment on first use, not at import time.
+    
     Returns:
         Settings: Application settings
     """
-    return settings
+    return Settings()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Aggregation Tables
+===================================
+
+Builds pre-aggregated copies of fact_orders for Power BI composite models,
+so visuals at month or day level read a few thousand rows instead of every
+order item:
+
+- ``agg_orders_month``: month x market x customer segment x category
+- ``agg_orders_day_market``: day x market
+
+Besides their grain, both tables are grouped by the is_late, is_complete
+and is_canceled flags. The semantic model measures (OTIF %, Late Items,
+Revenue at Risk, ...) filter fact_orders on those flags, and a filter can
+only be answered from an aggregation that groups by it. The precomputed
+OTIF, late and revenue-at-risk columns serve readers of the exported
+files.
+
+Like the validation summary, tables are maintained per batch: only the
+months or days touched by a run are recomputed, in one transaction.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+from src.logging_config import LoggerMixin, log_execution_time
+
+if TYPE_CHECKING:
+    from src.etl.incremental_validation import ValidationScope
+    from src.etl.load import DataLoader
+
+
+DETAIL_TABLE = "fact_orders"
+
+# Grain column -> (SQL over fact_orders f and the dimensions, SQL type,
+# semantic model column it groups by)
+MONTH_GRAIN = {
+    "year": ("d.year", "INTEGER", "dim_date.year"),
+    "month": ("d.month", "INTEGER", "dim_date.month"),
+    "market": ("g.market", "VARCHAR(100)", "dim_geography.market"),
+    "customer_segment": ("c.customer_segment", "VARCHAR(100)", "dim_customer.customer_segment"),
+    "category_name": ("p.category_name", "VARCHAR(100)", "dim_product.category_name"),
+}
+DAY_GRAIN = {
+    "date_key": ("f.date_key", "INTEGER", "fact_orders.date_key"),
+    "market": ("g.market", "VARCHAR(100)", "dim_geography.market"),
+}
+FLAG_GRAIN = {
+    flag: (f"f.{flag}", "BOOLEAN", f"fact_orders.{flag}")
+    for flag in ("is_late", "is_complete", "is_canceled")
+}
+
+# Aggregated column -> (SQL, SQL type, (summarization, semantic model base)
+# or None when no detail column computes it)
+MEASURE_COLUMNS = {
+    "order_items": ("COUNT(*)", "BIGINT", ("count", "fact_orders")),
+    "active_items": ("COUNT(*) FILTER (WHERE NOT f.is_canceled)", "BIGINT", None),
+    "otif_items": (
+        "COUNT(*) FILTER (WHERE NOT f.is_canceled AND NOT f.is_late AND f.is_complete)", "BIGINT", None
+    ),
+    "late_items": ("COUNT(*) FILTER (WHERE f.is_late)", "BIGINT", None),
+    "sales": ("COALESCE(SUM(f.sales), 0)", "NUMERIC(16, 2)", ("sum", "fact_orders.sales")),
+    "revenue_at_risk": ("COALESCE(SUM(f.sales) FILTER (WHERE f.is_late), 0)", "NUMERIC(16, 2)", None),
+}
+
+# Table -> grain columns and the period a batch scope is widened to
+AGGREGATE_TABLES = {
+    "agg_orders_month": {"grain": {**MONTH_GRAIN, **FLAG_GRAIN}, "period": "month"},
+    "agg_orders_day_market": {"grain": {**DAY_GRAIN, **FLAG_GRAIN}, "period": "day"},
+}
+
+AGGREGATE_SQL = """
+    SELECT
+        {columns}
+    FROM {schema}.fact_orders f
+    LEFT JOIN {schema}.dim_date d ON d.date_key = f.date_key
+    LEFT JOIN {schema}.dim_geography g ON g.geography_key = f.geography_key
+    LEFT JOIN {schema}.dim_customer c ON c.customer_id = f.customer_id
+    LEFT JOIN {schema}.dim_product p ON p.product_card_id = f.product_card_id
+    WHERE {where}
+    GROUP BY {group_by}
+"""
+
+
+def semantic_aggregations() -> Dict[str, dict]:
+    """
+    Aggregation specs of the semantic model generator.
+
+    Returns:
+        dict: Table -> {"detail": fact table, "columns": {column:
+            (summarization, base)}} for the columns Power BI can map
+    """
+    aggregations = {}
+    for table, spec in AGGREGATE_TABLES.items():
+        columns = {column: ("groupBy", base) for column, (_, _, base) in spec["grain"].items()}
+        columns.update({
+            column: mapping for column, (_, _, mapping) in MEASURE_COLUMNS.items() if mapping is not None
+        })
+        aggregations[table] = {"detail": DETAIL_TABLE, "columns": columns}
+    return aggregations
+
+
+class AggregateBuilder(LoggerMixin):
+    """
+    Creates and refreshes the aggregation tables.
+    """
+
+    def __init__(self, loader: "DataLoader", schema: str = "dw"):
+        """
+        Initialize AggregateBuilder.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding fact_orders and the aggregation tables
+        """
+        self.loader = loader
+        self.schema = schema
+
+    def ensure(self) -> None:
+        """Create the aggregation tables if they do not exist."""
+        for table, spec in AGGREGATE_TABLES.items():
+            columns = {**spec["grain"], **MEASURE_COLUMNS}
+            definitions = ",\n                ".join(
+                f"{column} {sql_type}" for column, (_, sql_type, _) in columns.items()
+            )
+            self.loader.execute_statement(f"""
+                CREATE TABLE IF NOT EXISTS {self.schema}.{table} (
+                {definitions},
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            key = "year, month" if spec["period"] == "month" else "date_key"
+            self.loader.execute_statement(
+                f"CREATE INDEX IF NOT EXISTS {table}_{key.replace(', ', '_')}_idx ON {self.schema}.{table} ({key})"
+            )
+
+    @staticmethod
+    def scope_bounds(table: str, scope: "ValidationScope") -> tuple:
+        """date_key range of the table periods a batch scope touches (whole months for monthly tables)."""
+        start, end = scope.first_date_key, scope.last_date_key
+        if AGGREGATE_TABLES[table]["period"] == "month":
+            return start // 100 * 100 + 1, end // 100 * 100 + 31
+        return start, end
+
+    def aggregate_sql(self, table: str, where: str = "TRUE") -> str:
+        """Query computing a table's rows from fact_orders."""
+        grain = AGGREGATE_TABLES[table]["grain"]
+        columns = [f"{sql} as {column}" for column, (sql, _, _) in grain.items()]
+        columns += [f"{sql} as {column}" for column, (sql, _, _) in MEASURE_COLUMNS.items()]
+        return AGGREGATE_SQL.format(
+            schema=self.schema,
+            columns=",\n        ".join(columns),
+            where=where,
+            group_by=", ".join(str(position) for position in range(1, len(grain) + 1)),
+        )
+
+    def refresh_statements(self, table: str, scope: Optional["ValidationScope"] = None) -> list:
+        """
+        Statements replacing the rows of a table covered by a scope.
+
+        Args:
+            table: Aggregation table
+            scope: Batch scope (default: rebuild the whole table)
+
+        Returns:
+            list: DELETE/TRUNCATE and INSERT statements
+        """
+        target = f"{self.schema}.{table}"
+        columns = ", ".join([*AGGREGATE_TABLES[table]["grain"], *MEASURE_COLUMNS])
+        if scope is None:
+            return [f"TRUNCATE {target}", f"INSERT INTO {target} ({columns}) {self.aggregate_sql(table)}"]
+
+        start, end = self.scope_bounds(table, scope)
+        if AGGREGATE_TABLES[table]["period"] == "month":
+            clear = f"year * 100 + month BETWEEN {start // 100} AND {end // 100}"
+        else:
+            clear = f"date_key BETWEEN {start} AND {end}"
+        return [
+            f"DELETE FROM {target} WHERE {clear}",
+            f"INSERT INTO {target} ({columns}) "
+            f"{self.aggregate_sql(table, f'f.date_key BETWEEN {start} AND {end}')}",
+        ]
+
+    @log_execution_time
+    def refresh(self, scope: Optional["ValidationScope"] = None) -> Dict[str, int]:
+        """
+        Recompute the aggregation rows of a batch, or of all facts.
+
+        Args:
+            scope: Batch scope (default: rebuild every table)
+
+        Returns:
+            dict: Rows written per table
+        """
+        from sqlalchemy import text
+
+        self.ensure()
+        written = {}
+        with self.loader.engine.begin() as conn:
+            for table in AGGREGATE_TABLES:
+                for statement in self.refresh_statements(table, scope):
+                    result = conn.execute(text(statement))
+                written[table] = max(result.rowcount, 0)
+
+        for table, rows in written.items():
+            self.logger.info(f"{self.schema}.{table}: {rows:,} rows {'refreshed' if scope else 'rebuilt'}")
+        return written
+
+    def run(self, scope: Optional["ValidationScope"] = None) -> int:
+        """
+        Refresh the aggregation tables (see refresh).
+
+        Args:
+            scope: Batch scope (default: rebuild every table)
+
+        Returns:
+            int: Rows written
+        """
+        return sum(self.refresh(scope).values())
+
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Order Anomaly Scoring
+======================================
+
+Scores fact rows for unusual shipping delays and discounts against robust
+baselines of their segment (market x shipping mode), instead of fixed
+rules such as ``days_for_shipping_real > 60``. A "Same Day" order shipped
+in 4 days is an outlier; a "Standard Class" order shipped in 4 days is not.
+
+- Baselines (median and a robust scale per metric and segment, plus an
+  all-segments fallback) are fitted from fact_orders with pandas group-bys
+  and kept in ``anomaly_baselines``; they are refitted once they are older
+  than anomaly_baseline_max_age_days.
+- Scoring computes modified z-scores column-wise for the rows of a batch
+  (streamed as Arrow batches) and writes them to ``fact_order_anomalies``,
+  so the cost grows linearly with the batch size.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin, log_execution_time
+
+if TYPE_CHECKING:
+    from src.etl.incremental_validation import ValidationScope
+    from src.etl.load import DataLoader
+
+
+BASELINE_TABLE = "anomaly_baselines"
+SCORE_TABLE = "fact_order_anomalies"
+
+SEGMENT_COLUMNS = ["market", "shipping_mode"]
+ALL_SEGMENTS = "*"
+
+# Scored metric -> SQL expression over fact_orders (f)
+ANOMALY_METRICS = {
+    "shipping_gap_days": "f.days_for_shipping_real - f.days_for_shipment_scheduled",
+    "discount_rate": "f.order_item_discount_rate",
+}
+
+# Consistency constants turning MAD / mean absolute deviation into a
+# standard deviation estimate (Iglewicz & Hoaglin)
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.253314
+
+# Scores are capped so values of constant segments stay storable
+MAX_SCORE = 1000.0
+
+ROWS_SQL = """
+    SELECT
+        f.order_id,
+        f.order_item_id,
+        f.date_key,
+        COALESCE(g.market, '') as market,
+        COALESCE(f.shipping_mode, '') as shipping_mode,
+        {metrics}
+    FROM {schema}.fact_orders f
+    LEFT JOIN {schema}.dim_geography g ON g.geography_key = f.geography_key
+    WHERE {where}
+"""
+
+
+def _robust_scale(values: pd.Series) -> float:
+    """Standard deviation estimate from MAD, or mean absolute deviation when MAD is 0."""
+    deviation = (values - values.median()).abs()
+    mad = deviation.median()
+    if mad > 0:
+        return mad * MAD_SCALE
+    return deviation.mean() * MEAN_AD_SCALE
+
+
+def fit_baselines(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fit the median and robust scale of every metric per segment.
+
+    The scale is MAD * 1.4826, or the mean absolute deviation * 1.2533 for
+    segments where more than half the values are equal (MAD of 0). A row
+    with both segment columns set to "*" holds the all-segments baseline.
+
+    Args:
+        frame: Rows with the segment columns and the ANOMALY_METRICS
+
+    Returns:
+        pd.DataFrame: One row per segment with observations and
+            <metric>_median / <metric>_scale columns
+    """
+    segments = frame.groupby(SEGMENT_COLUMNS, sort=True, dropna=False)
+    baselines = segments.size().rename("observations").to_frame()
+    for metric in ANOMALY_METRICS:
+        baselines[f"{metric}_median"] = segments[metric].median()
+        # Deviations from each row's segment median, aggregated per segment
+        deviation = (frame[metric] - segments[metric].transform("median")).abs()
+        grouped = deviation.groupby([frame[column] for column in SEGMENT_COLUMNS], dropna=False)
+        mad = grouped.median()
+        baselines[f"{metric}_scale"] = (mad * MAD_SCALE).where(mad > 0, grouped.mean() * MEAN_AD_SCALE)
+
+    overall = {"observations": len(frame)}
+    for metric in ANOMALY_METRICS:
+        overall[f"{metric}_median"] = frame[metric].median()
+        overall[f"{metric}_scale"] = _robust_scale(frame[metric])
+    overall = pd.DataFrame([overall], index=pd.MultiIndex.from_tuples(
+        [(ALL_SEGMENTS, ALL_SEGMENTS)], names=SEGMENT_COLUMNS
+    ))
+    return pd.concat([baselines, overall]).reset_index()
+
+
+def score_frame(frame: pd.DataFrame, baselines: pd.DataFrame, threshold: float = 3.5) -> pd.DataFrame:
+    """
+    Score rows against the baseline of their segment.
+
+    Each metric gets a modified z-score ``(value - median) / scale``;
+    segments without a baseline use the all-segments one. The anomaly score
+    is the largest absolute z-score and names the metric it comes from.
+
+    Args:
+        frame: Rows with order keys, date_key, segment columns and metrics
+        baselines: Output of fit_baselines
+        threshold: Anomaly score from which a row is flagged
+
+    Returns:
+        pd.DataFrame: order_id, order_item_id, date_key, segment columns,
+            <metric>_z, anomaly_score, is_anomaly and anomaly_reason
+    """
+    segment_key = SEGMENT_COLUMNS
+    overall = baselines[(baselines[segment_key] == ALL_SEGMENTS).all(axis=1)].iloc[0]
+    matched = frame.merge(
+        baselines.drop(columns="observations"), on=segment_key, how="left", validate="many_to_one"
+    )
+
+    scores = {}
+    for metric in ANOMALY_METRICS:
+        median = matched[f"{metric}_median"].fillna(overall[f"{metric}_median"]).to_numpy(dtype=np.float64)
+        scale = matched[f"{metric}_scale"].fillna(overall[f"{metric}_scale"]).to_numpy(dtype=np.float64)
+        deviation = matched[metric].to_numpy(dtype=np.float64) - median
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(scale > 0, deviation / scale, np.sign(deviation) * MAX_SCORE)
+        scores[f"{metric}_z"] = np.clip(np.nan_to_num(z, nan=0.0), -MAX_SCORE, MAX_SCORE)
+
+    result = matched[["order_id", "order_item_id", "date_key", *segment_key]].copy()
+    z_matrix = np.column_stack(list(scores.values()))
+    for column, values in scores.items():
+        result[column] = np.round(values, 4)
+
+    strongest = np.abs(z_matrix).argmax(axis=1)
+    result["anomaly_score"] = np.round(np.abs(z_matrix).max(axis=1), 4)
+    result["is_anomaly"] = result["anomaly_score"] >= threshold
+    reasons = np.where(result["is_anomaly"], np.array(list(ANOMALY_METRICS), dtype=object)[strongest], None)
+    result["anomaly_reason"] = pd.Series(reasons, index=result.index, dtype=object)
+    return result
+
+
+class AnomalyDetector(LoggerMixin):
+    """
+    Fits segment baselines and scores batches of fact rows.
+    """
+
+    def __init__(
+        self,
+        loader: "DataLoader",
+        schema: str = "dw",
+        threshold: Optional[float] = None,
+        max_age_days: Optional[int] = None
+    ):
+        """
+        Initialize AnomalyDetector.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding fact_orders and the anomaly tables
+            threshold: Anomaly score threshold (default: from settings)
+            max_age_days: Refit baselines older than this (default: from settings)
+        """
+        settings = get_settings()
+        self.loader = loader
+        self.schema = schema
+        self.baseline_table = f"{schema}.{BASELINE_TABLE}"
+        self.score_table = f"{schema}.{SCORE_TABLE}"
+        self.threshold = threshold or settings.anomaly_score_threshold
+        self.max_age_days = max_age_days if max_age_days is not None else settings.anomaly_baseline_max_age_days
+
+    def rows_sql(self, where: str = "TRUE") -> str:
+        """Query of the fact rows to fit or score, with their segment and metrics."""
+        metrics = ",\n        ".join(f"{sql} as {metric}" for metric, sql in ANOMALY_METRICS.items())
+        return ROWS_SQL.format(schema=self.schema, metrics=metrics, where=where)
+
+    def ensure(self) -> None:
+        """Create the baseline and score tables if they do not exist."""
+        metric_columns = ",\n                ".join(
+            f"{metric}_median DOUBLE PRECISION, {metric}_scale DOUBLE PRECISION" for metric in ANOMALY_METRICS
+        )
+        self.loader.execute_statement(f"""
+            CREATE TABLE IF NOT EXISTS {self.baseline_table} (
+                market VARCHAR(100) NOT NULL,
+                shipping_mode VARCHAR(100) NOT NULL,
+                observations BIGINT NOT NULL,
+                {metric_columns},
+                fitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (market, shipping_mode)
+            )
+        """)
+
+        if not self.loader.table_exists(SCORE_TABLE, schema=self.schema):
+            # Order keys are typed like the fact table's
+            self.logger.info(f"Creating {self.score_table}")
+            self.loader.execute_statement(f"""
+                CREATE TABLE {self.score_table} AS
+                SELECT order_id, order_item_id, date_key FROM {self.schema}.fact_orders WITH NO DATA
+            """)
+            z_columns = ", ".join(f"ADD COLUMN {metric}_z NUMERIC(9, 4)" for metric in ANOMALY_METRICS)
+            self.loader.execute_statement(f"""
+                ALTER TABLE {self.score_table}
+                    ADD PRIMARY KEY (order_id, order_item_id),
+                    ADD COLUMN market VARCHAR(100),
+                    ADD COLUMN shipping_mode VARCHAR(100),
+                    {z_columns},
+                    ADD COLUMN anomaly_score NUMERIC(9, 4),
+                    ADD COLUMN is_anomaly BOOLEAN,
+                    ADD COLUMN anomaly_reason VARCHAR(50),
+                    ADD COLUMN scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            """)
+            self.loader.execute_statement(f"CREATE INDEX ON {self.score_table} (date_key)")
+
+    def baselines_stale(self) -> bool:
+        """Check whether the baselines are missing or older than max_age_days."""
+        result = self.loader.execute_query(f"""
+            SELECT COUNT(*) as segments,
+                   COALESCE(MIN(fitted_at) < CURRENT_TIMESTAMP - INTERVAL '{int(self.max_age_days)} days', FALSE)
+                       as expired
+            FROM {self.baseline_table}
+        """)
+        return int(result["segments"].iloc[0]) == 0 or bool(result["expired"].iloc[0])
+
+    @log_execution_time
+    def fit(self) -> pd.DataFrame:
+        """
+        Fit the baselines from all fact rows and replace anomaly_baselines.
+
+        Returns:
+            pd.DataFrame: Fitted baselines
+        """
+        from sqlalchemy import text
+
+        frame = self.loader.execute_query_arrow(self.rows_sql(), numeric_as_float=True).to_pandas()
+        baselines = fit_baselines(frame)
+
+        columns = list(baselines.columns)
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {self.baseline_table}"))
+            conn.execute(
+                text(f"INSERT INTO {self.baseline_table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(f':{column}' for column in columns)})"),
+                baselines.to_dict("records"),
+            )
+
+        self.logger.info(f"{self.baseline_table}: fitted {len(baselines) - 1:,} segments from {len(frame):,} rows")
+        return baselines
+
+    def baselines(self) -> pd.DataFrame:
+        """Load the baselines, refitting them when stale."""
+        if self.baselines_stale():
+            return self.fit()
+        return self.loader.execute_query(f"SELECT * FROM {self.baseline_table}").drop(columns="fitted_at")
+
+    @log_execution_time
+    def score(self, scope: Optional["ValidationScope"] = None) -> Dict[str, int]:
+        """
+        Score the fact rows of a batch and replace their anomaly scores.
+
+        Rows are streamed as Arrow batches and written as they are scored,
+        in one transaction.
+
+        Args:
+            scope: Rows to score (default: all fact rows)
+
+        Returns:
+            dict: scored and anomalies counts
+        """
+        from sqlalchemy import text
+
+        self.ensure()
+        baselines = self.baselines()
+
+        where = scope.predicate("f") if scope else "TRUE"
+        columns = [
+            "order_id", "order_item_id", "date_key", *SEGMENT_COLUMNS,
+            *(f"{metric}_z" for metric in ANOMALY_METRICS),
+            "anomaly_score", "is_anomaly", "anomaly_reason",
+        ]
+        insert = text(
+            f"INSERT INTO {self.score_table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(f':{column}' for column in columns)})"
+        )
+
+        counts = {"scored": 0, "anomalies": 0}
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.score_table} WHERE {scope.predicate() if scope else 'TRUE'}"))
+            for batch in self.loader.iter_query_batches(self.rows_sql(where), numeric_as_float=True):
+                if batch.num_rows == 0:
+                    continue
+                scored = score_frame(batch.to_pandas(), baselines, self.threshold)
+                conn.execute(insert, scored[columns].to_dict("records"))
+                counts["scored"] += len(scored)
+                counts["anomalies"] += int(scored["is_anomaly"].sum())
+
+        self.logger.info(
+            f"{self.score_table}: scored {counts['scored']:,} rows, "
+            f"{counts['anomalies']:,} anomalies (score >= {self.threshold})"
+        )
+        return counts
+
+    def run(self, scope: Optional["ValidationScope"] = None) -> int:
+        """
+        Score a batch (see score).
+
+        Args:
+            scope: Rows to score (default: all fact rows)
+
+        Returns:
+            int: Rows scored
+        """
+        return self.score(scope)["scored"]
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Arrow Query Results
+====================================
+
+Columnar result path for large reads. Instead of fetching Python row tuples
+(what ``pd.read_sql`` does), the query is wrapped in
+``COPY (query) TO STDOUT WITH (FORMAT csv)`` and the stream is parsed by
+pyarrow's multithreaded CSV reader straight into Arrow record batches. Column
+types come from the query's result description, so no inference pass is
+needed and batches can be yielded lazily while the COPY is still running.
+
+NUMERIC columns stay exact: decimal128 with the column's declared precision
+and scale, or text when the type modifier is missing. Callers that only do
+float math on them (model features) can opt into float64 instead.
+
+Drivers without COPY support fall back to fetching rows in chunks.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import io
+import tempfile
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+# PostgreSQL type OIDs with a native Arrow type (anything else is read as text)
+BOOL_OID = 16
+INT_OIDS = {20: "int64", 21: "int16", 23: "int32", 26: "int64"}
+FLOAT_OIDS = {700: "float32", 701: "float64"}
+NUMERIC_OID = 1700
+DATE_OID = 1082
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+
+FALLBACK_FETCH_ROWS = 50000
+
+
+def copy_statement(query: str) -> str:
+    """
+    Wrap a query in a CSV COPY to the client.
+
+    Rows are written without a header (column names come from the result
+    description); NULL is an unquoted empty field and an empty string is
+    quoted, so the two stay distinguishable.
+
+    Args:
+        query: SELECT statement (without a trailing semicolon)
+
+    Returns:
+        str: COPY statement
+    """
+    return f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH (FORMAT csv, HEADER false)"
+
+
+def describe_statement(query: str) -> str:
+    """Build a statement returning the query's columns but no rows."""
+    return f"SELECT * FROM ({query.strip().rstrip(';')}) AS arrow_query LIMIT 0"
+
+
+def arrow_type(
+    type_code: int,
+    precision: Optional[int] = None,
+    scale: Optional[int] = None,
+    numeric_as_float: bool = False
+) -> "pa.DataType":
+    """
+    Map a PostgreSQL type OID to the Arrow type the CSV column is parsed as.
+
+    Args:
+        type_code: Type OID from the cursor description
+        precision: Declared precision (NUMERIC only, None if unconstrained)
+        scale: Declared scale (NUMERIC only, None if unconstrained)
+        numeric_as_float: Parse NUMERIC as float64 instead of exact decimals
+
+    Returns:
+        pa.DataType: Arrow type (string for types without a native mapping)
+    """
+    import pyarrow as pa
+
+    if type_code == NUMERIC_OID:
+        if numeric_as_float:
+            return pa.float64()
+        if precision is not None and scale is not None and 0 < precision <= 38:
+            return pa.decimal128(precision, scale)
+        # Unconstrained NUMERIC has no fixed scale; keep the exact text
+        return pa.string()
+    if type_code == BOOL_OID:
+        return pa.bool_()
+    if type_code in INT_OIDS:
+        return pa.type_for_alias(INT_OIDS[type_code])
+    if type_code in FLOAT_OIDS:
+        return pa.type_for_alias(FLOAT_OIDS[type_code])
+    if type_code == DATE_OID:
+        return pa.date32()
+    if type_code == TIMESTAMP_OID:
+        return pa.timestamp("us")
+    if type_code == TIMESTAMPTZ_OID:
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def arrow_schema(description: Sequence[Sequence], numeric_as_float: bool = False) -> "pa.Schema":
+    """
+    Build the Arrow schema of a result from its DB-API cursor description.
+
+    Args:
+        description: cursor.description (name, type_code and, when present,
+            precision and scale per column)
+        numeric_as_float: Parse NUMERIC as float64 instead of exact decimals
+
+    Returns:
+        pa.Schema: Result schema
+    """
+    import pyarrow as pa
+
+    fields = []
+    for column in description:
+        precision, scale = (column[4], column[5]) if len(column) > 5 else (None, None)
+        fields.append(pa.field(column[0], arrow_type(column[1], precision, scale, numeric_as_float)))
+    return pa.schema(fields)
+
+
+def iter_csv_batches(stream, schema: "pa.Schema", block_size: int) -> Iterator["pa.RecordBatch"]:
+    """
+    Parse PostgreSQL CSV COPY output into record batches.
+
+    Columns are addressed by position (placeholder names), so results with
+    duplicate column names parse correctly; the real names are restored on
+    each batch. An empty result yields one empty batch carrying the schema.
+
+    Args:
+        stream: Binary file-like object with the COPY output
+        schema: Result schema (see arrow_schema)
+        block_size: Bytes parsed per batch
+
+    Yields:
+        pa.RecordBatch: Batches with the result schema
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    positional = [f"c{i}" for i in range(len(schema))]
+    read_options = pv.ReadOptions(column_names=positional, block_size=block_size)
+    convert_options = pv.ConvertOptions(
+        column_types=dict(zip(positional, schema.types)),
+        null_values=[""],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+        true_values=["t"],
+        false_values=["f"],
+    )
+
+    try:
+        reader = pv.open_csv(stream, read_options=read_options, convert_options=convert_options)
+    except pa.ArrowInvalid as e:
+        if "Empty CSV file" not in str(e):
+            raise
+        yield pa.RecordBatch.from_pylist([], schema=schema)
+        return
+
+    for batch in reader:
+        yield pa.RecordBatch.from_arrays(batch.columns, schema=schema)
+
+
+class CopyStream(io.RawIOBase):
+    """
+    Read-only file object over an iterator of byte blocks (a psycopg COPY).
+    """
+
+    def __init__(self, blocks: Iterable[bytes]):
+        """
+        Initialize CopyStream.
+
+        Args:
+            blocks: Iterable of bytes-like blocks
+        """
+        self._blocks = iter(blocks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        """The stream is readable."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Fill a buffer from the pending block, fetching the next one if needed."""
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._blocks)).cast("B")
+            except StopIteration:
+                return 0
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _bind(conn, query: str, params: Optional[dict]) -> Tuple[str, Optional[dict]]:
+    """Compile a query with :name parameters to the driver's paramstyle."""
+    from sqlalchemy import text
+
+    if not params:
+        # Left untouched: the driver only interprets % when given parameters
+        return query, None
+    compiled = text(query).compile(dialect=conn.dialect)
+    return compiled.string, compiled.construct_params(params)
+
+
+def iter_copy_batches(conn, query: str, params: Optional[dict], block_size: int,
+                      numeric_as_float: bool = False) -> Iterator["pa.RecordBatch"]:
+    """
+    Stream a query result as record batches over a PostgreSQL COPY.
+
+    Args:
+        conn: SQLAlchemy connection (psycopg or psycopg2 driver)
+        query: SELECT statement, with optional :name parameters
+        params: Query parameters (optional)
+        block_size: Bytes parsed per batch
+        numeric_as_float: Parse NUMERIC as float64 instead of exact decimals
+
+    Yields:
+        pa.RecordBatch: Result batches
+    """
+    statement, bound = _bind(conn, query, params)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(describe_statement(statement), bound)
+        schema = arrow_schema(cursor.description, numeric_as_float)
+
+        if hasattr(cursor, "copy"):
+            # psycopg 3: binds parameters client-side and streams the output
+            with cursor.copy(copy_statement(statement), bound) as copy:
+                yield from iter_csv_batches(CopyStream(copy), schema, block_size)
+        else:
+            # psycopg2 writes the whole COPY to a file; spool it, then parse
+            rendered = cursor.mogrify(statement, bound).decode("utf-8")
+            with tempfile.SpooledTemporaryFile(max_size=block_size) as spool:
+                cursor.copy_expert(copy_statement(rendered), spool)
+                spool.seek(0)
+                yield from iter_csv_batches(spool, schema, block_size)
+    finally:
+        cursor.close()
+
+
+def iter_fetch_batches(conn, query: str, params: Optional[dict], rows: int = FALLBACK_FETCH_ROWS,
+                       numeric_as_float: bool = False) -> Iterator["pa.RecordBatch"]:
+    """
+    Fetch a query result in row chunks and convert each chunk to a batch.
+
+    Used for drivers without COPY (the rows pass through Python objects).
+    An empty result yields one empty batch with untyped columns.
+
+    Args:
+        conn: SQLAlchemy connection
+        query: SELECT statement, with optional :name parameters
+        params: Query parameters (optional)
+        rows: Rows fetched per batch
+        numeric_as_float: Convert decimal columns to float64
+
+    Yields:
+        pa.RecordBatch: Result batches
+    """
+    import pyarrow as pa
+    from sqlalchemy import text
+
+    result = conn.execution_options(stream_results=True).execute(text(query), params or {})
+    names: List[str] = list(result.keys())
+    fetched = False
+    while True:
+        chunk = result.fetchmany(rows)
+        if not chunk:
+            break
+        fetched = True
+        arrays = [pa.array(column) for column in zip(*chunk)]
+        if numeric_as_float:
+            arrays = [array.cast(pa.float64()) if pa.types.is_decimal(array.type) else array for array in arrays]
+        yield pa.RecordBatch.from_arrays(arrays, names=names)
+
+    if not fetched:
+        yield pa.RecordBatch.from_arrays([pa.array([], pa.null()) for _ in names], names=names)
+
+
+def supports_copy(conn) -> bool:
+    """Check whether a SQLAlchemy connection runs on a PostgreSQL driver with COPY."""
+    return conn.dialect.name == "postgresql" and conn.dialect.driver in ("psycopg", "psycopg2")
+
+
+def to_pandas(table: "pa.Table") -> pd.DataFrame:
+    """
+    Convert an Arrow table to a DataFrame with Arrow-backed dtypes.
+
+    Args:
+        table: Arrow table
+
+    Returns:
+        pd.DataFrame: DataFrame sharing the Arrow buffers (no object columns)
+    """
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Benchmark Results Module
+=========================================
+
+Timing, persistence and regression detection for the ETL benchmark suite
+(scripts/run_benchmarks.py). Each run is stored as one JSON file so runs
+can be compared over time.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import get_settings
+
+
+# Named dataset sizes (order items)
+DATASET_SIZES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+
+def parse_size(label: str) -> int:
+    """
+    Convert a size label (10k, 1m, 250000) to a row count.
+
+    Args:
+        label: Size label
+
+    Returns:
+        int: Number of rows
+
+    Raises:
+        ValueError: If the label is not a known size or an integer
+    """
+    label = label.strip().lower()
+    if label in DATASET_SIZES:
+        return DATASET_SIZES[label]
+    try:
+        return int(label)
+    except ValueError:
+        raise ValueError(f"Unknown dataset size: {label} (use {', '.join(DATASET_SIZES)} or a row count)")
+
+
+def time_call(func: Callable, *args: Any, repeat: int = 1, setup: Optional[Callable] = None,
+              **kwargs: Any) -> Tuple[float, Any]:
+    """
+    Time a call, keeping the best of ``repeat`` runs.
+
+    Args:
+        func: Function to time
+        *args: Positional arguments
+        repeat: Number of runs
+        setup: Called before each run, outside the timed section (optional)
+        **kwargs: Keyword arguments
+
+    Returns:
+        Tuple[float, Any]: Best wall time in seconds and the last result
+    """
+    best = float("inf")
+    result = None
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def git_commit() -> Optional[str]:
+    """Get the current git commit (None outside a git checkout)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=get_settings().project_root
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_results(seed: int, repeat: int) -> Dict[str, Any]:
+    """
+    Create an empty results document for a benchmark run.
+
+    Args:
+        seed: Synthetic data seed
+        repeat: Runs per stage
+
+    Returns:
+        dict: Results document (timings go under "results")
+    """
+    return {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": {},
+    }
+
+
+def save_results(results: Dict[str, Any], output_dir: Optional[Path] = None) -> Path:
+    """
+    Save a benchmark run as JSON.
+
+    Args:
+        results: Results document
+        output_dir: Directory for result files (default: logs/benchmarks)
+
+    Returns:
+        Path: Written file
+    """
+    output_dir = Path(output_dir or get_settings().benchmark_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    stamp = datetime.fromisoformat(results["run_at"]).strftime("%Y%m%d_%H%M%S")
+    path = output_dir / f"benchmark_{stamp}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Load a saved benchmark run."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def latest_results(output_dir: Optional[Path] = None) -> Optional[Path]:
+    """
+    Find the most recent saved benchmark run.
+
+    Args:
+        output_dir: Directory for result files (default: logs/benchmarks)
+
+    Returns:
+        Path: Latest result file, or None if there is none
+    """
+    output_dir = Path(output_dir or get_settings().benchmark_dir)
+    runs = sorted(output_dir.glob("benchmark_*.json"))
+    return runs[-1] if runs else None
+
+
+def find_regressions(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.20,
+    min_seconds: float = 0.05
+) -> List[Dict[str, Any]]:
+    """
+    Compare a run against a baseline run.
+
+    A stage regresses when it is more than ``threshold`` slower than in the
+    baseline and the difference exceeds ``min_seconds`` (so timer noise on
+    tiny datasets is not reported).
+
+    Args:
+        current: Results document of this run
+        baseline: Results document to compare against
+        threshold: Allowed relative slowdown (0.20 = 20%)
+        min_seconds: Minimum absolute slowdown to report
+
+    Returns:
+        list: One dict per regression (size, stage, baseline, current, change_pct)
+    """
+    regressions = []
+    for size, stages in current["results"].items():
+        baseline_stages = baseline.get("results", {}).get(size, {})
+        for stage, seconds in stages.items():
+            before = baseline_stages.get(stage)
+            if before is None:
+                continue
+            if seconds > before * (1 + threshold) and seconds - before >= min_seconds:
+                regressions.append({
+                    "size": size,
+                    "stage": stage,
+                    "baseline": before,
+                    "current": seconds,
+                    "change_pct": round((seconds / before - 1) * 100, 1) if before else float("inf"),
+                })
+    return regressions
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Pipeline Checkpoint Module
+===========================================
+
+Persists the state of each ETL run (stages, chunks, exported tables) to a
+local JSON file so a failed run can be resumed with ``--resume <run_id>``
+and only redo the incomplete work.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin
+
+
+def new_run_id() -> str:
+    """
+    Generate a sortable, unique run id (e.g. 20260204_153012_a1b2c3).
+
+    Returns:
+        str: Run id
+    """
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class RunState(LoggerMixin):
+    """
+    State of one pipeline run, saved after every change.
+
+    The file is written atomically (temp file + rename) so a crash never
+    leaves a truncated checkpoint behind.
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        state_dir: Optional[Path] = None,
+        options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Start a new run state.
+
+        Args:
+            run_id: Run id (default: generated)
+            state_dir: Directory holding run state files (default: from settings)
+            options: Pipeline options to remember for a resume (skip flags, ...)
+        """
+        self.settings = get_settings()
+        self.state_dir = Path(state_dir or self.settings.run_state_dir)
+        now = datetime.now().isoformat(timespec="seconds")
+        self.state = {
+            "run_id": run_id or new_run_id(),
+            "status": "running",
+            "created_at": now,
+            "updated_at": now,
+            "options": options or {},
+            "stages": {},
+        }
+
+    @classmethod
+    def load(cls, run_id: str, state_dir: Optional[Path] = None) -> "RunState":
+        """
+        Load the state of a previous run.
+
+        Args:
+            run_id: Run id to resume
+            state_dir: Directory holding run state files (default: from settings)
+
+        Returns:
+            RunState: Loaded run state
+
+        Raises:
+            FileNotFoundError: If no state file exists for the run id
+        """
+        run_state = cls(run_id=run_id, state_dir=state_dir)
+        if not run_state.path.exists():
+            raise FileNotFoundError(f"No checkpoint found for run {run_id}: {run_state.path}")
+
+        with open(run_state.path, "r", encoding="utf-8") as f:
+            run_state.state = json.load(f)
+        run_state.state["status"] = "running"
+
+        run_state.logger.info(f"Resuming run {run_id} from {run_state.path}")
+        return run_state
+
+    @property
+    def run_id(self) -> str:
+        """Get the run id."""
+        return self.state["run_id"]
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        """Get the pipeline options recorded for this run."""
+        return self.state["options"]
+
+    @property
+    def path(self) -> Path:
+        """Get the state file path."""
+        return self.state_dir / f"{self.run_id}.json"
+
+    def save(self) -> None:
+        """Write the state file atomically."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.state["updated_at"] = datetime.now().isoformat(timespec="seconds")
+
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+    def _stage(self, stage: str) -> Dict[str, Any]:
+        """Get (or create) the state entry for a stage."""
+        return self.state["stages"].setdefault(
+            stage, {"status": "pending", "chunks": [], "items": {}}
+        )
+
+    def stage_completed(self, stage: str) -> bool:
+        """
+        Check whether a stage finished in this run (or the run being resumed).
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            bool: True if the stage is completed
+        """
+        return self.state["stages"].get(stage, {}).get("status") == "completed"
+
+    def stage_details(self, stage: str) -> Dict[str, Any]:
+        """
+        Get the details recorded when a stage completed.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            dict: Stage details (empty if none)
+        """
+        return self.state["stages"].get(stage, {}).get("details", {})
+
+    def start_stage(self, stage: str) -> None:
+        """Mark a stage as running."""
+        entry = self._stage(stage)
+        entry["status"] = "running"
+        entry.setdefault("started_at", datetime.now().isoformat(timespec="seconds"))
+        entry.pop("error", None)
+        self.save()
+
+    def complete_stage(self, stage: str, **details: Any) -> None:
+        """
+        Mark a stage as completed.
+
+        Args:
+            stage: Stage name
+            **details: Extra details to keep (row counts, validation result, ...)
+        """
+        entry = self._stage(stage)
+        entry["status"] = "completed"
+        entry["completed_at"] = datetime.now().isoformat(timespec="seconds")
+        entry["details"] = details
+        self.save()
+
+    def fail_stage(self, stage: str, error: str) -> None:
+        """Mark a stage as failed, keeping its committed chunks and items."""
+        entry = self._stage(stage)
+        entry["status"] = "failed"
+        entry["error"] = error
+        self.save()
+
+    def record_chunk(self, stage: str, offset: int, rows: int) -> None:
+        """
+        Record a committed chunk.
+
+        Args:
+            stage: Stage name
+            offset: Row offset of the first row in the chunk
+            rows: Rows committed
+        """
+        entry = self._stage(stage)
+        entry["chunks"].append({"index": len(entry["chunks"]), "offset": offset, "rows": rows})
+        self.save()
+
+    def rows_committed(self, stage: str) -> int:
+        """
+        Get the number of rows already committed by a chunked stage.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            int: Offset where the next chunk should start
+        """
+        chunks = self.state["stages"].get(stage, {}).get("chunks", [])
+        if not chunks:
+            return 0
+        last = chunks[-1]
+        return last["offset"] + last["rows"]
+
+    def complete_item(self, stage: str, item: str, rows: int) -> None:
+        """
+        Record a finished unit of work inside a stage (e.g. one exported table).
+
+        Args:
+            stage: Stage name
+            item: Item name
+            rows: Rows processed
+        """
+        self._stage(stage)["items"][item] = {
+            "rows": rows,
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save()
+
+    def item_completed(self, stage: str, item: str) -> bool:
+        """Check whether an item of a stage already finished."""
+        return item in self.state["stages"].get(stage, {}).get("items", {})
+
+    def finish(self, status: str) -> None:
+        """
+        Record the final status of the run.
+
+        Args:
+            status: completed, completed_with_warnings or failed
+        """
+        self.state["status"] = status
+        self.save()
+
+
+if __name__ == "__main__":
+    # Test run state persistence
+    run_state = RunState(options={"skip_extract": True})
+    run_state.start_stage("extract")
+    run_state.record_chunk("extract", offset=0, rows=50000)
+    run_state.complete_stage("extract", rows=50000)
+    print(f"Run {run_state.run_id} saved to {run_state.path}")
+    print(f"Rows committed: {RunState.load(run_state.run_id).rows_committed('extract'):,}")
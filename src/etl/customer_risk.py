@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Customer Churn Risk Scoring
+============================================
+
+Scores every customer on recency, frequency and monetary value (RFM) and on
+the share of their order items delivered late, and publishes the result as
+``dw.customer_risk``, one row per customer for the dashboard to read as is.
+
+Instead of aggregating fact_orders over all customers for every query (as
+``dw.vw_vip_churn_risk`` does with NTILE), scoring works in two steps:
+
+- ``customer_rfm`` keeps the per-customer aggregates. When a batch lands,
+  only the customers it touches are recomputed (as the running validation
+  summary does for days), so the cost follows the size of the batch.
+- Quintile boundaries come from a quantile sketch: the database returns a
+  few hundred logarithmic bucket counts per metric instead of all values,
+  and scores are assigned with ``width_bucket`` against those boundaries.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import math
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin, log_execution_time
+
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
+
+METRICS_TABLE = "customer_rfm"
+RISK_TABLE = "customer_risk"
+
+# Failure rate (% of items delivered late) from which a customer is at risk,
+# as in dw.vw_vip_churn_risk
+CRITICAL_FAILURE_PCT = 50.0
+HIGH_FAILURE_PCT = 30.0
+
+QUINTILES = [0.2, 0.4, 0.6, 0.8]
+
+# Columns of the risk tables besides customer_id
+METRICS_COLUMNS = {
+    "first_order_date": "DATE",
+    "last_order_date": "DATE",
+    "frequency": "INTEGER NOT NULL",
+    "order_items": "INTEGER NOT NULL",
+    "late_items": "INTEGER NOT NULL",
+    "monetary": "NUMERIC(14, 2) NOT NULL",
+    "updated_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+}
+RISK_COLUMNS = {
+    "full_name": "VARCHAR(255)",
+    "customer_segment": "VARCHAR(100)",
+    "last_order_date": "DATE",
+    "recency_days": "INTEGER",
+    "frequency": "INTEGER",
+    "monetary": "NUMERIC(14, 2)",
+    "failure_rate_pct": "NUMERIC(5, 2)",
+    "r_score": "SMALLINT",
+    "f_score": "SMALLINT",
+    "m_score": "SMALLINT",
+    "rfm_score": "CHAR(3)",
+    "risk_level": "VARCHAR(10)",
+    "is_vip": "BOOLEAN",
+    "is_vip_at_risk": "BOOLEAN",
+    "scored_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+}
+
+# Aggregates of the customers matching a condition on fact_orders (f)
+CUSTOMER_METRICS_SQL = """
+    INSERT INTO {table} (
+        customer_id, first_order_date, last_order_date, frequency,
+        order_items, late_items, monetary, updated_at
+    )
+    SELECT
+        f.customer_id,
+        TO_DATE(MIN(f.date_key)::text, 'YYYYMMDD'),
+        TO_DATE(MAX(f.date_key)::text, 'YYYYMMDD'),
+        COUNT(DISTINCT f.order_id),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE f.is_late),
+        COALESCE(SUM(f.sales), 0),
+        CURRENT_TIMESTAMP
+    FROM {schema}.fact_orders f
+    WHERE f.customer_id IS NOT NULL AND {where}
+    GROUP BY f.customer_id
+"""
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a relative accuracy guarantee.
+
+    Positive values are counted in logarithmic buckets (bucket ``i`` holds
+    values in ``(gamma^(i-1), gamma^i]``), zeros and negatives in a separate
+    counter; any quantile is then estimated within ``relative_accuracy`` of
+    the true value from the bucket counts alone. The bucket index is simple
+    enough to compute in SQL, so the counts can be aggregated where the
+    data lives.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Initialize QuantileSketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates (0-1)
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be between 0 and 1, got {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+
+    @property
+    def count(self) -> int:
+        """Number of values added."""
+        return self.zero_count + sum(self.buckets.values())
+
+    def bucket_sql(self, column: str) -> str:
+        """SQL expression of the bucket index of a positive column."""
+        return f"CEIL(LN({column}) / {math.log(self.gamma)!r})::INTEGER"
+
+    def add_counts(self, buckets, counts, zero_count: int = 0) -> "QuantileSketch":
+        """
+        Add pre-aggregated bucket counts (e.g. grouped by bucket_sql).
+
+        Args:
+            buckets: Bucket indexes
+            counts: Number of values in each bucket
+            zero_count: Number of values <= 0
+
+        Returns:
+            QuantileSketch: self
+        """
+        for bucket, count in zip(np.asarray(buckets, dtype=np.int64), np.asarray(counts, dtype=np.int64)):
+            self.buckets[int(bucket)] = self.buckets.get(int(bucket), 0) + int(count)
+        self.zero_count += int(zero_count)
+        return self
+
+    def update(self, values) -> "QuantileSketch":
+        """
+        Add values.
+
+        Args:
+            values: Array of numbers (NaN are ignored)
+
+        Returns:
+            QuantileSketch: self
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positive = values[values > 0]
+        buckets, counts = np.unique(
+            np.ceil(np.log(positive) / math.log(self.gamma)).astype(np.int64), return_counts=True
+        )
+        return self.add_counts(buckets, counts, zero_count=len(values) - len(positive))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Add the counts of another sketch with the same accuracy.
+
+        Args:
+            other: Sketch to merge
+
+        Returns:
+            QuantileSketch: self
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        return self.add_counts(list(other.buckets), list(other.buckets.values()), other.zero_count)
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """
+        Estimate quantiles.
+
+        Args:
+            qs: Quantiles (0-1)
+
+        Returns:
+            list: Estimated values (0.0 for quantiles among the zeros; NaN if empty)
+        """
+        total = self.count
+        if total == 0:
+            return [math.nan for _ in qs]
+
+        indexes = np.array(sorted(self.buckets), dtype=np.int64)
+        cumulative = self.zero_count + np.cumsum([self.buckets[int(i)] for i in indexes])
+        estimates = 2 * np.power(self.gamma, indexes.astype(np.float64)) / (self.gamma + 1)
+
+        results = []
+        for q in qs:
+            rank = q * (total - 1)
+            if rank < self.zero_count:
+                results.append(0.0)
+            else:
+                results.append(float(estimates[np.searchsorted(cumulative, rank, side="right")]))
+        return results
+
+
+class CustomerRiskScorer(LoggerMixin):
+    """
+    Maintains customer_rfm incrementally and publishes customer_risk.
+    """
+
+    def __init__(
+        self,
+        loader: "DataLoader",
+        schema: str = "dw",
+        relative_accuracy: Optional[float] = None
+    ):
+        """
+        Initialize CustomerRiskScorer.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding fact_orders, dim_customer and the risk tables
+            relative_accuracy: Accuracy of the quintile sketches (default: from settings)
+        """
+        self.loader = loader
+        self.schema = schema
+        self.metrics_table = f"{schema}.{METRICS_TABLE}"
+        self.risk_table = f"{schema}.{RISK_TABLE}"
+        self.relative_accuracy = relative_accuracy or get_settings().risk_sketch_relative_accuracy
+
+    def ensure(self) -> None:
+        """Create the risk tables (and the fact index the refresh uses) if missing."""
+        for name, columns in ((METRICS_TABLE, METRICS_COLUMNS), (RISK_TABLE, RISK_COLUMNS)):
+            if self.loader.table_exists(name, schema=self.schema):
+                continue
+            # customer_id is typed like the fact table's
+            table = f"{self.schema}.{name}"
+            self.logger.info(f"Creating {table}")
+            self.loader.execute_statement(
+                f"CREATE TABLE {table} AS SELECT customer_id FROM {self.schema}.fact_orders WITH NO DATA"
+            )
+            additions = ", ".join(f"ADD COLUMN {column} {ddl}" for column, ddl in columns.items())
+            self.loader.execute_statement(f"ALTER TABLE {table} ADD PRIMARY KEY (customer_id), {additions}")
+
+        self.loader.execute_statement(
+            f"CREATE INDEX IF NOT EXISTS fact_orders_customer_id_idx ON {self.schema}.fact_orders (customer_id)"
+        )
+
+    def _replace(self, clear_sql: str, where: str = "TRUE") -> None:
+        """Clear and recompute customer aggregates in a single transaction."""
+        from sqlalchemy import text
+
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(clear_sql))
+            conn.execute(text(CUSTOMER_METRICS_SQL.format(
+                table=self.metrics_table, schema=self.schema, where=where
+            )))
+
+    @log_execution_time
+    def refresh(self, full: bool = False) -> None:
+        """
+        Recompute the aggregates of the customers in the staged batch.
+
+        An empty metrics table (first run) is rebuilt from all facts.
+
+        Args:
+            full: Rebuild every customer regardless of the batch
+        """
+        self.ensure()
+
+        if full or self.loader.get_table_count(METRICS_TABLE, self.schema) == 0:
+            self.logger.info(f"Rebuilding {self.metrics_table} from {self.schema}.fact_orders")
+            self._replace(f"TRUNCATE {self.metrics_table}")
+            return
+
+        batch_customers = f"SELECT DISTINCT customer_id FROM {self.schema}.stg_raw_orders"
+        self._replace(
+            f"DELETE FROM {self.metrics_table} WHERE customer_id IN ({batch_customers})",
+            f"f.customer_id IN ({batch_customers})",
+        )
+        self.logger.info(f"Refreshed {self.metrics_table} for the customers of the staged batch")
+
+    def sketch(self, expression: str) -> QuantileSketch:
+        """
+        Build the quantile sketch of a customer metric in the database.
+
+        Args:
+            expression: SQL expression over customer_rfm (r)
+
+        Returns:
+            QuantileSketch: Sketch of the metric over all customers
+        """
+        sketch = QuantileSketch(self.relative_accuracy)
+        result = self.loader.execute_query(f"""
+            SELECT CASE WHEN value > 0 THEN {sketch.bucket_sql('value')} END as bucket,
+                   COUNT(*) as n
+            FROM (SELECT ({expression})::DOUBLE PRECISION as value FROM {self.metrics_table} r) m
+            WHERE value IS NOT NULL
+            GROUP BY 1
+        """)
+        positive = result["bucket"].notna()
+        return sketch.add_counts(
+            result.loc[positive, "bucket"], result.loc[positive, "n"], int(result.loc[~positive, "n"].sum())
+        )
+
+    def quintile_boundaries(self) -> Dict[str, List[float]]:
+        """
+        Estimate the quintile boundaries of recency, frequency and monetary.
+
+        Recency is measured in days before the newest order in the data.
+
+        Returns:
+            dict: Four boundaries per metric
+        """
+        return {
+            metric: self.sketch(expression).quantiles(QUINTILES)
+            for metric, expression in self._metric_expressions().items()
+        }
+
+    def _metric_expressions(self) -> Dict[str, str]:
+        """SQL expressions of the RFM metrics over customer_rfm (r)."""
+        return {
+            "recency_days": f"(SELECT MAX(last_order_date) FROM {self.metrics_table}) - r.last_order_date",
+            "frequency": "r.frequency",
+            "monetary": "r.monetary",
+        }
+
+    def publish_sql(self, boundaries: Dict[str, List[float]]) -> str:
+        """
+        Build the statement scoring every customer into customer_risk.
+
+        Args:
+            boundaries: Quintile boundaries per metric (see quintile_boundaries)
+
+        Returns:
+            str: INSERT ... SELECT statement
+        """
+        def score(metric: str, column: str, descending: bool = False) -> str:
+            bounds = ", ".join(repr(float(bound)) for bound in boundaries[metric])
+            bucket = f"width_bucket({column}::DOUBLE PRECISION, ARRAY[{bounds}]::DOUBLE PRECISION[])"
+            return f"(5 - {bucket})" if descending else f"({bucket} + 1)"
+
+        return f"""
+            INSERT INTO {self.risk_table} (
+                customer_id, full_name, customer_segment, last_order_date, recency_days,
+                frequency, monetary, failure_rate_pct, r_score, f_score, m_score,
+                rfm_score, risk_level, is_vip, is_vip_at_risk, scored_at
+            )
+            WITH metrics AS (
+                SELECT
+                    r.*,
+                    {self._metric_expressions()['recency_days']} as recency_days,
+                    ROUND(r.late_items * 100.0 / NULLIF(r.order_items, 0), 2) as failure_rate_pct
+                FROM {self.metrics_table} r
+            ),
+            scored AS (
+                SELECT
+                    m.*,
+                    {score('recency_days', 'm.recency_days', descending=True)} as r_score,
+                    {score('frequency', 'm.frequency')} as f_score,
+                    {score('monetary', 'm.monetary')} as m_score,
+                    CASE
+                        WHEN m.failure_rate_pct >= {CRITICAL_FAILURE_PCT} THEN 'CRITICAL'
+                        WHEN m.failure_rate_pct >= {HIGH_FAILURE_PCT} THEN 'HIGH'
+                        ELSE 'NORMAL'
+                    END as risk_level
+                FROM metrics m
+            )
+            SELECT
+                s.customer_id,
+                TRIM(CONCAT(c.customer_fname, ' ', c.customer_lname)),
+                c.customer_segment,
+                s.last_order_date,
+                s.recency_days,
+                s.frequency,
+                s.monetary,
+                s.failure_rate_pct,
+                s.r_score,
+                s.f_score,
+                s.m_score,
+                CONCAT(s.r_score, s.f_score, s.m_score),
+                s.risk_level,
+                s.m_score = 5,
+                s.m_score = 5 AND s.risk_level IN ('CRITICAL', 'HIGH'),
+                CURRENT_TIMESTAMP
+            FROM scored s
+            LEFT JOIN {self.schema}.dim_customer c ON c.customer_id = s.customer_id
+        """
+
+    @log_execution_time
+    def publish(self) -> int:
+        """
+        Score every customer and replace customer_risk (one transaction).
+
+        Returns:
+            int: Customers scored
+        """
+        from sqlalchemy import text
+
+        boundaries = self.quintile_boundaries()
+        if any(math.isnan(bound) for bounds in boundaries.values() for bound in bounds):
+            self.logger.warning(f"{self.metrics_table} is empty; nothing to score")
+            return 0
+
+        # DELETE rather than TRUNCATE: TRUNCATE would hold an ACCESS EXCLUSIVE
+        # lock until commit, blocking dashboard reads during the rewrite
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.risk_table}"))
+            rows = conn.execute(text(self.publish_sql(boundaries))).rowcount
+
+        self.logger.info(f"{self.risk_table}: scored {rows:,} customers")
+        return rows
+
+    def run(self, full: bool = False) -> int:
+        """
+        Refresh the batch's customer aggregates and publish customer_risk.
+
+        Args:
+            full: Recompute the aggregates of every customer
+
+        Returns:
+            int: Customers scored
+        """
+        self.refresh(full=full)
+        return self.publish()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Calendar Dimension
+===================================
+
+Generates dim_date as a calendar instead of deriving it from the order dates
+in staging. The calendar covers a configured span (calendar_start_date to
+calendar_end_date) with ISO weeks, fiscal periods and weekend and holiday
+flags, all computed column-wise with pandas. It is bulk-loaded once; later
+runs only append the days past the current end, when a batch brings dates
+beyond it. A batch with orders before the start reloads the span from its
+oldest day. No run has to scan staging to build the dimension.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin
+
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
+
+# Column definitions of dim_date, in load order
+CALENDAR_COLUMNS = {
+    "date_key": "INTEGER PRIMARY KEY",
+    "full_date": "DATE NOT NULL",
+    "year": "INTEGER",
+    "quarter": "INTEGER",
+    "month": "INTEGER",
+    "month_name": "VARCHAR(20)",
+    "week": "INTEGER",
+    "day_of_year": "INTEGER",
+    "day_of_month": "INTEGER",
+    "day_of_week": "INTEGER",
+    "day_name": "VARCHAR(20)",
+    "iso_year": "INTEGER",
+    "is_weekend": "BOOLEAN",
+    "is_holiday": "BOOLEAN",
+    "fiscal_year": "INTEGER",
+    "fiscal_quarter": "INTEGER",
+    "fiscal_month": "INTEGER",
+}
+
+# Columns older, staging-derived dim_date tables do not have
+CALENDAR_EXTENSION_COLUMNS = [
+    "iso_year", "is_weekend", "is_holiday", "fiscal_year", "fiscal_quarter", "fiscal_month"
+]
+
+
+def holiday_dates(start: date, end: date, holidays: str = "us_federal") -> pd.DatetimeIndex:
+    """
+    Get the holidays of a calendar within a span.
+
+    Args:
+        start: First day
+        end: Last day
+        holidays: Holiday calendar (us_federal or none)
+
+    Returns:
+        pd.DatetimeIndex: Holiday dates
+    """
+    if holidays == "none":
+        return pd.DatetimeIndex([])
+    if holidays == "us_federal":
+        from pandas.tseries.holiday import USFederalHolidayCalendar
+
+        return USFederalHolidayCalendar().holidays(start=start, end=end)
+    raise ValueError(f"Unknown holiday calendar '{holidays}' (expected us_federal or none)")
+
+
+def generate_calendar(
+    start: date,
+    end: date,
+    fiscal_year_start_month: int = 1,
+    holidays: str = "us_federal"
+) -> pd.DataFrame:
+    """
+    Generate the dim_date rows of a span of days.
+
+    Calendar attributes match the SQL the dimension used to be built with
+    (``week`` is the ISO week, ``day_of_week`` is 0 for Sunday as in
+    ``EXTRACT(DOW)``). Fiscal years are named after the calendar year they
+    end in: with fiscal_year_start_month=10, October 2017 is in FY2018.
+
+    Args:
+        start: First day (inclusive)
+        end: Last day (inclusive)
+        fiscal_year_start_month: First month of the fiscal year (1-12)
+        holidays: Holiday calendar (us_federal or none)
+
+    Returns:
+        pd.DataFrame: One row per day with the CALENDAR_COLUMNS
+    """
+    if not 1 <= fiscal_year_start_month <= 12:
+        raise ValueError(f"fiscal_year_start_month must be 1-12, got {fiscal_year_start_month}")
+
+    dates = pd.date_range(start=start, end=end, freq="D")
+    iso = dates.isocalendar()
+    day_of_week = dates.dayofweek.to_numpy()  # Monday = 0
+    fiscal_offset = (dates.month.to_numpy() - fiscal_year_start_month) % 12
+    starts_next_year = (fiscal_year_start_month > 1) & (dates.month.to_numpy() >= fiscal_year_start_month)
+
+    calendar = pd.DataFrame({
+        "date_key": dates.year * 10000 + dates.month * 100 + dates.day,
+        "full_date": dates.date,
+        "year": dates.year,
+        "quarter": dates.quarter,
+        "month": dates.month,
+        "month_name": dates.month_name(),
+        "week": iso["week"].to_numpy(dtype="int64"),
+        "day_of_year": dates.dayofyear,
+        "day_of_month": dates.day,
+        "day_of_week": (day_of_week + 1) % 7,
+        "day_name": dates.day_name(),
+        "iso_year": iso["year"].to_numpy(dtype="int64"),
+        "is_weekend": day_of_week >= 5,
+        "is_holiday": dates.isin(holiday_dates(start, end, holidays)),
+        "fiscal_year": dates.year + starts_next_year.astype("int64"),
+        "fiscal_quarter": fiscal_offset // 3 + 1,
+        "fiscal_month": fiscal_offset + 1,
+    })
+    return calendar[list(CALENDAR_COLUMNS)]
+
+
+DateLike = Union[int, str, date, datetime]
+
+
+def to_date_key(value: DateLike) -> int:
+    """
+    Convert a date (or YYYYMMDD / YYYY-MM-DD value) to a dim_date key.
+
+    Args:
+        value: Date, datetime, YYYYMMDD integer or ISO date string
+
+    Returns:
+        int: Date key (YYYYMMDD)
+    """
+    if isinstance(value, (date, datetime)):
+        return int(value.strftime("%Y%m%d"))
+    if isinstance(value, int):
+        return value
+    return int(str(value).replace("-", "")[:8])
+
+
+def date_from_key(date_key: int) -> date:
+    """Convert a YYYYMMDD key back to a date."""
+    return datetime.strptime(str(int(date_key)), "%Y%m%d").date()
+
+
+class CalendarDimension(LoggerMixin):
+    """
+    Maintains dim_date from the generated calendar.
+    """
+
+    def __init__(
+        self,
+        loader: "DataLoader",
+        schema: str = "dw",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        fiscal_year_start_month: Optional[int] = None,
+        holidays: Optional[str] = None
+    ):
+        """
+        Initialize CalendarDimension.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding dim_date
+            start: First day of the calendar (default: from settings)
+            end: Last day of the calendar (default: from settings, or
+                December 31 of next year)
+            fiscal_year_start_month: First month of the fiscal year (default: from settings)
+            holidays: Holiday calendar (default: from settings)
+        """
+        settings = get_settings()
+        self.loader = loader
+        self.schema = schema
+        self.table = f"{schema}.dim_date"
+        self.start = start or settings.calendar_start_date
+        self.end = end or settings.calendar_end_date or date(date.today().year + 1, 12, 31)
+        self.fiscal_year_start_month = fiscal_year_start_month or settings.fiscal_year_start_month
+        self.holidays = holidays or settings.calendar_holidays
+
+    def ensure(self) -> None:
+        """Create dim_date, or add the calendar columns an older table lacks."""
+        columns = ",\n                ".join(f"{name} {ddl}" for name, ddl in CALENDAR_COLUMNS.items())
+        self.loader.execute_statement(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                {columns}
+            )
+        """)
+
+        # ALTER TABLE locks dim_date even when the columns exist, so only
+        # older tables that lack them are altered
+        missing = self.loader.missing_columns("dim_date", CALENDAR_EXTENSION_COLUMNS, schema=self.schema)
+        if missing:
+            additions = ", ".join(f"ADD COLUMN {name} {CALENDAR_COLUMNS[name]}" for name in missing)
+            self.loader.execute_statement(f"ALTER TABLE {self.table} {additions}")
+
+    def coverage(self) -> Tuple[Optional[int], Optional[int], int]:
+        """
+        Describe the days dim_date currently holds.
+
+        Returns:
+            tuple: (first date key, last date key, rows without calendar attributes);
+                the keys are None for an empty table
+        """
+        result = self.loader.execute_query(f"""
+            SELECT MIN(date_key) as first_key,
+                   MAX(date_key) as last_key,
+                   COUNT(*) FILTER (WHERE fiscal_year IS NULL) as incomplete
+            FROM {self.table}
+        """)
+        row = result.iloc[0]
+        first_key = None if pd.isna(row["first_key"]) else int(row["first_key"])
+        last_key = None if pd.isna(row["last_key"]) else int(row["last_key"])
+        return first_key, last_key, int(row["incomplete"])
+
+    def span_to_load(
+        self,
+        through: Optional[DateLike] = None,
+        since: Optional[DateLike] = None
+    ) -> Optional[Tuple[date, date]]:
+        """
+        Work out which days have to be generated.
+
+        An empty table, rows without calendar attributes (built from staging
+        by older releases) or a start moved earlier (by settings or by a batch
+        with older orders) lead to a full load of the span; otherwise only the
+        days after the current last day are generated.
+
+        Args:
+            through: Last day that must be covered (e.g. the newest order date of
+                a batch); the configured end is always covered
+            since: First day that must be covered (e.g. the oldest order date of
+                a batch); the configured start is always covered
+
+        Returns:
+            tuple: (first, last) day to load, or None if dim_date is up to date
+        """
+        start, end = self.start, self.end
+        if since is not None:
+            start = min(start, date_from_key(to_date_key(since)))
+        if through is not None:
+            end = max(end, date_from_key(to_date_key(through)))
+
+        first_key, last_key, incomplete = self.coverage()
+        if last_key is None or incomplete or first_key > to_date_key(start):
+            if first_key is None:
+                return start, end
+            return min(start, date_from_key(first_key)), max(end, date_from_key(last_key))
+
+        if last_key >= to_date_key(end):
+            return None
+        return date_from_key(last_key) + timedelta(days=1), end
+
+    def load(self, start: date, end: date) -> int:
+        """
+        Generate a span of days and upsert it in one transaction.
+
+        Args:
+            start: First day
+            end: Last day
+
+        Returns:
+            int: Rows written
+        """
+        from sqlalchemy import text
+
+        calendar = generate_calendar(start, end, self.fiscal_year_start_month, self.holidays)
+        names = list(CALENDAR_COLUMNS)
+        updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in names[1:])
+        statement = text(f"""
+            INSERT INTO {self.table} ({", ".join(names)})
+            VALUES ({", ".join(f":{name}" for name in names)})
+            ON CONFLICT (date_key) DO UPDATE SET {updates}
+        """)
+
+        with self.loader.engine.begin() as conn:
+            conn.execute(statement, calendar.to_dict("records"))
+
+        self.logger.info(f"{self.table}: loaded {len(calendar):,} days ({start} to {end})")
+        return len(calendar)
+
+    def sync(self, through: Optional[DateLike] = None, since: Optional[DateLike] = None) -> int:
+        """
+        Make dim_date cover the calendar span (and a batch's order dates).
+
+        Args:
+            through: Last day that must be covered (optional)
+            since: First day that must be covered (optional)
+
+        Returns:
+            int: Rows written (0 if dim_date was already up to date)
+        """
+        self.ensure()
+
+        span = self.span_to_load(through, since)
+        if span is None:
+            self.logger.info(f"{self.table} already covers the calendar through {self.end}")
+            return 0
+        return self.load(*span)
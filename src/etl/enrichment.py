@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Enrichment Steps
+=================================
+
+Derived tables scored from the loaded facts: customer risk, order anomalies,
+late-delivery predictions, OTIF forecasts and the aggregation tables. Both
+the sequential and the async orchestrator run these steps after the star
+schema is built, so the two produce the same tables.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from src.etl.incremental_validation import ValidationScope
+    from src.etl.load import DataLoader
+
+
+def enrichment_steps(
+    loader: "DataLoader",
+    scope: Optional["ValidationScope"] = None
+) -> Dict[str, Callable[[], int]]:
+    """
+    Get the enrichment steps, in execution order.
+
+    Each step builds its scorer when called, so a missing model or optional
+    dependency only fails that step.
+
+    Args:
+        loader: DataLoader instance
+        scope: Days of the batch just loaded; row-level scores and aggregates
+            are limited to them (default: rebuild from every fact)
+
+    Returns:
+        dict: Step name -> callable returning the rows it wrote
+    """
+    from src.etl.aggregates import AggregateBuilder
+    from src.etl.anomaly import AnomalyDetector
+    from src.etl.customer_risk import CustomerRiskScorer
+    from src.etl.forecast import OTIFForecaster
+    from src.etl.late_delivery_model import LateDeliveryPredictor
+
+    return {
+        "customer_risk": lambda: CustomerRiskScorer(loader=loader).run(),
+        "order_anomalies": lambda: AnomalyDetector(loader=loader).run(scope),
+        "late_delivery_predictions": lambda: LateDeliveryPredictor(loader=loader).run(scope),
+        "otif_forecast": lambda: OTIFForecaster(loader=loader).run(),
+        "order_aggregates": lambda: AggregateBuilder(loader=loader).run(scope),
+    }
@@ -11,47 +11,169 @@ Date: 2026-02-04
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional
 
 import pandas as pd
 
 from src.config import get_settings
+from src.etl.profiling import StreamingProfiler
+from src.etl.staging_cache import ParquetStagingCache
+from src.etl.utils import sanitize_columns
 from src.logging_config import LoggerMixin, log_execution_time
 
 
+# PostgreSQL types of dw.stg_raw_orders, by sanitized DataCo column. Staging
+# is created from this schema before any chunk is loaded, so its types never
+# depend on what the first chunk happened to contain (e.g. a column that is
+# empty in the first 50,000 rows); columns outside it are staged as TEXT.
+STAGING_SCHEMA = {
+    "type": "TEXT",
+    "days_for_shipping_real": "BIGINT",
+    "days_for_shipment_scheduled": "BIGINT",
+    "benefit_per_order": "DOUBLE PRECISION",
+    "sales_per_customer": "DOUBLE PRECISION",
+    "delivery_status": "TEXT",
+    "late_delivery_risk": "BIGINT",
+    "category_id": "BIGINT",
+    "category_name": "TEXT",
+    "customer_city": "TEXT",
+    "customer_country": "TEXT",
+    "customer_email": "TEXT",
+    "customer_fname": "TEXT",
+    "customer_id": "BIGINT",
+    "customer_lname": "TEXT",
+    "customer_password": "TEXT",
+    "customer_segment": "TEXT",
+    "customer_state": "TEXT",
+    "customer_street": "TEXT",
+    "customer_zipcode": "DOUBLE PRECISION",
+    "department_id": "BIGINT",
+    "department_name": "TEXT",
+    "latitude": "DOUBLE PRECISION",
+    "longitude": "DOUBLE PRECISION",
+    "market": "TEXT",
+    "order_city": "TEXT",
+    "order_country": "TEXT",
+    "order_customer_id": "BIGINT",
+    "order_date_dateorders": "TIMESTAMP",
+    "order_id": "BIGINT",
+    "order_item_cardprod_id": "BIGINT",
+    "order_item_discount": "DOUBLE PRECISION",
+    "order_item_discount_rate": "DOUBLE PRECISION",
+    "order_item_id": "BIGINT",
+    "order_item_product_price": "DOUBLE PRECISION",
+    "order_item_profit_ratio": "DOUBLE PRECISION",
+    "order_item_quantity": "BIGINT",
+    "sales": "DOUBLE PRECISION",
+    "order_item_total": "DOUBLE PRECISION",
+    "order_profit_per_order": "DOUBLE PRECISION",
+    "order_region": "TEXT",
+    "order_state": "TEXT",
+    "order_status": "TEXT",
+    "order_zipcode": "DOUBLE PRECISION",
+    "product_card_id": "BIGINT",
+    "product_category_id": "BIGINT",
+    "product_description": "TEXT",
+    "product_image": "TEXT",
+    "product_name": "TEXT",
+    "product_price": "DOUBLE PRECISION",
+    "product_status": "BIGINT",
+    "shipping_date_dateorders": "TIMESTAMP",
+    "shipping_mode": "TEXT",
+}
+
+# Timestamp format of the DataCo export (e.g. 1/31/2018 22:56)
+STAGING_DATE_FORMAT = "%m/%d/%Y %H:%M"
+
+
+def staging_table_ddl(columns: Iterable[str], table: str = "dw.stg_raw_orders") -> List[str]:
+    """
+    Build the statements (re)creating the staging table from STAGING_SCHEMA.
+    
+    Args:
+        columns: Sanitized column names, in file order
+        table: Schema-qualified staging table
+    
+    Returns:
+        list: DROP TABLE and CREATE TABLE statements
+    """
+    definitions = ", ".join(f'"{column}" {STAGING_SCHEMA.get(column, "TEXT")}' for column in columns)
+    return [f"DROP TABLE IF EXISTS {table}", f"CREATE TABLE {table} ({definitions})"]
+
+
+def conform_to_staging(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a sanitized chunk to the dtypes of STAGING_SCHEMA.
+    
+    Values that do not fit their column (e.g. text in an id column) raise
+    instead of being loaded as NULL.
+    
+    Args:
+        chunk: Sanitized chunk
+    
+    Returns:
+        pd.DataFrame: Chunk with BIGINT columns as Int64, DOUBLE PRECISION as
+            float64, TIMESTAMP as datetime64 and TEXT as strings
+    """
+    conformed = {}
+    for column in chunk.columns:
+        values = chunk[column]
+        sql_type = STAGING_SCHEMA.get(column, "TEXT")
+        if sql_type == "TIMESTAMP":
+            conformed[column] = pd.to_datetime(values, format=STAGING_DATE_FORMAT)
+        elif sql_type == "BIGINT":
+            conformed[column] = pd.to_numeric(values).astype("Int64")
+        elif sql_type == "DOUBLE PRECISION":
+            conformed[column] = pd.to_numeric(values).astype("float64")
+        elif pd.api.types.is_string_dtype(values):
+            conformed[column] = values
+        else:
+            conformed[column] = values.astype("str")
+    return pd.DataFrame(conformed, index=chunk.index)
+
+
 class DataExtractor(LoggerMixin):
     """
     Extracts data from various sources (CSV, database, API).
     
     Handles encoding issues, chunking for large files, and error recovery.
+    Sanitized extracts are served from the Parquet staging cache while the
+    source file is unchanged.
     """
     
-    def __init__(self):
-        """Initialize DataExtractor."""
+    def __init__(self, staging_cache: Optional[ParquetStagingCache] = None):
+        """
+        Initialize DataExtractor.
+        
+        Args:
+            staging_cache: Parquet staging cache (default: data/interim if enabled)
+        """
         self.settings = get_settings()
+        
+        if staging_cache is None and self.settings.staging_cache_enabled:
+            staging_cache = ParquetStagingCache()
+        self.staging_cache = staging_cache
+        
         self.logger.info("DataExtractor initialized")
     
-    @log_execution_time
-    def extract_csv(
-        self,
-        file_path: Optional[str] = None,
-        encoding: str = "ISO-8859-1",
-        chunksize: Optional[int] = None
-    ) -> pd.DataFrame:
+    def _cache_key(self, csv_path: str, encoding: str) -> Optional[str]:
+        """Get the staging cache key for a file (None if caching is off)."""
+        if self.staging_cache is None or not self.staging_cache.available:
+            return None
+        return self.staging_cache.key(csv_path, encoding)
+    
+    def _resolve_csv_path(self, file_path: Optional[str] = None) -> str:
         """
-        Extract data from CSV file.
+        Resolve the CSV path and make sure the file exists.
         
         Args:
             file_path: Path to CSV file (default: from settings)
-            encoding: File encoding (default: ISO-8859-1 for DataCo dataset)
-            chunksize: Number of rows per chunk for large files
         
         Returns:
-            pd.DataFrame: Extracted data
+            str: Absolute path to the CSV file
         
         Raises:
             FileNotFoundError: If CSV file doesn't exist
-            pd.errors.ParserError: If CSV parsing fails
         """
         # Use default path from settings if not provided
         csv_path = file_path or self.settings.csv_file_path
@@ -67,6 +189,32 @@ class DataExtractor(LoggerMixin):
             self.logger.error(f"CSV file not found: {csv_path}")
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
         
+        return csv_path
+    
+    @log_execution_time
+    def extract_csv(
+        self,
+        file_path: Optional[str] = None,
+        encoding: str = "ISO-8859-1",
+        chunksize: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Extract data from CSV file.
+        
+        Args:
+            file_path: Path to CSV file (default: from settings)
+            encoding: File encoding (default: ISO-8859-1 for DataCo dataset)
+            chunksize: Number of rows per chunk for large files
+        
+        Returns:
+            pd.DataFrame: Extracted data
+        
+        Raises:
+            FileNotFoundError: If CSV file doesn't exist
+            pd.errors.ParserError: If CSV parsing fails
+        """
+        csv_path = self._resolve_csv_path(file_path)
+        
         # Get file size for logging
         file_size_mb = os.path.getsize(csv_path) / (1024 * 1024)
         self.logger.info(f"File size: {file_size_mb:.2f} MB")
@@ -107,78 +255,139 @@ class DataExtractor(LoggerMixin):
         - Replace spaces with underscores
         - Remove special characters except underscores
         
+        Uses the shared, memoized sanitizer from src.etl.utils, so repeated
+        headers (chunks, reruns) are mapped without redoing the work.
+        
         Args:
             df: DataFrame with raw column names
         
         Returns:
             pd.DataFrame: DataFrame with sanitized column names
         """
-        self.logger.info("Sanitizing column names")
-        
-        original_columns = df.columns.tolist()
-        
-        # Sanitize column names
-        new_columns = []
-        for col in df.columns:
-            # Convert to lowercase and replace spaces with underscores
-            sanitized = col.lower().replace(" ", "_").replace("(", "").replace(")", "")
-            # Remove other special characters except underscores
-            sanitized = "".join(c if c.isalnum() or c == "_" else "" for c in sanitized)
-            # Remove leading/trailing underscores and collapse multiple underscores
-            sanitized = "_".join(filter(None, sanitized.split("_")))
-            new_columns.append(sanitized)
+        original_columns = tuple(df.columns)
+        new_columns = sanitize_columns(original_columns)
         
         # Apply new column names
-        df.columns = new_columns
+        df.columns = list(new_columns)
         
-        # Log changes
-        for old, new in zip(original_columns, new_columns):
-            if old != new:
-                self.logger.debug(f"Column renamed: '{old}' -> '{new}'")
-        
-        self.logger.info(f"Sanitized {len(new_columns)} column names")
+        renamed = sum(old != new for old, new in zip(original_columns, new_columns))
+        self.logger.info(f"Sanitized {len(new_columns)} column names ({renamed} renamed)")
         
         return df
     
     def extract_and_sanitize(
         self,
         file_path: Optional[str] = None,
-        encoding: str = "ISO-8859-1"
+        encoding: str = "ISO-8859-1",
+        columns: Optional[List[str]] = None
     ) -> pd.DataFrame:
         """
         Extract CSV and sanitize column names in one step.
         
+        The first parse of a file is written to the staging cache; later calls
+        for the unchanged file read only the requested columns from Parquet.
+        
         Args:
             file_path: Path to CSV file
             encoding: File encoding
+            columns: Sanitized column names to return (default: all)
         
         Returns:
             pd.DataFrame: Extracted and sanitized data
         """
-        df = self.extract_csv(file_path=file_path, encoding=encoding)
+        csv_path = self._resolve_csv_path(file_path)
+        cache_key = self._cache_key(csv_path, encoding)
+        
+        if cache_key:
+            df = self.staging_cache.load(cache_key, columns=columns)
+            if df is not None:
+                return df
+        
+        df = self.extract_csv(file_path=csv_path, encoding=encoding)
         df = self.sanitize_column_names(df)
-        return df
+        
+        if cache_key:
+            self.staging_cache.store(cache_key, df)
+        
+        return df[columns] if columns else df
     
-    def get_data_profile(self, df: pd.DataFrame) -> dict:
+    def iter_csv_chunks(
+        self,
+        file_path: Optional[str] = None,
+        encoding: str = "ISO-8859-1",
+        chunksize: Optional[int] = None,
+        skip_rows: int = 0,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
         """
-        Get basic profile of the dataset.
+        Stream the CSV as sanitized chunks, optionally skipping rows already loaded.
+        
+        Skipped rows are dropped by the parser (the header is kept), so resuming
+        from a late offset does not re-parse the committed part of the file.
+        Chunks come from the staging cache when the file is unchanged; a full
+        pass over the CSV populates the cache one row group per chunk.
         
         Args:
-            df: DataFrame to profile
+            file_path: Path to CSV file (default: from settings)
+            encoding: File encoding
+            chunksize: Rows per chunk (default: from settings)
+            skip_rows: Number of data rows to skip from the start
+            columns: Sanitized column names to return (default: all)
         
-        Returns:
-            dict: Profile information
+        Yields:
+            pd.DataFrame: Sanitized chunk
+        
+        Raises:
+            FileNotFoundError: If CSV file doesn't exist
         """
-        profile = {
-            "row_count": len(df),
-            "column_count": len(df.columns),
-            "columns": df.columns.tolist(),
-            "dtypes": df.dtypes.to_dict(),
-            "null_counts": df.isnull().sum().to_dict(),
-            "null_percentages": (df.isnull().sum() / len(df) * 100).to_dict(),
-            "memory_mb": df.memory_usage(deep=True).sum() / (1024 * 1024),
-        }
+        csv_path = self._resolve_csv_path(file_path)
+        rows_per_chunk = chunksize or self.settings.extract_chunk_size
+        
+        if skip_rows:
+            self.logger.info(f"Skipping {skip_rows:,} rows already loaded")
+        
+        cache_key = self._cache_key(csv_path, encoding)
+        if cache_key:
+            cached = self.staging_cache.iter_chunks(
+                cache_key, rows_per_chunk, skip_rows=skip_rows, columns=columns
+            )
+            if cached is not None:
+                yield from cached
+                return
+        
+        # Only a pass over the whole file can populate the cache
+        cache_writer = self.staging_cache.writer(cache_key) if cache_key and not skip_rows else None
+        
+        reader = pd.read_csv(
+            csv_path,
+            encoding=encoding,
+            chunksize=rows_per_chunk,
+            skiprows=range(1, skip_rows + 1) if skip_rows else None
+        )
+        
+        sanitized_columns = None
+        try:
+            for chunk in reader:
+                # Sanitize the header once per file, not once per chunk
+                if sanitized_columns is None:
+                    chunk = self.sanitize_column_names(chunk)
+                    sanitized_columns = list(chunk.columns)
+                else:
+                    chunk.columns = sanitized_columns
+                
+                if cache_writer:
+                    cache_writer.write(chunk)
+                yield chunk[columns] if columns else chunk
+        except BaseException:
+            if cache_writer:
+                cache_writer.abort()
+            raise
         
+        if cache_writer:
+            cache_writer.close()
+    
+    def _log_profile(self, profile: dict) -> None:
+        """Log the summary of a data profile."""
         self.logger.info(
             f"Data profile: {profile['row_count']:,} rows, "
             f"{profile['column_count']} columns, "
@@ -194,7 +403,46 @@ class DataExtractor(LoggerMixin):
             self.logger.warning(
                 f"Columns with >10% nulls: {', '.join(f'{col}({pct:.1f}%)' for col, pct in high_nulls.items())}"
             )
+    
+    def get_data_profile(self, df: pd.DataFrame) -> dict:
+        """
+        Get basic profile of the dataset.
+        
+        Args:
+            df: DataFrame to profile
+        
+        Returns:
+            dict: Profile information
+        """
+        profile = StreamingProfiler().update(df).profile()
+        self._log_profile(profile)
+        return profile
+    
+    @log_execution_time
+    def profile_csv(
+        self,
+        file_path: Optional[str] = None,
+        encoding: str = "ISO-8859-1",
+        chunksize: Optional[int] = None,
+        columns: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Profile a CSV file chunk by chunk, in bounded memory.
         
+        Args:
+            file_path: Path to CSV file (default: from settings)
+            encoding: File encoding
+            chunksize: Rows per chunk (default: from settings)
+            columns: Sanitized column names to profile (default: all)
+        
+        Returns:
+            dict: Profile information (see StreamingProfiler.profile)
+        """
+        chunks = self.iter_csv_chunks(
+            file_path=file_path, encoding=encoding, chunksize=chunksize, columns=columns
+        )
+        profile = StreamingProfiler.from_chunks(chunks).profile()
+        self._log_profile(profile)
         return profile
 
 
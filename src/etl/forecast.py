@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Torre Control - OTIF Forecasting
+=================================
+
+Forecasts monthly OTIF % and revenue at risk, overall and per market and
+customer segment, and writes them to ``dw.forecast_otif`` next to the
+history that ``dw.vw_temporal_trends`` shows.
+
+- Monthly series come from one aggregate query over fact_orders; months
+  without orders are filled (0 revenue at risk, last known OTIF %).
+- Each series gets an exponential smoothing (ETS) model from statsmodels:
+  damped additive trend, plus yearly seasonality once two years of history
+  exist. Series too short for ETS get a naive forecast.
+- Fits run in parallel across processes, one task per series.
+- Every forecast row carries a hash of its series (values, horizon and
+  model version). Series whose hash is already in the table keep their
+  forecasts, so a nightly run only refits the series that changed.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin, log_execution_time
+
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
+
+FORECAST_TABLE = "forecast_otif"
+
+# Bump when the models change so cached forecasts are refitted
+MODEL_VERSION = "ets-1"
+
+# Forecast dimension -> member expression over fact_orders (f), dim_geography (g)
+# and dim_customer (c)
+FORECAST_DIMENSIONS = {
+    "total": "'All'",
+    "market": "g.market",
+    "customer_segment": "c.customer_segment",
+}
+FORECAST_METRICS = ["otif_pct", "revenue_at_risk"]
+
+# Months of history needed for a trend model, and for yearly seasonality
+MIN_ETS_MONTHS = 6
+SEASONAL_PERIODS = 12
+
+# Two-sided 95% prediction interval
+INTERVAL_ALPHA = 0.05
+INTERVAL_Z = 1.959964
+
+SERIES_SQL = """
+    SELECT
+        '{dimension}' as dimension,
+        COALESCE({member}, 'Unknown') as member,
+        f.date_key / 100 as period,
+        COUNT(*) FILTER (WHERE NOT f.is_canceled) as active_items,
+        COUNT(*) FILTER (WHERE NOT f.is_canceled AND NOT f.is_late AND f.is_complete) as otif_items,
+        COALESCE(SUM(f.sales) FILTER (WHERE f.is_late), 0) as revenue_at_risk
+    FROM {schema}.fact_orders f
+    LEFT JOIN {schema}.dim_geography g ON g.geography_key = f.geography_key
+    LEFT JOIN {schema}.dim_customer c ON c.customer_id = f.customer_id
+    GROUP BY 1, 2, 3
+"""
+
+SeriesKey = Tuple[str, str, str]
+
+
+def build_series(history: pd.DataFrame) -> Dict[SeriesKey, pd.Series]:
+    """
+    Turn monthly aggregates into one complete monthly series per metric.
+
+    Every series runs from the first month of its member to the latest month
+    of the history, so all forecasts start at the same month.
+
+    Args:
+        history: Rows of SERIES_SQL (dimension, member, period as yyyymm,
+            active_items, otif_items, revenue_at_risk)
+
+    Returns:
+        dict: (dimension, member, metric) -> monthly pd.Series (PeriodIndex)
+    """
+    if history.empty:
+        return {}
+
+    history = history.assign(
+        month=pd.PeriodIndex.from_fields(
+            year=history["period"] // 100, month=history["period"] % 100, freq="M"
+        ),
+        otif_pct=100.0 * history["otif_items"] / history["active_items"].where(history["active_items"] > 0),
+    )
+    last_month = history["month"].max()
+
+    series = {}
+    for (dimension, member), rows in history.groupby(["dimension", "member"], sort=True):
+        months = pd.period_range(rows["month"].min(), last_month, freq="M")
+        monthly = rows.set_index("month").reindex(months)
+        series[(dimension, member, "otif_pct")] = monthly["otif_pct"].astype(float).ffill().bfill()
+        series[(dimension, member, "revenue_at_risk")] = monthly["revenue_at_risk"].astype(float).fillna(0.0)
+    return series
+
+
+def series_hash(key: SeriesKey, values: pd.Series, horizon: int) -> str:
+    """
+    Fingerprint of a series and everything its forecast depends on.
+
+    Args:
+        key: (dimension, member, metric)
+        values: Monthly series
+        horizon: Months forecast
+
+    Returns:
+        str: 32-character hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("|".join([*key, MODEL_VERSION, str(horizon), str(values.index[0])]).encode())
+    digest.update(np.round(values.to_numpy(dtype=np.float64), 6).tobytes())
+    return digest.hexdigest()
+
+
+def _naive_forecast(values: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean of the last three months, with an interval from month-to-month changes."""
+    level = values[-3:].mean()
+    spread = np.diff(values).std() if len(values) > 2 else 0.0
+    steps = np.arange(1, horizon + 1)
+    return np.full(horizon, level), INTERVAL_Z * spread * np.sqrt(steps)
+
+
+def fit_series(task: Tuple[SeriesKey, np.ndarray, str, int]) -> pd.DataFrame:
+    """
+    Fit one series and forecast it (runs in a worker process).
+
+    Args:
+        task: (key, monthly values, first month as "YYYY-MM", horizon)
+
+    Returns:
+        pd.DataFrame: One row per forecast month with forecast, lower_bound,
+            upper_bound and method
+    """
+    key, values, first_month, horizon = task
+    values = np.asarray(values, dtype=np.float64)
+    method = "naive"
+    forecast = None
+
+    if len(values) >= MIN_ETS_MONTHS and np.ptp(values) > 0:
+        seasonal = len(values) >= 2 * SEASONAL_PERIODS
+        try:
+            # Optional dependency: without statsmodels every series is forecast naively
+            from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+            model = ETSModel(
+                values,
+                error="add",
+                trend="add",
+                damped_trend=True,
+                seasonal="add" if seasonal else None,
+                seasonal_periods=SEASONAL_PERIODS if seasonal else None,
+            )
+            fitted = model.fit(disp=False)
+            prediction = fitted.get_prediction(start=len(values), end=len(values) + horizon - 1)
+            frame = prediction.summary_frame(alpha=INTERVAL_ALPHA)
+            forecast = frame["mean"].to_numpy()
+            lower, upper = frame["pi_lower"].to_numpy(), frame["pi_upper"].to_numpy()
+            method = "ets_seasonal" if seasonal else "ets_damped"
+        except (ImportError, ValueError, np.linalg.LinAlgError):
+            forecast = None
+
+    if forecast is None:
+        forecast, half_width = _naive_forecast(values, horizon)
+        lower, upper = forecast - half_width, forecast + half_width
+
+    # OTIF is a percentage, revenue at risk cannot be negative
+    upper_limit = 100.0 if key[2] == "otif_pct" else np.inf
+    months = pd.period_range(pd.Period(first_month, freq="M") + len(values), periods=horizon, freq="M")
+    return pd.DataFrame({
+        "dimension": key[0],
+        "member": key[1],
+        "metric": key[2],
+        "forecast_month": months.to_timestamp().date,
+        "horizon": np.arange(1, horizon + 1),
+        "forecast": np.round(np.clip(forecast, 0.0, upper_limit), 2),
+        "lower_bound": np.round(np.clip(lower, 0.0, upper_limit), 2),
+        "upper_bound": np.round(np.clip(upper, 0.0, upper_limit), 2),
+        "method": method,
+    })
+
+
+class OTIFForecaster(LoggerMixin):
+    """
+    Fits the OTIF and revenue-at-risk series and maintains forecast_otif.
+    """
+
+    def __init__(
+        self,
+        loader: "DataLoader",
+        schema: str = "dw",
+        horizon: Optional[int] = None,
+        workers: Optional[int] = None
+    ):
+        """
+        Initialize OTIFForecaster.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding fact_orders and forecast_otif
+            horizon: Months to forecast (default: from settings)
+            workers: Processes fitting series (default: from settings)
+        """
+        settings = get_settings()
+        self.loader = loader
+        self.schema = schema
+        self.table = f"{schema}.{FORECAST_TABLE}"
+        self.horizon = horizon or settings.forecast_horizon_months
+        self.workers = workers or settings.forecast_workers
+
+    def ensure(self) -> None:
+        """Create forecast_otif if it does not exist."""
+        self.loader.execute_statement(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                dimension VARCHAR(50) NOT NULL,
+                member VARCHAR(100) NOT NULL,
+                metric VARCHAR(50) NOT NULL,
+                forecast_month DATE NOT NULL,
+                horizon SMALLINT NOT NULL,
+                forecast NUMERIC(14, 2),
+                lower_bound NUMERIC(14, 2),
+                upper_bound NUMERIC(14, 2),
+                method VARCHAR(30) NOT NULL,
+                series_hash VARCHAR(32) NOT NULL,
+                fitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (dimension, member, metric, forecast_month)
+            )
+        """)
+
+    def series_sql(self) -> str:
+        """Monthly aggregates of every forecast dimension."""
+        return "\n    UNION ALL\n".join(
+            SERIES_SQL.format(schema=self.schema, dimension=dimension, member=member)
+            for dimension, member in FORECAST_DIMENSIONS.items()
+        )
+
+    def cached_hashes(self) -> set:
+        """Series hashes that already have forecasts."""
+        result = self.loader.execute_query(f"SELECT DISTINCT series_hash FROM {self.table}")
+        return set(result["series_hash"])
+
+    def fit_all(self, tasks: List[Tuple[SeriesKey, np.ndarray, str, int]]) -> List[pd.DataFrame]:
+        """
+        Fit series, across worker processes when there is more than one.
+
+        Args:
+            tasks: fit_series arguments
+
+        Returns:
+            list: fit_series results, in task order
+        """
+        workers = min(self.workers, len(tasks))
+        if workers <= 1:
+            return [fit_series(task) for task in tasks]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fit_series, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    @log_execution_time
+    def run(self, refit: bool = False) -> int:
+        """
+        Refit the changed series and replace their forecasts.
+
+        Forecasts of series whose hash is unchanged are kept; forecasts of
+        series that no longer exist are removed. Both happen in one
+        transaction.
+
+        Args:
+            refit: Refit every series, ignoring cached forecasts
+
+        Returns:
+            int: Forecast rows written
+        """
+        from sqlalchemy import text
+
+        self.ensure()
+        series = build_series(self.loader.execute_query(self.series_sql()))
+        hashes = {key: series_hash(key, values, self.horizon) for key, values in series.items()}
+        cached = set() if refit else self.cached_hashes()
+
+        stale = [key for key in series if hashes[key] not in cached]
+        tasks = [
+            (key, series[key].to_numpy(dtype=np.float64), str(series[key].index[0]), self.horizon)
+            for key in stale
+        ]
+        forecasts = [frame.assign(series_hash=hashes[key]) for key, frame in zip(stale, self.fit_all(tasks))]
+
+        keep = [hashes[key] for key in series if hashes[key] in cached]
+        rows = pd.concat(forecasts, ignore_index=True) if forecasts else pd.DataFrame()
+        columns = list(rows.columns)
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.table} WHERE series_hash <> ALL(:keep)"), {"keep": keep})
+            if len(rows):
+                conn.execute(
+                    text(f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                         f"VALUES ({', '.join(f':{column}' for column in columns)})"),
+                    rows.to_dict("records"),
+                )
+
+        self.logger.info(
+            f"{self.table}: refitted {len(stale):,} of {len(series):,} series "
+            f"({len(keep):,} unchanged), {len(rows):,} forecast rows written"
+        )
+        return len(rows)
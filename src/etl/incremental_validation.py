@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Incremental Validation
+=======================================
+
+Lets DataValidator check only the rows a run wrote. A ValidationScope is a
+``date_key`` range, either given directly or recorded by an ETL run for the
+batch it loaded. Row-level invariants (NULLs, referential integrity) only
+need the new rows; global invariants such as overall OTIF % are read from
+a running per-day summary table that is refreshed for the scope alone, so
+validation cost follows the size of the delta.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+from src.etl.date_dimension import DateLike, to_date_key
+from src.logging_config import LoggerMixin
+
+if TYPE_CHECKING:
+    from src.etl.checkpoint import RunState
+    from src.etl.load import DataLoader
+
+
+SUMMARY_TABLE = "validation_daily_summary"
+
+# Summary totals may drift this far from the catalog row estimate before the
+# summary is considered stale (the estimate itself is approximate)
+SUMMARY_DRIFT_TOLERANCE = 0.10
+
+def batch_date_key_range(loader: "DataLoader", schema: str = "dw") -> Optional[Tuple[int, int]]:
+    """
+    Get the date_key range of the batch currently in staging.
+
+    Args:
+        loader: DataLoader instance
+        schema: Schema of the staging table
+
+    Returns:
+        Tuple[int, int]: (first, last) date key, or None if staging is empty
+    """
+    result = loader.execute_query(f"""
+        SELECT MIN(TO_CHAR(order_date_dateorders, 'YYYYMMDD')::INTEGER) as first_key,
+               MAX(TO_CHAR(order_date_dateorders, 'YYYYMMDD')::INTEGER) as last_key
+        FROM {schema}.stg_raw_orders
+    """)
+    first_key, last_key = result["first_key"].iloc[0], result["last_key"].iloc[0]
+    if first_key is None or first_key != first_key:  # NULL or NaN
+        return None
+    return int(first_key), int(last_key)
+
+
+class ValidationScope:
+    """
+    Range of fact rows (by date_key) a validation is limited to.
+    """
+
+    def __init__(self, first_date_key: DateLike, last_date_key: DateLike, run_id: Optional[str] = None):
+        """
+        Initialize ValidationScope.
+
+        Args:
+            first_date_key: First date of the scope (inclusive)
+            last_date_key: Last date of the scope (inclusive)
+            run_id: ETL run that wrote the rows (informational)
+        """
+        self.first_date_key = to_date_key(first_date_key)
+        self.last_date_key = to_date_key(last_date_key)
+        self.run_id = run_id
+
+        if self.first_date_key > self.last_date_key:
+            raise ValueError(f"Empty validation scope: {self.first_date_key} > {self.last_date_key}")
+
+    @classmethod
+    def for_run(cls, run: Union[str, "RunState"], state_dir: Optional[Path] = None) -> "ValidationScope":
+        """
+        Build the scope of the batch an ETL run loaded.
+
+        Args:
+            run: Run id or RunState of the run
+            state_dir: Directory holding run state files (default: from settings)
+
+        Returns:
+            ValidationScope: Scope of the run's batch
+
+        Raises:
+            ValueError: If the run did not record a batch range
+        """
+        from src.etl.checkpoint import RunState
+
+        run_state = RunState.load(run, state_dir=state_dir) if isinstance(run, str) else run
+        date_key_range = run_state.stage_details("transform").get("date_key_range")
+        if not date_key_range:
+            raise ValueError(f"Run {run_state.run_id} did not record the date range of its batch")
+
+        first_key, last_key = date_key_range
+        return cls(first_key, last_key, run_id=run_state.run_id)
+
+    def predicate(self, alias: Optional[str] = None) -> str:
+        """
+        SQL condition selecting the rows in scope.
+
+        Args:
+            alias: Table alias of the fact table (optional)
+
+        Returns:
+            str: Condition on date_key
+        """
+        column = f"{alias}.date_key" if alias else "date_key"
+        return f"{column} BETWEEN {self.first_date_key:d} AND {self.last_date_key:d}"
+
+    def __str__(self) -> str:
+        """Describe the scope."""
+        described = f"date_key {self.first_date_key}..{self.last_date_key}"
+        return f"run {self.run_id} ({described})" if self.run_id else described
+
+
+class RunningSummary(LoggerMixin):
+    """
+    Per-day totals of fact_orders, maintained for the scopes that were validated.
+
+    Only the days of a scope are recomputed, so global invariants can be
+    checked from a table of one row per day instead of the whole fact table.
+    """
+
+    def __init__(self, loader: "DataLoader", schema: str = "dw"):
+        """
+        Initialize RunningSummary.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding fact_orders (and the summary table)
+        """
+        self.loader = loader
+        self.schema = schema
+        self.table = f"{schema}.{SUMMARY_TABLE}"
+
+    def _aggregate_sql(self, where: str = "TRUE") -> str:
+        """INSERT ... SELECT computing the summary rows matching a condition."""
+        return f"""
+            INSERT INTO {self.table} (date_key, order_items, active_items, otif_items, updated_at)
+            SELECT
+                date_key,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE is_canceled = FALSE),
+                COUNT(*) FILTER (WHERE is_canceled = FALSE AND is_late = FALSE AND is_complete = TRUE),
+                CURRENT_TIMESTAMP
+            FROM {self.schema}.fact_orders
+            WHERE {where}
+            GROUP BY date_key
+        """
+
+    def ensure(self) -> None:
+        """Create the summary table if it does not exist."""
+        self.loader.execute_statement(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                date_key INTEGER PRIMARY KEY,
+                order_items BIGINT NOT NULL,
+                active_items BIGINT NOT NULL,
+                otif_items BIGINT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def _replace(self, clear_sql: str, where: str = "TRUE") -> None:
+        """Clear and recompute summary rows in a single transaction."""
+        from sqlalchemy import text
+
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(clear_sql))
+            conn.execute(text(self._aggregate_sql(where)))
+
+    def rebuild(self) -> None:
+        """Recompute the summary from the whole fact table."""
+        self.logger.info(f"Rebuilding {self.table} from {self.schema}.fact_orders")
+        self._replace(f"TRUNCATE {self.table}")
+
+    def refresh(self, scope: ValidationScope) -> None:
+        """
+        Recompute the summary days of a scope (in one transaction).
+
+        A missing, empty or drifted summary is rebuilt instead.
+
+        Args:
+            scope: Scope whose days were written
+        """
+        self.ensure()
+
+        if self._is_stale():
+            self.rebuild()
+            return
+
+        self._replace(f"DELETE FROM {self.table} WHERE {scope.predicate()}", scope.predicate())
+        self.logger.info(f"Refreshed {self.table} for {scope}")
+
+    def _is_stale(self) -> bool:
+        """
+        Check whether the summary no longer matches the fact table.
+
+        Compares the summed order items with the catalog estimate of
+        fact_orders (no scan). Rows written outside any validated scope, or
+        a delta larger than the tolerance, therefore lead to a full rebuild.
+        """
+        summary_rows = self.totals()["order_items"]
+        if summary_rows == 0:
+            return True
+
+        fact_rows = self.loader.get_table_count("fact_orders", self.schema, mode="estimated")
+        drift = abs(fact_rows - summary_rows) / max(fact_rows, 1)
+        if drift > SUMMARY_DRIFT_TOLERANCE:
+            self.logger.warning(
+                f"{self.table} covers {summary_rows:,} rows but fact_orders has ~{fact_rows:,}; rebuilding"
+            )
+            return True
+        return False
+
+    def totals(self) -> Dict[str, int]:
+        """
+        Sum the summary over all days.
+
+        Returns:
+            dict: days, order_items, active_items and otif_items
+        """
+        result = self.loader.execute_query(f"""
+            SELECT COUNT(*) as days,
+                   COALESCE(SUM(order_items), 0) as order_items,
+                   COALESCE(SUM(active_items), 0) as active_items,
+                   COALESCE(SUM(otif_items), 0) as otif_items
+            FROM {self.table}
+        """)
+        return {column: int(result[column].iloc[0]) for column in result.columns}
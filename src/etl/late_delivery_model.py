@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Late-Delivery Risk Model
+=========================================
+
+Predicts whether an order item will be delivered late from what is known
+when the order is placed (shipping mode, scheduled days, market, region,
+product category, customer segment, order size and calendar), instead of
+copying ``late_delivery_risk`` from the source file.
+
+- ``train_model`` builds the features from fact_orders and the dimensions,
+  fits a gradient-boosted tree classifier (scikit-learn's
+  HistGradientBoostingClassifier or XGBoost) on the older 80% of the
+  orders, evaluates it on the newest 20% and persists it to models/.
+- ``LateDeliveryPredictor`` scores the rows of a batch as they stream in
+  as Arrow record batches (one vectorized predict_proba per batch) and
+  writes the probabilities to ``fact_order_predictions``, which backs the
+  ``vw_orders_at_risk`` view used by the Power BI "at risk" pages.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin, get_logger, log_execution_time
+
+if TYPE_CHECKING:
+    from src.etl.incremental_validation import ValidationScope
+    from src.etl.load import DataLoader
+
+
+PREDICTION_TABLE = "fact_order_predictions"
+AT_RISK_VIEW = "vw_orders_at_risk"
+
+NUMERIC_FEATURES = [
+    "days_for_shipment_scheduled",
+    "order_item_quantity",
+    "sales",
+    "order_item_discount_rate",
+    "product_price",
+    "order_month",
+    "order_day_of_week",
+]
+CATEGORICAL_FEATURES = [
+    "shipping_mode",
+    "market",
+    "order_region",
+    "category_name",
+    "department_name",
+    "customer_segment",
+]
+TARGET = "is_late"
+
+# Histogram-based trees bin categories into at most 255 values (one is
+# reserved for missing); rarer categories are treated as missing
+MAX_CATEGORIES = 254
+
+HOLDOUT_FRACTION = 0.2
+
+FEATURES_SQL = """
+    SELECT
+        f.order_id,
+        f.order_item_id,
+        f.date_key,
+        f.is_late,
+        f.days_for_shipment_scheduled,
+        f.order_item_quantity,
+        f.sales,
+        f.order_item_discount_rate,
+        p.product_price,
+        d.month as order_month,
+        d.day_of_week as order_day_of_week,
+        f.shipping_mode,
+        g.market,
+        g.order_region,
+        p.category_name,
+        p.department_name,
+        c.customer_segment
+    FROM {schema}.fact_orders f
+    LEFT JOIN {schema}.dim_product p ON p.product_card_id = f.product_card_id
+    LEFT JOIN {schema}.dim_geography g ON g.geography_key = f.geography_key
+    LEFT JOIN {schema}.dim_customer c ON c.customer_id = f.customer_id
+    LEFT JOIN {schema}.dim_date d ON d.date_key = f.date_key
+    WHERE {where}
+"""
+
+
+def features_from_staging(staging: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the model features from staging-shaped (sanitized DataCo) rows.
+
+    Used by the benchmarks, which run without the star schema.
+
+    Args:
+        staging: Rows with the sanitized DataCo columns
+
+    Returns:
+        pd.DataFrame: NUMERIC_FEATURES, CATEGORICAL_FEATURES and is_late
+    """
+    order_dates = pd.to_datetime(staging["order_date_dateorders"], errors="coerce")
+    return pd.DataFrame({
+        "days_for_shipment_scheduled": staging["days_for_shipment_scheduled"],
+        "order_item_quantity": staging["order_item_quantity"],
+        "sales": staging["sales"],
+        "order_item_discount_rate": staging["order_item_discount_rate"],
+        "product_price": staging["order_item_product_price"],
+        "order_month": order_dates.dt.month,
+        "order_day_of_week": (order_dates.dt.dayofweek + 1) % 7,
+        "shipping_mode": staging["shipping_mode"],
+        "market": staging["market"],
+        "order_region": staging["order_region"],
+        "category_name": staging["category_name"],
+        "department_name": staging["department_name"],
+        "customer_segment": staging["customer_segment"],
+        TARGET: staging["days_for_shipping_real"] > staging["days_for_shipment_scheduled"],
+    })
+
+
+class FeatureEncoder:
+    """
+    Turns feature frames into the float32 matrix the classifiers take.
+
+    Categorical columns become integer codes against the vocabulary seen
+    in training (unseen and rare values become NaN, i.e. missing).
+    """
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None):
+        """
+        Initialize FeatureEncoder.
+
+        Args:
+            categories: Vocabulary per categorical feature (set by fit)
+        """
+        self.categories = categories or {}
+
+    def fit(self, frame: pd.DataFrame) -> "FeatureEncoder":
+        """
+        Learn the vocabulary of each categorical feature (most frequent first).
+
+        Args:
+            frame: Training features
+
+        Returns:
+            FeatureEncoder: self
+        """
+        self.categories = {
+            column: frame[column].dropna().astype(str).value_counts().index[:MAX_CATEGORIES].tolist()
+            for column in CATEGORICAL_FEATURES
+        }
+        return self
+
+    @property
+    def categorical_mask(self) -> np.ndarray:
+        """Boolean mask of the categorical columns in the matrix."""
+        return np.array([False] * len(NUMERIC_FEATURES) + [True] * len(CATEGORICAL_FEATURES))
+
+    def transform(self, frame: pd.DataFrame) -> np.ndarray:
+        """
+        Encode a feature frame.
+
+        Args:
+            frame: Features (extra columns are ignored)
+
+        Returns:
+            np.ndarray: float32 matrix, NUMERIC_FEATURES then CATEGORICAL_FEATURES
+        """
+        matrix = np.empty((len(frame), len(NUMERIC_FEATURES) + len(CATEGORICAL_FEATURES)), dtype=np.float32)
+        for i, column in enumerate(NUMERIC_FEATURES):
+            matrix[:, i] = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=np.float32, na_value=np.nan)
+        for i, column in enumerate(CATEGORICAL_FEATURES, start=len(NUMERIC_FEATURES)):
+            values = frame[column]
+            # Unseen and missing values have no index (-1) and become NaN
+            codes = pd.Index(self.categories[column]).get_indexer(values.astype(str).where(values.notna()))
+            matrix[:, i] = np.where(codes < 0, np.nan, codes)
+        return matrix
+
+
+def build_classifier(algorithm: str) -> Any:
+    """
+    Create an unfitted classifier.
+
+    Args:
+        algorithm: hist_gradient_boosting or xgboost
+
+    Returns:
+        Classifier with fit / predict_proba
+    """
+    if algorithm == "hist_gradient_boosting":
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        return HistGradientBoostingClassifier(
+            max_iter=300, learning_rate=0.1, categorical_features=FeatureEncoder().categorical_mask,
+            early_stopping=True, random_state=42
+        )
+    if algorithm == "xgboost":
+        from xgboost import XGBClassifier
+
+        return XGBClassifier(
+            n_estimators=300, max_depth=6, learning_rate=0.1, tree_method="hist",
+            eval_metric="logloss", n_jobs=-1, random_state=42
+        )
+    raise ValueError(f"Unknown algorithm '{algorithm}' (expected hist_gradient_boosting or xgboost)")
+
+
+def evaluate(labels: np.ndarray, probabilities: np.ndarray, threshold: float = 0.5) -> Dict[str, float]:
+    """
+    Score predictions against the actual outcomes.
+
+    Args:
+        labels: Actual late flags
+        probabilities: Predicted late probabilities
+        threshold: Probability from which an order is predicted late
+
+    Returns:
+        dict: rows, base_rate, roc_auc, average_precision, accuracy, precision, recall
+    """
+    from sklearn.metrics import average_precision_score, roc_auc_score
+
+    labels = np.asarray(labels, dtype=bool)
+    predicted = probabilities >= threshold
+    true_positives = int((predicted & labels).sum())
+    both_classes = 0 < labels.sum() < len(labels)
+    return {
+        "rows": int(len(labels)),
+        "base_rate": round(float(labels.mean()), 4),
+        "roc_auc": round(float(roc_auc_score(labels, probabilities)), 4) if both_classes else float("nan"),
+        "average_precision": round(float(average_precision_score(labels, probabilities)), 4) if both_classes
+        else float("nan"),
+        "accuracy": round(float((predicted == labels).mean()), 4),
+        "precision": round(true_positives / max(int(predicted.sum()), 1), 4),
+        "recall": round(true_positives / max(int(labels.sum()), 1), 4),
+    }
+
+
+def fit_model(
+    features: pd.DataFrame,
+    algorithm: str = "hist_gradient_boosting",
+    threshold: float = 0.5
+) -> Dict[str, Any]:
+    """
+    Fit and evaluate a late-delivery model on a time-ordered split.
+
+    Args:
+        features: Feature rows with is_late, in chronological order
+        algorithm: hist_gradient_boosting or xgboost
+        threshold: Probability from which an order is predicted late (for metrics)
+
+    Returns:
+        dict: Model bundle (model, encoder categories, algorithm, metrics,
+            trained_at, version) as persisted by save_model
+    """
+    split = int(len(features) * (1 - HOLDOUT_FRACTION))
+    train, holdout = features.iloc[:split], features.iloc[split:]
+
+    encoder = FeatureEncoder().fit(train)
+    model = build_classifier(algorithm)
+    model.fit(encoder.transform(train), train[TARGET].astype(bool).to_numpy())
+
+    trained_at = datetime.now()
+    bundle = {
+        "model": model,
+        "categories": encoder.categories,
+        "algorithm": algorithm,
+        "features": NUMERIC_FEATURES + CATEGORICAL_FEATURES,
+        "trained_rows": len(train),
+        "trained_at": trained_at.isoformat(timespec="seconds"),
+        "version": trained_at.strftime("%Y%m%d%H%M%S"),
+        "metrics": {},
+    }
+    if len(holdout):
+        probabilities = model.predict_proba(encoder.transform(holdout))[:, 1]
+        bundle["metrics"] = evaluate(holdout[TARGET].to_numpy(), probabilities, threshold)
+    return bundle
+
+
+def default_model_path() -> Path:
+    """Get the configured model file."""
+    settings = get_settings()
+    return settings.models_dir / settings.late_model_file
+
+
+def save_model(bundle: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """
+    Persist a model bundle with joblib.
+
+    Args:
+        bundle: Output of fit_model
+        path: Target file (default: models/<late_model_file>)
+
+    Returns:
+        Path: Written file
+    """
+    import joblib
+
+    path = Path(path or default_model_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(bundle, path)
+    return path
+
+
+def load_model(path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Load a persisted model bundle.
+
+    Args:
+        path: Model file (default: models/<late_model_file>)
+
+    Returns:
+        dict: Model bundle
+    """
+    import joblib
+
+    return joblib.load(Path(path or default_model_path()))
+
+
+@log_execution_time
+def train_model(
+    loader: "DataLoader",
+    schema: str = "dw",
+    algorithm: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    path: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    Train the late-delivery model from the warehouse and persist it.
+
+    Args:
+        loader: DataLoader instance
+        schema: Schema holding the star schema
+        algorithm: Classifier (default: from settings)
+        max_rows: Train on the newest rows only (default: all)
+        path: Target file (default: models/<late_model_file>)
+
+    Returns:
+        dict: Model bundle (with the path it was saved to)
+    """
+    settings = get_settings()
+    logger = get_logger("LateDeliveryModel")
+
+    query = FEATURES_SQL.format(schema=schema, where="f.is_late IS NOT NULL") + " ORDER BY f.date_key, f.order_id"
+    features = loader.execute_query(query, arrow=True, numeric_as_float=True)
+    if max_rows:
+        features = features.iloc[-max_rows:]
+    logger.info(f"Training {algorithm or settings.late_model_algorithm} on {len(features):,} order items")
+
+    bundle = fit_model(features, algorithm or settings.late_model_algorithm, settings.late_risk_threshold)
+    bundle["path"] = str(save_model(bundle, path))
+    logger.info(f"Model {bundle['version']} saved to {bundle['path']}: {bundle['metrics']}")
+    return bundle
+
+
+class LateDeliveryPredictor(LoggerMixin):
+    """
+    Scores batches of fact rows with the persisted late-delivery model.
+    """
+
+    def __init__(
+        self,
+        loader: "DataLoader",
+        schema: str = "dw",
+        model_path: Optional[Path] = None,
+        threshold: Optional[float] = None
+    ):
+        """
+        Initialize LateDeliveryPredictor.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding the star schema and the prediction table
+            model_path: Model file (default: models/<late_model_file>)
+            threshold: Late probability from which an order is at risk (default: from settings)
+        """
+        self.loader = loader
+        self.schema = schema
+        self.model_path = Path(model_path or default_model_path())
+        self.threshold = threshold or get_settings().late_risk_threshold
+        self.prediction_table = f"{schema}.{PREDICTION_TABLE}"
+        self._bundle: Optional[Dict[str, Any]] = None
+
+    @property
+    def bundle(self) -> Dict[str, Any]:
+        """Model bundle (loaded once)."""
+        if self._bundle is None:
+            self._bundle = load_model(self.model_path)
+        return self._bundle
+
+    def predict_proba(self, frame: pd.DataFrame) -> np.ndarray:
+        """
+        Predict late probabilities for a frame of features (one vectorized call).
+
+        Args:
+            frame: Feature rows
+
+        Returns:
+            np.ndarray: Late probability per row
+        """
+        encoder = FeatureEncoder(self.bundle["categories"])
+        return self.bundle["model"].predict_proba(encoder.transform(frame))[:, 1]
+
+    def ensure(self) -> None:
+        """Create the prediction table and the at-risk view if they do not exist."""
+        if not self.loader.table_exists(PREDICTION_TABLE, schema=self.schema):
+            # Order keys are typed like the fact table's
+            self.logger.info(f"Creating {self.prediction_table}")
+            self.loader.execute_statement(f"""
+                CREATE TABLE {self.prediction_table} AS
+                SELECT order_id, order_item_id, date_key FROM {self.schema}.fact_orders WITH NO DATA
+            """)
+            self.loader.execute_statement(f"""
+                ALTER TABLE {self.prediction_table}
+                    ADD PRIMARY KEY (order_id, order_item_id),
+                    ADD COLUMN late_probability NUMERIC(6, 5),
+                    ADD COLUMN predicted_late BOOLEAN,
+                    ADD COLUMN model_version VARCHAR(20),
+                    ADD COLUMN scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            """)
+            self.loader.execute_statement(f"CREATE INDEX ON {self.prediction_table} (date_key)")
+
+        self.loader.execute_statement(f"""
+            CREATE OR REPLACE VIEW {self.schema}.{AT_RISK_VIEW} AS
+            SELECT
+                p.order_id,
+                p.order_item_id,
+                p.date_key,
+                g.market,
+                g.order_region,
+                f.shipping_mode,
+                f.delivery_status,
+                f.sales,
+                p.late_probability,
+                ROUND(f.sales * p.late_probability, 2) as expected_revenue_at_risk,
+                p.model_version
+            FROM {self.prediction_table} p
+            JOIN {self.schema}.fact_orders f
+                ON f.order_id = p.order_id AND f.order_item_id = p.order_item_id
+            LEFT JOIN {self.schema}.dim_geography g ON g.geography_key = f.geography_key
+            WHERE p.predicted_late
+        """)
+
+    @log_execution_time
+    def score(self, scope: Optional["ValidationScope"] = None) -> int:
+        """
+        Predict the fact rows of a batch and replace their predictions.
+
+        Args:
+            scope: Rows to score (default: all fact rows)
+
+        Returns:
+            int: Rows scored
+        """
+        from sqlalchemy import text
+
+        self.ensure()
+        version = self.bundle["version"]
+        insert = text(f"""
+            INSERT INTO {self.prediction_table}
+                (order_id, order_item_id, date_key, late_probability, predicted_late, model_version)
+            VALUES (:order_id, :order_item_id, :date_key, :late_probability, :predicted_late, :model_version)
+        """)
+
+        rows = 0
+        query = FEATURES_SQL.format(schema=self.schema, where=scope.predicate("f") if scope else "TRUE")
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.prediction_table} WHERE {scope.predicate() if scope else 'TRUE'}"))
+            for batch in self.loader.iter_query_batches(query, numeric_as_float=True):
+                if batch.num_rows == 0:
+                    continue
+                frame = batch.to_pandas()
+                probabilities = np.round(self.predict_proba(frame), 5)
+                predictions = pd.DataFrame({
+                    "order_id": frame["order_id"],
+                    "order_item_id": frame["order_item_id"],
+                    "date_key": frame["date_key"],
+                    "late_probability": probabilities,
+                    "predicted_late": probabilities >= self.threshold,
+                    "model_version": version,
+                })
+                conn.execute(insert, predictions.to_dict("records"))
+                rows += len(predictions)
+
+        self.logger.info(f"{self.prediction_table}: scored {rows:,} rows with model {version}")
+        return rows
+
+    def run(self, scope: Optional["ValidationScope"] = None) -> int:
+        """
+        Score a batch if a model has been trained.
+
+        Args:
+            scope: Rows to score (default: all fact rows)
+
+        Returns:
+            int: Rows scored (0 without a model)
+        """
+        if not self.model_path.exists():
+            self.logger.warning(
+                f"No late-delivery model at {self.model_path}; "
+                f"train one with: python scripts/train_late_delivery_model.py"
+            )
+            return 0
+        return self.score(scope)
@@ -9,16 +9,24 @@ Author: Torre Control Engineering Team
 Date: 2026-02-04
 """
 
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, Iterator, List, Optional
 
 import pandas as pd
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import Engine
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError
 
 from src.config import get_settings
+from src.etl.arrow_results import iter_copy_batches, iter_fetch_batches, supports_copy, to_pandas
+from src.etl.query_cache import QueryResultCache, get_data_version
+from src.etl.query_profiler import QueryProfiler, estimate_frame_bytes
+from src.etl.row_counts import EXACT, RowCountService
 from src.logging_config import LoggerMixin, log_execution_time
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 class DataLoader(LoggerMixin):
     """
@@ -27,16 +35,34 @@ class DataLoader(LoggerMixin):
     Handles connection management, batching, and error recovery.
     """
     
-    def __init__(self, database_url: Optional[str] = None):
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        query_profiler: Optional[QueryProfiler] = None,
+        query_cache: Optional[QueryResultCache] = None
+    ):
         """
         Initialize DataLoader.
         
         Args:
             database_url: PostgreSQL connection string (default: from settings)
+            query_profiler: SQL profiler attached to the engine (default: a new
+                one if query profiling is enabled in settings)
+            query_cache: Result cache for execute_query(cache=True) (default: a
+                new one if the query cache is enabled in settings)
         """
         self.settings = get_settings()
         self.database_url = database_url or self.settings.database_url
         self._engine: Optional[Engine] = None
+        
+        if query_profiler is None and self.settings.query_profiling_enabled:
+            query_profiler = QueryProfiler()
+        self.query_profiler = query_profiler
+        
+        if query_cache is None and self.settings.query_cache_enabled:
+            query_cache = QueryResultCache()
+        self.query_cache = query_cache
+        self.row_counts = RowCountService(self)
         self.logger.info("DataLoader initialized")
     
     @property
@@ -55,30 +81,27 @@ class DataLoader(LoggerMixin):
         """
         Create SQLAlchemy engine with connection pooling.
         
+        No connection is opened here: the pool connects (and pre-pings) on
+        first use, so building a loader for a run that skips the database
+        stays cheap. Use test_connection() for an explicit check.
+        
         Returns:
             Engine: SQLAlchemy engine
         """
         self.logger.info(f"Creating database engine: {self.database_url.split('@')[1]}")
         
-        try:
-            engine = create_engine(
-                self.database_url,
-                echo=False,
-                pool_pre_ping=True,  # Verify connections before using
-                pool_size=5,
-                max_overflow=10
-            )
-            
-            # Test connection
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            
-            self.logger.info("Database connection established successfully")
-            return engine
-            
-        except OperationalError as e:
-            self.logger.error(f"Database connection failed: {e}")
-            raise
+        engine = create_engine(
+            self.database_url,
+            echo=False,
+            pool_pre_ping=True,  # Verify connections before using
+            pool_size=5,
+            max_overflow=10
+        )
+        
+        if self.query_profiler:
+            self.query_profiler.attach(engine)
+        self.row_counts.attach(engine)
+        return engine
     
     def test_connection(self) -> bool:
         """
@@ -122,6 +145,34 @@ class DataLoader(LoggerMixin):
         
         return exists
     
+    def missing_columns(self, table_name: str, columns: List[str], schema: str = "public") -> List[str]:
+        """
+        List the columns a table does not have yet.
+        
+        Reads information_schema only, so callers can skip ``ALTER TABLE ...
+        ADD COLUMN IF NOT EXISTS`` (which takes an ACCESS EXCLUSIVE lock even
+        when the column exists) once a table is up to date.
+        
+        Args:
+            table_name: Table name
+            columns: Column names to look for
+            schema: Schema name
+        
+        Returns:
+            list: Columns absent from the table, in the given order
+        """
+        with self.engine.connect() as conn:
+            present = set(conn.execute(
+                text("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_schema = :schema AND table_name = :table_name
+                """),
+                {"schema": schema, "table_name": table_name}
+            ).scalars())
+        
+        return [column for column in columns if column not in present]
+    
     @log_execution_time
     def load_dataframe(
         self,
@@ -171,23 +222,69 @@ class DataLoader(LoggerMixin):
             self.logger.error(f"Failed to load data into {full_table_name}: {e}")
             raise
     
-    def execute_query(self, query: str, params: Optional[dict] = None) -> pd.DataFrame:
+    @staticmethod
+    def _set_statement_timeout(conn, statement_timeout_ms: Optional[int]) -> None:
+        """Limit the statements of the connection's current transaction."""
+        if statement_timeout_ms:
+            conn.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": f"{int(statement_timeout_ms)}ms"}
+            )
+    
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        statement_timeout_ms: Optional[int] = None,
+        cache: bool = False,
+        arrow: bool = False,
+        numeric_as_float: bool = False
+    ) -> pd.DataFrame:
         """
         Execute SQL query and return results as DataFrame.
         
         Args:
             query: SQL query
             params: Query parameters (optional)
+            statement_timeout_ms: Cancel the query server-side after this many
+                milliseconds (optional, scoped to the query's transaction)
+            cache: Serve the result from the query cache while the warehouse
+                data version is unchanged (for read-only analytics queries)
+            arrow: Read the result through Arrow (see iter_query_batches) and
+                return Arrow-backed columns; meant for wide, large reads
+            numeric_as_float: With arrow, read NUMERIC columns as float64
+                instead of exact decimals
         
         Returns:
             pd.DataFrame: Query results
         """
         self.logger.debug(f"Executing query: {query[:100]}...")
         
+        use_cache = cache and self.query_cache is not None
+        if use_cache:
+            data_version = get_data_version(self)
+            cached = self.query_cache.get(query, params, data_version)
+            if cached is not None:
+                self.logger.info(f"Query served from cache ({len(cached):,} rows, data version {data_version})")
+                return cached
+        
+        if arrow:
+            result = to_pandas(self.execute_query_arrow(query, params, statement_timeout_ms, numeric_as_float))
+            if use_cache:
+                self.query_cache.put(query, params, data_version, result)
+            return result
+        
         try:
             with self.engine.connect() as conn:
+                self._set_statement_timeout(conn, statement_timeout_ms)
                 result = pd.read_sql(text(query), conn, params=params)
             
+            if self.query_profiler:
+                self.query_profiler.record_bytes(query, estimate_frame_bytes(result))
+            
+            if use_cache:
+                self.query_cache.put(query, params, data_version, result)
+            
             self.logger.info(f"Query returned {len(result):,} rows")
             return result
             
@@ -195,6 +292,102 @@ class DataLoader(LoggerMixin):
             self.logger.error(f"Query execution failed: {e}")
             raise
     
+    def iter_query_batches(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        statement_timeout_ms: Optional[int] = None,
+        numeric_as_float: bool = False
+    ) -> Iterator["pa.RecordBatch"]:
+        """
+        Stream query results as Arrow record batches.
+        
+        On PostgreSQL the query runs as COPY ... TO STDOUT and the output is
+        parsed by pyarrow, so no Python object is built per row or value.
+        Batches are yielded while the COPY is still running; the connection
+        is held until the iterator is exhausted or closed. Other databases
+        fall back to fetching rows in chunks. COPY bypasses the engine's
+        cursor events, so its time, rows and bytes are reported to the query
+        profiler here.
+        
+        Args:
+            query: SQL query (a single SELECT)
+            params: Query parameters (optional)
+            statement_timeout_ms: Cancel the query server-side after this many
+                milliseconds (optional)
+            numeric_as_float: Read NUMERIC columns as float64 instead of
+                exact decimals (for callers that only do float math)
+        
+        Yields:
+            pa.RecordBatch: Result batches (at least one, possibly empty)
+        """
+        self.logger.debug(f"Streaming query as Arrow batches: {query[:100]}...")
+        block_size = self.settings.arrow_block_size_mb * 1024 * 1024
+        rows = 0
+        nbytes = 0
+        seconds = 0.0
+        
+        try:
+            with self.engine.connect() as conn:
+                self._set_statement_timeout(conn, statement_timeout_ms)
+                copy = supports_copy(conn)
+                if copy:
+                    batches = iter_copy_batches(conn, query, params, block_size, numeric_as_float)
+                else:
+                    batches = iter_fetch_batches(conn, query, params, numeric_as_float=numeric_as_float)
+                
+                # Only the time spent reading counts, not the caller's work between batches
+                while True:
+                    start = time.perf_counter()
+                    batch = next(batches, None)
+                    seconds += time.perf_counter() - start
+                    if batch is None:
+                        break
+                    rows += batch.num_rows
+                    nbytes += batch.nbytes
+                    yield batch
+        except Exception as e:
+            self.logger.error(f"Arrow query failed: {e}")
+            raise
+        
+        if self.query_profiler:
+            if copy:
+                # COPY runs on a raw DBAPI cursor, which the engine events never see
+                self.query_profiler.record(query, seconds, rows, nbytes)
+            else:
+                self.query_profiler.record_bytes(query, nbytes)
+        
+        self.logger.info(f"Query streamed {rows:,} rows as Arrow batches")
+    
+    def execute_query_arrow(
+        self,
+        query: str,
+        params: Optional[dict] = None,
+        statement_timeout_ms: Optional[int] = None,
+        numeric_as_float: bool = False
+    ) -> "pa.Table":
+        """
+        Execute SQL query and return results as an Arrow table.
+        
+        Args:
+            query: SQL query (a single SELECT)
+            params: Query parameters (optional)
+            statement_timeout_ms: Cancel the query server-side after this many
+                milliseconds (optional)
+            numeric_as_float: Read NUMERIC columns as float64 instead of
+                exact decimals
+        
+        Returns:
+            pa.Table: Query results
+        """
+        import pyarrow as pa
+        
+        # Fallback batches are typed chunk by chunk, so unify their schemas
+        tables = [pa.Table.from_batches([batch]) for batch in self.iter_query_batches(
+            query, params, statement_timeout_ms, numeric_as_float
+        )]
+        return pa.concat_tables(tables, promote_options="permissive")
+    
     def execute_statement(self, statement: str, params: Optional[dict] = None) -> int:
         """
         Execute SQL statement (INSERT, UPDATE, DELETE, DDL).
@@ -221,24 +414,32 @@ class DataLoader(LoggerMixin):
             self.logger.error(f"Statement execution failed: {e}")
             raise
     
-    def get_table_count(self, table_name: str, schema: Optional[str] = None) -> int:
+    def get_table_count(
+        self,
+        table_name: str,
+        schema: Optional[str] = None,
+        statement_timeout_ms: Optional[int] = None,
+        mode: str = EXACT
+    ) -> int:
         """
         Get row count for a table.
         
         Args:
             table_name: Table name
             schema: Schema name (optional)
+            statement_timeout_ms: Server-side time limit of an exact count (optional)
+            mode: "exact" (COUNT(*) scan), "estimated" (catalog statistics, no
+                scan) or "cached" (exact, reused until this loader writes)
         
         Returns:
             int: Number of rows
         """
         full_table = f"{schema}.{table_name}" if schema else table_name
-        query = f"SELECT COUNT(*) as count FROM {full_table}"
-        
-        result = self.execute_query(query)
-        count = result["count"].iloc[0]
+        count = self.row_counts.count(
+            table_name, schema, mode=mode, statement_timeout_ms=statement_timeout_ms
+        )
         
-        self.logger.info(f"Table {full_table} has {count:,} rows")
+        self.logger.info(f"Table {full_table} has {count:,} rows ({mode})")
         return count
     
     def close(self):
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Pareto (80/20) Analysis
+========================================
+
+Which products, categories, departments, markets or shipping modes cause
+most of the late deliveries (or the revenue at risk)? Instead of
+re-aggregating fact_orders with window functions for every question (as
+``dw.vw_pareto_delays`` does), the fact table is grouped once to a small
+grain (product x market x shipping mode). Every dimension is then rolled
+up from that grain with NumPy (factorize + bincount), sorted, and turned
+into contribution and cumulative shares.
+
+The grain query goes through the DataLoader query cache, so dashboards and
+repeated CLI calls are served from disk until the warehouse data changes.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.logging_config import LoggerMixin
+
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
+
+# Dimension name -> grain column
+PARETO_DIMENSIONS = {
+    "product": "product_name",
+    "category": "category_name",
+    "department": "department_name",
+    "market": "market",
+    "shipping_mode": "shipping_mode",
+}
+
+# Additive measures available at the grain
+PARETO_MEASURES = ("late_items", "late_sales", "total_items", "sales")
+
+DEFAULT_THRESHOLD_PCT = 80.0
+
+PARETO_GRAIN_SQL = """
+    SELECT
+        p.product_name,
+        p.category_name,
+        p.department_name,
+        g.market,
+        f.shipping_mode,
+        COUNT(*) as total_items,
+        COUNT(*) FILTER (WHERE f.is_late) as late_items,
+        COALESCE(SUM(f.sales), 0) as sales,
+        COALESCE(SUM(f.sales) FILTER (WHERE f.is_late), 0) as late_sales
+    FROM {schema}.fact_orders f
+    LEFT JOIN {schema}.dim_product p ON p.product_card_id = f.product_card_id
+    LEFT JOIN {schema}.dim_geography g ON g.geography_key = f.geography_key
+    GROUP BY 1, 2, 3, 4, 5
+"""
+
+UNKNOWN_MEMBER = "(unknown)"
+
+
+def pareto_frame(
+    labels: np.ndarray,
+    values: np.ndarray,
+    total_items: Optional[np.ndarray] = None,
+    late_items: Optional[np.ndarray] = None,
+    threshold_pct: float = DEFAULT_THRESHOLD_PCT
+) -> pd.DataFrame:
+    """
+    Roll a measure up by label and compute its Pareto distribution.
+
+    Members are ranked by their total (largest first); ``contribution_pct``
+    is each member's share of the grand total and ``cumulative_pct`` the
+    running share. The vital few are the members needed to reach the
+    threshold (the one crossing it included). Members with a zero total are
+    dropped.
+
+    Args:
+        labels: Member of each grain row (None/NaN become "(unknown)")
+        values: Measure of each grain row
+        total_items: Order items of each grain row (optional, for late rates)
+        late_items: Late order items of each grain row (optional, for late rates)
+        threshold_pct: Cumulative share defining the vital few
+
+    Returns:
+        pd.DataFrame: member, value, contribution_pct, cumulative_pct, rank,
+            is_vital_few (plus total_items, late_items and late_rate_pct
+            when both item arrays are given)
+    """
+    labels = pd.Series(labels, dtype=object).fillna(UNKNOWN_MEMBER).to_numpy()
+    codes, members = pd.factorize(labels)
+    values = np.asarray(values, dtype=np.float64)
+
+    totals = np.bincount(codes, weights=values, minlength=len(members))
+    order = np.argsort(-totals, kind="stable")
+    order = order[totals[order] > 0]
+
+    ranked = totals[order]
+    grand_total = ranked.sum()
+    share = ranked / grand_total * 100 if grand_total else ranked
+    cumulative = np.cumsum(share)
+
+    result = pd.DataFrame({
+        "member": np.asarray(members, dtype=object)[order],
+        "value": ranked,
+        "contribution_pct": share,
+        "cumulative_pct": cumulative,
+        "rank": np.arange(1, len(order) + 1),
+        "is_vital_few": (cumulative - share) < threshold_pct,
+    })
+
+    if total_items is not None and late_items is not None:
+        items = np.bincount(codes, weights=np.asarray(total_items, dtype=np.float64), minlength=len(members))[order]
+        late = np.bincount(codes, weights=np.asarray(late_items, dtype=np.float64), minlength=len(members))[order]
+        result["total_items"] = items.astype(np.int64)
+        result["late_items"] = late.astype(np.int64)
+        result["late_rate_pct"] = np.divide(late * 100, items, out=np.zeros_like(late), where=items > 0)
+
+    return result
+
+
+class ParetoAnalyzer(LoggerMixin):
+    """
+    Pareto analysis of fact_orders by any dimension, from one grouped pass.
+    """
+
+    def __init__(self, loader: Optional["DataLoader"] = None, schema: str = "dw", cache: bool = True):
+        """
+        Initialize ParetoAnalyzer.
+
+        Args:
+            loader: DataLoader instance (creates new if not provided)
+            schema: Schema holding the star schema
+            cache: Serve the grain from the query cache while the data is unchanged
+        """
+        if loader is None:
+            from src.etl.load import DataLoader
+
+            loader = DataLoader()
+        self.loader = loader
+        self.schema = schema
+        self.cache = cache
+        self._grain: Optional[pd.DataFrame] = None
+
+    @property
+    def grain(self) -> pd.DataFrame:
+        """Fact totals by product x market x shipping mode (fetched once)."""
+        if self._grain is None:
+            self._grain = self.loader.execute_query(
+                PARETO_GRAIN_SQL.format(schema=self.schema), cache=self.cache
+            )
+            self.logger.info(f"Pareto grain: {len(self._grain):,} groups")
+        return self._grain
+
+    def analyze(
+        self,
+        dimension: str = "product",
+        measure: str = "late_items",
+        threshold_pct: float = DEFAULT_THRESHOLD_PCT
+    ) -> pd.DataFrame:
+        """
+        Compute the Pareto distribution of a measure over a dimension.
+
+        Args:
+            dimension: product, category, department, market or shipping_mode
+            measure: late_items, late_sales, total_items or sales
+            threshold_pct: Cumulative share defining the vital few
+
+        Returns:
+            pd.DataFrame: Ranked members (see pareto_frame), the member column
+                named after the dimension
+        """
+        if dimension not in PARETO_DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}' (expected one of {', '.join(PARETO_DIMENSIONS)})")
+        if measure not in PARETO_MEASURES:
+            raise ValueError(f"Unknown measure '{measure}' (expected one of {', '.join(PARETO_MEASURES)})")
+
+        grain = self.grain
+        result = pareto_frame(
+            grain[PARETO_DIMENSIONS[dimension]].to_numpy(),
+            grain[measure].to_numpy(dtype=np.float64),
+            total_items=grain["total_items"].to_numpy(),
+            late_items=grain["late_items"].to_numpy(),
+            threshold_pct=threshold_pct,
+        )
+        result = result.rename(columns={"member": dimension})
+        # Item measures are already rolled up as integer columns
+        if measure in result.columns:
+            return result.drop(columns="value")
+        return result.rename(columns={"value": measure})
+
+    def summary(
+        self,
+        dimension: str = "product",
+        measure: str = "late_items",
+        threshold_pct: float = DEFAULT_THRESHOLD_PCT
+    ) -> Dict[str, float]:
+        """
+        Summarize how concentrated a measure is.
+
+        Args:
+            dimension: Dimension (see analyze)
+            measure: Measure (see analyze)
+            threshold_pct: Cumulative share defining the vital few
+
+        Returns:
+            dict: members, vital_few, vital_few_pct (share of members) and
+                vital_few_value_pct (share of the measure they cover)
+        """
+        result = self.analyze(dimension, measure, threshold_pct)
+        vital = result[result["is_vital_few"]]
+        members = len(result)
+        return {
+            "members": members,
+            "vital_few": len(vital),
+            "vital_few_pct": round(len(vital) / members * 100, 2) if members else 0.0,
+            "vital_few_value_pct": round(float(vital["contribution_pct"].sum()), 2),
+        }
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Torre Control - VertiPaq Parquet Export Profile
+================================================
+
+Writes Parquet files shaped for Power BI Import, whose VertiPaq engine
+stores every column as a dictionary of values plus run-length encoded ids.
+Files that already look like that load faster and are smaller:
+
+- Keys become int32: integer ids that fit, and 32-character MD5 hash keys
+  (geography_key) through a surrogate id shared by every table written
+  with the same profile, so relationships still match. The id map is saved
+  under data/interim per export directory and reloaded, so a partial
+  re-export keeps the ids of the files already on disk (it is not written
+  into the export directory, which Power BI may import as a folder).
+- Other integer columns shrink to int32 when their values fit, and key
+  columns read as floats (integers with NULLs) become nullable integers.
+- Low-cardinality strings are written as Arrow dictionaries, which Power BI
+  and pandas read back as categories.
+- Rows are sorted by the lowest-cardinality columns, giving long runs for
+  Parquet's (and VertiPaq's) run-length encoding.
+- Row groups are sized explicitly (by default one VertiPaq segment, 2^20
+  rows) and compression defaults to zstd.
+
+Every write returns a per-column report of the in-memory size, the Parquet
+size and their ratio.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin
+
+# Columns treated as keys
+KEY_SUFFIXES = ("_id", "_key")
+HASH_KEY = re.compile(r"^[0-9a-f]{32}$")
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+# Surrogate id maps (hash key -> id per column), one per export directory
+KEY_MAP_DIR = "surrogate_keys"
+
+# Strings with at most this share of distinct values are dictionary encoded
+DICTIONARY_MAX_RATIO = 0.5
+
+# Sort by up to this many columns of at most this many distinct values
+SORT_MAX_COLUMNS = 4
+SORT_MAX_CARDINALITY = 1000
+
+
+def is_key_column(column: str) -> bool:
+    """Whether a column name follows the key naming convention."""
+    return column.endswith(KEY_SUFFIXES)
+
+
+def is_hash_key(values: pd.Series) -> bool:
+    """Whether a string column holds MD5 hex digests only."""
+    sample = values.dropna()
+    if sample.empty or pd.api.types.infer_dtype(sample, skipna=True) != "string":
+        return False
+    return bool(sample.head(1000).map(lambda value: bool(HASH_KEY.match(value))).all())
+
+
+def integer_type(values: pd.Series) -> Optional[str]:
+    """Smallest pandas integer type (int32/Int32/int64/Int64) holding integral values, if any."""
+    non_null = values.dropna()
+    if pd.api.types.is_bool_dtype(values) or not (
+            pd.api.types.is_integer_dtype(values) or pd.api.types.is_float_dtype(values)):
+        return None
+    if pd.api.types.is_float_dtype(values) and not np.all(np.mod(non_null, 1) == 0):
+        return None
+    fits = non_null.empty or (non_null.min() >= INT32_MIN and non_null.max() <= INT32_MAX)
+    nullable = values.isna().any()
+    if fits:
+        return "Int32" if nullable else "int32"
+    return "Int64" if nullable else "int64"
+
+
+def key_map_path(export_dir: Union[str, Path]) -> Path:
+    """
+    Get the surrogate id map file of an export directory.
+
+    Args:
+        export_dir: Directory the Parquet files are exported to
+
+    Returns:
+        Path: Key map file under the interim data directory
+    """
+    export_dir = Path(export_dir).resolve()
+    digest = hashlib.blake2b(str(export_dir).encode("utf-8"), digest_size=8).hexdigest()
+    return get_settings().data_interim_dir / KEY_MAP_DIR / f"{export_dir.name}-{digest}.parquet"
+
+
+def sort_columns(frame: pd.DataFrame) -> List[str]:
+    """Lowest-cardinality columns (more than one value) to sort rows by."""
+    cardinality = frame.nunique(dropna=False)
+    candidates = cardinality[(cardinality > 1) & (cardinality <= SORT_MAX_CARDINALITY)]
+    return list(candidates.sort_values(kind="stable").index[:SORT_MAX_COLUMNS])
+
+
+class VertiPaqParquetProfile(LoggerMixin):
+    """
+    Prepares frames and writes them as VertiPaq-friendly Parquet files.
+
+    Hash keys are mapped to the same surrogate ids in every table written
+    with one profile instance, so export a star schema with one profile.
+    Ids are only ever appended; save_key_maps and load_key_maps carry them
+    from one export to the next.
+    """
+
+    def __init__(
+        self,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        row_group_size: Optional[int] = None,
+        sort: bool = True
+    ):
+        """
+        Initialize VertiPaqParquetProfile.
+
+        Args:
+            compression: Parquet codec (default: from settings)
+            compression_level: Codec level (default: from settings)
+            row_group_size: Rows per row group (default: from settings)
+            sort: Sort rows by their lowest-cardinality columns
+        """
+        settings = get_settings()
+        self.compression = compression or settings.parquet_compression
+        self.compression_level = compression_level or settings.parquet_compression_level
+        self.row_group_size = row_group_size or settings.parquet_row_group_size
+        self.sort = sort
+        self.key_maps: Dict[str, pd.Index] = {}
+
+    def surrogate_ids(self, column: str, values: pd.Series) -> pd.Series:
+        """
+        Map hash keys to int32 ids shared across tables.
+
+        Args:
+            column: Key column name
+            values: Hash key values
+
+        Returns:
+            pd.Series: Nullable Int32 ids
+        """
+        known = self.key_maps.get(column, pd.Index([], dtype=object))
+        new = pd.Index(values.dropna().unique()).difference(known).sort_values()
+        self.key_maps[column] = known.append(new)
+
+        codes = self.key_maps[column].get_indexer(values)
+        return pd.Series(codes, index=values.index).where(values.notna()).astype("Int32")
+
+    def load_key_maps(self, file_path: Union[str, Path]) -> int:
+        """
+        Load the surrogate ids of an earlier export (see save_key_maps).
+
+        Args:
+            file_path: Key map file; a missing file loads nothing
+
+        Returns:
+            int: Hash keys loaded
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            return 0
+
+        saved = pd.read_parquet(file_path).sort_values(["key_column", "id"], kind="stable")
+        self.key_maps = {
+            column: pd.Index(group["hash_key"].astype(object).to_numpy(), dtype=object)
+            for column, group in saved.groupby("key_column", sort=False)
+        }
+        self.logger.info(f"Loaded {len(saved):,} surrogate ids from {file_path.name}")
+        return len(saved)
+
+    def save_key_maps(self, file_path: Union[str, Path]) -> Path:
+        """
+        Save the surrogate ids assigned so far.
+
+        Args:
+            file_path: Key map file
+
+        Returns:
+            Path: File written
+        """
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        saved = pd.DataFrame({
+            "key_column": pd.Series([column for column, keys in self.key_maps.items() for _ in keys], dtype=str),
+            "hash_key": pd.Series([key for keys in self.key_maps.values() for key in keys], dtype=str),
+        })
+        saved["id"] = saved.groupby("key_column", sort=False).cumcount().astype("int32")
+        saved.to_parquet(file_path, index=False)
+        return file_path
+
+    def prepare(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply the profile's types and row order to a frame.
+
+        Args:
+            frame: Frame as read from the warehouse
+
+        Returns:
+            pd.DataFrame: Frame with compact dtypes, categories and sorted rows
+        """
+        prepared = {}
+        for column in frame.columns:
+            values = frame[column]
+            if is_key_column(column) and is_hash_key(values):
+                prepared[column] = self.surrogate_ids(column, values)
+                continue
+
+            # Floats stay floats unless they are keys, so measure types do not
+            # change between exports when amounts happen to be whole numbers
+            target = integer_type(values)
+            if target is not None and (is_key_column(column) or not pd.api.types.is_float_dtype(values)):
+                prepared[column] = values.astype(target)
+            elif pd.api.types.infer_dtype(values, skipna=True) == "string" and \
+                    values.nunique() <= DICTIONARY_MAX_RATIO * max(len(values), 1):
+                prepared[column] = values.astype("category")
+            else:
+                prepared[column] = values
+        prepared = pd.DataFrame(prepared, index=frame.index)
+
+        if self.sort:
+            by = sort_columns(prepared)
+            if by:
+                prepared = prepared.sort_values(by, kind="stable", na_position="last")
+        return prepared.reset_index(drop=True)
+
+    def write(self, frame: pd.DataFrame, file_path: Union[str, Path]) -> pd.DataFrame:
+        """
+        Write a frame with the profile and report its compression.
+
+        Args:
+            frame: Frame as read from the warehouse
+            file_path: Output Parquet file
+
+        Returns:
+            pd.DataFrame: Per column: type, memory_bytes (source frame),
+                parquet_bytes (compressed), compression_ratio
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        file_path = Path(file_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        prepared = self.prepare(frame)
+        table = pa.Table.from_pandas(prepared, preserve_index=False)
+        pq.write_table(
+            table,
+            file_path,
+            compression=self.compression,
+            compression_level=self.compression_level if self.compression != "none" else None,
+            row_group_size=self.row_group_size,
+            use_dictionary=True,
+        )
+
+        report = compression_report(frame, file_path)
+        total = report[["memory_bytes", "parquet_bytes"]].sum()
+        self.logger.info(
+            f"{file_path.name}: {len(frame):,} rows, {table.num_columns} columns, "
+            f"{total['memory_bytes'] / 1e6:.2f} MB in memory -> {total['parquet_bytes'] / 1e6:.2f} MB "
+            f"({total['memory_bytes'] / max(total['parquet_bytes'], 1):.1f}x, {self.compression})"
+        )
+        return report
+
+
+def compression_report(frame: pd.DataFrame, file_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Compare each column's in-memory size with its size in a Parquet file.
+
+    Args:
+        frame: Source frame
+        file_path: Parquet file written from it
+
+    Returns:
+        pd.DataFrame: column, parquet_type, memory_bytes, parquet_bytes,
+            uncompressed_bytes and compression_ratio, largest files first
+    """
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(file_path).metadata
+    schema = metadata.schema.to_arrow_schema()
+    sizes = {name: [0, 0] for name in schema.names}
+    for group in range(metadata.num_row_groups):
+        row_group = metadata.row_group(group)
+        for index in range(row_group.num_columns):
+            chunk = row_group.column(index)
+            name = chunk.path_in_schema.split(".")[0]
+            sizes[name][0] += chunk.total_compressed_size
+            sizes[name][1] += chunk.total_uncompressed_size
+
+    memory = frame.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        "column": schema.names,
+        "parquet_type": [str(field.type) for field in schema],
+        "memory_bytes": [int(memory.get(name, 0)) for name in schema.names],
+        "parquet_bytes": [sizes[name][0] for name in schema.names],
+        "uncompressed_bytes": [sizes[name][1] for name in schema.names],
+    })
+    report["compression_ratio"] = (report["memory_bytes"] / report["parquet_bytes"].clip(lower=1)).round(2)
+    return report.sort_values("parquet_bytes", ascending=False, ignore_index=True)
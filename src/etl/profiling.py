@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Streaming Data Profiler
+========================================
+
+One-pass, bounded-memory profiling of data that arrives in chunks (CSV
+chunks, the staging table read with a server-side cursor, ...). Each column
+keeps mergeable sketches:
+
+- exact row/null counts, min/max, mean and standard deviation
+- HyperLogLog distinct counts
+- t-digest quantiles (numeric columns)
+- top-k frequent values (non-numeric columns)
+
+so profiles of any file size can be built chunk by chunk, or per worker and
+merged, and still return the familiar profile dictionary.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.logging_config import LoggerMixin
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over 64-bit pandas hashes."""
+
+    def __init__(self, precision: int = 12):
+        """
+        Initialize HyperLogLog.
+
+        Args:
+            precision: Register index bits, 11-16 (standard error ~1.04 / sqrt(2**precision))
+
+        Raises:
+            ValueError: If precision is out of range
+        """
+        if not 11 <= precision <= 16:
+            raise ValueError("precision must be between 11 and 16")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Add 64-bit hashes to the sketch.
+
+        Args:
+            hashes: uint64 hash values
+        """
+        if len(hashes) == 0:
+            return
+
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+
+        # frexp gives the exact bit length: remainders fit a float64 mantissa
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = (value_bits - bit_length + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Merge another sketch with the same precision into this one."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """
+        Estimate the number of distinct values.
+
+        Returns:
+            int: Approximate distinct count
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles.
+
+    Centroids are compressed with the k1 (arcsine) scale function, so the
+    tails keep small centroids and extreme quantiles stay accurate.
+    """
+
+    def __init__(self, compression: int = 500):
+        """
+        Initialize TDigest.
+
+        Args:
+            compression: Accuracy/size trade-off (about compression / 2 centroids)
+        """
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def total_weight(self) -> float:
+        """Get the number of values summarized."""
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add values to the digest.
+
+        Args:
+            values: Non-null numeric values
+        """
+        if len(values):
+            self._compress(values.astype(np.float64), np.ones(len(values)))
+
+    def merge(self, other: "TDigest") -> None:
+        """Merge another digest into this one."""
+        if len(other.means):
+            self._compress(other.means, other.weights)
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        """Merge new centroids with the current ones and re-compress."""
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+
+        # Bucket centroids by the k-scale of their left edge; each bucket
+        # spans at most one unit of k and becomes one centroid
+        left_q = (np.cumsum(weights) - weights) / weights.sum()
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * left_q - 1)
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(bucket)) + 1])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float, minimum: float, maximum: float) -> float:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile in [0, 1]
+            minimum: Exact minimum of the data
+            maximum: Exact maximum of the data
+
+        Returns:
+            float: Approximate quantile (NaN if the digest is empty)
+        """
+        total = self.total_weight
+        if not total:
+            return float("nan")
+
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(
+            q * total,
+            np.concatenate([[0.0], centers, [total]]),
+            np.concatenate([[minimum], self.means, [maximum]])
+        ))
+
+
+class TopK:
+    """Approximate most frequent values, keeping a bounded candidate set."""
+
+    def __init__(self, k: int = 10, capacity: Optional[int] = None):
+        """
+        Initialize TopK.
+
+        Args:
+            k: Number of values reported
+            capacity: Candidates kept between chunks (default: 20 * k)
+        """
+        self.k = k
+        self.capacity = capacity or 20 * k
+        self.counts = pd.Series(dtype="int64")
+
+    def update(self, values: pd.Series) -> None:
+        """
+        Count the values of a chunk.
+
+        Args:
+            values: Non-null values
+        """
+        self._merge(values.value_counts(sort=False))
+
+    def merge(self, other: "TopK") -> None:
+        """Merge another TopK into this one."""
+        self._merge(other.counts)
+
+    def _merge(self, counts: pd.Series) -> None:
+        """Add counts and trim to the candidate capacity."""
+        if counts.empty:
+            return
+        combined = counts if self.counts.empty else self.counts.add(counts, fill_value=0)
+        if len(combined) > self.capacity:
+            combined = combined.nlargest(self.capacity)
+        self.counts = combined.astype("int64")
+
+    def top(self) -> Dict[Any, int]:
+        """
+        Get the most frequent values.
+
+        Returns:
+            dict: Value -> approximate count, most frequent first
+        """
+        return {
+            value.item() if isinstance(value, np.generic) else value: int(count)
+            for value, count in self.counts.nlargest(self.k).items()
+        }
+
+
+class ColumnSketch:
+    """Mergeable summary of one column."""
+
+    def __init__(self, dtype: str, top_k: int, hll_precision: int, compression: int):
+        """
+        Initialize ColumnSketch.
+
+        Args:
+            dtype: Column dtype name
+            top_k: Number of frequent values to report
+            hll_precision: HyperLogLog precision
+            compression: t-digest compression
+        """
+        self.dtype = dtype
+        self.count = 0
+        self.nulls = 0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.distinct = HyperLogLog(hll_precision)
+        self.digest = TDigest(compression)
+        self.frequent = TopK(top_k)
+
+    @property
+    def kind(self) -> str:
+        """Get the column kind: numeric, datetime or categorical."""
+        dtype = pd.api.types.pandas_dtype(self.dtype)
+        if pd.api.types.is_bool_dtype(dtype):
+            return "categorical"
+        if pd.api.types.is_numeric_dtype(dtype):
+            return "numeric"
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return "datetime"
+        return "categorical"
+
+    def _merge_dtype(self, dtype: str) -> None:
+        """Widen the dtype when chunks disagree (e.g. int64 -> float64)."""
+        if dtype == self.dtype:
+            return
+        both_numeric = all(
+            pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(name))
+            and not pd.api.types.is_bool_dtype(pd.api.types.pandas_dtype(name))
+            for name in (dtype, self.dtype)
+        )
+        self.dtype = "float64" if both_numeric else "object"
+
+    def _merge_moments(self, count: int, mean: float, m2: float) -> None:
+        """Combine mean and sum of squared deviations (Chan et al.)."""
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def _merge_range(self, minimum: Any, maximum: Any) -> None:
+        """Combine min/max."""
+        if minimum is None:
+            return
+        try:
+            self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+            self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+        except TypeError:
+            # Mixed types in an object column have no order
+            self.minimum = self.maximum = None
+
+    def update(self, series: pd.Series) -> None:
+        """
+        Add a chunk of the column.
+
+        Args:
+            series: Column values
+        """
+        self._merge_dtype(str(series.dtype))
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+
+        if values.empty:
+            return
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            numbers = values.to_numpy(dtype=np.float64)
+            chunk_mean = numbers.mean()
+            self._merge_moments(len(numbers), chunk_mean, float(((numbers - chunk_mean) ** 2).sum()))
+            self.digest.update(numbers)
+            # Hash as float so int and float chunks of the same column agree
+            values = pd.Series(numbers)
+            self._merge_range(float(numbers.min()), float(numbers.max()))
+        else:
+            self.count += len(values)
+            self.frequent.update(values)
+            try:
+                self._merge_range(values.min(), values.max())
+            except TypeError:
+                self.minimum = self.maximum = None
+
+        self.distinct.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+
+    def merge(self, other: "ColumnSketch") -> None:
+        """Merge the sketch of the same column from another profiler."""
+        self._merge_dtype(other.dtype)
+        self.nulls += other.nulls
+        if other.digest.total_weight:
+            self._merge_moments(other.count, other.mean, other.m2)
+        else:
+            self.count += other.count
+        self._merge_range(other.minimum, other.maximum)
+        self.distinct.merge(other.distinct)
+        self.digest.merge(other.digest)
+        self.frequent.merge(other.frequent)
+
+    def numeric_stats(self) -> Dict[str, float]:
+        """
+        Get describe()-style statistics of a numeric column.
+
+        Returns:
+            dict: count, mean, std, min, 25%, 50%, 75%, max
+        """
+        if not self.count:
+            return {"count": 0.0}
+        return {
+            "count": float(self.count),
+            "mean": float(self.mean),
+            "std": float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan"),
+            "min": self.minimum,
+            "25%": self.digest.quantile(0.25, self.minimum, self.maximum),
+            "50%": self.digest.quantile(0.50, self.minimum, self.maximum),
+            "75%": self.digest.quantile(0.75, self.minimum, self.maximum),
+            "max": self.maximum,
+        }
+
+
+class StreamingProfiler(LoggerMixin):
+    """
+    Builds a data profile from chunks in one pass and bounded memory.
+
+    Counts, null counts, min/max, mean and std are exact; distinct counts,
+    quantiles and top values are approximate. memory_mb is the shallow
+    in-memory size of the chunks (string payloads are not walked).
+    """
+
+    def __init__(self, top_k: int = 10, hll_precision: int = 12, compression: int = 500):
+        """
+        Initialize StreamingProfiler.
+
+        Args:
+            top_k: Number of frequent values reported per non-numeric column
+            hll_precision: HyperLogLog precision (11-16)
+            compression: t-digest compression
+        """
+        self.top_k = top_k
+        self.hll_precision = hll_precision
+        self.compression = compression
+        self.row_count = 0
+        self.memory_bytes = 0
+        self.columns: Dict[str, ColumnSketch] = {}
+
+    def _sketch(self, column: str, dtype: str) -> ColumnSketch:
+        """Get (or create) the sketch of a column."""
+        if column not in self.columns:
+            self.columns[column] = ColumnSketch(
+                dtype, self.top_k, self.hll_precision, self.compression
+            )
+        return self.columns[column]
+
+    def update(self, chunk: pd.DataFrame) -> "StreamingProfiler":
+        """
+        Add a chunk.
+
+        Args:
+            chunk: DataFrame chunk (same columns as previous chunks)
+
+        Returns:
+            StreamingProfiler: self, for chaining
+        """
+        self.row_count += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(index=False, deep=False).sum())
+        for column in chunk.columns:
+            self._sketch(column, str(chunk[column].dtype)).update(chunk[column])
+        return self
+
+    def merge(self, other: "StreamingProfiler") -> "StreamingProfiler":
+        """
+        Merge a profiler built over other chunks of the same data.
+
+        Args:
+            other: Profiler to merge
+
+        Returns:
+            StreamingProfiler: self, for chaining
+        """
+        self.row_count += other.row_count
+        self.memory_bytes += other.memory_bytes
+        for column, sketch in other.columns.items():
+            self._sketch(column, sketch.dtype).merge(sketch)
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], **kwargs: Any) -> "StreamingProfiler":
+        """
+        Profile an iterable of chunks.
+
+        Args:
+            chunks: DataFrame chunks
+            **kwargs: StreamingProfiler options
+
+        Returns:
+            StreamingProfiler: Profiler holding the merged sketches
+        """
+        profiler = cls(**kwargs)
+        for chunk in chunks:
+            profiler.update(chunk)
+        return profiler
+
+    def profile(self) -> Dict[str, Any]:
+        """
+        Build the profile dictionary.
+
+        Returns:
+            dict: Profile with the keys of generate_data_profile plus
+            distinct_counts and top_values
+        """
+        columns = list(self.columns)
+        null_counts = {col: sketch.nulls for col, sketch in self.columns.items()}
+        kinds = {col: sketch.kind for col, sketch in self.columns.items()}
+        numeric_columns = [col for col in columns if kinds[col] == "numeric"]
+
+        profile = {
+            "row_count": self.row_count,
+            "column_count": len(columns),
+            "columns": columns,
+            "dtypes": {col: sketch.dtype for col, sketch in self.columns.items()},
+            "null_counts": null_counts,
+            "null_percentages": {
+                col: round(nulls / self.row_count * 100, 2) if self.row_count else 0.0
+                for col, nulls in null_counts.items()
+            },
+            "memory_mb": self.memory_bytes / (1024 * 1024),
+            "numeric_columns": numeric_columns,
+            "categorical_columns": [col for col in columns if kinds[col] == "categorical"],
+            "datetime_columns": [col for col in columns if kinds[col] == "datetime"],
+            "distinct_counts": {
+                col: sketch.distinct.estimate() for col, sketch in self.columns.items()
+            },
+            "top_values": {
+                col: sketch.frequent.top()
+                for col, sketch in self.columns.items() if kinds[col] != "numeric"
+            },
+        }
+
+        if numeric_columns:
+            profile["numeric_stats"] = {
+                col: self.columns[col].numeric_stats() for col in numeric_columns
+            }
+
+        return profile
+
+
+def profile_table(
+    loader,
+    table_name: str,
+    schema: str = "dw",
+    chunksize: int = 50000,
+    **kwargs: Any
+) -> Dict[str, Any]:
+    """
+    Profile a database table with a server-side cursor.
+
+    Args:
+        loader: DataLoader providing the engine
+        table_name: Table to profile
+        schema: Table schema
+        chunksize: Rows fetched per chunk
+        **kwargs: StreamingProfiler options
+
+    Returns:
+        dict: Profile dictionary
+    """
+    from sqlalchemy import text
+
+    profiler = StreamingProfiler(**kwargs)
+    profiler.logger.info(f"Profiling {schema}.{table_name} in {chunksize:,}-row chunks")
+
+    with loader.engine.connect() as conn:
+        streaming = conn.execution_options(stream_results=True)
+        for chunk in pd.read_sql(text(f"SELECT * FROM {schema}.{table_name}"), streaming, chunksize=chunksize):
+            profiler.update(chunk)
+
+    return profiler.profile()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Query Result Cache
+===================================
+
+Local Parquet cache of analytics query results. Entries are keyed by the
+normalized SQL text plus its parameters and filed under the warehouse data
+version, a counter the ETL bumps after every successful transform and again
+once the enrichments have rewritten the derived tables: once the version
+moves on, older results are never served and are purged. The cache
+is bounded in size, evicting the least recently used results first.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin
+
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
+
+DATA_VERSION_TABLE = "dw.etl_data_version"
+
+# Plain SQL so scripts with their own connection can bump the version too
+BUMP_DATA_VERSION_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+        id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        version BIGINT NOT NULL,
+        updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT INTO {DATA_VERSION_TABLE} (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET
+        version = {DATA_VERSION_TABLE}.version + 1,
+        updated_at = CURRENT_TIMESTAMP;
+"""
+
+_LINE_COMMENTS = re.compile(r"^\s*--[^\n]*$", re.MULTILINE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalize SQL text so formatting differences share a cache entry.
+
+    Only whole-line comments, whitespace runs and a trailing semicolon are
+    removed; literals are kept, since they change the result.
+
+    Args:
+        query: SQL text
+
+    Returns:
+        str: Normalized SQL
+    """
+    normalized = _LINE_COMMENTS.sub(" ", query)
+    return _WHITESPACE.sub(" ", normalized).strip().rstrip(";").strip()
+
+
+def get_data_version(loader: "DataLoader") -> int:
+    """
+    Read the warehouse data version.
+
+    Args:
+        loader: DataLoader instance
+
+    Returns:
+        int: Current version (0 if the ETL never recorded one)
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import SQLAlchemyError
+
+    try:
+        with loader.engine.connect() as conn:
+            version = conn.execute(text(f"SELECT version FROM {DATA_VERSION_TABLE}")).scalar()
+    except SQLAlchemyError:
+        return 0
+    return int(version or 0)
+
+
+def bump_data_version(loader: "DataLoader") -> int:
+    """
+    Advance the warehouse data version (call after the ETL rewrites warehouse tables).
+
+    Args:
+        loader: DataLoader instance
+
+    Returns:
+        int: New version
+    """
+    from sqlalchemy import text
+
+    with loader.engine.begin() as conn:
+        for statement in BUMP_DATA_VERSION_SQL.split(";"):
+            if statement.strip():
+                conn.execute(text(statement))
+        version = conn.execute(text(f"SELECT version FROM {DATA_VERSION_TABLE}")).scalar()
+
+    loader.logger.info(f"Warehouse data version is now {version}")
+    return int(version)
+
+
+class QueryResultCache(LoggerMixin):
+    """
+    Size-bounded Parquet cache of query results, one directory per data version.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize QueryResultCache.
+
+        Args:
+            cache_dir: Cache directory (default: data/interim/query_cache)
+            max_bytes: Size limit of the cache (default: from settings)
+        """
+        self.settings = get_settings()
+        self.cache_dir = Path(cache_dir or self.settings.query_cache_dir)
+        self.max_bytes = (
+            self.settings.query_cache_max_mb * 1024 * 1024 if max_bytes is None else max_bytes
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        """Check whether a Parquet engine (pyarrow) is installed."""
+        return importlib.util.find_spec("pyarrow") is not None
+
+    @staticmethod
+    def key(query: str, params: Optional[dict] = None) -> str:
+        """
+        Build the cache key of a query.
+
+        Args:
+            query: SQL text
+            params: Query parameters (optional)
+
+        Returns:
+            str: Hex digest of the normalized SQL and parameters
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(normalize_sql(query).encode("utf-8"))
+        digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def path_for(self, key: str, version: int) -> Path:
+        """Get the Parquet file of a key under a data version."""
+        return self.cache_dir / f"v{version}" / f"{key}.parquet"
+
+    def get(self, query: str, params: Optional[dict], version: int) -> Optional[pd.DataFrame]:
+        """
+        Look up a query result.
+
+        Args:
+            query: SQL text
+            params: Query parameters
+            version: Current data version
+
+        Returns:
+            pd.DataFrame: Cached result, or None on a miss
+        """
+        path = self.path_for(self.key(query, params), version)
+        if not self.available or not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            result = pd.read_parquet(path)
+        except Exception as e:
+            self.logger.debug(f"Dropping unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # The access time drives LRU eviction
+        os.utime(path)
+        self.hits += 1
+        return result
+
+    def put(self, query: str, params: Optional[dict], version: int, result: pd.DataFrame) -> Optional[Path]:
+        """
+        Store a query result.
+
+        Args:
+            query: SQL text
+            params: Query parameters
+            version: Data version the result was read at
+            result: Query result
+
+        Returns:
+            Path: Cache file, or None if the result could not be cached
+        """
+        if not self.available or self.max_bytes <= 0:
+            return None
+
+        self._purge_versions(keep=version)
+
+        path = self.path_for(self.key(query, params), version)
+        tmp_path = path.with_suffix(".parquet.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            result.to_parquet(tmp_path, index=False)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.debug(f"Query result not cacheable: {e}")
+            return None
+
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def _purge_versions(self, keep: int) -> None:
+        """Remove the results of every other data version."""
+        if not self.cache_dir.exists():
+            return
+        for version_dir in self.cache_dir.glob("v*"):
+            if version_dir.is_dir() and version_dir.name != f"v{keep}":
+                shutil.rmtree(version_dir, ignore_errors=True)
+                self.logger.info(f"Query cache: dropped results of data version {version_dir.name[1:]}")
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used results until the cache fits max_bytes.
+
+        Returns:
+            int: Number of results removed
+        """
+        entries = []
+        for path in self.cache_dir.glob("v*/*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            self.logger.debug(f"Query cache: evicted {removed} results ({total / (1024 * 1024):.1f} MB kept)")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Torre Control - SQL Query Profiler
+===================================
+
+Instruments a SQLAlchemy engine with cursor events to record per-statement
+latency, row counts and fetched bytes, aggregated by a normalized statement
+fingerprint (literals and parameters replaced by ``?``). Statements slower
+than a threshold can be sampled with ``EXPLAIN`` for later inspection.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin
+
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PARAMETERS = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statements EXPLAIN can describe without running them
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement so executions with different values group together.
+
+    Args:
+        statement: SQL text (as sent to the driver)
+
+    Returns:
+        str: Lower-cased statement with comments, literals and parameters removed
+    """
+    normalized = _COMMENTS.sub(" ", statement)
+    normalized = _STRINGS.sub("?", normalized)
+    normalized = _PARAMETERS.sub("?", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip().lower()
+    # IN lists and multi-row VALUES vary in length with the batch
+    normalized = _VALUE_LISTS.sub("(?...)", normalized)
+    return _REPEATED_LISTS.sub("(?...)", normalized)
+
+
+def estimate_frame_bytes(df: pd.DataFrame, sample_size: int = 1000) -> int:
+    """
+    Estimate the bytes of a query result without walking every string.
+
+    Args:
+        df: Query result
+        sample_size: Rows sampled to size text columns
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    total = int(df.memory_usage(index=False, deep=False).sum())
+    if df.empty:
+        return total
+
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            sample = series.head(sample_size).dropna().astype(str)
+            if len(sample):
+                total += int(sample.str.len().mean() * series.count())
+    return total
+
+
+class QueryStats:
+    """Aggregated statistics of one statement fingerprint."""
+
+    def __init__(self, statement: str):
+        """
+        Initialize QueryStats.
+
+        Args:
+            statement: Normalized statement
+        """
+        self.statement = statement
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.bytes_fetched = 0
+        self.slow_calls = 0
+        self.explain: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the statistics as a dictionary."""
+        return {
+            "statement": self.statement,
+            "calls": self.calls,
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "mean_ms": round(self.total_seconds * 1000 / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "rows": self.rows,
+            "bytes_fetched": self.bytes_fetched,
+            "slow_calls": self.slow_calls,
+            "explain": self.explain,
+        }
+
+
+class QueryProfiler(LoggerMixin):
+    """
+    Records statement timings on SQLAlchemy engines.
+
+    Attach it to one or more engines; statistics are thread-safe and keyed by
+    statement fingerprint.
+    """
+
+    def __init__(
+        self,
+        slow_threshold_ms: Optional[float] = None,
+        explain_slow: Optional[bool] = None
+    ):
+        """
+        Initialize QueryProfiler.
+
+        Args:
+            slow_threshold_ms: Statements slower than this count as slow (default: from settings)
+            explain_slow: Capture an EXPLAIN plan for the first slow call of each fingerprint
+                (default: from settings)
+        """
+        self.settings = get_settings()
+        self.slow_threshold_ms = (
+            self.settings.slow_query_threshold_ms if slow_threshold_ms is None else slow_threshold_ms
+        )
+        self.explain_slow = self.settings.explain_slow_queries if explain_slow is None else explain_slow
+        self.stats: Dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Start profiling an engine.
+
+        Args:
+            engine: SQLAlchemy engine
+        """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def detach(self, engine: Engine) -> None:
+        """
+        Stop profiling an engine.
+
+        Args:
+            engine: SQLAlchemy engine
+        """
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Remember when the statement started (nested executions stack up)."""
+        conn.info.setdefault("query_profiler_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Record the statement's timing and row count."""
+        elapsed = time.perf_counter() - conn.info["query_profiler_start"].pop()
+        rowcount = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        slow = elapsed * 1000 >= self.slow_threshold_ms
+
+        stats = self._record(statement, elapsed, rowcount, slow)
+
+        if slow and self.explain_slow and stats.explain is None and not executemany:
+            stats.explain = self._explain(conn, statement, parameters)
+
+    def _record(self, statement: str, elapsed: float, rows: int, slow: bool) -> QueryStats:
+        """Add one execution to the statistics of its fingerprint."""
+        key = fingerprint(statement)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = QueryStats(key)
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            stats.rows += rows
+            stats.slow_calls += int(slow)
+        return stats
+
+    def record(self, statement: str, seconds: float, rows: int = 0, nbytes: int = 0) -> None:
+        """
+        Record an execution the engine events do not see (e.g. a COPY on a raw cursor).
+
+        Args:
+            statement: SQL text of the query
+            seconds: Time spent executing and reading the result
+            rows: Rows read
+            nbytes: Bytes fetched
+        """
+        stats = self._record(statement, seconds, rows, seconds * 1000 >= self.slow_threshold_ms)
+        with self._lock:
+            stats.bytes_fetched += nbytes
+
+    def record_bytes(self, statement: str, nbytes: int) -> None:
+        """
+        Add fetched bytes to a statement (the driver does not report them).
+
+        Args:
+            statement: SQL text of the query
+            nbytes: Bytes fetched
+        """
+        key = fingerprint(statement)
+        with self._lock:
+            if key in self.stats:
+                self.stats[key].bytes_fetched += nbytes
+
+    def _explain(self, conn, statement: str, parameters: Any) -> Optional[str]:
+        """
+        Capture the plan of a slow statement without running it again.
+
+        The plan is fetched on a separate DBAPI cursor inside a savepoint, so
+        a failing EXPLAIN never aborts the caller's transaction.
+        """
+        if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+
+        dbapi_conn = conn.connection.dbapi_connection
+        in_transaction = not getattr(dbapi_conn, "autocommit", False)
+        cursor = dbapi_conn.cursor()
+        try:
+            if in_transaction:
+                cursor.execute("SAVEPOINT query_profiler_explain")
+            try:
+                cursor.execute(f"EXPLAIN {statement}", parameters or None)
+                plan = "\n".join(" ".join(str(value) for value in row) for row in cursor.fetchall())
+            except Exception as e:
+                if in_transaction:
+                    cursor.execute("ROLLBACK TO SAVEPOINT query_profiler_explain")
+                self.logger.debug(f"EXPLAIN failed: {e}")
+                return None
+            if in_transaction:
+                cursor.execute("RELEASE SAVEPOINT query_profiler_explain")
+            return plan
+        except Exception as e:
+            self.logger.debug(f"Could not sample query plan: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    def report(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get the aggregated statistics, slowest (by total time) first.
+
+        Args:
+            top: Number of fingerprints to return (default: all)
+
+        Returns:
+            list: One dict per statement fingerprint
+        """
+        with self._lock:
+            ranked = sorted(self.stats.values(), key=lambda s: s.total_seconds, reverse=True)
+            return [stats.as_dict() for stats in ranked[:top]]
+
+    def log_report(self, top: int = 10) -> None:
+        """
+        Log the statements that took the most time.
+
+        Args:
+            top: Number of fingerprints to log
+        """
+        report = self.report(top=top)
+        if not report:
+            return
+
+        total_calls = sum(stats.calls for stats in self.stats.values())
+        total_ms = sum(stats.total_seconds for stats in self.stats.values()) * 1000
+
+        self.logger.info("=" * 70)
+        self.logger.info(f"SQL PROFILE: {total_calls:,} statements, {total_ms / 1000:.2f}s in database")
+        self.logger.info("=" * 70)
+        for entry in report:
+            self.logger.info(
+                f"{entry['total_ms']:>10.1f} ms  {entry['calls']:>5}x  "
+                f"max {entry['max_ms']:>8.1f} ms  {entry['rows']:>10,} rows  "
+                f"{entry['bytes_fetched'] / (1024 * 1024):>7.2f} MB  {entry['statement'][:80]}"
+            )
+            if entry["explain"]:
+                self.logger.debug(f"Plan of slow statement:\n{entry['explain']}")
+        self.logger.info("=" * 70)
+
+    def reset(self) -> None:
+        """Clear the collected statistics."""
+        with self._lock:
+            self.stats.clear()
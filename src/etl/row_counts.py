@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Row Count Service
+==================================
+
+Table sizes in three flavours, so each caller pays only for the accuracy
+it needs:
+
+- ``estimated``: read from the catalog (pg_stat_user_tables.n_live_tup,
+  falling back to pg_class.reltuples); no table scan.
+- ``exact``: ``SELECT COUNT(*)``; a full scan of the table.
+- ``cached``: exact, remembered until the pipeline itself writes to the
+  database through the same engine.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from src.logging_config import LoggerMixin
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+
+    from src.etl.load import DataLoader
+
+
+ESTIMATED = "estimated"
+EXACT = "exact"
+CACHED = "cached"
+COUNT_MODES = (ESTIMATED, EXACT, CACHED)
+
+# One catalog lookup for any number of tables (bind :schema and :tables)
+ESTIMATED_COUNTS_SQL = """
+    SELECT c.relname AS table_name,
+           c.reltuples::bigint AS reltuples,
+           s.n_live_tup AS n_live_tup
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE n.nspname = :schema
+      AND c.relname = ANY(:tables)
+      AND c.relkind IN ('r', 'p')
+"""
+
+# Statements that cannot change row counts
+_READ_ONLY = re.compile(r"^\s*(select|show|explain|set|begin|commit|rollback|savepoint|release)\b", re.IGNORECASE)
+
+
+def estimate_from_stats(reltuples: Optional[int], n_live_tup: Optional[int]) -> Optional[int]:
+    """
+    Pick the better row estimate from the catalog statistics.
+
+    n_live_tup is maintained by the statistics system on every write, so it
+    is preferred; reltuples is only refreshed by VACUUM/ANALYZE and is -1 for
+    tables that were never analyzed.
+
+    Args:
+        reltuples: pg_class.reltuples
+        n_live_tup: pg_stat_user_tables.n_live_tup
+
+    Returns:
+        int: Estimated rows, or None when the catalog has no information
+    """
+    if n_live_tup is not None and n_live_tup > 0:
+        return int(n_live_tup)
+    if reltuples is not None and reltuples >= 0:
+        return int(reltuples)
+    if n_live_tup is not None:
+        return int(n_live_tup)
+    return None
+
+
+class RowCountService(LoggerMixin):
+    """
+    Row counts for a DataLoader's database, by estimate, scan or cache.
+
+    Cached counts are dropped whenever a statement that can write runs on
+    the loader's engine (see attach), or explicitly with invalidate().
+    """
+
+    def __init__(self, loader: "DataLoader"):
+        """
+        Initialize RowCountService.
+
+        Args:
+            loader: DataLoader whose database is counted
+        """
+        self.loader = loader
+        self._cache: Dict[Tuple[str, str], int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def attach(self, engine: "Engine") -> None:
+        """
+        Invalidate the cache on every write statement run by an engine.
+
+        Args:
+            engine: SQLAlchemy engine
+        """
+        from sqlalchemy import event
+
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Drop cached counts after any statement that may have written."""
+        if not _READ_ONLY.match(statement):
+            self.invalidate()
+
+    def invalidate(self, table_name: Optional[str] = None, schema: Optional[str] = None) -> None:
+        """
+        Forget cached counts.
+
+        Args:
+            table_name: Table to forget (default: all tables)
+            schema: Schema of the table
+        """
+        with self._lock:
+            # Counts that are being computed right now may already be stale
+            self._generation += 1
+            if table_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop((schema or "public", table_name), None)
+
+    def estimate(self, tables: Iterable[str], schema: str = "public") -> Dict[str, Optional[int]]:
+        """
+        Estimate the row counts of several tables with one catalog query.
+
+        Args:
+            tables: Table names
+            schema: Schema name
+
+        Returns:
+            dict: Estimated rows per table (None for unknown tables)
+        """
+        tables = list(tables)
+        result = self.loader.execute_query(ESTIMATED_COUNTS_SQL, params={"schema": schema, "tables": tables})
+
+        estimates = dict.fromkeys(tables)
+        for row in result.itertuples(index=False):
+            n_live_tup = None if pd.isna(row.n_live_tup) else row.n_live_tup
+            estimates[row.table_name] = estimate_from_stats(row.reltuples, n_live_tup)
+        return estimates
+
+    def exact(self, table_name: str, schema: Optional[str] = None,
+              statement_timeout_ms: Optional[int] = None) -> int:
+        """
+        Count the rows of a table with a full scan.
+
+        Args:
+            table_name: Table name
+            schema: Schema name (optional)
+            statement_timeout_ms: Server-side time limit of the count (optional)
+
+        Returns:
+            int: Number of rows
+        """
+        full_table = f"{schema}.{table_name}" if schema else table_name
+        result = self.loader.execute_query(
+            f"SELECT COUNT(*) as count FROM {full_table}",
+            statement_timeout_ms=statement_timeout_ms
+        )
+        return int(result["count"].iloc[0])
+
+    def count(
+        self,
+        table_name: str,
+        schema: Optional[str] = None,
+        mode: str = EXACT,
+        statement_timeout_ms: Optional[int] = None
+    ) -> int:
+        """
+        Get the row count of a table in the requested mode.
+
+        Tables the catalog knows nothing about are counted exactly, so an
+        estimate never hides a missing table.
+
+        Args:
+            table_name: Table name
+            schema: Schema name (optional)
+            mode: estimated, exact or cached
+            statement_timeout_ms: Server-side time limit of an exact count (optional)
+
+        Returns:
+            int: Number of rows
+        """
+        if mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode '{mode}' (expected one of {', '.join(COUNT_MODES)})")
+
+        if mode == ESTIMATED:
+            estimate = self.estimate([table_name], schema or "public")[table_name]
+            if estimate is not None:
+                return estimate
+            return self.exact(table_name, schema, statement_timeout_ms)
+
+        if mode == CACHED:
+            key = (schema or "public", table_name)
+            with self._lock:
+                if key in self._cache:
+                    return self._cache[key]
+                generation = self._generation
+            count = self.exact(table_name, schema, statement_timeout_ms)
+            with self._lock:
+                if generation == self._generation:
+                    self._cache[key] = count
+            return count
+
+        return self.exact(table_name, schema, statement_timeout_ms)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Slowly Changing Dimensions (Type 2)
+====================================================
+
+Keeps the history of dim_customer, dim_product and dim_geography. Each
+member staged from dw.stg_raw_orders gets an MD5 hash of its tracked
+attributes; one hash join against the dimension finds the members that are
+new or whose hash changed, and only those are written:
+
+- ``<dimension>_history`` holds every version with ``valid_from`` /
+  ``valid_to`` / ``is_current``; changed members have their current
+  version closed and a new one inserted, in bulk.
+- ``<dimension>`` itself keeps one current row per member (facts and the
+  analytics queries join it on the natural key), upserted for changed
+  members only. Type 1 attributes (e.g. sales_per_customer) are
+  overwritten in place without creating a version.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from typing import TYPE_CHECKING, Dict, List
+
+from src.logging_config import LoggerMixin, log_execution_time
+
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
+
+# Natural key, versioned (type 2) and overwritten (type 1) attributes of each
+# dimension, and the staging query yielding one row per member
+SCD2_DIMENSIONS = {
+    "dim_customer": {
+        "natural_key": ["customer_id"],
+        "tracked": [
+            "customer_fname", "customer_lname", "customer_email", "customer_segment",
+            "customer_city", "customer_state", "customer_country",
+        ],
+        "type1": ["sales_per_customer"],
+        "source": """
+            SELECT DISTINCT ON (customer_id)
+                customer_id,
+                customer_fname,
+                customer_lname,
+                customer_email,
+                customer_segment,
+                customer_city,
+                customer_state,
+                customer_country,
+                SUM(COALESCE(sales, 0)) OVER (PARTITION BY customer_id) as sales_per_customer
+            FROM dw.stg_raw_orders
+            WHERE customer_id IS NOT NULL
+            ORDER BY customer_id, order_date_dateorders DESC
+        """,
+    },
+    "dim_product": {
+        "natural_key": ["product_card_id"],
+        "tracked": ["category_id", "category_name", "department_name", "product_name", "product_price"],
+        "type1": [],
+        "source": """
+            SELECT DISTINCT ON (product_card_id)
+                product_card_id,
+                category_id,
+                category_name,
+                department_name,
+                product_name,
+                order_item_product_price as product_price
+            FROM dw.stg_raw_orders
+            WHERE product_card_id IS NOT NULL
+            ORDER BY product_card_id, order_date_dateorders DESC
+        """,
+    },
+    # The key is a hash of the location itself, so a moved location is a new
+    # member; the engine still records when each one first appeared. NULL and
+    # empty parts hash alike, so DISTINCT ON keeps one row per key
+    "dim_geography": {
+        "natural_key": ["geography_key"],
+        "tracked": ["market", "order_region", "order_country", "order_state", "order_city"],
+        "type1": [],
+        "source": """
+            SELECT DISTINCT ON (geography_key)
+                MD5(CONCAT(
+                    COALESCE(market, ''), '|',
+                    COALESCE(order_region, ''), '|',
+                    COALESCE(order_country, ''), '|',
+                    COALESCE(order_state, ''), '|',
+                    COALESCE(order_city, '')
+                )) as geography_key,
+                market,
+                order_region,
+                order_country,
+                order_state,
+                order_city
+            FROM dw.stg_raw_orders
+            WHERE market IS NOT NULL
+            ORDER BY geography_key, market, order_region, order_country, order_state, order_city
+        """,
+    },
+}
+
+HISTORY_TABLES = [f"{dimension}_history" for dimension in SCD2_DIMENSIONS]
+
+
+def row_hash_sql(columns: List[str]) -> str:
+    """
+    SQL expression hashing a row's tracked attributes.
+
+    The row constructor's text form quotes empty strings and leaves NULLs
+    empty, so the two hash differently.
+
+    Args:
+        columns: Tracked columns
+
+    Returns:
+        str: MD5 expression (32 hex characters)
+    """
+    return f"MD5(ROW({', '.join(columns)})::text)"
+
+
+def key_join(left: str, right: str, natural_key: List[str]) -> str:
+    """Join condition on the natural key between two aliases."""
+    return " AND ".join(f"{left}.{column} = {right}.{column}" for column in natural_key)
+
+
+class SCD2Engine(LoggerMixin):
+    """
+    Type 2 history for the dimensions in SCD2_DIMENSIONS.
+    """
+
+    def __init__(self, loader: "DataLoader", schema: str = "dw"):
+        """
+        Initialize SCD2Engine.
+
+        Args:
+            loader: DataLoader instance
+            schema: Schema holding the dimensions (and their history tables)
+        """
+        self.loader = loader
+        self.schema = schema
+
+    def ensure(self, dimension: str) -> None:
+        """
+        Prepare a dimension for versioning.
+
+        Adds the row_hash column, creates the history table and seeds it (and
+        the hashes) for members loaded before history was kept. Idempotent.
+
+        Args:
+            dimension: Dimension name (a key of SCD2_DIMENSIONS)
+        """
+        spec = SCD2_DIMENSIONS[dimension]
+        table = f"{self.schema}.{dimension}"
+        history = f"{table}_history"
+        key, tracked = spec["natural_key"], spec["tracked"]
+        versioned = ", ".join(key + tracked + ["row_hash"])
+
+        # ALTER TABLE locks the live dimension even when the column exists
+        if self.loader.missing_columns(dimension, ["row_hash"], schema=self.schema):
+            self.loader.execute_statement(f"ALTER TABLE {table} ADD COLUMN row_hash CHAR(32)")
+
+        if not self.loader.table_exists(f"{dimension}_history", schema=self.schema):
+            self.logger.info(f"Creating {history}")
+            self.loader.execute_statement(f"CREATE TABLE {history} AS SELECT {versioned} FROM {table} WITH NO DATA")
+            self.loader.execute_statement(f"""
+                ALTER TABLE {history}
+                    ADD COLUMN valid_from TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    ADD COLUMN valid_to TIMESTAMP,
+                    ADD COLUMN is_current BOOLEAN NOT NULL DEFAULT TRUE
+            """)
+            self.loader.execute_statement(
+                f"CREATE UNIQUE INDEX ON {history} ({', '.join(key)}) WHERE is_current"
+            )
+
+        self.loader.execute_statement(
+            f"UPDATE {table} SET row_hash = {row_hash_sql(tracked)} WHERE row_hash IS NULL"
+        )
+        self.loader.execute_statement(f"""
+            INSERT INTO {history} ({versioned})
+            SELECT {', '.join(f'd.{column}' for column in key + tracked + ['row_hash'])}
+            FROM {table} d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {history} h
+                WHERE {key_join('h', 'd', key)} AND h.is_current
+            )
+        """)
+
+    def statements(self, dimension: str) -> List[str]:
+        """
+        Build the statements of one SCD2 load, in execution order.
+
+        Args:
+            dimension: Dimension name (a key of SCD2_DIMENSIONS)
+
+        Returns:
+            list: SQL statements (to run in one transaction)
+        """
+        spec = SCD2_DIMENSIONS[dimension]
+        table = f"{self.schema}.{dimension}"
+        history = f"{table}_history"
+        key, tracked, type1 = spec["natural_key"], spec["tracked"], spec["type1"]
+        members = key + tracked + type1
+        versioned = ", ".join(key + tracked + ["row_hash"])
+
+        upserts = ", ".join(f"{column} = EXCLUDED.{column}" for column in tracked + type1 + ["row_hash"])
+        statements = [
+            # Staged members, typed like the dimension so hashes compare equal
+            f"CREATE TEMP TABLE scd_stage ON COMMIT DROP AS "
+            f"SELECT {', '.join(members)}, row_hash FROM {table} WITH NO DATA",
+            f"INSERT INTO scd_stage ({', '.join(members)}) {spec['source']}",
+            f"UPDATE scd_stage SET row_hash = {row_hash_sql(tracked)}",
+            # The single hash join: new members and members whose hash changed
+            f"""CREATE TEMP TABLE scd_changes ON COMMIT DROP AS
+                SELECT s.*, d.{key[0]} IS NULL AS is_new
+                FROM scd_stage s
+                LEFT JOIN {table} d ON {key_join('d', 's', key)}
+                WHERE d.row_hash IS DISTINCT FROM s.row_hash""",
+            f"""UPDATE {history} h
+                SET valid_to = CURRENT_TIMESTAMP, is_current = FALSE
+                FROM scd_changes c
+                WHERE h.is_current AND {key_join('h', 'c', key)}""",
+            f"""INSERT INTO {history} ({versioned}, valid_from, is_current)
+                SELECT {versioned}, CURRENT_TIMESTAMP, TRUE FROM scd_changes""",
+            f"""INSERT INTO {table} ({', '.join(members)}, row_hash)
+                SELECT {', '.join(members)}, row_hash FROM scd_changes
+                ON CONFLICT ({', '.join(key)}) DO UPDATE SET {upserts}""",
+        ]
+
+        if type1:
+            differs = " OR ".join(f"d.{column} IS DISTINCT FROM s.{column}" for column in type1)
+            statements.append(f"""UPDATE {table} d
+                SET {', '.join(f'{column} = s.{column}' for column in type1)}
+                FROM scd_stage s
+                WHERE {key_join('d', 's', key)} AND ({differs})""")
+
+        return statements
+
+    @log_execution_time
+    def load(self, dimension: str) -> Dict[str, int]:
+        """
+        Apply the staged members of a dimension (one transaction).
+
+        Args:
+            dimension: Dimension name (a key of SCD2_DIMENSIONS)
+
+        Returns:
+            dict: new, changed and type1_updated member counts
+        """
+        from sqlalchemy import text
+
+        self.ensure(dimension)
+
+        with self.loader.engine.begin() as conn:
+            for statement in self.statements(dimension):
+                result = conn.execute(text(statement))
+            # The type 1 update (if any) is the last statement
+            type1_updated = result.rowcount if SCD2_DIMENSIONS[dimension]["type1"] else 0
+            new, changed = conn.execute(text(
+                "SELECT COUNT(*) FILTER (WHERE is_new), COUNT(*) FILTER (WHERE NOT is_new) FROM scd_changes"
+            )).one()
+
+        counts = {"new": int(new), "changed": int(changed), "type1_updated": int(type1_updated)}
+        self.logger.info(
+            f"{self.schema}.{dimension}: {counts['new']:,} new, {counts['changed']:,} changed "
+            f"(versioned), {counts['type1_updated']:,} type 1 updates"
+        )
+        return counts
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Power BI Semantic Model Generator
+==================================================
+
+Writes the TMDL definition of the Power BI semantic model (tables,
+relationships, measures, storage modes and aggregations) from the live
+``dw`` catalog, so the model follows the warehouse instead of drifting
+from it.
+
+- Tables are the ``dim_*`` and ``fact_*`` tables of the schema (type 2
+  history tables excluded); columns and their types come from
+  information_schema.
+- Relationships come from declared foreign keys; where there are none, a
+  fact column named like a dimension's key (its primary key, or its first
+  column) is related to it.
+- Storage modes follow the catalog row estimates: facts of
+  semantic_directquery_min_rows rows or more are DirectQuery, the
+  dimensions they use are Dual, everything else is Import. Aggregation
+  tables are added in Import mode for DirectQuery facts when they are at
+  most semantic_aggregation_max_ratio of the detail rows.
+- Lineage tags are derived from names, so regenerating the model does not
+  change the files of unchanged tables.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import re
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin, log_execution_time
+
+if TYPE_CHECKING:
+    from src.etl.load import DataLoader
+
+
+IMPORT = "import"
+DIRECT_QUERY = "directQuery"
+DUAL = "dual"
+
+# Namespace of the generated lineage tags
+LINEAGE_NAMESPACE = uuid.UUID("6f1d6c2e-54a3-4c8e-9d43-1b7e2f0c9a10")
+
+COLUMNS_SQL = """
+    SELECT c.table_name, c.column_name, c.data_type, c.ordinal_position
+    FROM information_schema.columns c
+    JOIN information_schema.tables t
+      ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+    WHERE c.table_schema = :schema
+      AND t.table_type = 'BASE TABLE'
+    ORDER BY c.table_name, c.ordinal_position
+"""
+
+# Primary keys and foreign keys (referenced_* set for foreign keys only)
+KEYS_SQL = """
+    SELECT tc.table_name, tc.constraint_name, tc.constraint_type, kcu.column_name,
+           ccu.table_name as referenced_table, ccu.column_name as referenced_column
+    FROM information_schema.table_constraints tc
+    JOIN information_schema.key_column_usage kcu
+      ON kcu.constraint_schema = tc.constraint_schema AND kcu.constraint_name = tc.constraint_name
+    LEFT JOIN information_schema.constraint_column_usage ccu
+      ON tc.constraint_type = 'FOREIGN KEY'
+     AND ccu.constraint_schema = tc.constraint_schema AND ccu.constraint_name = tc.constraint_name
+    WHERE tc.table_schema = :schema
+      AND tc.constraint_type IN ('PRIMARY KEY', 'FOREIGN KEY')
+"""
+
+# PostgreSQL data type -> TMDL data type (anything else is a string)
+DATA_TYPES = {
+    "smallint": "int64",
+    "integer": "int64",
+    "bigint": "int64",
+    "numeric": "decimal",
+    "real": "double",
+    "double precision": "double",
+    "boolean": "boolean",
+    "date": "dateTime",
+    "timestamp without time zone": "dateTime",
+    "timestamp with time zone": "dateTime",
+}
+NUMERIC_TYPES = {"int64", "decimal", "double"}
+
+# Measures of fact_orders: name -> (DAX expression, format string, columns used).
+# Filters only use columns an aggregation table can group by, so the
+# measures are answered from aggregations when the model has them.
+MEASURES = {
+    "Sales": ("SUM(fact_orders[sales])", "#,0.00", ["sales"]),
+    "Order Items": ("COUNTROWS(fact_orders)", "#,0", []),
+    "Late Items": (
+        "CALCULATE(COUNTROWS(fact_orders), fact_orders[is_late] = TRUE())", "#,0", ["is_late"]
+    ),
+    "Active Items": (
+        "CALCULATE(COUNTROWS(fact_orders), fact_orders[is_canceled] = FALSE())", "#,0", ["is_canceled"]
+    ),
+    "OTIF Items": (
+        "CALCULATE(COUNTROWS(fact_orders), fact_orders[is_canceled] = FALSE(), "
+        "fact_orders[is_late] = FALSE(), fact_orders[is_complete] = TRUE())",
+        "#,0",
+        ["is_canceled", "is_late", "is_complete"],
+    ),
+    "OTIF %": ("DIVIDE([OTIF Items], [Active Items])", "0.00%", ["is_canceled", "is_late", "is_complete"]),
+    "Late Rate %": ("DIVIDE([Late Items], [Order Items])", "0.00%", ["is_late"]),
+    "Revenue at Risk": ("CALCULATE([Sales], fact_orders[is_late] = TRUE())", "#,0.00", ["sales", "is_late"]),
+}
+MEASURE_TABLE = "fact_orders"
+
+
+def lineage_tag(*parts: str) -> str:
+    """Stable lineage tag for a model object."""
+    return str(uuid.uuid5(LINEAGE_NAMESPACE, "/".join(parts)))
+
+
+def tmdl_name(name: str) -> str:
+    """Quote a TMDL object name when it is not a plain identifier."""
+    if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        return name
+    return "'" + name.replace("'", "''") + "'"
+
+
+def tmdl_reference(table: str, column: Optional[str] = None) -> str:
+    """Reference to a table or table.column."""
+    return tmdl_name(table) if column is None else f"{tmdl_name(table)}.{tmdl_name(column)}"
+
+
+def is_model_table(table: str) -> bool:
+    """Whether a warehouse table belongs in the semantic model."""
+    return table.startswith(("dim_", "fact_")) and not table.endswith("_history")
+
+
+def infer_relationships(columns: pd.DataFrame, keys: pd.DataFrame, tables: List[str]) -> List[Dict[str, str]]:
+    """
+    Relate the fact tables to the dimensions.
+
+    Declared single-column foreign keys are used as they are. Fact columns
+    without one are related to the dimension whose key has the same name;
+    a dimension's key is its single-column primary key, or its first column
+    when it has none.
+
+    Args:
+        columns: COLUMNS_SQL rows
+        keys: KEYS_SQL rows
+        tables: Tables in the model
+
+    Returns:
+        list: from_table, from_column, to_table, to_column per relationship
+    """
+    dimensions = [table for table in tables if table.startswith("dim_")]
+    facts = [table for table in tables if not table.startswith("dim_")]
+
+    single = keys.groupby("constraint_name")["column_name"].transform("nunique") == 1
+    primary = keys[single & (keys["constraint_type"] == "PRIMARY KEY")]
+    foreign = keys[single & (keys["constraint_type"] == "FOREIGN KEY")]
+
+    dimension_keys = {}
+    for dimension in dimensions:
+        declared = primary.loc[primary["table_name"] == dimension, "column_name"]
+        first = columns.loc[columns["table_name"] == dimension].sort_values("ordinal_position")["column_name"]
+        if len(declared):
+            dimension_keys[dimension] = declared.iloc[0]
+        elif len(first):
+            dimension_keys[dimension] = first.iloc[0]
+
+    relationships = []
+    for fact in facts:
+        fact_columns = columns.loc[columns["table_name"] == fact].sort_values("ordinal_position")["column_name"]
+        related = set()
+        for row in foreign[foreign["table_name"] == fact].itertuples(index=False):
+            if row.referenced_table in dimension_keys and row.referenced_table not in related:
+                relationships.append({
+                    "from_table": fact, "from_column": row.column_name,
+                    "to_table": row.referenced_table, "to_column": row.referenced_column,
+                })
+                related.add(row.referenced_table)
+        for dimension, key in dimension_keys.items():
+            if dimension not in related and key in set(fact_columns):
+                relationships.append({
+                    "from_table": fact, "from_column": key, "to_table": dimension, "to_column": key,
+                })
+    return relationships
+
+
+def choose_storage_modes(
+    sizes: Dict[str, Optional[int]],
+    relationships: List[Dict[str, str]],
+    aggregations: Dict[str, dict],
+    directquery_min_rows: int,
+    aggregation_max_ratio: float
+) -> Dict[str, str]:
+    """
+    Pick the storage mode of every table from its size.
+
+    Facts of directquery_min_rows rows or more are DirectQuery and the
+    dimensions related to them Dual, so they can answer queries both with
+    the DirectQuery facts and with in-memory tables. An aggregation table
+    is kept (Import) when its detail table is DirectQuery and it has at
+    most aggregation_max_ratio of the detail rows; otherwise it is left out.
+
+    Args:
+        sizes: Estimated rows per table (None when unknown)
+        relationships: infer_relationships output
+        aggregations: Aggregation table -> spec with its "detail" table
+        directquery_min_rows: Fact rows from which DirectQuery is used
+        aggregation_max_ratio: Largest useful aggregation/detail row ratio
+
+    Returns:
+        dict: Table -> import, directQuery or dual (tables left out are absent)
+    """
+    rows = {table: size or 0 for table, size in sizes.items()}
+    modes = {}
+    for table in rows:
+        if table in aggregations or table.startswith("dim_"):
+            continue
+        modes[table] = DIRECT_QUERY if rows[table] >= directquery_min_rows else IMPORT
+
+    for table in rows:
+        if table.startswith("dim_"):
+            direct = any(
+                relationship["to_table"] == table and modes.get(relationship["from_table"]) == DIRECT_QUERY
+                for relationship in relationships
+            )
+            modes[table] = DUAL if direct else IMPORT
+
+    for table, spec in aggregations.items():
+        detail = spec["detail"]
+        if table in rows and modes.get(detail) == DIRECT_QUERY and rows[table] <= rows[detail] * aggregation_max_ratio:
+            modes[table] = IMPORT
+    return modes
+
+
+def render_partition(table: str, schema: str, mode: str) -> List[str]:
+    """M partition reading a warehouse table through the connection parameters."""
+    return [
+        f"\tpartition {tmdl_name(table)} = m",
+        f"\t\tmode: {mode}",
+        "\t\tsource =",
+        "\t\t\t\tlet",
+        "\t\t\t\t    Source = PostgreSQL.Database(PostgresServer, PostgresDatabase),",
+        f'\t\t\t\t    Data = Source{{[Schema="{schema}", Item="{table}"]}}[Data]',
+        "\t\t\t\tin",
+        "\t\t\t\t    Data",
+        "",
+    ]
+
+
+def render_table(
+    table: str,
+    columns: pd.DataFrame,
+    schema: str,
+    mode: str,
+    key_columns: set,
+    aggregation: Optional[dict] = None
+) -> str:
+    """
+    Render the TMDL file of one table.
+
+    Args:
+        table: Table name
+        columns: Its COLUMNS_SQL rows
+        schema: Warehouse schema
+        mode: Storage mode
+        key_columns: Columns used by relationships (hidden in facts, never summarized)
+        aggregation: Aggregation spec when the table is an aggregation table
+
+    Returns:
+        str: TMDL text
+    """
+    names = list(columns["column_name"])
+    is_dimension = table.startswith("dim_")
+    is_date = table == "dim_date" and "full_date" in names
+
+    lines = [f"table {tmdl_name(table)}", f"\tlineageTag: {lineage_tag(table)}"]
+    if aggregation:
+        lines.append("\tisHidden")
+    if is_date:
+        lines.append("\tdataCategory: Time")
+    lines.append("")
+
+    if table == MEASURE_TABLE:
+        for name, (expression, format_string, needed) in MEASURES.items():
+            if set(needed) <= set(names):
+                lines += [
+                    f"\tmeasure {tmdl_name(name)} = {expression}",
+                    f"\t\tformatString: {format_string}",
+                    f"\t\tlineageTag: {lineage_tag(table, 'measure', name)}",
+                    "",
+                ]
+
+    for row in columns.itertuples(index=False):
+        column = row.column_name
+        data_type = DATA_TYPES.get(row.data_type, "string")
+        is_key = column in key_columns or column.endswith(("_id", "_key"))
+        summarize = "sum" if data_type in NUMERIC_TYPES and not is_key and not is_dimension else "none"
+
+        lines.append(f"\tcolumn {tmdl_name(column)}")
+        lines.append(f"\t\tdataType: {data_type}")
+        if data_type == "int64":
+            lines.append("\t\tformatString: 0")
+        elif data_type == "dateTime":
+            lines.append("\t\tformatString: Long Date")
+        if is_date and column == "full_date":
+            lines.append("\t\tisKey")
+        if not is_dimension and column in key_columns:
+            lines.append("\t\tisHidden")
+        lines += [
+            f"\t\tlineageTag: {lineage_tag(table, column)}",
+            f"\t\tsummarizeBy: {summarize}",
+            f"\t\tsourceColumn: {column}",
+        ]
+        if aggregation and column in aggregation["columns"]:
+            summarization, base = aggregation["columns"][column]
+            base_table, _, base_column = base.partition(".")
+            reference = f"baseColumn: {tmdl_reference(base_table, base_column)}" if base_column \
+                else f"baseTable: {tmdl_reference(base_table)}"
+            lines += ["", "\t\talternateOf", f"\t\t\t{reference}", f"\t\t\tsummarization: {summarization}"]
+        lines += ["", "\t\tannotation SummarizationSetBy = Automatic", ""]
+
+    lines += render_partition(table, schema, mode)
+    lines += ["\tannotation PBI_ResultType = Table", ""]
+    return "\n".join(lines)
+
+
+def render_relationships(relationships: List[Dict[str, str]]) -> str:
+    """Render relationships.tmdl."""
+    lines = []
+    for relationship in relationships:
+        source = tmdl_reference(relationship["from_table"], relationship["from_column"])
+        target = tmdl_reference(relationship["to_table"], relationship["to_column"])
+        lines += [
+            f"relationship {lineage_tag('relationship', source, target)}",
+            f"\tfromColumn: {source}",
+            f"\ttoColumn: {target}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def render_expressions(server: str, database: str) -> str:
+    """Render expressions.tmdl with the PostgreSQL connection parameters."""
+    lines = []
+    for name, value in (("PostgresServer", server), ("PostgresDatabase", database)):
+        lines += [
+            f'expression {name} = "{value}" meta [IsParameterQuery=true, Type="Text", IsParameterQueryRequired=true]',
+            f"\tlineageTag: {lineage_tag('expression', name)}",
+            "",
+            "\tannotation PBI_ResultType = Text",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def render_model(tables: List[str]) -> str:
+    """Render model.tmdl referencing the generated tables."""
+    query_order = ",".join(f'"{table}"' for table in tables)
+    lines = [
+        "model Model",
+        "\tculture: es-ES",
+        "\tdefaultPowerBIDataSourceVersion: powerBI_V3",
+        "\tdiscourageImplicitMeasures",
+        "\tsourceQueryCulture: es-CO",
+        "\tdataAccessOptions",
+        "\t\tlegacyRedirects",
+        "\t\treturnErrorValuesAsNull",
+        "",
+        # dim_date is marked as the date table, so no auto date tables
+        "annotation __PBI_TimeIntelligenceEnabled = 0",
+        "",
+        f"annotation PBI_QueryOrder = [{query_order}]",
+        "",
+        'annotation PBI_ProTooling = ["DevMode"]',
+        "",
+    ]
+    lines += [f"ref table {tmdl_name(table)}" for table in tables]
+    lines += ["", "ref cultureInfo es-ES", ""]
+    return "\n".join(lines)
+
+
+class SemanticModelGenerator(LoggerMixin):
+    """
+    Generates the TMDL semantic model from the warehouse catalog.
+    """
+
+    def __init__(
+        self,
+        loader: "DataLoader",
+        schema: str = "dw",
+        output_dir: Optional[Path] = None,
+        aggregations: Optional[Dict[str, dict]] = None
+    ):
+        """
+        Initialize SemanticModelGenerator.
+
+        Args:
+            loader: DataLoader instance
+            schema: Warehouse schema described by the model
+            output_dir: TMDL definition folder (default: from settings)
+            aggregations: Aggregation table -> {"detail": table, "columns":
+                {column: (summarization, "table.column" or "table")}}
+                (default: the pipeline's aggregation tables)
+        """
+        from src.etl.aggregates import semantic_aggregations
+
+        self.settings = get_settings()
+        self.loader = loader
+        self.schema = schema
+        self.output_dir = Path(output_dir or self.settings.semantic_model_dir)
+        self.aggregations = semantic_aggregations() if aggregations is None else aggregations
+
+    def catalog(self) -> Dict[str, pd.DataFrame]:
+        """Read the columns and keys of the schema."""
+        params = {"schema": self.schema}
+        return {
+            "columns": self.loader.execute_query(COLUMNS_SQL, params=params),
+            "keys": self.loader.execute_query(KEYS_SQL, params=params),
+        }
+
+    def plan(self) -> dict:
+        """
+        Decide the tables, relationships and storage modes of the model.
+
+        Returns:
+            dict: columns, tables (ordered), sizes, modes and relationships
+        """
+        catalog = self.catalog()
+        columns = catalog["columns"]
+        candidates = [
+            table for table in columns["table_name"].unique()
+            if is_model_table(table) or table in self.aggregations
+        ]
+        sizes = self.loader.row_counts.estimate(candidates, schema=self.schema)
+
+        detail_tables = [table for table in candidates if table not in self.aggregations]
+        relationships = infer_relationships(columns, catalog["keys"], detail_tables)
+        modes = choose_storage_modes(
+            sizes,
+            relationships,
+            self.aggregations,
+            self.settings.semantic_directquery_min_rows,
+            self.settings.semantic_aggregation_max_ratio,
+        )
+
+        tables = sorted(modes, key=lambda table: (
+            0 if table.startswith("dim_") else 2 if table in self.aggregations else 1, table
+        ))
+        return {
+            "columns": columns,
+            "tables": tables,
+            "sizes": sizes,
+            "modes": modes,
+            "relationships": relationships,
+        }
+
+    def render(self, plan: dict) -> Dict[str, str]:
+        """
+        Render the definition files of a plan.
+
+        Args:
+            plan: Output of plan()
+
+        Returns:
+            dict: Path relative to the definition folder -> TMDL text
+        """
+        columns = plan["columns"]
+        key_columns = {}
+        for relationship in plan["relationships"]:
+            key_columns.setdefault(relationship["from_table"], set()).add(relationship["from_column"])
+            key_columns.setdefault(relationship["to_table"], set()).add(relationship["to_column"])
+
+        files = {
+            "model.tmdl": render_model(plan["tables"]),
+            "relationships.tmdl": render_relationships(plan["relationships"]),
+            "expressions.tmdl": render_expressions(
+                f"{self.settings.postgres_host}:{self.settings.postgres_port}", self.settings.postgres_db
+            ),
+        }
+        for table in plan["tables"]:
+            files[f"tables/{table}.tmdl"] = render_table(
+                table,
+                columns[columns["table_name"] == table],
+                self.schema,
+                plan["modes"][table],
+                key_columns.get(table, set()),
+                self.aggregations.get(table),
+            )
+        return files
+
+    @log_execution_time
+    def write(self, plan: Optional[dict] = None) -> List[Path]:
+        """
+        Write the model, replacing table files that are no longer generated.
+
+        Args:
+            plan: Output of plan() (default: planned from the catalog)
+
+        Returns:
+            list: Written files
+        """
+        plan = plan or self.plan()
+        files = self.render(plan)
+
+        tables_dir = self.output_dir / "tables"
+        tables_dir.mkdir(parents=True, exist_ok=True)
+        for stale in sorted(tables_dir.glob("*.tmdl")):
+            if f"tables/{stale.name}" not in files:
+                self.logger.info(f"Removing {stale.name} (not in the warehouse)")
+                stale.unlink()
+
+        written = []
+        for relative, text in files.items():
+            path = self.output_dir / relative
+            path.write_text(text, encoding="utf-8")
+            written.append(path)
+
+        for table in plan["tables"]:
+            self.logger.info(f"  {table}: {plan['modes'][table]} ({plan['sizes'].get(table) or 0:,} rows)")
+        self.logger.info(
+            f"Semantic model written to {self.output_dir}: {len(plan['tables'])} tables, "
+            f"{len(plan['relationships'])} relationships"
+        )
+        return written
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Parquet Staging Cache
+======================================
+
+Content-hash keyed Parquet cache of the sanitized raw CSV. The first parse
+writes the typed frame to data/interim; later extractions of an unchanged
+file memory-map the cached columns instead of re-parsing ~95 MB of Latin-1
+text, and can project only the columns a caller needs.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from src.config import get_settings
+from src.logging_config import LoggerMixin
+
+# Part of every cache key: bump it whenever the cached frames change shape
+# for the same file (column sanitizer, parsing or dtype rules), so entries
+# written by older code are never served
+CACHE_FORMAT_VERSION = 2
+
+
+@lru_cache(maxsize=1)
+def _arrow():
+    """Import pyarrow on first use (it is optional and slow to import)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # pragma: no cover - optional dependency
+        return None, None
+    return pa, pq
+
+
+def file_digest(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Compute the BLAKE2b digest of a file's contents.
+
+    Args:
+        file_path: Path to file
+        block_size: Bytes read per block
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParquetStagingCache(LoggerMixin):
+    """
+    Parquet cache of sanitized CSV extracts, keyed by file content.
+
+    Digests are remembered per (path, size, mtime) in index.json, so an
+    unchanged file is only hashed once.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize ParquetStagingCache.
+
+        Args:
+            cache_dir: Cache directory (default: data/interim)
+        """
+        self.settings = get_settings()
+        self.cache_dir = Path(cache_dir or self.settings.data_interim_dir)
+        self.index_path = self.cache_dir / "index.json"
+
+    @property
+    def available(self) -> bool:
+        """Check whether pyarrow is installed."""
+        return _arrow()[1] is not None
+
+    def _read_index(self) -> dict:
+        """Read the digest index (empty if missing or corrupt)."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _digest(self, csv_path: str) -> str:
+        """
+        Get the content digest of a file, hashing only when it changed.
+
+        Args:
+            csv_path: Absolute path to the CSV file
+
+        Returns:
+            str: Hex digest
+        """
+        stat = os.stat(csv_path)
+        index = self._read_index()
+        entry = index.get(csv_path)
+
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["digest"]
+
+        digest = file_digest(csv_path)
+        index[csv_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+        return digest
+
+    def key(self, csv_path: str, encoding: str) -> str:
+        """
+        Build the cache key for a CSV file.
+
+        Args:
+            csv_path: Absolute path to the CSV file
+            encoding: Encoding used to parse it
+
+        Returns:
+            str: Cache key (file stem, content digest, encoding and cache format version)
+        """
+        encoding_slug = encoding.lower().replace("-", "").replace("_", "")
+        return f"{Path(csv_path).stem}-{self._digest(csv_path)}-{encoding_slug}-v{CACHE_FORMAT_VERSION}"
+
+    @staticmethod
+    def stem_of(key: str) -> str:
+        """Get the file stem of a cache key (stems may contain dashes themselves)."""
+        return key.rsplit("-", 3)[0]
+
+    def path_for(self, key: str) -> Path:
+        """Get the Parquet file path for a cache key."""
+        return self.cache_dir / f"{key}.parquet"
+
+    def load(self, key: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load a cached frame, memory-mapping only the requested columns.
+
+        Args:
+            key: Cache key
+            columns: Columns to read (default: all)
+
+        Returns:
+            pd.DataFrame: Cached frame, or None on a cache miss
+        """
+        path = self.path_for(key)
+        if not self.available or not path.exists():
+            return None
+
+        _, pq = _arrow()
+        table = pq.read_table(path, columns=columns, memory_map=True)
+        self.logger.info(f"Staging cache hit: {path.name} ({table.num_rows:,} rows)")
+        return table.to_pandas()
+
+    def iter_chunks(
+        self,
+        key: str,
+        chunksize: int,
+        skip_rows: int = 0,
+        columns: Optional[List[str]] = None
+    ) -> Optional[Iterator[pd.DataFrame]]:
+        """
+        Stream a cached frame in chunks.
+
+        Args:
+            key: Cache key
+            chunksize: Rows per chunk
+            skip_rows: Rows to skip from the start
+            columns: Columns to read (default: all)
+
+        Returns:
+            Iterator[pd.DataFrame]: Chunk iterator, or None on a cache miss
+        """
+        path = self.path_for(key)
+        if not self.available or not path.exists():
+            return None
+
+        self.logger.info(f"Staging cache hit: {path.name} (streaming {chunksize:,}-row chunks)")
+
+        def chunks() -> Iterator[pd.DataFrame]:
+            _, pq = _arrow()
+            table = pq.read_table(path, columns=columns, memory_map=True)
+            for start in range(skip_rows, table.num_rows, chunksize):
+                yield table.slice(start, chunksize).to_pandas()
+
+        return chunks()
+
+    def _purge_stale(self, key: str) -> None:
+        """Remove cached versions of the same file with another digest or format."""
+        stem = self.stem_of(key)
+        for path in self.cache_dir.glob(f"{stem}-*.parquet"):
+            # orders-*.parquet also matches the cache of orders-2023.csv
+            if path.stem != key and self.stem_of(path.stem) == stem:
+                path.unlink(missing_ok=True)
+                self.logger.debug(f"Removed stale staging cache: {path.name}")
+
+    def store(self, key: str, df: pd.DataFrame) -> Optional[Path]:
+        """
+        Write a frame to the cache.
+
+        Args:
+            key: Cache key
+            df: Sanitized, typed frame
+
+        Returns:
+            Path: Cached file, or None if the frame could not be cached
+        """
+        if not self.available:
+            return None
+
+        pa, pq = _arrow()
+        path = self.path_for(key)
+        tmp_path = path.with_suffix(".parquet.tmp")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"Could not cache staging frame: {e}")
+            return None
+
+        os.replace(tmp_path, path)
+        self._purge_stale(key)
+        self.logger.info(f"Staging cache written: {path.name}")
+        return path
+
+    def writer(self, key: str) -> "StagingCacheWriter":
+        """
+        Open an incremental writer for a chunked parse.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            StagingCacheWriter: Writer that commits on close()
+        """
+        return StagingCacheWriter(self, key)
+
+
+class StagingCacheWriter:
+    """
+    Writes a chunked parse to the cache, one row group per chunk.
+
+    The file is only published by close(); if a chunk does not match the
+    schema of the first one the cache entry is abandoned, never half-written.
+    """
+
+    def __init__(self, cache: ParquetStagingCache, key: str):
+        """
+        Initialize StagingCacheWriter.
+
+        Args:
+            cache: Owning cache
+            key: Cache key
+        """
+        self.cache = cache
+        self.key = key
+        self.path = cache.path_for(key)
+        self.tmp_path = self.path.with_suffix(".parquet.tmp")
+        self._writer = None
+        self.failed = not cache.available
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """
+        Append a chunk.
+
+        Args:
+            chunk: Sanitized chunk
+        """
+        if self.failed:
+            return
+
+        pa, pq = _arrow()
+        try:
+            if self._writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self.cache.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(
+                    chunk, schema=self._writer.schema, preserve_index=False
+                )
+            self._writer.write_table(table)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            self.cache.logger.debug(f"Chunk does not fit the cached schema, not caching: {e}")
+            self.abort()
+
+    def abort(self) -> None:
+        """Discard the partial cache file."""
+        self.failed = True
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self.tmp_path.unlink(missing_ok=True)
+
+    def close(self) -> Optional[Path]:
+        """
+        Publish the cache file.
+
+        Returns:
+            Path: Cached file, or None if caching was abandoned
+        """
+        if self.failed or self._writer is None:
+            self.abort()
+            return None
+
+        self._writer.close()
+        self._writer = None
+        os.replace(self.tmp_path, self.path)
+        self.cache._purge_stale(self.key)
+        self.cache.logger.info(f"Staging cache written: {self.path.name}")
+        return self.path
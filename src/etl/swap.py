@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Blue/Green Schema Swap Module
+==============================================
+
+Rebuilds the star schema in a shadow schema (default: dw_next), validates it,
+and swaps the finished tables into the live schema inside one short
+transaction, so Power BI DirectQuery users never see half-built tables.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import get_settings
+from src.etl.load import DataLoader
+from src.etl.scd import HISTORY_TABLES, SCD2_DIMENSIONS, SCD2Engine
+from src.etl.transform import DataTransformer
+from src.etl.validate import DataValidator, ValidationError
+from src.logging_config import LoggerMixin, log_execution_time
+
+
+STAR_TABLES = ["dim_customer", "dim_product", "dim_geography", "dim_date", "fact_orders"]
+
+# History tables travel with their dimensions so a swap never loses versions
+SWAP_TABLES = STAR_TABLES + HISTORY_TABLES
+
+
+class SchemaSwapper(LoggerMixin):
+    """
+    Builds the star schema off-line and swaps it into the live schema.
+
+    The shadow tables are created with ``LIKE ... INCLUDING ALL`` so they keep
+    the live defaults, constraints and indexes. ``LIKE`` does not copy foreign
+    keys, so they are read from ``pg_constraint`` and recreated NOT VALID on
+    the shadow tables, then validated before the swap. The shadow tables can
+    be created UNLOGGED for a faster bulk build; they are switched to LOGGED
+    before the swap so the live tables are always crash-safe.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[DataLoader] = None,
+        live_schema: str = "dw",
+        shadow_schema: Optional[str] = None,
+        tables: Optional[List[str]] = None
+    ):
+        """
+        Initialize SchemaSwapper.
+
+        Args:
+            loader: DataLoader instance (creates new if not provided)
+            live_schema: Schema read by the dashboards
+            shadow_schema: Schema used for the rebuild (default: from settings)
+            tables: Tables to rebuild and swap (default: the star schema and its history tables)
+        """
+        self.settings = get_settings()
+        self.loader = loader or DataLoader()
+        self.live_schema = live_schema
+        self.shadow_schema = shadow_schema or self.settings.shadow_schema
+        self.retired_schema = f"{live_schema}_old"
+        self.tables = tables or list(SWAP_TABLES)
+        self.logger.info(
+            f"SchemaSwapper initialized ({self.shadow_schema} -> {self.live_schema})"
+        )
+
+    @log_execution_time
+    def prepare_shadow(self, seed_from_live: bool = True, unlogged: bool = True) -> None:
+        """
+        Create an empty (or seeded) copy of every live table in the shadow schema.
+
+        Args:
+            seed_from_live: Copy the live rows first so the incremental upserts of
+                DataTransformer keep members that are no longer in staging
+            unlogged: Create the shadow tables UNLOGGED (no WAL during the build)
+        """
+        self.logger.info(f"Preparing shadow schema {self.shadow_schema}...")
+
+        table_kind = "UNLOGGED TABLE" if unlogged else "TABLE"
+
+        # History tables are created on first use; they must exist to be cloned
+        scd = SCD2Engine(self.loader, schema=self.live_schema)
+        for dimension in SCD2_DIMENSIONS:
+            if f"{dimension}_history" in self.tables:
+                scd.ensure(dimension)
+
+        with self.loader.engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {self.shadow_schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {self.shadow_schema}"))
+
+            for table in self.tables:
+                conn.execute(text(
+                    f"CREATE {table_kind} {self.shadow_schema}.{table} "
+                    f"(LIKE {self.live_schema}.{table} INCLUDING ALL)"
+                ))
+                if seed_from_live:
+                    conn.execute(text(
+                        f"INSERT INTO {self.shadow_schema}.{table} "
+                        f"SELECT * FROM {self.live_schema}.{table}"
+                    ))
+
+            # NOT VALID skips the scan of the seeded rows; swap() validates them
+            foreign_keys = self._foreign_keys(conn)
+            for table, name, definition in foreign_keys:
+                conn.execute(text(
+                    f"ALTER TABLE {self.shadow_schema}.{table} "
+                    f"ADD CONSTRAINT {name} {definition} NOT VALID"
+                ))
+
+        self.logger.info(
+            f"✅ Shadow schema {self.shadow_schema} ready "
+            f"({len(self.tables)} tables, {len(foreign_keys)} foreign keys)"
+        )
+
+    def _foreign_keys(self, conn: Connection) -> List[Tuple[str, str, str]]:
+        """
+        Read the foreign keys of the live tables, retargeted to the shadow schema.
+
+        References to tables that are swapped too point at their shadow copy;
+        references to other tables keep pointing at the live table.
+
+        Args:
+            conn: Open connection
+
+        Returns:
+            list: (table, constraint name, constraint definition) tuples
+        """
+        query = text("""
+            SELECT
+                src.relname AS table_name,
+                c.conname AS constraint_name,
+                ref.relname AS referenced_table,
+                pg_get_constraintdef(c.oid) AS definition
+            FROM pg_constraint c
+            JOIN pg_class src ON src.oid = c.conrelid
+            JOIN pg_namespace n ON n.oid = src.relnamespace
+            JOIN pg_class ref ON ref.oid = c.confrelid
+            WHERE c.contype = 'f'
+              AND n.nspname = :schema
+              AND src.relname = ANY(:tables)
+            ORDER BY src.relname, c.conname
+        """)
+
+        rows = conn.execute(query, {"schema": self.live_schema, "tables": list(self.tables)})
+        foreign_keys = []
+        for table, name, referenced_table, definition in rows.fetchall():
+            # "FOREIGN KEY (a) REFERENCES dw.t(b) ON DELETE ..." -> retarget dw.t
+            head, tail = definition.split(" REFERENCES ", 1)
+            referenced_schema = (
+                self.shadow_schema if referenced_table in self.tables else self.live_schema
+            )
+            foreign_keys.append((
+                table,
+                name,
+                f"{head} REFERENCES {referenced_schema}.{referenced_table}{tail[tail.index('('):]}"
+            ))
+        return foreign_keys
+
+    def _unvalidated_foreign_keys(self, conn: Connection) -> List[Tuple[str, str]]:
+        """
+        List the NOT VALID foreign keys of the shadow tables.
+
+        Args:
+            conn: Open connection
+
+        Returns:
+            list: (table, constraint name) tuples
+        """
+        query = text("""
+            SELECT src.relname AS table_name, c.conname AS constraint_name
+            FROM pg_constraint c
+            JOIN pg_class src ON src.oid = c.conrelid
+            JOIN pg_namespace n ON n.oid = src.relnamespace
+            WHERE c.contype = 'f'
+              AND NOT c.convalidated
+              AND n.nspname = :schema
+            ORDER BY src.relname, c.conname
+        """)
+
+        rows = conn.execute(query, {"schema": self.shadow_schema})
+        return [(table, name) for table, name in rows.fetchall()]
+
+    def _dependent_views(self, conn: Connection) -> Dict[str, str]:
+        """
+        Collect live views that reference the tables being swapped.
+
+        Views are bound to table OIDs, so they have to be redefined after the
+        swap or they would keep pointing to the retired tables.
+
+        Args:
+            conn: Open connection inside the swap transaction
+
+        Returns:
+            dict: View name -> view definition
+        """
+        query = text("""
+            SELECT DISTINCT
+                v.oid::regclass::text AS view_name,
+                pg_get_viewdef(v.oid, true) AS definition
+            FROM pg_depend d
+            JOIN pg_rewrite r ON r.oid = d.objid
+            JOIN pg_class v ON v.oid = r.ev_class
+            JOIN pg_namespace n ON n.oid = v.relnamespace
+            WHERE d.refobjid = CAST(:table_name AS regclass)
+              AND v.oid <> d.refobjid
+              AND v.relkind = 'v'
+              AND n.nspname = :schema
+        """)
+
+        views = {}
+        for table in self.tables:
+            rows = conn.execute(
+                query,
+                {"table_name": f"{self.live_schema}.{table}", "schema": self.live_schema}
+            )
+            for view_name, definition in rows:
+                views[view_name] = definition
+        return views
+
+    def _owned_sequences(self, conn: Connection, table: str) -> List[Tuple[str, str]]:
+        """
+        List the sequences owned by a live table's columns.
+
+        ``LIKE ... INCLUDING DEFAULTS`` makes the shadow table share these
+        sequences, so they must follow it into the live schema instead of being
+        dropped together with the retired table.
+
+        Args:
+            conn: Open connection inside the swap transaction
+            table: Table name
+
+        Returns:
+            list: (sequence name, owning column) tuples
+        """
+        query = text("""
+            SELECT s.relname AS sequence_name, a.attname AS column_name
+            FROM pg_class s
+            JOIN pg_depend d
+              ON d.objid = s.oid
+             AND d.classid = 'pg_class'::regclass
+             AND d.deptype = 'a'
+            JOIN pg_attribute a
+              ON a.attrelid = d.refobjid
+             AND a.attnum = d.refobjsubid
+            WHERE s.relkind = 'S'
+              AND d.refobjid = CAST(:table_name AS regclass)
+        """)
+
+        rows = conn.execute(query, {"table_name": f"{self.live_schema}.{table}"})
+        return [(sequence_name, column_name) for sequence_name, column_name in rows.fetchall()]
+
+    @log_execution_time
+    def swap(self, keep_retired: bool = False) -> None:
+        """
+        Atomically replace the live tables with the shadow tables.
+
+        Everything runs in one transaction guarded by ``lock_timeout``: readers
+        see either the old tables or the new ones, never a mix.
+
+        Args:
+            keep_retired: Keep the previous tables in ``<live>_old`` for rollback
+        """
+        self.logger.info(f"Swapping {self.shadow_schema} into {self.live_schema}...")
+
+        # SET LOGGED rewrites the table and VALIDATE CONSTRAINT scans it, so
+        # both run before taking the swap locks. A logged table may only
+        # reference logged tables, so fact tables are switched last.
+        with self.loader.engine.begin() as conn:
+            for table in sorted(self.tables, key=lambda name: name.startswith("fact_")):
+                conn.execute(text(f"ALTER TABLE {self.shadow_schema}.{table} SET LOGGED"))
+            for table, name in self._unvalidated_foreign_keys(conn):
+                conn.execute(text(
+                    f"ALTER TABLE {self.shadow_schema}.{table} VALIDATE CONSTRAINT {name}"
+                ))
+
+        try:
+            with self.loader.engine.begin() as conn:
+                conn.execute(text(
+                    f"SET LOCAL lock_timeout = '{int(self.settings.swap_lock_timeout_ms)}ms'"
+                ))
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {self.retired_schema} CASCADE"))
+                conn.execute(text(f"CREATE SCHEMA {self.retired_schema}"))
+
+                views = self._dependent_views(conn)
+
+                for table in self.tables:
+                    sequences = self._owned_sequences(conn, table)
+
+                    # Owned sequences travel with the live table into the retired schema
+                    conn.execute(text(
+                        f"ALTER TABLE {self.live_schema}.{table} SET SCHEMA {self.retired_schema}"
+                    ))
+                    conn.execute(text(
+                        f"ALTER TABLE {self.shadow_schema}.{table} SET SCHEMA {self.live_schema}"
+                    ))
+
+                    for sequence_name, column_name in sequences:
+                        retired_sequence = f"{self.retired_schema}.{sequence_name}"
+                        conn.execute(text(f"ALTER SEQUENCE {retired_sequence} OWNED BY NONE"))
+                        conn.execute(text(
+                            f"ALTER SEQUENCE {retired_sequence} SET SCHEMA {self.live_schema}"
+                        ))
+                        conn.execute(text(
+                            f"ALTER SEQUENCE {self.live_schema}.{sequence_name} "
+                            f"OWNED BY {self.live_schema}.{table}.{column_name}"
+                        ))
+
+                for view_name, definition in views.items():
+                    conn.execute(text(f"CREATE OR REPLACE VIEW {view_name} AS {definition}"))
+
+            self.logger.info(
+                f"✅ Swap completed: {len(self.tables)} tables, {len(views)} views redefined"
+            )
+
+        except SQLAlchemyError as e:
+            self.logger.error(f"Schema swap failed (live tables untouched): {e}")
+            raise
+
+        if not keep_retired:
+            self.loader.execute_statement(f"DROP SCHEMA IF EXISTS {self.retired_schema} CASCADE")
+        self.loader.execute_statement(f"DROP SCHEMA IF EXISTS {self.shadow_schema} CASCADE")
+
+    @log_execution_time
+    def refresh(
+        self,
+        transformer: DataTransformer,
+        validator: DataValidator,
+        seed_from_live: bool = True
+    ) -> Dict[str, any]:
+        """
+        Build the star schema in the shadow schema, validate it and swap it live.
+
+        Args:
+            transformer: DataTransformer used for the build
+            validator: DataValidator used to check the shadow tables
+            seed_from_live: Seed the shadow tables with the live rows
+
+        Returns:
+            dict: Transformation row counts and the shadow validation summary
+
+        Raises:
+            ValidationError: If the shadow schema fails ERROR-level checks
+                (the live tables are left untouched)
+        """
+        self.prepare_shadow(seed_from_live=seed_from_live)
+
+        live_target = transformer.target_schema
+        transformer.target_schema = self.shadow_schema
+        try:
+            results = transformer.transform_all()
+        finally:
+            transformer.target_schema = live_target
+
+        summary = validator.validate_all(schema=self.shadow_schema)
+        if summary["errors"] > 0:
+            self.logger.error(
+                f"Shadow schema failed {summary['errors']} checks; keeping live tables"
+            )
+            raise ValidationError(
+                f"{self.shadow_schema} failed {summary['errors']} validation checks"
+            )
+
+        self.swap()
+
+        return {"tables": results, "validation": summary}
+
+
+if __name__ == "__main__":
+    # Test blue/green refresh
+    loader = DataLoader()
+    swapper = SchemaSwapper(loader=loader)
+
+    try:
+        outcome = swapper.refresh(
+            DataTransformer(loader=loader),
+            DataValidator(loader=loader)
+        )
+        print("\nBlue/green refresh completed:")
+        for table, count in outcome["tables"].items():
+            print(f"  {table}: {count:,} rows")
+    except Exception as e:
+        print(f"Blue/green refresh failed: {e}")
+    finally:
+        loader.close()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Synthetic DataCo Generator
+===========================================
+
+Generates reproducible DataCo-shaped supply chain data (same 53 raw columns,
+Latin-1 text, "m/d/Y H:M" dates) for tests and benchmarks. Cardinalities
+follow the public dataset: 5 markets, 23 regions, ~164 countries, 118
+products in 51 categories and 11 departments, ~2.75 items per order and
+one customer per ~8.7 order items.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Market -> order regions, as in the public DataCo dataset
+MARKET_REGIONS: Dict[str, List[str]] = {
+    "Africa": ["Central Africa", "East Africa", "North Africa", "Southern Africa", "West Africa"],
+    "Europe": ["Eastern Europe", "Northern Europe", "Southern Europe", "Western Europe"],
+    "LATAM": ["Caribbean", "Central America", "South America"],
+    "Pacific Asia": ["Central Asia", "Eastern Asia", "Oceania", "South Asia", "Southeast Asia", "West Asia"],
+    "USCA": ["Canada", "East of USA", "South of USA", "US Center", "West of USA"],
+}
+
+# Relative share of order items per market
+MARKET_WEIGHTS: Dict[str, float] = {
+    "Africa": 0.064, "Europe": 0.280, "LATAM": 0.285, "Pacific Asia": 0.229, "USCA": 0.142,
+}
+
+SHIPPING_MODES: Dict[str, Tuple[float, int]] = {
+    # mode: (share, scheduled days)
+    "Standard Class": (0.597, 4),
+    "Second Class": (0.195, 2),
+    "First Class": (0.154, 1),
+    "Same Day": (0.054, 0),
+}
+
+ORDER_STATUSES: Dict[str, float] = {
+    "COMPLETE": 0.330, "PENDING_PAYMENT": 0.221, "PROCESSING": 0.121, "PENDING": 0.112,
+    "CLOSED": 0.108, "ON_HOLD": 0.054, "SUSPECTED_FRAUD": 0.023, "CANCELED": 0.020,
+    "PAYMENT_REVIEW": 0.011,
+}
+
+CUSTOMER_SEGMENTS: Dict[str, float] = {"Consumer": 0.519, "Corporate": 0.303, "Home Office": 0.178}
+
+# Real DataCo customer cities include accented names, which exercise Latin-1
+CUSTOMER_CITIES = ["Caguas", "Chicago", "Los Angeles", "Brooklyn", "New York", "Philadelphia",
+                   "San Diego", "Houston", "Dallas", "San Juan", "Bayamón", "Mayagüez"]
+
+PRODUCT_COUNT = 118
+CATEGORY_COUNT = 51
+DEPARTMENT_COUNT = 11
+COUNTRY_COUNT = 164
+CITY_COUNT = 3597
+ITEMS_PER_ORDER = 2.75
+ITEMS_PER_CUSTOMER = 8.74
+
+DATE_RANGE = (pd.Timestamp("2015-01-01"), pd.Timestamp("2018-01-31 23:59"))
+
+# Raw DataCo column order
+COLUMNS = [
+    "Type", "Days for shipping (real)", "Days for shipment (scheduled)", "Benefit per order",
+    "Sales per customer", "Delivery Status", "Late_delivery_risk", "Category Id",
+    "Category Name", "Customer City", "Customer Country", "Customer Email", "Customer Fname",
+    "Customer Id", "Customer Lname", "Customer Password", "Customer Segment", "Customer State",
+    "Customer Street", "Customer Zipcode", "Department Id", "Department Name", "Latitude",
+    "Longitude", "Market", "Order City", "Order Country", "Order Customer Id",
+    "order date (DateOrders)", "Order Id", "Order Item Cardprod Id", "Order Item Discount",
+    "Order Item Discount Rate", "Order Item Id", "Order Item Product Price",
+    "Order Item Profit Ratio", "Order Item Quantity", "Sales", "Order Item Total",
+    "Order Profit Per Order", "Order Region", "Order State", "Order Status", "Order Zipcode",
+    "Product Card Id", "Product Category Id", "Product Description", "Product Image",
+    "Product Name", "Product Price", "Product Status", "shipping date (DateOrders)",
+    "Shipping Mode",
+]
+
+DATE_FORMAT = "%m/%d/%Y %H:%M"
+
+
+def _choice(rng: np.random.Generator, weights: Dict[str, float], size: int) -> np.ndarray:
+    """Draw labels with the given relative weights."""
+    labels = list(weights)
+    p = np.array([weights[label] for label in labels], dtype=float)
+    return np.array(labels, dtype=object)[rng.choice(len(labels), size=size, p=p / p.sum())]
+
+
+def _labels(template: str, count: int, start: int = 0) -> np.ndarray:
+    """Build an array of formatted labels to index into."""
+    return np.array([template.format(i + start) for i in range(count)], dtype=object)
+
+
+def _geography(seed: int) -> pd.DataFrame:
+    """Build the fixed city -> state -> country -> region -> market table."""
+    rng = np.random.default_rng(seed)
+    regions = [(market, region) for market, names in MARKET_REGIONS.items() for region in names]
+
+    # Countries are spread over regions, cities over countries
+    country_region = rng.integers(0, len(regions), COUNTRY_COUNT)
+    country_region[:len(regions)] = np.arange(len(regions))
+    city_country = rng.integers(0, COUNTRY_COUNT, CITY_COUNT)
+    city_country[:COUNTRY_COUNT] = np.arange(COUNTRY_COUNT)
+
+    region_of_city = country_region[city_country]
+    return pd.DataFrame({
+        "Market": [regions[r][0] for r in region_of_city],
+        "Order Region": [regions[r][1] for r in region_of_city],
+        "Order Country": [f"País {c:03d}" for c in city_country],
+        "Order State": [f"Estado {c:03d}-{i % 12:02d}" for i, c in enumerate(city_country)],
+        "Order City": [f"Ciudad {i:04d}" for i in range(CITY_COUNT)],
+    })
+
+
+def _products(seed: int) -> pd.DataFrame:
+    """Build the fixed product catalogue."""
+    rng = np.random.default_rng(seed)
+    category = rng.integers(2, 2 + CATEGORY_COUNT, PRODUCT_COUNT)
+    category[:CATEGORY_COUNT] = np.arange(2, 2 + CATEGORY_COUNT)
+    product_ids = np.sort(rng.choice(np.arange(19, 1400), PRODUCT_COUNT, replace=False))
+    return pd.DataFrame({
+        "Product Card Id": product_ids,
+        "Category Id": category,
+        "Category Name": [f"Category {c:02d}" for c in category],
+        "Department Id": category % DEPARTMENT_COUNT + 2,
+        "Department Name": [f"Department {c % DEPARTMENT_COUNT + 2:02d}" for c in category],
+        "Product Name": [f"Product {p}" for p in product_ids],
+        "Product Image": [f"http://images.example.com/{p}.jpg" for p in product_ids],
+        "Product Price": np.round(rng.lognormal(4.3, 0.9, PRODUCT_COUNT), 2),
+        # A few best sellers carry most of the volume
+        "popularity": rng.pareto(1.2, PRODUCT_COUNT) + 0.05,
+    })
+
+
+def generate_dataco_frame(
+    rows: int,
+    seed: int = 42,
+    first_item_id: int = 1,
+    total_rows: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Generate DataCo-shaped order items.
+
+    The geography and product catalogue depend only on ``seed``, so chunks
+    generated with consecutive ``first_item_id`` values share dimensions and
+    can be concatenated into one dataset. Chunks should start on an order
+    boundary (``first_item_id - 1`` a multiple of 11).
+
+    Args:
+        rows: Number of order items
+        seed: Random seed
+        first_item_id: Order Item Id of the first row
+        total_rows: Size of the whole dataset when generating a chunk
+            (sets the customer count; default: this frame)
+
+    Returns:
+        pd.DataFrame: Frame with the 53 raw DataCo columns
+    """
+    rng = np.random.default_rng([seed, first_item_id])
+    geography = _geography(seed)
+    products = _products(seed)
+
+    # Orders and customers scale with the number of items, and ids are
+    # derived from item ids so chunks of one dataset do not collide
+    item_ids = np.arange(first_item_id, first_item_id + rows)
+    order_ids = (item_ids - 1) // ITEMS_PER_ORDER + 1
+    order_ids = order_ids.astype(np.int64)
+    dataset_rows = total_rows or first_item_id - 1 + rows
+    customer_pool = max(50, int(dataset_rows / ITEMS_PER_CUSTOMER))
+    order_customer = (order_ids * 2654435761 % customer_pool + 1).astype(np.int64)
+
+    # Order-level attributes are drawn once per order and broadcast to its items
+    unique_orders, item_order = np.unique(order_ids, return_inverse=True)
+    n_orders = len(unique_orders)
+    order_market = _choice(rng, MARKET_WEIGHTS, n_orders)
+    order_city = np.empty(n_orders, dtype=np.int64)
+    for market in MARKET_REGIONS:
+        in_market = order_market == market
+        cities = np.flatnonzero(geography["Market"].to_numpy() == market)
+        order_city[in_market] = rng.choice(cities, in_market.sum())
+    span = (DATE_RANGE[1] - DATE_RANGE[0]).total_seconds() // 60
+    order_date = DATE_RANGE[0] + pd.to_timedelta(rng.integers(0, span, n_orders), unit="min")
+    shipping_mode = _choice(rng, {mode: share for mode, (share, _) in SHIPPING_MODES.items()}, n_orders)
+    scheduled = np.array([SHIPPING_MODES[mode][1] for mode in shipping_mode])
+    real = np.clip(scheduled + rng.integers(-1, 3, n_orders), 0, 6)
+    status = _choice(rng, ORDER_STATUSES, n_orders)
+    payment = _choice(rng, {"DEBIT": 0.384, "TRANSFER": 0.276, "PAYMENT": 0.231, "CASH": 0.109}, n_orders)
+
+    geo = geography.iloc[order_city[item_order]].reset_index(drop=True)
+    product_p = products["popularity"].to_numpy()
+    product = products.iloc[rng.choice(PRODUCT_COUNT, rows, p=product_p / product_p.sum())].reset_index(drop=True)
+
+    quantity = rng.choice([1, 1, 1, 1, 2, 3, 4, 5], rows)
+    price = product["Product Price"].to_numpy()
+    sales = np.round(price * quantity, 2)
+    discount_rate = rng.choice([0.0, 0.01, 0.02, 0.03, 0.04, 0.05, 0.06, 0.07, 0.09, 0.1,
+                                0.12, 0.13, 0.15, 0.16, 0.17, 0.18, 0.2, 0.25], rows)
+    discount = np.round(sales * discount_rate, 2)
+    total = np.round(sales - discount, 2)
+    profit_ratio = np.round(np.clip(rng.normal(0.12, 0.45, rows), -2.75, 0.5), 2)
+    profit = np.round(total * profit_ratio, 2)
+
+    days_real = real[item_order]
+    days_scheduled = scheduled[item_order]
+    item_status = status[item_order]
+    late = days_real > days_scheduled
+    delivery_status = np.where(
+        item_status == "CANCELED", "Shipping canceled",
+        np.where(late, "Late delivery",
+                 np.where(days_real < days_scheduled, "Advance shipping", "Shipping on time"))
+    )
+    # Format once per order, not once per item
+    order_date_text = np.asarray(order_date.strftime(DATE_FORMAT), dtype=object)[item_order]
+    ship_date_text = np.asarray(
+        (order_date + pd.to_timedelta(real, unit="D")).strftime(DATE_FORMAT), dtype=object
+    )[item_order]
+
+    customer = order_customer
+    customer_city = np.array(CUSTOMER_CITIES, dtype=object)[customer % len(CUSTOMER_CITIES)]
+    segment_keys = list(CUSTOMER_SEGMENTS)
+    segment_cut = np.cumsum([CUSTOMER_SEGMENTS[s] for s in segment_keys])
+    customer_segment = np.array(segment_keys, dtype=object)[
+        np.searchsorted(segment_cut, (customer * 0.6180339887) % 1.0)
+    ]
+
+    df = pd.DataFrame({
+        "Type": payment[item_order],
+        "Days for shipping (real)": days_real,
+        "Days for shipment (scheduled)": days_scheduled,
+        "Benefit per order": profit,
+        "Sales per customer": total,
+        "Delivery Status": delivery_status,
+        "Late_delivery_risk": late.astype(np.int64),
+        "Category Id": product["Category Id"],
+        "Category Name": product["Category Name"],
+        "Customer City": customer_city,
+        "Customer Country": np.where(customer_city == "Caguas", "Puerto Rico", "EE. UU."),
+        "Customer Email": "XXXXXXXXX",
+        "Customer Fname": _labels("Nombre{}", 782)[customer % 782],
+        "Customer Id": customer,
+        "Customer Lname": _labels("Apellido{}", 1109)[customer % 1109],
+        "Customer Password": "XXXXXXXXX",
+        "Customer Segment": customer_segment,
+        "Customer State": np.where(customer_city == "Caguas", "PR", "CA"),
+        "Customer Street": _labels("{} Calle Mayor", 9000, start=100)[customer % 9000],
+        "Customer Zipcode": (customer * 7919 % 90000 + 725).astype(np.int64),
+        "Department Id": product["Department Id"],
+        "Department Name": product["Department Name"],
+        "Latitude": np.round(18.0 + (customer % 2500) / 100.0, 6),
+        "Longitude": np.round(-66.0 - (customer % 5000) / 100.0, 6),
+        "Market": geo["Market"],
+        "Order City": geo["Order City"],
+        "Order Country": geo["Order Country"],
+        "Order Customer Id": customer,
+        "order date (DateOrders)": order_date_text,
+        "Order Id": order_ids,
+        "Order Item Cardprod Id": product["Product Card Id"],
+        "Order Item Discount": discount,
+        "Order Item Discount Rate": discount_rate,
+        "Order Item Id": item_ids,
+        "Order Item Product Price": price,
+        "Order Item Profit Ratio": profit_ratio,
+        "Order Item Quantity": quantity,
+        "Sales": sales,
+        "Order Item Total": total,
+        "Order Profit Per Order": profit,
+        "Order Region": geo["Order Region"],
+        "Order State": geo["Order State"],
+        "Order Status": item_status,
+        "Order Zipcode": np.where(geo["Market"] == "USCA", customer % 90000 + 10000, np.nan),
+        "Product Card Id": product["Product Card Id"],
+        "Product Category Id": product["Category Id"],
+        "Product Description": np.nan,
+        "Product Image": product["Product Image"],
+        "Product Name": product["Product Name"],
+        "Product Price": price,
+        "Product Status": 0,
+        "shipping date (DateOrders)": ship_date_text,
+        "Shipping Mode": shipping_mode[item_order],
+    })
+
+    return df[COLUMNS]
+
+
+def write_dataco_csv(
+    file_path: str,
+    rows: int,
+    seed: int = 42,
+    chunk_rows: int = 500000
+) -> Path:
+    """
+    Write a synthetic DataCo CSV in bounded memory.
+
+    The file is Latin-1 encoded like the real dataset and identical for the
+    same ``rows``, ``seed`` and ``chunk_rows``.
+
+    Args:
+        file_path: Output CSV path
+        rows: Number of order items
+        seed: Random seed
+        chunk_rows: Rows generated and written per chunk (rounded down to
+            whole orders)
+
+    Returns:
+        Path: Written file
+    """
+    # 11 items = 4 orders, so chunks never split an order
+    chunk_rows = max(11, chunk_rows - chunk_rows % 11)
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w", encoding="ISO-8859-1", newline="") as f:
+        for start in range(0, rows, chunk_rows):
+            chunk = generate_dataco_frame(
+                min(chunk_rows, rows - start),
+                seed=seed,
+                first_item_id=start + 1,
+                total_rows=rows
+            )
+            chunk.to_csv(f, index=False, header=start == 0)
+
+    return path
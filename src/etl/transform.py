@@ -15,10 +15,104 @@ import pandas as pd
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.config import get_settings
+from src.etl.date_dimension import CalendarDimension, DateLike
 from src.etl.load import DataLoader
+from src.etl.scd import SCD2Engine
 from src.logging_config import LoggerMixin, log_execution_time
 
 
+FACT_ORDERS_SQL = """
+    INSERT INTO {schema}.fact_orders (
+        order_id,
+        order_item_id,
+        customer_id,
+        product_card_id,
+        date_key,
+        geography_key,
+        sales,
+        order_item_quantity,
+        order_item_total,
+        order_item_discount,
+        order_item_discount_rate,
+        order_item_profit_ratio,
+        benefit_per_order,
+        days_for_shipment_scheduled,
+        days_for_shipping_real,
+        delivery_status,
+        late_delivery_risk,
+        order_status,
+        shipping_mode,
+        -- Calculated columns
+        is_late,
+        delay_days,
+        is_complete,
+        is_canceled,
+        is_fraud_suspect
+    )
+    SELECT 
+        order_id,
+        order_item_id,
+        customer_id,
+        product_card_id,
+        TO_CHAR(order_date_dateorders, 'YYYYMMDD')::INTEGER as date_key,
+        MD5(CONCAT(
+            COALESCE(market, ''), '|',
+            COALESCE(order_region, ''), '|',
+            COALESCE(order_country, ''), '|',
+            COALESCE(order_state, ''), '|',
+            COALESCE(order_city, '')
+        )) as geography_key,
+        sales,
+        order_item_quantity,
+        order_item_total,
+        order_item_discount,
+        order_item_discount_rate,
+        order_item_profit_ratio,
+        benefit_per_order,
+        days_for_shipment_scheduled,
+        days_for_shipping_real,
+        delivery_status,
+        late_delivery_risk,
+        order_status,
+        shipping_mode,
+        -- Calculated columns
+        CASE 
+            WHEN days_for_shipping_real > days_for_shipment_scheduled THEN TRUE 
+            ELSE FALSE 
+        END as is_late,
+        GREATEST(0, days_for_shipping_real - days_for_shipment_scheduled) as delay_days,
+        CASE 
+            WHEN UPPER(delivery_status) LIKE '%COMPLETE%' THEN TRUE 
+            ELSE FALSE 
+        END as is_complete,
+        CASE 
+            WHEN UPPER(order_status) LIKE '%CANCEL%' THEN TRUE 
+            ELSE FALSE 
+        END as is_canceled,
+        CASE 
+            WHEN UPPER(order_status) LIKE '%FRAUD%' 
+                 OR UPPER(delivery_status) LIKE '%SUSPECT%'
+                 OR order_item_discount_rate > 50 
+            THEN TRUE 
+            ELSE FALSE 
+        END as is_fraud_suspect
+    FROM dw.stg_raw_orders
+    WHERE order_id IS NOT NULL 
+      AND order_item_id IS NOT NULL
+    ON CONFLICT (order_id, order_item_id) DO UPDATE SET
+        sales = EXCLUDED.sales,
+        late_delivery_risk = EXCLUDED.late_delivery_risk
+"""
+
+
+# Statements run directly against staging. The dimensions are built first
+# by other means: customer, product and geography keep type 2 history (see
+# SCD2Engine) and dim_date is generated as a calendar (see CalendarDimension).
+TRANSFORM_QUERIES = {
+    "fact_orders": FACT_ORDERS_SQL,
+}
+
+
 class DataTransformer(LoggerMixin):
     """
     Transforms staging data into star schema.
@@ -26,66 +120,66 @@ class DataTransformer(LoggerMixin):
     Creates dimension and fact tables with calculated columns and quality flags.
     """
     
-    def __init__(self, loader: Optional[DataLoader] = None):
+    def __init__(self, loader: Optional[DataLoader] = None, target_schema: str = "dw"):
         """
         Initialize DataTransformer.
         
         Args:
             loader: DataLoader instance (creates new if not provided)
+            target_schema: Schema holding the star schema tables to populate
+                (staging is always read from dw.stg_raw_orders)
         """
         self.settings = get_settings()
         self.loader = loader or DataLoader()
+        self.target_schema = target_schema
+        
+        # Oldest and newest order date (or date key) of the batch being
+        # transformed, if known: the calendar is extended back to the first
+        # and through the last when they fall outside the configured span
+        self.calendar_since: Optional[DateLike] = None
+        self.calendar_through: Optional[DateLike] = None
         self.logger.info("DataTransformer initialized")
     
-    @log_execution_time
-    def create_dim_customer(self) -> int:
+    def build_query(self, table: str) -> str:
         """
-        Create customer dimension from staging table.
+        Build the INSERT ... SELECT statement that populates a star schema table.
+        
+        Args:
+            table: Table name (a key of TRANSFORM_QUERIES)
         
         Returns:
-            int: Number of rows created
+            str: SQL statement targeting the transformer's schema
+        """
+        return TRANSFORM_QUERIES[table].format(schema=self.target_schema)
+    
+    def _load_scd_dimension(self, table: str) -> int:
         """
-        self.logger.info("Creating dim_customer...")
+        Apply the staged members of a versioned dimension.
         
-        query = """
-            INSERT INTO dw.dim_customer (
-                customer_id,
-                customer_fname,
-                customer_lname,
-                customer_email,
-                customer_segment,
-                customer_city,
-                customer_state,
-                customer_country,
-                sales_per_customer
-            )
-            SELECT 
-                customer_id,
-                customer_fname,
-                customer_lname,
-                customer_email,
-                customer_segment,
-                customer_city,
-                customer_state,
-                customer_country,
-                SUM(COALESCE(sales, 0)) as sales_per_customer
-            FROM dw.stg_raw_orders
-            WHERE customer_id IS NOT NULL
-            GROUP BY 
-                customer_id,
-                customer_fname,
-                customer_lname,
-                customer_email,
-                customer_segment,
-                customer_city,
-                customer_state,
-                customer_country
-            ON CONFLICT (customer_id) DO UPDATE SET
-                sales_per_customer = EXCLUDED.sales_per_customer
+        Only new members and members whose attribute hash changed are
+        written; their previous version is closed in the history table.
+        
+        Args:
+            table: Dimension name (a key of SCD2_DIMENSIONS)
+        
+        Returns:
+            int: Number of new or changed members
         """
+        counts = SCD2Engine(self.loader, schema=self.target_schema).load(table)
+        return counts["new"] + counts["changed"]
+    
+    @log_execution_time
+    def create_dim_customer(self) -> int:
+        """
+        Create customer dimension from staging table (type 2 history).
+        
+        Returns:
+            int: Number of new or changed members written
+        """
+        self.logger.info(f"Creating {self.target_schema}.dim_customer...")
         
         try:
-            rows = self.loader.execute_statement(query)
+            rows = self._load_scd_dimension("dim_customer")
             self.logger.info(f"✅ dim_customer created: {rows:,} rows")
             return rows
         except SQLAlchemyError as e:
@@ -95,38 +189,15 @@ class DataTransformer(LoggerMixin):
     @log_execution_time
     def create_dim_product(self) -> int:
         """
-        Create product dimension from staging table.
+        Create product dimension from staging table (type 2 history).
         
         Returns:
-            int: Number of rows created
-        """
-        self.logger.info("Creating dim_product...")
-        
-        query = """
-            INSERT INTO dw.dim_product (
-                product_card_id,
-                category_id,
-                category_name,
-                department_name,
-                product_name,
-                product_price
-            )
-            SELECT DISTINCT
-                product_card_id,
-                category_id,
-                category_name,
-                department_name,
-                product_name,
-                order_item_product_price as product_price
-            FROM dw.stg_raw_orders
-            WHERE product_card_id IS NOT NULL
-            ON CONFLICT (product_card_id) DO UPDATE SET
-                product_name = EXCLUDED.product_name,
-                product_price = EXCLUDED.product_price
+            int: Number of new or changed members written
         """
+        self.logger.info(f"Creating {self.target_schema}.dim_product...")
         
         try:
-            rows = self.loader.execute_statement(query)
+            rows = self._load_scd_dimension("dim_product")
             self.logger.info(f"✅ dim_product created: {rows:,} rows")
             return rows
         except SQLAlchemyError as e:
@@ -136,42 +207,15 @@ class DataTransformer(LoggerMixin):
     @log_execution_time
     def create_dim_geography(self) -> int:
         """
-        Create geography dimension from staging table.
+        Create geography dimension from staging table (type 2 history).
         
         Returns:
-            int: Number of rows created
-        """
-        self.logger.info("Creating dim_geography...")
-        
-        query = """
-            INSERT INTO dw.dim_geography (
-                geography_key,
-                market,
-                order_region,
-                order_country,
-                order_state,
-                order_city
-            )
-            SELECT DISTINCT
-                MD5(CONCAT(
-                    COALESCE(market, ''), '|',
-                    COALESCE(order_region, ''), '|',
-                    COALESCE(order_country, ''), '|',
-                    COALESCE(order_state, ''), '|',
-                    COALESCE(order_city, '')
-                )) as geography_key,
-                market,
-                order_region,
-                order_country,
-                order_state,
-                order_city
-            FROM dw.stg_raw_orders
-            WHERE market IS NOT NULL
-            ON CONFLICT (geography_key) DO NOTHING
+            int: Number of new or changed members written
         """
+        self.logger.info(f"Creating {self.target_schema}.dim_geography...")
         
         try:
-            rows = self.loader.execute_statement(query)
+            rows = self._load_scd_dimension("dim_geography")
             self.logger.info(f"✅ dim_geography created: {rows:,} rows")
             return rows
         except SQLAlchemyError as e:
@@ -181,46 +225,20 @@ class DataTransformer(LoggerMixin):
     @log_execution_time
     def create_dim_date(self) -> int:
         """
-        Create date dimension from staging table.
+        Create or extend the date dimension from the generated calendar.
+        
+        Staging is not read: dim_date is loaded once for the configured span
+        and only days past its end are added afterwards.
         
         Returns:
             int: Number of rows created
         """
-        self.logger.info("Creating dim_date...")
+        self.logger.info(f"Creating {self.target_schema}.dim_date...")
         
-        query = """
-            INSERT INTO dw.dim_date (
-                date_key,
-                full_date,
-                year,
-                quarter,
-                month,
-                month_name,
-                week,
-                day_of_year,
-                day_of_month,
-                day_of_week,
-                day_name
-            )
-            SELECT DISTINCT
-                TO_CHAR(order_date_dateorders, 'YYYYMMDD')::INTEGER as date_key,
-                order_date_dateorders::DATE as full_date,
-                EXTRACT(YEAR FROM order_date_dateorders) as year,
-                EXTRACT(QUARTER FROM order_date_dateorders) as quarter,
-                EXTRACT(MONTH FROM order_date_dateorders) as month,
-                TO_CHAR(order_date_dateorders, 'Month') as month_name,
-                EXTRACT(WEEK FROM order_date_dateorders) as week,
-                EXTRACT(DOY FROM order_date_dateorders) as day_of_year,
-                EXTRACT(DAY FROM order_date_dateorders) as day_of_month,
-                EXTRACT(DOW FROM order_date_dateorders) as day_of_week,
-                TO_CHAR(order_date_dateorders, 'Day') as day_name
-            FROM dw.stg_raw_orders
-            WHERE order_date_dateorders IS NOT NULL
-            ON CONFLICT (date_key) DO NOTHING
-        """
+        calendar = CalendarDimension(self.loader, schema=self.target_schema)
         
         try:
-            rows = self.loader.execute_statement(query)
+            rows = calendar.sync(through=self.calendar_through, since=self.calendar_since)
             self.logger.info(f"✅ dim_date created: {rows:,} rows")
             return rows
         except SQLAlchemyError as e:
@@ -235,90 +253,9 @@ class DataTransformer(LoggerMixin):
         Returns:
             int: Number of rows created
         """
-        self.logger.info("Creating fact_orders...")
+        self.logger.info(f"Creating {self.target_schema}.fact_orders...")
         
-        query = """
-            INSERT INTO dw.fact_orders (
-                order_id,
-                order_item_id,
-                customer_id,
-                product_card_id,
-                date_key,
-                geography_key,
-                sales,
-                order_item_quantity,
-                order_item_total,
-                order_item_discount,
-                order_item_discount_rate,
-                order_item_profit_ratio,
-                benefit_per_order,
-                days_for_shipment_scheduled,
-                days_for_shipping_real,
-                delivery_status,
-                late_delivery_risk,
-                order_status,
-                shipping_mode,
-                -- Calculated columns
-                is_late,
-                delay_days,
-                is_complete,
-                is_canceled,
-                is_fraud_suspect
-            )
-            SELECT 
-                order_id,
-                order_item_id,
-                customer_id,
-                product_card_id,
-                TO_CHAR(order_date_dateorders, 'YYYYMMDD')::INTEGER as date_key,
-                MD5(CONCAT(
-                    COALESCE(market, ''), '|',
-                    COALESCE(order_region, ''), '|',
-                    COALESCE(order_country, ''), '|',
-                    COALESCE(order_state, ''), '|',
-                    COALESCE(order_city, '')
-                )) as geography_key,
-                sales,
-                order_item_quantity,
-                order_item_total,
-                order_item_discount,
-                order_item_discount_rate,
-                order_item_profit_ratio,
-                benefit_per_order,
-                days_for_shipment_scheduled,
-                days_for_shipping_real,
-                delivery_status,
-                late_delivery_risk,
-                order_status,
-                shipping_mode,
-                -- Calculated columns
-                CASE 
-                    WHEN days_for_shipping_real > days_for_shipment_scheduled THEN TRUE 
-                    ELSE FALSE 
-                END as is_late,
-                GREATEST(0, days_for_shipping_real - days_for_shipment_scheduled) as delay_days,
-                CASE 
-                    WHEN UPPER(delivery_status) LIKE '%COMPLETE%' THEN TRUE 
-                    ELSE FALSE 
-                END as is_complete,
-                CASE 
-                    WHEN UPPER(order_status) LIKE '%CANCEL%' THEN TRUE 
-                    ELSE FALSE 
-                END as is_canceled,
-                CASE 
-                    WHEN UPPER(order_status) LIKE '%FRAUD%' 
-                         OR UPPER(delivery_status) LIKE '%SUSPECT%'
-                         OR order_item_discount_rate > 50 
-                    THEN TRUE 
-                    ELSE FALSE 
-                END as is_fraud_suspect
-            FROM dw.stg_raw_orders
-            WHERE order_id IS NOT NULL 
-              AND order_item_id IS NOT NULL
-            ON CONFLICT (order_id, order_item_id) DO UPDATE SET
-                sales = EXCLUDED.sales,
-                late_delivery_risk = EXCLUDED.late_delivery_risk
-        """
+        query = self.build_query("fact_orders")
         
         try:
             rows = self.loader.execute_statement(query)
@@ -10,30 +10,61 @@ Date: 2026-02-04
 """
 
 import os
+import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from src.etl.profiling import StreamingProfiler
 
+
+# Latin-1 translation table: spaces become underscores, alphanumerics and
+# underscores are kept, everything else (parentheses, dashes, ...) is dropped
+_COLUMN_NAME_TABLE = {
+    code: ("_" if char == " " else char if char.isalnum() or char == "_" else None)
+    for code, char in ((code, chr(code)) for code in range(256))
+}
+_REPEATED_UNDERSCORES = re.compile(r"_{2,}")
+
+
+@lru_cache(maxsize=4096)
 def sanitize_column_name(column_name: str) -> str:
     """
     Sanitize column name for database compatibility.
     
+    - Convert to lowercase
+    - Replace spaces with underscores
+    - Remove special characters except underscores
+    - Collapse repeated underscores and strip leading/trailing ones
+    
     Args:
         column_name: Original column name
     
     Returns:
         str: Sanitized column name
     """
-    # Convert to lowercase and replace spaces with underscores
-    sanitized = column_name.lower().replace(" ", "_").replace("(", "").replace(")", "")
-    # Remove special characters except underscores
-    sanitized = "".join(c if c.isalnum() or c == "_" else "" for c in sanitized)
-    # Remove leading/trailing underscores and collapse multiple underscores
-    sanitized = "_".join(filter(None, sanitized.split("_")))
-    return sanitized
+    sanitized = column_name.lower().translate(_COLUMN_NAME_TABLE)
+    # Characters outside Latin-1 are not in the table
+    if not sanitized.isascii():
+        sanitized = "".join(c for c in sanitized if c.isalnum() or c == "_")
+    return _REPEATED_UNDERSCORES.sub("_", sanitized).strip("_")
+
+
+@lru_cache(maxsize=256)
+def sanitize_columns(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Sanitize a whole header, memoized by the header tuple.
+    
+    Args:
+        columns: Original column names
+    
+    Returns:
+        Tuple[str, ...]: Sanitized column names, in the same order
+    """
+    return tuple(sanitize_column_name(col) for col in columns)
 
 
 def sanitize_dataframe_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -46,7 +77,7 @@ def sanitize_dataframe_columns(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with sanitized column names
     """
-    df.columns = [sanitize_column_name(col) for col in df.columns]
+    df.columns = list(sanitize_columns(tuple(df.columns)))
     return df
 
 
@@ -265,31 +296,16 @@ def generate_data_profile(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Generate comprehensive data profile.
     
+    For data that does not fit in memory, feed chunks to
+    src.etl.profiling.StreamingProfiler instead.
+    
     Args:
         df: DataFrame to profile
     
     Returns:
         dict: Data profile information
     """
-    profile = {
-        "row_count": len(df),
-        "column_count": len(df.columns),
-        "columns": df.columns.tolist(),
-        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
-        "null_counts": df.isnull().sum().to_dict(),
-        "null_percentages": (df.isnull().sum() / len(df) * 100).round(2).to_dict(),
-        "memory_mb": get_dataframe_memory_mb(df),
-        "numeric_columns": df.select_dtypes(include=["number"]).columns.tolist(),
-        "categorical_columns": df.select_dtypes(include=["object"]).columns.tolist(),
-        "datetime_columns": df.select_dtypes(include=["datetime"]).columns.tolist(),
-    }
-    
-    # Add basic statistics for numeric columns
-    if profile["numeric_columns"]:
-        numeric_stats = df[profile["numeric_columns"]].describe().to_dict()
-        profile["numeric_stats"] = numeric_stats
-    
-    return profile
+    return StreamingProfiler().update(df).profile()
 
 
 def print_data_profile(profile: Dict[str, Any]):
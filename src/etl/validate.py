@@ -9,45 +9,141 @@ Author: Torre Control Engineering Team
 Date: 2026-02-04
 """
 
-from typing import Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from math import sqrt
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 
 from src.config import get_settings
+from src.etl.incremental_validation import RunningSummary, ValidationScope
 from src.etl.load import DataLoader
+from src.etl.row_counts import EXACT
 from src.logging_config import LoggerMixin
 
 
+SAMPLE_METHODS = ("SYSTEM", "BERNOULLI")
+
+
 class ValidationError(Exception):
     """Custom exception for validation failures."""
     pass
 
 
+def wilson_interval(successes: int, trials: int, z: float = 1.96) -> Tuple[float, float]:
+    """
+    Wilson score interval of a proportion.
+    
+    Unlike the normal approximation it stays inside [0, 1] and gives a
+    useful upper bound when no successes were observed (e.g. no NULLs).
+    
+    Args:
+        successes: Observed successes
+        trials: Sample size
+        z: Standard normal quantile of the confidence level
+    
+    Returns:
+        Tuple[float, float]: (lower, upper) bounds of the proportion
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+    
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
 class DataValidator(LoggerMixin):
     """
     Validates data quality throughout ETL pipeline.
     
     Checks for nulls, outliers, referential integrity, and business rules.
+    Independent checks run concurrently on pooled connections; their results
+    are merged in declaration order, so reports do not depend on timing.
+    
+    In sampling mode the NULL, referential-integrity and OTIF checks first
+    read a TABLESAMPLE of the table and report confidence intervals; only
+    checks whose sample is inconclusive (NULLs or orphans seen, OTIF target
+    inside the interval) are re-run exhaustively.
     """
     
-    def __init__(self, loader: Optional[DataLoader] = None):
+    def __init__(
+        self,
+        loader: Optional[DataLoader] = None,
+        max_workers: Optional[int] = None,
+        check_timeout: Optional[float] = None,
+        sample_percent: Optional[float] = None,
+        sample_method: Optional[str] = None,
+        sample_seed: Optional[int] = None
+    ):
         """
         Initialize DataValidator.
         
         Args:
             loader: DataLoader instance (creates new if not provided)
+            max_workers: Checks run concurrently (default: from settings)
+            check_timeout: Time limit of a single check in seconds
+                (default: from settings)
+            sample_percent: Percentage of the table read by sampled checks;
+                0 or 100 checks exhaustively (default: from settings)
+            sample_method: TABLESAMPLE method, SYSTEM (pages) or BERNOULLI (rows)
+                (default: from settings)
+            sample_seed: REPEATABLE seed of the sample (default: from settings)
         """
         self.settings = get_settings()
         self.loader = loader or DataLoader()
+        self.max_workers = max_workers or self.settings.validation_workers
+        self.check_timeout = (
+            self.settings.validation_check_timeout_s if check_timeout is None else check_timeout
+        )
+        self.sample_percent = (
+            self.settings.validation_sample_percent if sample_percent is None else sample_percent
+        )
+        self.sample_method = (sample_method or self.settings.validation_sample_method).upper()
+        if self.sample_method not in SAMPLE_METHODS:
+            raise ValueError(f"sample_method must be one of {SAMPLE_METHODS}")
+        self.sample_seed = self.settings.validation_sample_seed if sample_seed is None else sample_seed
+        self.confidence = self.settings.validation_confidence
+        self._z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
         self.validation_results = []
+        self._local = threading.local()
         self.logger.info("DataValidator initialized")
     
+    @property
+    def _statement_timeout_ms(self) -> Optional[int]:
+        """Server-side time limit applied to each validation query."""
+        return int(self.check_timeout * 1000) if self.check_timeout else None
+    
+    @property
+    def sampling(self) -> bool:
+        """Whether checks start from a table sample."""
+        return 0 < self.sample_percent < 100
+    
+    def _tablesample(self) -> str:
+        """TABLESAMPLE clause of sampled checks."""
+        return f"TABLESAMPLE {self.sample_method} ({self.sample_percent:g}) REPEATABLE ({self.sample_seed})"
+    
+    def _sample_note(self, rows: int) -> str:
+        """Describe the sample behind an estimate."""
+        return f"{self.sample_method} {self.sample_percent:g}% sample of {rows:,} rows"
+    
+    def _escalate(self, check_name: str, reason: str) -> None:
+        """Log that a sampled check falls back to an exhaustive one."""
+        self.logger.info(f"🔎 {check_name}: {reason}; escalating to an exhaustive check")
+    
     def _add_result(
         self,
         check_name: str,
         passed: bool,
         message: str,
-        severity: str = "ERROR"
+        severity: str = "ERROR",
+        details: Optional[dict] = None
     ):
         """
         Add validation result.
@@ -57,6 +153,7 @@ class DataValidator(LoggerMixin):
             passed: Whether check passed
             message: Result message
             severity: Severity level (ERROR, WARNING, INFO)
+            details: Extra result fields, e.g. sample size and confidence interval
         """
         result = {
             "check": check_name,
@@ -64,7 +161,11 @@ class DataValidator(LoggerMixin):
             "message": message,
             "severity": severity
         }
-        self.validation_results.append(result)
+        if details:
+            result["details"] = details
+        # Checks running on the worker pool collect into their own buffer
+        buffer = getattr(self._local, "results", None)
+        (self.validation_results if buffer is None else buffer).append(result)
         
         if passed:
             self.logger.info(f"✅ {check_name}: {message}")
@@ -99,27 +200,42 @@ class DataValidator(LoggerMixin):
         self,
         table_name: str,
         schema: str = "dw",
-        min_rows: int = 1
+        min_rows: int = 1,
+        mode: Optional[str] = None
     ) -> Tuple[bool, int]:
         """
         Validate that a table has minimum number of rows.
         
+        With an estimated or cached count, a result below the minimum is
+        confirmed with an exact count before the check fails, so the
+        scan is only paid when a table looks too small.
+        
         Args:
             table_name: Table name
             schema: Schema name
             min_rows: Minimum expected rows
+            mode: Count mode: estimated, exact or cached (default: from settings)
         
         Returns:
             Tuple[bool, int]: (passed, actual_count)
         """
+        mode = mode or self.settings.validation_count_mode
+        
         try:
-            count = self.loader.get_table_count(table_name, schema)
+            count = self.loader.get_table_count(
+                table_name, schema, statement_timeout_ms=self._statement_timeout_ms, mode=mode
+            )
+            if count < min_rows and mode != EXACT:
+                mode = EXACT
+                count = self.loader.get_table_count(
+                    table_name, schema, statement_timeout_ms=self._statement_timeout_ms, mode=mode
+                )
             passed = count >= min_rows
             
             self._add_result(
                 f"row_count_{table_name}",
                 passed,
-                f"{schema}.{table_name} has {count:,} rows (minimum: {min_rows:,})",
+                f"{schema}.{table_name} has {count:,} rows ({mode}, minimum: {min_rows:,})",
                 "ERROR" if not passed else "INFO"
             )
             
@@ -137,7 +253,8 @@ class DataValidator(LoggerMixin):
         self,
         table_name: str,
         columns: List[str],
-        schema: str = "dw"
+        schema: str = "dw",
+        where: Optional[str] = None
     ) -> bool:
         """
         Validate that specified columns have no NULL values.
@@ -146,6 +263,7 @@ class DataValidator(LoggerMixin):
             table_name: Table name
             columns: List of column names to check
             schema: Schema name
+            where: Condition limiting the rows checked (optional)
         
         Returns:
             bool: True if no NULLs found
@@ -153,14 +271,21 @@ class DataValidator(LoggerMixin):
         all_passed = True
         
         for column in columns:
+            if self.sampling:
+                try:
+                    if self._sampled_no_nulls(table_name, column, schema, where):
+                        continue
+                except Exception as e:
+                    self._escalate(f"no_nulls_{table_name}_{column}", f"sample failed ({e})")
+            
             query = f"""
                 SELECT COUNT(*) as null_count
                 FROM {schema}.{table_name}
-                WHERE {column} IS NULL
+                WHERE {column} IS NULL{f" AND {where}" if where else ""}
             """
             
             try:
-                result = self.loader.execute_query(query)
+                result = self.loader.execute_query(query, statement_timeout_ms=self._statement_timeout_ms)
                 null_count = result["null_count"].iloc[0]
                 passed = null_count == 0
                 
@@ -184,13 +309,47 @@ class DataValidator(LoggerMixin):
         
         return all_passed
     
+    def _sampled_no_nulls(self, table_name: str, column: str, schema: str, where: Optional[str] = None) -> bool:
+        """
+        Check a column for NULLs on a table sample.
+        
+        Returns:
+            bool: True if the sample settled the check (no NULLs seen)
+        """
+        check_name = f"no_nulls_{table_name}_{column}"
+        query = f"""
+            SELECT COUNT(*) as sampled_rows,
+                   COUNT(*) FILTER (WHERE {column} IS NULL) as null_count
+            FROM {schema}.{table_name} {self._tablesample()}
+            WHERE {where or "TRUE"}
+        """
+        result = self.loader.execute_query(query, statement_timeout_ms=self._statement_timeout_ms)
+        sampled_rows = int(result["sampled_rows"].iloc[0])
+        null_count = int(result["null_count"].iloc[0])
+        
+        if sampled_rows == 0 or null_count > 0:
+            self._escalate(check_name, f"{null_count:,} NULLs in {sampled_rows:,} sampled rows")
+            return False
+        
+        _, upper = wilson_interval(0, sampled_rows, self._z)
+        self._add_result(
+            check_name,
+            True,
+            f"{schema}.{table_name}.{column} has no NULL values in a {self._sample_note(sampled_rows)} "
+            f"(NULL rate <= {upper:.3%} at {self.confidence:.0%} confidence)",
+            "INFO",
+            details={"sampled_rows": sampled_rows, "null_rate_ci": [0.0, upper]}
+        )
+        return True
+    
     def validate_referential_integrity(
         self,
         fact_table: str,
         fact_column: str,
         dim_table: str,
         dim_column: str,
-        schema: str = "dw"
+        schema: str = "dw",
+        where: Optional[str] = None
     ) -> bool:
         """
         Validate referential integrity between fact and dimension tables.
@@ -201,20 +360,30 @@ class DataValidator(LoggerMixin):
             dim_table: Dimension table name
             dim_column: Primary key column in dimension table
             schema: Schema name
+            where: Condition on the fact rows checked, alias f (optional)
         
         Returns:
             bool: True if all foreign keys exist in dimension
         """
+        if self.sampling:
+            try:
+                if self._sampled_referential_integrity(
+                    fact_table, fact_column, dim_table, dim_column, schema, where
+                ):
+                    return True
+            except Exception as e:
+                self._escalate(f"referential_integrity_{fact_table}_{dim_table}", f"sample failed ({e})")
+        
         query = f"""
             SELECT COUNT(*) as orphan_count
             FROM {schema}.{fact_table} f
             LEFT JOIN {schema}.{dim_table} d ON f.{fact_column} = d.{dim_column}
             WHERE f.{fact_column} IS NOT NULL
-              AND d.{dim_column} IS NULL
+              AND d.{dim_column} IS NULL{f" AND {where}" if where else ""}
         """
         
         try:
-            result = self.loader.execute_query(query)
+            result = self.loader.execute_query(query, statement_timeout_ms=self._statement_timeout_ms)
             orphan_count = result["orphan_count"].iloc[0]
             passed = orphan_count == 0
             
@@ -236,16 +405,72 @@ class DataValidator(LoggerMixin):
             )
             return False
     
-    def validate_otif_calculation(self, schema: str = "dw") -> bool:
+    def _sampled_referential_integrity(
+        self,
+        fact_table: str,
+        fact_column: str,
+        dim_table: str,
+        dim_column: str,
+        schema: str,
+        where: Optional[str] = None
+    ) -> bool:
+        """
+        Look for orphaned foreign keys in a sample of the fact table.
+        
+        Returns:
+            bool: True if the sample settled the check (no orphans seen)
+        """
+        check_name = f"referential_integrity_{fact_table}_{dim_table}"
+        query = f"""
+            SELECT COUNT(*) as sampled_rows,
+                   COUNT(*) FILTER (
+                       WHERE f.{fact_column} IS NOT NULL AND d.{dim_column} IS NULL
+                   ) as orphan_count
+            FROM {schema}.{fact_table} f {self._tablesample()}
+            LEFT JOIN {schema}.{dim_table} d ON f.{fact_column} = d.{dim_column}
+            WHERE {where or "TRUE"}
+        """
+        result = self.loader.execute_query(query, statement_timeout_ms=self._statement_timeout_ms)
+        sampled_rows = int(result["sampled_rows"].iloc[0])
+        orphan_count = int(result["orphan_count"].iloc[0])
+        
+        if sampled_rows == 0 or orphan_count > 0:
+            self._escalate(check_name, f"{orphan_count:,} orphans in {sampled_rows:,} sampled rows")
+            return False
+        
+        _, upper = wilson_interval(0, sampled_rows, self._z)
+        self._add_result(
+            check_name,
+            True,
+            f"Found 0 orphaned records in a {self._sample_note(sampled_rows)} of {fact_table}.{fact_column} "
+            f"(orphan rate <= {upper:.3%} at {self.confidence:.0%} confidence)",
+            "INFO",
+            details={"sampled_rows": sampled_rows, "orphan_rate_ci": [0.0, upper]}
+        )
+        return True
+    
+    def validate_otif_calculation(self, schema: str = "dw", summary: Optional[RunningSummary] = None) -> bool:
         """
         Validate OTIF (On-Time In-Full) calculation logic.
         
         Args:
             schema: Schema name
+            summary: Running daily summary to read the totals from instead of
+                scanning fact_orders (optional)
         
         Returns:
             bool: True if OTIF calculation is valid
         """
+        if summary is not None:
+            return self._summary_otif(summary)
+        
+        if self.sampling:
+            try:
+                if self._sampled_otif(schema):
+                    return True
+            except Exception as e:
+                self._escalate("otif_calculation", f"sample failed ({e})")
+        
         query = f"""
             SELECT 
                 COUNT(*) as total_orders,
@@ -260,7 +485,7 @@ class DataValidator(LoggerMixin):
         """
         
         try:
-            result = self.loader.execute_query(query)
+            result = self.loader.execute_query(query, statement_timeout_ms=self._statement_timeout_ms)
             
             total = result["total_orders"].iloc[0]
             otif_orders = result["otif_orders"].iloc[0]
@@ -295,52 +520,303 @@ class DataValidator(LoggerMixin):
             )
             return False
     
-    def validate_all(self) -> Dict[str, any]:
+    def _summary_otif(self, summary: RunningSummary) -> bool:
+        """
+        Validate the overall OTIF % from the running daily summary.
+        
+        Args:
+            summary: Refreshed running summary
+        
+        Returns:
+            bool: True if OTIF calculation is valid
+        """
+        try:
+            totals = summary.totals()
+            total, otif_orders = totals["active_items"], totals["otif_items"]
+            otif_pct = round(100 * otif_orders / total, 2) if total else None
+            passed = otif_pct is not None and 0 <= otif_pct <= 100
+            
+            self._add_result(
+                "otif_calculation",
+                passed,
+                f"OTIF: {otif_pct}% ({otif_orders:,} of {total:,} orders, "
+                f"running summary of {totals['days']:,} days)",
+                "INFO" if passed else "ERROR"
+            )
+            
+            if passed and otif_pct < self.settings.otif_target:
+                self._add_result(
+                    "otif_target",
+                    False,
+                    f"OTIF {otif_pct}% is below target {self.settings.otif_target}%",
+                    "WARNING"
+                )
+            
+            return passed
+            
+        except Exception as e:
+            self._add_result(
+                "otif_calculation",
+                False,
+                f"Failed to calculate OTIF from running summary: {e}",
+                "ERROR"
+            )
+            return False
+    
+    def validate_scope_rows(self, scope: ValidationScope, schema: str = "dw") -> bool:
+        """
+        Validate that the scope being validated contains fact rows.
+        
+        Args:
+            scope: Validation scope
+            schema: Schema name
+        
+        Returns:
+            bool: True if the scope has rows
+        """
+        query = f"""
+            SELECT COUNT(*) as scope_rows
+            FROM {schema}.fact_orders
+            WHERE {scope.predicate()}
+        """
+        
+        try:
+            result = self.loader.execute_query(query, statement_timeout_ms=self._statement_timeout_ms)
+            scope_rows = int(result["scope_rows"].iloc[0])
+            passed = scope_rows > 0
+            
+            self._add_result(
+                "scope_rows_fact_orders",
+                passed,
+                f"{schema}.fact_orders has {scope_rows:,} rows in {scope}",
+                "ERROR" if not passed else "INFO"
+            )
+            return passed
+            
+        except Exception as e:
+            self._add_result(
+                "scope_rows_fact_orders",
+                False,
+                f"Failed to count rows in scope: {e}",
+                "ERROR"
+            )
+            return False
+    
+    def _sampled_otif(self, schema: str) -> bool:
+        """
+        Estimate OTIF % from a sample of the fact table.
+        
+        The estimate settles the check when its confidence interval lies
+        entirely above or below the OTIF target.
+        
+        Returns:
+            bool: True if the sample settled the check
+        """
+        query = f"""
+            SELECT 
+                COUNT(*) as total_orders,
+                COUNT(*) FILTER (WHERE is_late = FALSE AND is_complete = TRUE) as otif_orders
+            FROM {schema}.fact_orders {self._tablesample()}
+            WHERE is_canceled = FALSE
+        """
+        result = self.loader.execute_query(query, statement_timeout_ms=self._statement_timeout_ms)
+        total = int(result["total_orders"].iloc[0])
+        otif_orders = int(result["otif_orders"].iloc[0])
+        target = self.settings.otif_target
+        
+        if total == 0:
+            self._escalate("otif_calculation", "empty sample")
+            return False
+        
+        lower, upper = (100 * bound for bound in wilson_interval(otif_orders, total, self._z))
+        if lower < target <= upper:
+            self._escalate("otif_calculation", f"target {target}% inside {lower:.2f}-{upper:.2f}%")
+            return False
+        
+        otif_pct = 100 * otif_orders / total
+        self._add_result(
+            "otif_calculation",
+            True,
+            f"OTIF: {otif_pct:.2f}% ({lower:.2f}-{upper:.2f}% at {self.confidence:.0%} confidence, "
+            f"{self._sample_note(total)})",
+            "INFO",
+            details={"sampled_rows": total, "otif_ci": [round(lower, 2), round(upper, 2)]}
+        )
+        
+        if upper < target:
+            self._add_result(
+                "otif_target",
+                False,
+                f"OTIF {otif_pct:.2f}% (at most {upper:.2f}%) is below target {target}%",
+                "WARNING"
+            )
+        return True
+    
+    def _run_check(self, check_name: str, check: Callable[[], object]) -> List[dict]:
+        """
+        Run one check on a worker, collecting its results separately.
+        
+        Args:
+            check_name: Name reported if the check raises
+            check: Check to run
+        
+        Returns:
+            list: Results added by the check
+        """
+        results = self._local.results = []
+        try:
+            check()
+        except Exception as e:
+            self._add_result(check_name, False, f"Check failed: {e}", "ERROR")
+        finally:
+            self._local.results = None
+        return results
+    
+    def run_checks(self, checks: List[Tuple[str, Callable[[], object]]]) -> None:
+        """
+        Run independent checks on a bounded worker pool.
+        
+        Each query carries a server-side statement timeout of check_timeout;
+        a check that still has not finished check_timeout seconds after its
+        turn comes is reported as failed and its late results are dropped.
+        Results are appended to validation_results in the order of checks.
+        
+        Args:
+            checks: (name, callable) pairs; the callables report through _add_result
+        """
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(checks)) or 1,
+            thread_name_prefix="validator"
+        )
+        timed_out = False
+        try:
+            futures = [
+                (check_name, executor.submit(self._run_check, check_name, check))
+                for check_name, check in checks
+            ]
+            
+            for check_name, future in futures:
+                try:
+                    results = future.result(timeout=self.check_timeout or None)
+                except FutureTimeoutError:
+                    timed_out = True
+                    future.cancel()
+                    self._add_result(
+                        check_name,
+                        False,
+                        f"Check timed out after {self.check_timeout:g}s",
+                        "ERROR"
+                    )
+                    continue
+                
+                self.validation_results.extend(results)
+        finally:
+            # Do not block on checks that overran their time limit
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
+    
+    def validate_all(self, schema: str = "dw", scope: Optional[ValidationScope] = None) -> Dict[str, any]:
         """
         Run all validation checks.
         
+        With a scope, fact_orders row checks only read the rows in the scope
+        and the overall OTIF % comes from the running daily summary, which is
+        refreshed for the scope's days first.
+        
+        Args:
+            schema: Schema holding the star schema tables (the staging table
+                is always checked in dw)
+            scope: Rows written by the run being validated (default: everything)
+        
         Returns:
             dict: Validation summary
         """
-        self.logger.info("Starting comprehensive validation checks...")
+        self.logger.info(
+            f"Starting {'incremental' if scope else 'comprehensive'} validation checks on schema "
+            f"'{schema}'{f' for {scope}' if scope else ''} ({self.max_workers} workers)..."
+        )
         self.validation_results = []
         
+        summary = None
+        if scope is not None:
+            summary = RunningSummary(self.loader, schema)
+            try:
+                summary.refresh(scope)
+            except Exception as e:
+                self.logger.warning(f"Could not refresh the running summary ({e}); OTIF is computed exhaustively")
+                summary = None
+        
+        fact_filter = {"fact_orders": scope.predicate()} if scope else {}
+        
+        checks = [("table_exists_stg_raw_orders", partial(self.validate_table_exists, "stg_raw_orders"))]
+        
         # Check that all tables exist
-        tables = ["stg_raw_orders", "dim_customer", "dim_product", "dim_geography", "dim_date", "fact_orders"]
+        tables = ["dim_customer", "dim_product", "dim_geography", "dim_date", "fact_orders"]
         for table in tables:
-            self.validate_table_exists(table)
+            checks.append((f"table_exists_{table}", partial(self.validate_table_exists, table, schema)))
         
         # Check row counts
-        self.validate_row_count("stg_raw_orders", min_rows=1000)
-        self.validate_row_count("dim_customer", min_rows=100)
-        self.validate_row_count("dim_product", min_rows=10)
-        self.validate_row_count("dim_geography", min_rows=5)
-        self.validate_row_count("dim_date", min_rows=30)
-        self.validate_row_count("fact_orders", min_rows=1000)
+        row_minimums = {
+            "dim_customer": 100,
+            "dim_product": 10,
+            "dim_geography": 5,
+            "dim_date": 30,
+            "fact_orders": 1000,
+        }
+        checks.append(("row_count_stg_raw_orders", partial(self.validate_row_count, "stg_raw_orders", min_rows=1000)))
+        for table, min_rows in row_minimums.items():
+            checks.append((f"row_count_{table}", partial(self.validate_row_count, table, schema, min_rows=min_rows)))
         
         # Check for NULLs in critical columns
-        self.validate_no_nulls("fact_orders", ["order_id", "order_item_id", "customer_id"])
-        self.validate_no_nulls("dim_customer", ["customer_id"])
-        self.validate_no_nulls("dim_product", ["product_card_id"])
+        critical_columns = {
+            "fact_orders": ["order_id", "order_item_id", "customer_id"],
+            "dim_customer": ["customer_id"],
+            "dim_product": ["product_card_id"],
+        }
+        for table, columns in critical_columns.items():
+            checks.append((
+                f"no_nulls_{table}",
+                partial(self.validate_no_nulls, table, columns, schema, where=fact_filter.get(table))
+            ))
         
         # Check referential integrity
-        self.validate_referential_integrity("fact_orders", "customer_id", "dim_customer", "customer_id")
-        self.validate_referential_integrity("fact_orders", "product_card_id", "dim_product", "product_card_id")
-        self.validate_referential_integrity("fact_orders", "date_key", "dim_date", "date_key")
-        self.validate_referential_integrity("fact_orders", "geography_key", "dim_geography", "geography_key")
+        foreign_keys = [
+            ("customer_id", "dim_customer", "customer_id"),
+            ("product_card_id", "dim_product", "product_card_id"),
+            ("date_key", "dim_date", "date_key"),
+            ("geography_key", "dim_geography", "geography_key"),
+        ]
+        for fact_column, dim_table, dim_column in foreign_keys:
+            checks.append((
+                f"referential_integrity_fact_orders_{dim_table}",
+                partial(
+                    self.validate_referential_integrity, "fact_orders", fact_column, dim_table, dim_column, schema,
+                    where=scope.predicate("f") if scope else None
+                )
+            ))
+        
+        if scope is not None:
+            checks.append(("scope_rows_fact_orders", partial(self.validate_scope_rows, scope, schema)))
         
         # Business rule validations
-        self.validate_otif_calculation()
+        checks.append(("otif_calculation", partial(self.validate_otif_calculation, schema, summary=summary)))
+        
+        self.run_checks(checks)
         
         # Summarize results
         total_checks = len(self.validation_results)
         passed_checks = sum(1 for r in self.validation_results if r["passed"])
         failed_checks = total_checks - passed_checks
         
+        errors = sum(
+            1 for r in self.validation_results
+            if not r["passed"] and r["severity"] == "ERROR"
+        )
+        
         summary = {
             "total_checks": total_checks,
             "passed": passed_checks,
             "failed": failed_checks,
+            "errors": errors,
             "success_rate": round(100 * passed_checks / total_checks, 2) if total_checks > 0 else 0,
             "results": self.validation_results
         }
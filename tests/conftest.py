@@ -23,6 +23,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.config import Settings, get_settings
 from src.etl.extract import DataExtractor
 from src.etl.load import DataLoader
+from src.etl.staging_cache import ParquetStagingCache
 from src.etl.transform import DataTransformer
 from src.etl.validate import DataValidator
 
@@ -115,9 +116,9 @@ def sample_csv_file(tmp_path, sample_dataframe):
 # ============================================================================
 
 @pytest.fixture
-def extractor():
-    """Provide DataExtractor instance."""
-    return DataExtractor()
+def extractor(tmp_path):
+    """Provide DataExtractor instance with a per-test staging cache."""
+    return DataExtractor(staging_cache=ParquetStagingCache(cache_dir=tmp_path / "interim"))
 
 
 @pytest.fixture
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Aggregation Table Tests
+========================================
+
+Unit tests for the aggregation table statements and their semantic model
+mappings.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import pytest
+
+from src.etl.aggregates import AGGREGATE_TABLES, AggregateBuilder, semantic_aggregations
+from src.etl.incremental_validation import ValidationScope
+
+
+class TestSemanticAggregations:
+    """Test suite for semantic_aggregations."""
+    
+    def test_mappings(self):
+        """Test group-by columns, row counts and sums mapped to the detail."""
+        aggregations = semantic_aggregations()
+        
+        assert set(aggregations) == set(AGGREGATE_TABLES)
+        month = aggregations["agg_orders_month"]
+        assert month["detail"] == "fact_orders"
+        assert month["columns"]["market"] == ("groupBy", "dim_geography.market")
+        assert month["columns"]["is_late"] == ("groupBy", "fact_orders.is_late")
+        assert month["columns"]["order_items"] == ("count", "fact_orders")
+        assert month["columns"]["sales"] == ("sum", "fact_orders.sales")
+        # Filtered counts have no detail column Power BI could map them to
+        assert "late_items" not in month["columns"]
+
+
+class TestAggregateBuilder:
+    """Test suite for AggregateBuilder."""
+    
+    def test_full_rebuild(self, mocker):
+        """Test that without a scope each table is truncated and rebuilt from all facts."""
+        builder = AggregateBuilder(loader=mocker.MagicMock())
+        
+        truncate, insert = builder.refresh_statements("agg_orders_day_market")
+        
+        assert truncate == "TRUNCATE dw.agg_orders_day_market"
+        assert "WHERE TRUE" in insert
+        assert "GROUP BY 1, 2, 3, 4, 5" in insert
+    
+    def test_month_table_refreshes_whole_months(self, mocker):
+        """Test that a batch inside a month recomputes the entire month."""
+        builder = AggregateBuilder(loader=mocker.MagicMock())
+        scope = ValidationScope(20170115, 20170203)
+        
+        delete, insert = builder.refresh_statements("agg_orders_month", scope)
+        
+        assert delete == "DELETE FROM dw.agg_orders_month WHERE year * 100 + month BETWEEN 201701 AND 201702"
+        assert "f.date_key BETWEEN 20170101 AND 20170231" in insert
+        assert "GROUP BY 1, 2, 3, 4, 5, 6, 7, 8" in insert
+    
+    def test_day_table_refreshes_the_scope(self, mocker):
+        """Test that the daily table only recomputes the batch's days."""
+        builder = AggregateBuilder(loader=mocker.MagicMock())
+        
+        delete, insert = builder.refresh_statements("agg_orders_day_market", ValidationScope(20170115, 20170203))
+        
+        assert delete == "DELETE FROM dw.agg_orders_day_market WHERE date_key BETWEEN 20170115 AND 20170203"
+        assert "f.date_key BETWEEN 20170115 AND 20170203" in insert
+    
+    def test_refresh_runs_in_one_transaction(self, mocker):
+        """Test that all tables are refreshed in one transaction and rows are reported."""
+        loader = mocker.MagicMock()
+        conn = loader.engine.begin.return_value.__enter__.return_value
+        conn.execute.return_value.rowcount = 12
+        
+        rows = AggregateBuilder(loader=loader).run(ValidationScope(20170101, 20170131))
+        
+        loader.engine.begin.assert_called_once()
+        assert conn.execute.call_count == 2 * len(AGGREGATE_TABLES)
+        assert rows == 12 * len(AGGREGATE_TABLES)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Anomaly Scoring Tests
+======================================
+
+Unit tests for the segment baselines and batch anomaly scoring.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.etl.anomaly import ALL_SEGMENTS, AnomalyDetector, fit_baselines, score_frame
+from src.etl.incremental_validation import ValidationScope
+
+
+def make_rows(market, shipping_mode, gaps, discounts, start_id=1):
+    """Build fact rows of one segment."""
+    count = len(gaps)
+    return pd.DataFrame({
+        "order_id": np.arange(start_id, start_id + count),
+        "order_item_id": np.arange(start_id, start_id + count),
+        "date_key": 20170101,
+        "market": market,
+        "shipping_mode": shipping_mode,
+        "shipping_gap_days": np.asarray(gaps, dtype=float),
+        "discount_rate": np.asarray(discounts, dtype=float),
+    })
+
+
+@pytest.fixture
+def history():
+    """Fact rows of two segments with different delay profiles."""
+    return pd.concat([
+        make_rows("Europe", "Same Day", [0, 0, 1, 0, 1, 0, 0, 1], [5, 10, 5, 10, 5, 10, 5, 10]),
+        make_rows("Europe", "Standard Class", [2, 4, 3, 5, 2, 4, 3, 5], [0, 0, 0, 0, 0, 0, 0, 25], start_id=100),
+    ], ignore_index=True)
+
+
+class TestFitBaselines:
+    """Test suite for fit_baselines."""
+    
+    def test_median_and_scale_per_segment(self, history):
+        """Test robust statistics per market x shipping mode plus the fallback row."""
+        baselines = fit_baselines(history).set_index(["market", "shipping_mode"])
+        
+        same_day = baselines.loc[("Europe", "Same Day")]
+        assert same_day["observations"] == 8
+        assert same_day["shipping_gap_days_median"] == 0
+        assert same_day["discount_rate_scale"] == pytest.approx(2.5 * 1.4826)
+        assert baselines.loc[(ALL_SEGMENTS, ALL_SEGMENTS), "observations"] == 16
+    
+    def test_mean_deviation_when_mad_is_zero(self, history):
+        """Test that mostly-constant segments fall back to the mean absolute deviation."""
+        baselines = fit_baselines(history).set_index(["market", "shipping_mode"])
+        
+        standard = baselines.loc[("Europe", "Standard Class")]
+        assert standard["discount_rate_median"] == 0
+        assert standard["discount_rate_scale"] == pytest.approx(25 / 8 * 1.253314)
+
+
+class TestScoreFrame:
+    """Test suite for score_frame."""
+    
+    def test_outliers_relative_to_segment(self, history):
+        """Test that the same delay is anomalous in one segment only."""
+        baselines = fit_baselines(history)
+        batch = pd.concat([
+            make_rows("Europe", "Same Day", [4], [5], start_id=500),
+            make_rows("Europe", "Standard Class", [4], [0], start_id=501),
+        ], ignore_index=True)
+        
+        scored = score_frame(batch, baselines, threshold=3.5)
+        
+        assert scored["is_anomaly"].tolist() == [True, False]
+        assert scored["anomaly_reason"].tolist() == ["shipping_gap_days", None]
+        assert scored["shipping_gap_days_z"].iloc[0] == pytest.approx(4 / (3 / 8 * 1.253314), abs=1e-3)
+    
+    def test_unknown_segment_uses_overall_baseline(self, history):
+        """Test that new segments are scored against the all-segments baseline."""
+        baselines = fit_baselines(history)
+        overall = baselines[baselines["market"] == ALL_SEGMENTS].iloc[0]
+        batch = make_rows("LATAM", "First Class", [overall["shipping_gap_days_median"]], [np.nan])
+        
+        scored = score_frame(batch, baselines)
+        
+        assert scored["shipping_gap_days_z"].iloc[0] == 0
+        assert scored["discount_rate_z"].iloc[0] == 0
+        assert not scored["is_anomaly"].iloc[0]
+
+
+class TestAnomalyDetector:
+    """Test the scoring flow against a mocked loader."""
+    
+    def test_scores_batch_rows_in_one_transaction(self, mocker, history):
+        """Test that only the scope is replaced and every streamed batch is written."""
+        loader = mocker.MagicMock()
+        loader.table_exists.return_value = True
+        loader.execute_query.side_effect = [
+            pd.DataFrame({"segments": [3], "expired": [False]}),
+            fit_baselines(history).assign(fitted_at=pd.Timestamp("2026-02-01")),
+        ]
+        loader.iter_query_batches.return_value = iter([
+            pa.Table.from_pandas(history.iloc[:10], preserve_index=False).combine_chunks().to_batches()[0],
+            pa.Table.from_pandas(history.iloc[10:], preserve_index=False).combine_chunks().to_batches()[0],
+        ])
+        conn = loader.engine.begin.return_value.__enter__.return_value
+        
+        detector = AnomalyDetector(loader=loader, threshold=3.5, max_age_days=7)
+        counts = detector.score(ValidationScope(20170101, 20170131))
+        
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        assert statements[0] == "DELETE FROM dw.fact_order_anomalies WHERE date_key BETWEEN 20170101 AND 20170131"
+        assert "f.date_key BETWEEN 20170101 AND 20170131" in loader.iter_query_batches.call_args.args[0]
+        assert len(statements) == 3
+        assert counts["scored"] == 16
+    
+    def test_stale_baselines_are_refitted(self, mocker):
+        """Test that missing or expired baselines trigger a refit."""
+        detector = AnomalyDetector(loader=mocker.MagicMock(), max_age_days=7)
+        detector.loader.execute_query.return_value = pd.DataFrame({"segments": [0], "expired": [False]})
+        assert detector.baselines_stale()
+        
+        detector.loader.execute_query.return_value = pd.DataFrame({"segments": [4], "expired": [True]})
+        assert detector.baselines_stale()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
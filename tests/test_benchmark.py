@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Benchmark Suite Tests
+======================================
+
+Unit tests for the synthetic DataCo generator and benchmark result handling.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import time
+
+import pandas as pd
+import pytest
+
+from src.etl.benchmark import find_regressions, latest_results, new_results, parse_size, save_results, time_call
+from src.etl.synthetic import COLUMNS, MARKET_REGIONS, generate_dataco_frame, write_dataco_csv
+
+
+class TestSyntheticGenerator:
+    """Test suite for the synthetic DataCo generator."""
+    
+    def test_frame_shape_and_cardinalities(self):
+        """Test that the frame has the DataCo columns and realistic cardinalities."""
+        df = generate_dataco_frame(20000, seed=7)
+        
+        assert list(df.columns) == COLUMNS
+        assert len(df) == 20000
+        assert df["Order Item Id"].is_unique
+        assert set(df["Market"]) == set(MARKET_REGIONS)
+        assert df["Product Card Id"].nunique() <= 118
+        assert df["Order Id"].nunique() == pytest.approx(20000 / 2.75, rel=0.01)
+        assert df["Customer Id"].nunique() == pytest.approx(20000 / 8.74, rel=0.1)
+        # Order-level attributes are consistent across the items of an order
+        assert df.groupby("Order Id")[["Customer Id", "Market", "Shipping Mode"]].nunique().max().max() == 1
+    
+    def test_frame_is_reproducible(self):
+        """Test that the same seed produces the same data."""
+        pd.testing.assert_frame_equal(generate_dataco_frame(500, seed=3), generate_dataco_frame(500, seed=3))
+    
+    def test_chunked_csv_round_trip(self, extractor, tmp_path):
+        """Test that a chunked Latin-1 CSV parses with the pipeline's sanitized names."""
+        csv_path = write_dataco_csv(str(tmp_path / "dataco.csv"), 1000, chunk_rows=300)
+        
+        df = extractor.extract_csv(file_path=str(csv_path))
+        
+        assert len(df) == 1000
+        assert df.groupby("Order Id")["Customer Id"].nunique().max() == 1
+        assert sorted(df["Order Item Id"]) == list(range(1, 1001))
+
+
+class TestBenchmarkResults:
+    """Test suite for benchmark result storage and comparison."""
+    
+    @pytest.mark.parametrize("label, rows", [("10k", 10_000), ("1M", 1_000_000), ("250000", 250_000)])
+    def test_parse_size(self, label, rows):
+        """Test size label parsing."""
+        assert parse_size(label) == rows
+    
+    def test_parse_size_invalid(self):
+        """Test that unknown sizes are rejected."""
+        with pytest.raises(ValueError):
+            parse_size("huge")
+    
+    def test_find_regressions(self):
+        """Test that only significant slowdowns are flagged."""
+        baseline = {"results": {"1m": {"extract_csv": 4.0, "transform_all": 10.0, "sanitize_column_names": 0.001}}}
+        current = {"results": {"1m": {"extract_csv": 5.0, "transform_all": 10.5, "sanitize_column_names": 0.002},
+                               "10m": {"extract_csv": 40.0}}}
+        
+        regressions = find_regressions(current, baseline, threshold=0.2)
+        
+        assert [(r["size"], r["stage"]) for r in regressions] == [("1m", "extract_csv")]
+        assert regressions[0]["change_pct"] == 25.0
+    
+    def test_time_call_runs_setup_outside_the_timer(self):
+        """Test that setup runs before every repeat without being timed."""
+        calls = []
+        
+        seconds, result = time_call(
+            lambda value: calls.append("func") or value, 7,
+            repeat=3, setup=lambda: calls.append("setup") or time.sleep(0.05)
+        )
+        
+        assert calls == ["setup", "func"] * 3
+        assert result == 7
+        assert seconds < 0.05
+    
+    def test_save_and_find_latest(self, tmp_path):
+        """Test that saved runs are found as the latest baseline."""
+        results = new_results(seed=42, repeat=1)
+        results["results"] = {"10k": {"extract_csv": 0.1}}
+        
+        path = save_results(results, output_dir=tmp_path)
+        
+        assert latest_results(tmp_path) == path
+        assert latest_results(tmp_path / "missing") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
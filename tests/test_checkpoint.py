@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Pipeline Checkpoint Tests
+==========================================
+
+Unit tests for the RunState class.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import json
+
+import pytest
+
+from src.etl.checkpoint import RunState, new_run_id
+
+
+class TestRunState:
+    """Test suite for RunState class."""
+    
+    def test_new_run_ids_are_unique(self):
+        """Test that generated run ids do not collide."""
+        assert new_run_id() != new_run_id()
+    
+    def test_state_is_saved_on_every_change(self, tmp_path):
+        """Test that stage transitions are written to the state file."""
+        run_state = RunState(state_dir=tmp_path, options={"skip_extract": True})
+        run_state.start_stage("transform")
+        
+        with open(run_state.path, encoding="utf-8") as f:
+            saved = json.load(f)
+        
+        assert saved["run_id"] == run_state.run_id
+        assert saved["options"] == {"skip_extract": True}
+        assert saved["stages"]["transform"]["status"] == "running"
+    
+    def test_resume_keeps_completed_stages(self, tmp_path):
+        """Test that a loaded run remembers completed and failed stages."""
+        run_state = RunState(state_dir=tmp_path)
+        run_state.start_stage("transform")
+        run_state.complete_stage("transform")
+        run_state.start_stage("export")
+        run_state.fail_stage("export", "disk full")
+        run_state.finish("failed")
+        
+        resumed = RunState.load(run_state.run_id, state_dir=tmp_path)
+        
+        assert resumed.stage_completed("transform")
+        assert not resumed.stage_completed("export")
+        assert resumed.state["stages"]["export"]["error"] == "disk full"
+        assert resumed.state["status"] == "running"
+    
+    def test_rows_committed_follows_last_chunk(self, tmp_path):
+        """Test that chunk checkpoints give the offset of the next chunk."""
+        run_state = RunState(state_dir=tmp_path)
+        assert run_state.rows_committed("extract") == 0
+        
+        run_state.record_chunk("extract", offset=0, rows=50000)
+        run_state.record_chunk("extract", offset=50000, rows=50000)
+        
+        resumed = RunState.load(run_state.run_id, state_dir=tmp_path)
+        assert resumed.rows_committed("extract") == 100000
+    
+    def test_items_are_tracked_per_stage(self, tmp_path):
+        """Test per-table progress inside a stage."""
+        run_state = RunState(state_dir=tmp_path)
+        run_state.complete_item("export", "dim_customer", rows=120)
+        
+        assert run_state.item_completed("export", "dim_customer")
+        assert not run_state.item_completed("export", "fact_orders")
+    
+    def test_load_unknown_run(self, tmp_path):
+        """Test that resuming an unknown run raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            RunState.load("does_not_exist", state_dir=tmp_path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Customer Risk Scoring Tests
+============================================
+
+Unit tests for the quantile sketch and the customer_risk scoring flow.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.customer_risk import QUINTILES, CustomerRiskScorer, QuantileSketch
+
+
+class TestQuantileSketch:
+    """Test suite for QuantileSketch."""
+    
+    def test_quantiles_within_relative_accuracy(self):
+        """Test estimates against exact quantiles of a skewed distribution."""
+        values = np.random.default_rng(7).lognormal(mean=6, sigma=1.5, size=20000)
+        sketch = QuantileSketch(relative_accuracy=0.01).update(values)
+        
+        exact = np.quantile(values, QUINTILES, method="lower")
+        assert sketch.count == 20000
+        for estimate, true_value in zip(sketch.quantiles(QUINTILES), exact):
+            assert abs(estimate - true_value) <= 0.01 * true_value * 1.0001
+    
+    def test_zeros_and_empty(self):
+        """Test that zeros are counted apart and an empty sketch yields NaN."""
+        sketch = QuantileSketch().update([0, 0, 0, 10, np.nan])
+        
+        assert sketch.zero_count == 3
+        assert sketch.quantiles([0.5])[0] == 0.0
+        assert sketch.quantiles([1.0])[0] == pytest.approx(10, rel=0.01)
+        assert math.isnan(QuantileSketch().quantiles([0.5])[0])
+    
+    def test_merge_matches_single_sketch(self):
+        """Test that merged partial sketches equal a sketch of all values."""
+        values = np.arange(1, 1001, dtype=float)
+        merged = QuantileSketch().update(values[:300]).merge(QuantileSketch().update(values[300:]))
+        
+        assert merged.buckets == QuantileSketch().update(values).buckets
+        with pytest.raises(ValueError, match="different relative accuracy"):
+            merged.merge(QuantileSketch(relative_accuracy=0.05))
+    
+    def test_counts_from_database_buckets(self):
+        """Test that pre-aggregated bucket counts give the same sketch."""
+        values = np.array([1.0, 2.5, 2.5, 40.0, 900.0])
+        local = QuantileSketch().update(values)
+        remote = QuantileSketch().add_counts(list(local.buckets), list(local.buckets.values()))
+        
+        assert remote.quantiles(QUINTILES) == local.quantiles(QUINTILES)
+        assert QuantileSketch().bucket_sql("value").startswith("CEIL(LN(value) / ")
+
+
+class TestCustomerRiskScorer:
+    """Test the refresh and publish flow against a mocked loader."""
+    
+    @pytest.fixture
+    def scorer(self, mocker):
+        """CustomerRiskScorer with existing tables and a recorded connection."""
+        loader = mocker.MagicMock()
+        loader.table_exists.return_value = True
+        return CustomerRiskScorer(loader=loader, relative_accuracy=0.01)
+    
+    def _executed(self, scorer):
+        """SQL run on the loader's transaction connection."""
+        conn = scorer.loader.engine.begin.return_value.__enter__.return_value
+        return [str(call.args[0]) for call in conn.execute.call_args_list]
+    
+    def test_refresh_recomputes_batch_customers_only(self, scorer):
+        """Test that a refresh only replaces the customers of the staged batch."""
+        scorer.loader.get_table_count.return_value = 5000
+        scorer.refresh()
+        
+        delete, insert = self._executed(scorer)
+        assert "DELETE FROM dw.customer_rfm WHERE customer_id IN (SELECT DISTINCT customer_id" in delete
+        assert "f.customer_id IN (SELECT DISTINCT customer_id FROM dw.stg_raw_orders)" in insert
+    
+    def test_first_refresh_rebuilds(self, scorer):
+        """Test that an empty metrics table is rebuilt from all facts."""
+        scorer.loader.get_table_count.return_value = 0
+        scorer.refresh()
+        
+        clear, insert = self._executed(scorer)
+        assert clear == "TRUNCATE dw.customer_rfm"
+        assert "WHERE f.customer_id IS NOT NULL AND TRUE" in insert
+    
+    def test_publish_scores_with_sketch_boundaries(self, scorer):
+        """Test that quintiles come from the sketched boundaries."""
+        scorer.loader.execute_query.return_value = pd.DataFrame({
+            "bucket": [None, 100.0, 200.0, 300.0], "n": [10, 30, 30, 30],
+        })
+        boundaries = scorer.quintile_boundaries()
+        sql = scorer.publish_sql(boundaries)
+        
+        assert set(boundaries) == {"recency_days", "frequency", "monetary"}
+        assert boundaries["monetary"] == QuantileSketch(0.01).add_counts([100, 200, 300], [30, 30, 30], 10).quantiles(
+            QUINTILES
+        )
+        assert "(5 - width_bucket(m.recency_days::DOUBLE PRECISION" in sql
+        assert "(width_bucket(m.monetary::DOUBLE PRECISION" in sql
+        assert "s.m_score = 5 AND s.risk_level IN ('CRITICAL', 'HIGH')" in sql
+        assert "NTILE" not in sql
+    
+    def test_publish_replaces_rows_without_blocking_readers(self, scorer):
+        """Test that customer_risk is replaced with DELETE + INSERT in one transaction."""
+        scorer.loader.execute_query.return_value = pd.DataFrame({
+            "bucket": [None, 100.0, 200.0, 300.0], "n": [10, 30, 30, 30],
+        })
+        conn = scorer.loader.engine.begin.return_value.__enter__.return_value
+        conn.execute.return_value.rowcount = 3
+        
+        assert scorer.publish() == 3
+        clear, insert = self._executed(scorer)
+        
+        scorer.loader.engine.begin.assert_called_once()
+        assert clear == "DELETE FROM dw.customer_risk"
+        assert "INSERT INTO dw.customer_risk" in insert
+    
+    def test_publish_skips_empty_metrics(self, scorer):
+        """Test that nothing is published before any customer is aggregated."""
+        scorer.loader.execute_query.return_value = pd.DataFrame({"bucket": [], "n": []})
+        
+        assert scorer.publish() == 0
+        scorer.loader.engine.begin.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Calendar Dimension Tests
+=========================================
+
+Unit tests for the generated dim_date calendar and its incremental loading.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from datetime import date
+
+import pytest
+
+from src.etl.date_dimension import CALENDAR_COLUMNS, CalendarDimension, generate_calendar
+
+
+class TestGenerateCalendar:
+    """Test suite for generate_calendar."""
+    
+    def test_one_row_per_day(self):
+        """Test that the span is covered day by day with every column."""
+        calendar = generate_calendar(date(2016, 1, 1), date(2016, 12, 31))
+        
+        assert len(calendar) == 366
+        assert list(calendar.columns) == list(CALENDAR_COLUMNS)
+        assert calendar["date_key"].iloc[0] == 20160101
+        assert calendar["date_key"].is_unique
+    
+    def test_iso_weeks_and_weekdays(self):
+        """Test ISO weeks at the year boundary and EXTRACT(DOW) numbering."""
+        calendar = generate_calendar(date(2016, 1, 1), date(2016, 1, 4)).set_index("date_key")
+        
+        # 2016-01-01 (a Friday) belongs to ISO week 53 of 2015
+        assert calendar.loc[20160101, "week"] == 53
+        assert calendar.loc[20160101, "iso_year"] == 2015
+        assert calendar.loc[20160104, "week"] == 1
+        
+        assert calendar.loc[20160103, "day_of_week"] == 0  # Sunday
+        assert calendar.loc[20160103, "day_name"] == "Sunday"
+        assert calendar["is_weekend"].tolist() == [False, True, True, False]
+    
+    def test_holidays(self):
+        """Test the US federal holiday flag."""
+        calendar = generate_calendar(date(2017, 7, 3), date(2017, 7, 5)).set_index("date_key")
+        assert calendar["is_holiday"].tolist() == [False, True, False]
+        
+        no_holidays = generate_calendar(date(2017, 7, 4), date(2017, 7, 4), holidays="none")
+        assert not no_holidays["is_holiday"].any()
+    
+    def test_fiscal_periods(self):
+        """Test fiscal years starting in October are named after the year they end in."""
+        calendar = generate_calendar(date(2017, 9, 30), date(2017, 10, 1), fiscal_year_start_month=10)
+        
+        assert calendar["fiscal_year"].tolist() == [2017, 2018]
+        assert calendar["fiscal_month"].tolist() == [12, 1]
+        assert calendar["fiscal_quarter"].tolist() == [4, 1]
+    
+    def test_calendar_year_fiscal_default(self):
+        """Test that the default fiscal year is the calendar year."""
+        calendar = generate_calendar(date(2017, 12, 31), date(2018, 1, 1))
+        
+        assert (calendar["fiscal_year"] == calendar["year"]).all()
+        assert (calendar["fiscal_month"] == calendar["month"]).all()
+
+
+class TestCalendarDimension:
+    """Test how much of the calendar a sync loads."""
+    
+    @pytest.fixture
+    def dimension(self):
+        """CalendarDimension for 2015-2017 without a database."""
+        return CalendarDimension(loader=None, start=date(2015, 1, 1), end=date(2017, 12, 31))
+    
+    def test_empty_table_loads_full_span(self, dimension, monkeypatch):
+        """Test that an empty dim_date is bulk-loaded over the whole span."""
+        monkeypatch.setattr(dimension, "coverage", lambda: (None, None, 0))
+        assert dimension.span_to_load() == (date(2015, 1, 1), date(2017, 12, 31))
+    
+    def test_up_to_date_table_loads_nothing(self, dimension, monkeypatch):
+        """Test that a covered span needs no work."""
+        monkeypatch.setattr(dimension, "coverage", lambda: (20150101, 20171231, 0))
+        
+        assert dimension.span_to_load() is None
+        assert dimension.span_to_load(through=20171115) is None
+    
+    def test_new_max_date_extends_calendar(self, dimension, monkeypatch):
+        """Test that only the days after the current end are generated."""
+        monkeypatch.setattr(dimension, "coverage", lambda: (20150101, 20171231, 0))
+        assert dimension.span_to_load(through=20180203) == (date(2018, 1, 1), date(2018, 2, 3))
+    
+    def test_older_orders_extend_calendar_back(self, dimension, monkeypatch):
+        """Test that a batch with orders before the start reloads the span from its oldest day."""
+        monkeypatch.setattr(dimension, "coverage", lambda: (20150101, 20171231, 0))
+        
+        assert dimension.span_to_load(since=20150101, through=20171115) is None
+        assert dimension.span_to_load(since=20141120, through=20171115) == (date(2014, 11, 20), date(2017, 12, 31))
+    
+    def test_ensure_only_alters_older_tables(self, mocker):
+        """Test that the locking ALTER TABLE only runs for missing calendar columns."""
+        loader = mocker.MagicMock()
+        dimension = CalendarDimension(loader=loader, start=date(2015, 1, 1), end=date(2017, 12, 31))
+        
+        loader.missing_columns.return_value = []
+        dimension.ensure()
+        assert not any("ALTER TABLE" in call.args[0] for call in loader.execute_statement.call_args_list)
+        
+        loader.missing_columns.return_value = ["iso_year", "fiscal_year"]
+        dimension.ensure()
+        loader.execute_statement.assert_called_with(
+            "ALTER TABLE dw.dim_date ADD COLUMN iso_year INTEGER, ADD COLUMN fiscal_year INTEGER"
+        )
+    
+    def test_staging_built_rows_are_completed(self, dimension, monkeypatch):
+        """Test that rows without calendar attributes trigger a full reload."""
+        monkeypatch.setattr(dimension, "coverage", lambda: (20150103, 20180131, 120))
+        assert dimension.span_to_load() == (date(2015, 1, 1), date(2018, 1, 31))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
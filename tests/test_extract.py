@@ -9,10 +9,15 @@ Author: Torre Control Engineering Team
 Date: 2026-02-04
 """
 
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import pytest
 
-from src.etl.extract import DataExtractor
+from src.etl.extract import DataExtractor, conform_to_staging, staging_table_ddl
+from src.etl.staging_cache import CACHE_FORMAT_VERSION, ParquetStagingCache
+from src.etl.utils import sanitize_column_name, sanitize_columns
 
 
 class TestDataExtractor:
@@ -79,6 +84,27 @@ class TestDataExtractor:
         
         assert list(df_sanitized.columns) == expected_columns
     
+    @pytest.mark.parametrize("raw, expected", [
+        ("Order Item Discount Rate", "order_item_discount_rate"),
+        ("  Product  Price ", "product_price"),
+        ("Order Zipcode-2", "order_zipcode2"),
+        ("Customer_Fname__", "customer_fname"),
+        ("Categoría Nombre", "categoría_nombre"),
+        ("Ωmega (Σ)", "ωmega_σ"),
+    ])
+    def test_sanitize_column_name(self, raw, expected):
+        """Test the shared sanitizer, including non-ASCII names."""
+        assert sanitize_column_name(raw) == expected
+    
+    def test_sanitize_columns_memoized(self):
+        """Test that a repeated header is served from the mapping cache."""
+        header = ("Order Id", "Sales per customer")
+        first = sanitize_columns(header)
+        hits = sanitize_columns.cache_info().hits
+        
+        assert sanitize_columns(header) is first
+        assert sanitize_columns.cache_info().hits == hits + 1
+    
     def test_extract_and_sanitize(self, extractor, sample_csv_file):
         """Test combined extract and sanitize operation."""
         df = extractor.extract_and_sanitize(file_path=str(sample_csv_file))
@@ -129,6 +155,116 @@ class TestDataExtractor:
         assert profile["null_percentages"]["col2"] == 100.0
         assert profile["null_percentages"]["col3"] == 0.0
     
+    def test_iter_csv_chunks(self, extractor, sample_csv_file):
+        """Test streaming sanitized chunks from a CSV file."""
+        chunks = list(extractor.iter_csv_chunks(file_path=str(sample_csv_file), chunksize=2))
+        
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        for chunk in chunks:
+            assert list(chunk.columns) == list(chunks[0].columns)
+            assert "order_id" in chunk.columns
+    
+    def test_iter_csv_chunks_skip_rows(self, extractor, sample_csv_file):
+        """Test resuming a chunked read after rows already loaded."""
+        chunks = list(extractor.iter_csv_chunks(
+            file_path=str(sample_csv_file),
+            chunksize=2,
+            skip_rows=3
+        ))
+        
+        assert sum(len(chunk) for chunk in chunks) == 2
+        assert chunks[0]["order_id"].tolist() == [4, 5]
+    
+    def test_staging_types_do_not_depend_on_first_chunk(self):
+        """Test that an all-NULL column in one chunk gets the same types as in the next."""
+        first = pd.DataFrame({
+            "order_id": [1.0, np.nan],
+            "order_zipcode": [np.nan, np.nan],
+            "product_description": [np.nan, np.nan],
+            "order_date_dateorders": ["1/31/2018 22:56", "2/1/2018 0:05"],
+            "extra_column": [1, 2],
+        })
+        second = pd.DataFrame({
+            "order_id": [3, 4],
+            "order_zipcode": [725.0, 10001.0],
+            "product_description": ["Cleats", None],
+            "order_date_dateorders": ["2/2/2018 10:00", "2/3/2018 11:30"],
+            "extra_column": ["a", "b"],
+        })
+        
+        conformed = [conform_to_staging(chunk) for chunk in (first, second)]
+        
+        assert conformed[0].dtypes.to_dict() == conformed[1].dtypes.to_dict()
+        assert conformed[0]["order_id"].dtype == "Int64"
+        assert conformed[0]["order_date_dateorders"].iloc[0] == pd.Timestamp("2018-01-31 22:56")
+        assert conformed[1]["product_description"].isna().tolist() == [False, True]
+        assert staging_table_ddl(first.columns) == [
+            "DROP TABLE IF EXISTS dw.stg_raw_orders",
+            'CREATE TABLE dw.stg_raw_orders ("order_id" BIGINT, "order_zipcode" DOUBLE PRECISION, '
+            '"product_description" TEXT, "order_date_dateorders" TIMESTAMP, "extra_column" TEXT)',
+        ]
+    
+    def test_staging_rejects_values_that_do_not_fit(self):
+        """Test that text in an id column fails instead of loading as NULL."""
+        with pytest.raises(ValueError):
+            conform_to_staging(pd.DataFrame({"customer_id": ["12", "n/a"]}))
+    
+    def test_extract_and_sanitize_uses_staging_cache(self, extractor, sample_csv_file, mocker):
+        """Test that an unchanged file is read from the Parquet cache with column projection."""
+        first = extractor.extract_and_sanitize(file_path=str(sample_csv_file))
+        assert list(extractor.staging_cache.cache_dir.glob("*.parquet"))
+        
+        parse = mocker.spy(extractor, "extract_csv")
+        cached = extractor.extract_and_sanitize(
+            file_path=str(sample_csv_file),
+            columns=["order_id", "sales"]
+        )
+        
+        parse.assert_not_called()
+        assert list(cached.columns) == ["order_id", "sales"]
+        pd.testing.assert_frame_equal(cached, first[["order_id", "sales"]])
+    
+    def test_staging_cache_invalidated_on_change(self, extractor, sample_csv_file, sample_dataframe):
+        """Test that editing the CSV produces a new cache entry and drops the stale one."""
+        extractor.extract_and_sanitize(file_path=str(sample_csv_file))
+        sample_dataframe.head(3).to_csv(sample_csv_file, index=False)
+        
+        df = extractor.extract_and_sanitize(file_path=str(sample_csv_file))
+        
+        assert len(df) == 3
+        assert len(list(extractor.staging_cache.cache_dir.glob("*.parquet"))) == 1
+    
+    def test_staging_cache_keeps_files_sharing_a_stem_prefix(self, extractor, sample_csv_file, sample_dataframe):
+        """Test that caching orders-2024.csv does not purge the cache of orders-2023.csv."""
+        files = [sample_csv_file.with_name(f"orders-{year}.csv") for year in (2023, 2024)]
+        for file in files:
+            sample_dataframe.to_csv(file, index=False)
+            extractor.extract_and_sanitize(file_path=str(file))
+        
+        cached = sorted(path.name for path in extractor.staging_cache.cache_dir.glob("*.parquet"))
+        assert [ParquetStagingCache.stem_of(Path(name).stem) for name in cached] == ["orders-2023", "orders-2024"]
+    
+    def test_staging_cache_key_has_format_version(self, extractor, sample_csv_file):
+        """Test that the cache key changes with the cache format version."""
+        key = extractor.staging_cache.key(str(sample_csv_file), "ISO-8859-1")
+        
+        assert key.endswith(f"-iso88591-v{CACHE_FORMAT_VERSION}")
+        assert ParquetStagingCache.stem_of(key) == sample_csv_file.stem
+    
+    def test_iter_csv_chunks_populates_staging_cache(self, extractor, sample_csv_file):
+        """Test that a full chunked pass is cached and replayed in the same chunks."""
+        list(extractor.iter_csv_chunks(file_path=str(sample_csv_file), chunksize=2))
+        assert list(extractor.staging_cache.cache_dir.glob("*.parquet"))
+        
+        cached = list(extractor.iter_csv_chunks(
+            file_path=str(sample_csv_file),
+            chunksize=2,
+            skip_rows=1
+        ))
+        
+        assert [len(chunk) for chunk in cached] == [2, 2]
+        assert cached[0]["order_id"].tolist() == [2, 3]
+    
     @pytest.mark.slow
     def test_extract_csv_with_chunking(self, extractor, sample_csv_file):
         """Test CSV extraction with chunking."""
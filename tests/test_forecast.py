@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Torre Control - OTIF Forecasting Tests
+=======================================
+
+Unit tests for the monthly series, forecast fits and cached refits.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import datetime
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.forecast import OTIFForecaster, build_series, fit_series, series_hash
+
+
+@pytest.fixture
+def history():
+    """Monthly aggregates as returned by SERIES_SQL."""
+    return pd.DataFrame({
+        "dimension": ["total", "total", "total", "market", "market"],
+        "member": ["All", "All", "All", "Europe", "Europe"],
+        "period": [201701, 201702, 201704, 201702, 201703],
+        "active_items": [100, 80, 50, 40, 0],
+        "otif_items": [40, 40, 20, 10, 0],
+        "revenue_at_risk": [1000.0, 800.0, 500.0, 300.0, 0.0],
+    })
+
+
+class TestBuildSeries:
+    """Test suite for build_series."""
+    
+    def test_months_are_completed_to_the_latest_month(self, history):
+        """Test that gaps are filled and every series ends at the same month."""
+        series = build_series(history)
+        
+        total_otif = series[("total", "All", "otif_pct")]
+        assert [str(month) for month in total_otif.index] == ["2017-01", "2017-02", "2017-03", "2017-04"]
+        assert total_otif.tolist() == [40.0, 50.0, 50.0, 40.0]
+        
+        europe_risk = series[("market", "Europe", "revenue_at_risk")]
+        assert [str(month) for month in europe_risk.index] == ["2017-02", "2017-03", "2017-04"]
+        assert europe_risk.tolist() == [300.0, 0.0, 0.0]
+        assert series[("market", "Europe", "otif_pct")].tolist() == [25.0, 25.0, 25.0]
+    
+    def test_hash_tracks_values_and_horizon(self, history):
+        """Test that only a changed series or horizon changes the hash."""
+        key = ("total", "All", "otif_pct")
+        values = build_series(history)[key]
+        
+        assert series_hash(key, values, 6) == series_hash(key, values.copy(), 6)
+        assert series_hash(key, values, 6) != series_hash(key, values, 3)
+        assert series_hash(key, values, 6) != series_hash(key, values + 0.5, 6)
+
+
+class TestFitSeries:
+    """Test suite for fit_series."""
+    
+    def test_short_series_uses_naive_forecast(self):
+        """Test the naive forecast, its months and the OTIF % bounds."""
+        task = (("total", "All", "otif_pct"), np.array([96.0, 99.0, 100.0]), "2017-01", 2)
+        
+        forecast = fit_series(task)
+        
+        assert forecast["method"].unique().tolist() == ["naive"]
+        assert forecast["forecast_month"].tolist() == [datetime.date(2017, 4, 1), datetime.date(2017, 5, 1)]
+        assert forecast["forecast"].tolist() == [98.33, 98.33]
+        assert forecast["upper_bound"].max() == 100.0
+        assert (forecast["lower_bound"] < forecast["forecast"]).all()
+    
+    def test_missing_statsmodels_falls_back_to_naive(self, monkeypatch):
+        """Test that long series are still forecast when statsmodels is not installed."""
+        monkeypatch.setitem(sys.modules, "statsmodels.tsa.exponential_smoothing.ets", None)
+        values = 1000 + 10 * np.arange(36, dtype=np.float64)
+        
+        forecast = fit_series((("market", "LATAM", "revenue_at_risk"), values, "2015-01", 3))
+        
+        assert forecast["method"].unique().tolist() == ["naive"]
+        assert forecast["forecast"].tolist() == [1340.0, 1340.0, 1340.0]
+    
+    def test_seasonal_ets_forecast(self):
+        """Test that two years of history get a seasonal ETS model."""
+        pytest.importorskip("statsmodels")
+        months = np.arange(36)
+        values = 1000 + 10 * months + 200 * np.sin(2 * np.pi * months / 12)
+        
+        forecast = fit_series((("market", "LATAM", "revenue_at_risk"), values, "2015-01", 6))
+        
+        assert forecast["method"].unique().tolist() == ["ets_seasonal"]
+        assert len(forecast) == 6
+        assert (forecast["lower_bound"] <= forecast["forecast"]).all()
+        assert (forecast["forecast"] <= forecast["upper_bound"]).all()
+
+
+class TestOTIFForecaster:
+    """Test cached refits against a mocked loader."""
+    
+    def test_only_changed_series_are_refitted(self, mocker, history):
+        """Test that cached series keep their forecasts and the rest are rewritten."""
+        loader = mocker.MagicMock()
+        series = build_series(history)
+        unchanged = ("total", "All", "otif_pct")
+        cached = series_hash(unchanged, series[unchanged], 3)
+        loader.execute_query.side_effect = [history, pd.DataFrame({"series_hash": [cached, "0" * 32]})]
+        conn = loader.engine.begin.return_value.__enter__.return_value
+        
+        rows = OTIFForecaster(loader=loader, horizon=3, workers=1).run()
+        
+        delete, insert = conn.execute.call_args_list
+        assert delete.args[1] == {"keep": [cached]}
+        written = pd.DataFrame(insert.args[1])
+        assert rows == len(written) == 3 * (len(series) - 1)
+        assert unchanged not in set(zip(written["dimension"], written["member"], written["metric"]))
+    
+    def test_fits_across_processes(self, mocker, history):
+        """Test that the process pool returns the fits in task order."""
+        series = build_series(history)
+        tasks = [(key, values.to_numpy(), str(values.index[0]), 2) for key, values in series.items()]
+        
+        results = OTIFForecaster(loader=mocker.MagicMock(), horizon=2, workers=2).fit_all(tasks)
+        
+        assert [tuple(result.iloc[0][["dimension", "member", "metric"]]) for result in results] == list(series)
+        assert all(len(result) == 2 for result in results)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Torre Control - CLI Import Time Tests
+======================================
+
+Guards the startup cost of the CLI entry points: importing them (and
+printing --help) must not pull in pandas, SQLAlchemy or pyarrow.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ("pandas", "numpy", "sqlalchemy", "pyarrow")
+ENTRY_POINTS = ("scripts.run_etl", "scripts.export_for_powerbi", "scripts.run_benchmarks")
+
+# Generous budget: the lazy entry points import in well under 0.2s
+IMPORT_BUDGET_SECONDS = 1.0
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    """Run a snippet in a fresh interpreter from the project root."""
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60
+    )
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_does_not_import_heavy_modules(module):
+    """Test that importing an entry point leaves the data stack unloaded."""
+    result = run_python(
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_import_time(module):
+    """Test that an entry point imports within the startup budget."""
+    result = run_python(f"import {module}", "-X", "importtime")
+    assert result.returncode == 0, result.stderr
+    
+    # -X importtime: "import time: self [us] | cumulative | name"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[1].isdigit():
+            cumulative[parts[2]] = int(parts[1])
+    
+    assert cumulative[module] / 1e6 < IMPORT_BUDGET_SECONDS
+
+
+def test_run_etl_help_stays_lightweight():
+    """Test that --help answers without loading the data stack."""
+    result = run_python(
+        "import sys, runpy; sys.argv = ['run_etl.py', '--help']\n"
+        "try:\n"
+        "    runpy.run_path('scripts/run_etl.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print('LOADED:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    
+    assert result.returncode == 0, result.stderr
+    assert "usage:" in result.stdout
+    assert result.stdout.strip().endswith("LOADED:")
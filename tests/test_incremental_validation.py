@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Incremental Validation Tests
+=============================================
+
+Unit tests for validation scopes and the running daily summary.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.etl.checkpoint import RunState
+from src.etl.date_dimension import to_date_key
+from src.etl.incremental_validation import RunningSummary, ValidationScope
+from src.etl.validate import DataValidator
+
+
+class RecordingLoader:
+    """Records validation queries and answers them with clean results."""
+    
+    def __init__(self, summary_rows=100000, fact_rows=100000):
+        self.summary_rows = summary_rows
+        self.fact_rows = fact_rows
+        self.queries = []
+    
+    def table_exists(self, table_name, schema=None):
+        return True
+    
+    def get_table_count(self, table_name, schema=None, statement_timeout_ms=None, mode="exact"):
+        return self.fact_rows
+    
+    def execute_query(self, query, params=None, statement_timeout_ms=None):
+        self.queries.append(query)
+        if "validation_daily_summary" in query:
+            return pd.DataFrame({
+                "days": [365], "order_items": [self.summary_rows],
+                "active_items": [90000], "otif_items": [86400],
+            })
+        if "scope_rows" in query:
+            return pd.DataFrame({"scope_rows": [1200]})
+        column = "null_count" if "null_count" in query else "orphan_count"
+        return pd.DataFrame({column: [0]})
+
+
+class TestValidationScope:
+    """Test suite for ValidationScope."""
+    
+    def test_date_keys(self):
+        """Test conversion of dates to dim_date keys."""
+        assert to_date_key(date(2026, 2, 4)) == 20260204
+        assert to_date_key("2026-02-04") == 20260204
+        assert to_date_key(20260204) == 20260204
+    
+    def test_predicate(self):
+        """Test the SQL condition of a scope."""
+        scope = ValidationScope("2026-02-01", "2026-02-04")
+        
+        assert scope.predicate() == "date_key BETWEEN 20260201 AND 20260204"
+        assert scope.predicate("f") == "f.date_key BETWEEN 20260201 AND 20260204"
+    
+    def test_empty_scope_rejected(self):
+        """Test that a reversed range is rejected."""
+        with pytest.raises(ValueError):
+            ValidationScope(20260205, 20260201)
+    
+    def test_scope_of_run(self, tmp_path):
+        """Test that a run's recorded batch range becomes its scope."""
+        run_state = RunState(state_dir=tmp_path)
+        run_state.complete_stage("transform", date_key_range=[20260203, 20260204])
+        
+        scope = ValidationScope.for_run(run_state.run_id, state_dir=tmp_path)
+        
+        assert (scope.first_date_key, scope.last_date_key) == (20260203, 20260204)
+        assert scope.run_id == run_state.run_id
+    
+    def test_run_without_range(self, tmp_path):
+        """Test that a run that recorded no batch range has no scope."""
+        run_state = RunState(state_dir=tmp_path)
+        run_state.complete_stage("transform")
+        
+        with pytest.raises(ValueError):
+            ValidationScope.for_run(run_state)
+
+
+class TestRunningSummary:
+    """Test suite for RunningSummary."""
+    
+    def test_matching_summary_is_fresh(self):
+        """Test that a summary covering the fact table is reused."""
+        assert RunningSummary(RecordingLoader())._is_stale() is False
+    
+    def test_drifted_summary_is_stale(self):
+        """Test that a summary far from the fact row estimate is rebuilt."""
+        assert RunningSummary(RecordingLoader(summary_rows=50000))._is_stale() is True
+        assert RunningSummary(RecordingLoader(summary_rows=0))._is_stale() is True
+
+
+class TestScopedValidation:
+    """Test DataValidator.validate_all with a scope."""
+    
+    def test_fact_checks_are_scoped(self, monkeypatch):
+        """Test that fact row checks only read the scope and OTIF uses the summary."""
+        monkeypatch.setattr(RunningSummary, "refresh", lambda self, scope: None)
+        loader = RecordingLoader()
+        scope = ValidationScope(20260203, 20260204)
+        
+        summary = DataValidator(loader=loader).validate_all(scope=scope)
+        
+        fact_queries = [q for q in loader.queries if "fact_orders" in q and "summary" not in q]
+        assert fact_queries
+        assert all("BETWEEN 20260203 AND 20260204" in q for q in fact_queries)
+        assert not any("is_complete" in q for q in loader.queries)
+        
+        checks = {r["check"]: r for r in summary["results"]}
+        assert checks["scope_rows_fact_orders"]["passed"]
+        assert "96.0%" in checks["otif_calculation"]["message"]
+        assert summary["errors"] == 0
+    
+    def test_dimension_checks_are_not_scoped(self, monkeypatch):
+        """Test that dimension checks still cover the whole dimension."""
+        monkeypatch.setattr(RunningSummary, "refresh", lambda self, scope: None)
+        loader = RecordingLoader()
+        
+        DataValidator(loader=loader).validate_all(scope=ValidationScope(20260203, 20260204))
+        
+        dim_null_queries = [q for q in loader.queries if "FROM dw.dim_customer" in q]
+        assert dim_null_queries
+        assert not any("BETWEEN" in q for q in dim_null_queries)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Late-Delivery Model Tests
+==========================================
+
+Unit tests for feature encoding, training and batch inference.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.etl.incremental_validation import ValidationScope
+from src.etl.late_delivery_model import (
+    CATEGORICAL_FEATURES,
+    NUMERIC_FEATURES,
+    FeatureEncoder,
+    LateDeliveryPredictor,
+    build_classifier,
+    features_from_staging,
+    fit_model,
+)
+
+
+def make_features(rows: int, seed: int = 3) -> pd.DataFrame:
+    """Feature rows where Same Day shipping with a long schedule runs late."""
+    rng = np.random.default_rng(seed)
+    shipping_mode = rng.choice(["Standard Class", "Second Class", "First Class", "Same Day"], size=rows)
+    scheduled = rng.integers(0, 5, size=rows)
+    frame = pd.DataFrame({
+        "order_id": np.arange(rows),
+        "order_item_id": np.arange(rows),
+        "date_key": 20170101,
+        "days_for_shipment_scheduled": scheduled,
+        "order_item_quantity": rng.integers(1, 5, size=rows),
+        "sales": rng.uniform(10, 500, size=rows),
+        "order_item_discount_rate": rng.uniform(0, 0.25, size=rows),
+        "product_price": rng.uniform(10, 300, size=rows),
+        "order_month": rng.integers(1, 13, size=rows),
+        "order_day_of_week": rng.integers(0, 7, size=rows),
+        "shipping_mode": shipping_mode,
+        "market": rng.choice(["Europe", "LATAM", "Pacific Asia"], size=rows),
+        "order_region": rng.choice(["Western Europe", "Central America"], size=rows),
+        "category_name": rng.choice(["Cleats", "Fishing"], size=rows),
+        "department_name": rng.choice(["Apparel", "Outdoors"], size=rows),
+        "customer_segment": rng.choice(["Consumer", "Corporate"], size=rows),
+    })
+    frame["is_late"] = (shipping_mode == "Same Day") | (scheduled <= 1)
+    return frame
+
+
+class StubModel:
+    """Classifier stand-in returning the scheduled days as late probability."""
+    
+    def predict_proba(self, matrix):
+        probability = np.clip(matrix[:, 0] / 4, 0, 1)
+        return np.column_stack([1 - probability, probability])
+
+
+class TestFeatureEncoder:
+    """Test suite for FeatureEncoder."""
+    
+    def test_matrix_layout_and_unknown_categories(self):
+        """Test numeric columns first, then category codes with NaN for unseen values."""
+        train = make_features(50)
+        encoder = FeatureEncoder().fit(train)
+        batch = train.iloc[:2].assign(market=["Africa", None])
+        
+        matrix = encoder.transform(batch)
+        
+        assert matrix.shape == (2, len(NUMERIC_FEATURES) + len(CATEGORICAL_FEATURES))
+        assert matrix.dtype == np.float32
+        assert matrix[0, 0] == train["days_for_shipment_scheduled"].iloc[0]
+        market = len(NUMERIC_FEATURES) + CATEGORICAL_FEATURES.index("market")
+        assert np.isnan(matrix[:, market]).all()
+        shipping = len(NUMERIC_FEATURES) + CATEGORICAL_FEATURES.index("shipping_mode")
+        assert encoder.categories["shipping_mode"][int(matrix[0, shipping])] == train["shipping_mode"].iloc[0]
+    
+    def test_categorical_mask(self):
+        """Test that the mask flags exactly the categorical columns."""
+        mask = FeatureEncoder().categorical_mask
+        assert mask.sum() == len(CATEGORICAL_FEATURES)
+        assert not mask[:len(NUMERIC_FEATURES)].any()
+    
+    def test_features_from_staging(self):
+        """Test the staging column mapping used by the benchmarks."""
+        staging = pd.DataFrame({
+            "order_date_dateorders": ["1/3/2016 10:00"],
+            "days_for_shipment_scheduled": [2],
+            "days_for_shipping_real": [4],
+            "order_item_quantity": [1],
+            "sales": [99.0],
+            "order_item_discount_rate": [0.1],
+            "order_item_product_price": [99.0],
+            "shipping_mode": ["Second Class"],
+            "market": ["Europe"],
+            "order_region": ["Western Europe"],
+            "category_name": ["Cleats"],
+            "department_name": ["Apparel"],
+            "customer_segment": ["Consumer"],
+        })
+        
+        features = features_from_staging(staging)
+        
+        assert features["order_day_of_week"].iloc[0] == 0  # Sunday, as in dim_date
+        assert features["is_late"].iloc[0]
+        assert set(NUMERIC_FEATURES + CATEGORICAL_FEATURES) <= set(features.columns)
+
+
+class TestTraining:
+    """Test model fitting (needs scikit-learn)."""
+    
+    def test_fit_and_evaluate_on_time_split(self):
+        """Test that the model learns the late pattern and reports holdout metrics."""
+        pytest.importorskip("sklearn")
+        bundle = fit_model(make_features(2000))
+        
+        assert bundle["trained_rows"] == 1600
+        assert bundle["metrics"]["rows"] == 400
+        assert bundle["metrics"]["roc_auc"] > 0.9
+    
+    def test_unknown_algorithm(self):
+        """Test that unsupported classifiers are rejected."""
+        with pytest.raises(ValueError, match="Unknown algorithm"):
+            build_classifier("random_forest")
+
+
+class TestLateDeliveryPredictor:
+    """Test batch inference against a mocked loader."""
+    
+    def test_without_model_scores_nothing(self, mocker, tmp_path):
+        """Test that the ENRICH step is a no-op until a model is trained."""
+        loader = mocker.MagicMock()
+        predictor = LateDeliveryPredictor(loader=loader, model_path=tmp_path / "missing.joblib")
+        
+        assert predictor.run() == 0
+        loader.engine.begin.assert_not_called()
+    
+    def test_scores_streamed_batches(self, mocker, tmp_path):
+        """Test that each Arrow batch is predicted in one call and written for the scope."""
+        loader = mocker.MagicMock()
+        loader.table_exists.return_value = True
+        features = make_features(6)
+        loader.iter_query_batches.return_value = iter([
+            pa.Table.from_pandas(features.iloc[:4], preserve_index=False).combine_chunks().to_batches()[0],
+            pa.Table.from_pandas(features.iloc[4:], preserve_index=False).combine_chunks().to_batches()[0],
+        ])
+        conn = loader.engine.begin.return_value.__enter__.return_value
+        
+        predictor = LateDeliveryPredictor(loader=loader, model_path=tmp_path / "model.joblib", threshold=0.5)
+        predictor._bundle = {
+            "model": StubModel(),
+            "categories": FeatureEncoder().fit(features).categories,
+            "version": "20260204120000",
+        }
+        rows = predictor.score(ValidationScope(20170101, 20170101))
+        
+        delete, first, second = conn.execute.call_args_list
+        assert str(delete.args[0]) == "DELETE FROM dw.fact_order_predictions WHERE date_key BETWEEN 20170101 AND 20170101"
+        written = first.args[1] + second.args[1]
+        assert rows == len(written) == 6
+        expected = np.clip(features["days_for_shipment_scheduled"] / 4, 0, 1)
+        assert [row["late_probability"] for row in written] == pytest.approx(expected.tolist())
+        assert [row["predicted_late"] for row in written] == (expected >= 0.5).tolist()
+        assert {row["model_version"] for row in written} == {"20260204120000"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Pareto Analysis Tests
+======================================
+
+Unit tests for the vectorized Pareto roll-up and ParetoAnalyzer.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.pareto import ParetoAnalyzer, pareto_frame
+
+
+@pytest.fixture
+def grain():
+    """Small product x market x shipping mode grain."""
+    return pd.DataFrame({
+        "product_name": ["Cleats", "Cleats", "Gloves", "Shoes", "Tent", None],
+        "category_name": ["Footwear", "Footwear", "Fitness", "Footwear", "Camping", "Camping"],
+        "department_name": ["Apparel", "Apparel", "Outdoors", "Apparel", "Outdoors", "Outdoors"],
+        "market": ["Europe", "LATAM", "Europe", "LATAM", "Europe", "Africa"],
+        "shipping_mode": ["First Class", "Standard Class", "Standard Class", "First Class", "Same Day", "Same Day"],
+        "total_items": [100, 60, 40, 50, 10, 5],
+        "late_items": [50, 10, 20, 15, 5, 0],
+        "sales": [1000.0, 600.0, 800.0, 500.0, 300.0, 50.0],
+        "late_sales": [500.0, 100.0, 400.0, 150.0, 150.0, 0.0],
+    })
+
+
+class TestParetoFrame:
+    """Test suite for pareto_frame."""
+    
+    def test_ranked_shares(self):
+        """Test contribution and cumulative shares of a rolled-up measure."""
+        result = pareto_frame(np.array(["a", "b", "a", "c"]), np.array([30, 50, 30, 40]))
+        
+        assert result["member"].tolist() == ["a", "b", "c"]
+        assert result["value"].tolist() == [60, 50, 40]
+        assert result["contribution_pct"].tolist() == pytest.approx([40, 33.333, 26.667], abs=1e-3)
+        assert result["cumulative_pct"].iloc[-1] == pytest.approx(100)
+        assert result["rank"].tolist() == [1, 2, 3]
+    
+    def test_vital_few_includes_member_crossing_threshold(self):
+        """Test that the vital few are the members needed to reach the threshold."""
+        result = pareto_frame(np.array(["a", "b", "c", "d"]), np.array([70, 15, 10, 5]))
+        
+        assert result["is_vital_few"].tolist() == [True, True, False, False]
+        assert pareto_frame(np.array(["a", "b"]), np.array([70, 30]), threshold_pct=70)["is_vital_few"].tolist() == [
+            True, False
+        ]
+    
+    def test_zero_members_dropped_and_nulls_labelled(self):
+        """Test that members without any measure are left out and nulls are kept."""
+        result = pareto_frame(np.array(["a", None, "b"], dtype=object), np.array([0, 5, 5]))
+        
+        assert result["member"].tolist() == ["(unknown)", "b"]
+        assert pareto_frame(np.array(["a"]), np.array([0])).empty
+    
+    def test_late_rates(self):
+        """Test late rates rolled up from item counts."""
+        result = pareto_frame(
+            np.array(["a", "a", "b"]), np.array([5, 5, 3]),
+            total_items=np.array([10, 10, 3]), late_items=np.array([5, 5, 3]),
+        )
+        
+        assert result["total_items"].tolist() == [20, 3]
+        assert result["late_rate_pct"].tolist() == pytest.approx([50, 100])
+
+
+class TestParetoAnalyzer:
+    """Test ParetoAnalyzer against a mocked loader."""
+    
+    @pytest.fixture
+    def analyzer(self, mocker, grain):
+        """ParetoAnalyzer whose loader returns the test grain."""
+        loader = mocker.MagicMock()
+        loader.execute_query.return_value = grain
+        return ParetoAnalyzer(loader=loader)
+    
+    def test_every_dimension_from_one_query(self, analyzer):
+        """Test that all dimensions are served from one cached grain query."""
+        product = analyzer.analyze("product")
+        market = analyzer.analyze("market")
+        analyzer.analyze("shipping_mode", measure="late_sales")
+        
+        analyzer.loader.execute_query.assert_called_once()
+        assert analyzer.loader.execute_query.call_args.kwargs == {"cache": True}
+        assert product["product"].tolist() == ["Cleats", "Gloves", "Shoes", "Tent"]
+        assert product["late_items"].tolist() == [60, 20, 15, 5]
+        assert market.set_index("market")["late_items"].to_dict() == {"Europe": 75, "LATAM": 25}
+    
+    def test_summary(self, analyzer):
+        """Test the concentration summary of a dimension."""
+        summary = analyzer.summary("category", measure="late_sales")
+        
+        assert summary == {"members": 3, "vital_few": 2, "vital_few_pct": 66.67, "vital_few_value_pct": 88.46}
+    
+    def test_unknown_dimension(self, analyzer):
+        """Test that unknown dimensions and measures are rejected."""
+        with pytest.raises(ValueError, match="Unknown dimension"):
+            analyzer.analyze("warehouse")
+        with pytest.raises(ValueError, match="Unknown measure"):
+            analyzer.analyze("product", measure="profit")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Torre Control - VertiPaq Parquet Export Tests
+==============================================
+
+Unit tests for the Parquet export profile and its compression report.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.etl.parquet_export import (
+    VertiPaqParquetProfile,
+    integer_type,
+    is_hash_key,
+    key_map_path,
+    sort_columns,
+)
+
+
+def md5(value) -> str:
+    """Hash key as built by the transform (MD5 of the natural key)."""
+    return hashlib.md5(str(value).encode()).hexdigest()
+
+
+@pytest.fixture
+def fact():
+    """Fact-like frame with the dtypes read_sql produces."""
+    rows = 2000
+    rng = np.random.default_rng(7)
+    customer_id = rng.integers(1, 500, size=rows).astype(float)
+    customer_id[:3] = np.nan
+    return pd.DataFrame({
+        "order_id": np.arange(rows, dtype=np.int64),
+        "customer_id": customer_id,
+        "geography_key": [md5(value) for value in rng.integers(0, 40, size=rows)],
+        "shipping_mode": rng.choice(["Standard Class", "Second Class", "First Class", "Same Day"], size=rows),
+        "customer_name": [f"Customer {index}" for index in range(rows)],
+        "sales": rng.uniform(10, 500, size=rows).round(2),
+        "is_late": rng.random(rows) < 0.5,
+    })
+
+
+class TestColumnRules:
+    """Test suite for the column type helpers."""
+    
+    def test_integer_type(self):
+        """Test int32 when values fit, nullable types with NULLs, none for fractions and decimals."""
+        assert integer_type(pd.Series([1, 2, 3], dtype="int64")) == "int32"
+        assert integer_type(pd.Series([1.0, np.nan])) == "Int32"
+        assert integer_type(pd.Series([2 ** 40, 1])) == "int64"
+        assert integer_type(pd.Series([1.5, 2.0])) is None
+        assert integer_type(pd.Series([True, False])) is None
+        assert integer_type(pd.Series([1, 2], dtype=pd.ArrowDtype(pa.decimal128(15, 2)))) is None
+    
+    def test_hash_keys_and_sort_columns(self, fact):
+        """Test MD5 key detection and the low-cardinality sort order."""
+        assert is_hash_key(fact["geography_key"])
+        assert not is_hash_key(fact["shipping_mode"])
+        assert sort_columns(fact) == ["is_late", "shipping_mode", "geography_key", "customer_id"]
+
+
+class TestVertiPaqParquetProfile:
+    """Test suite for VertiPaqParquetProfile."""
+    
+    def test_prepare(self, fact):
+        """Test key types, dictionaries and sorted rows."""
+        prepared = VertiPaqParquetProfile(compression="zstd").prepare(fact)
+        
+        assert prepared["order_id"].dtype == "int32"
+        assert prepared["customer_id"].dtype == "Int32"
+        assert prepared["geography_key"].dtype == "Int32"
+        assert prepared["shipping_mode"].dtype == "category"
+        assert prepared["sales"].dtype == "float64"
+        assert prepared["customer_name"].dtype != "category"
+        assert prepared["is_late"].is_monotonic_increasing
+        assert prepared["sales"].sum() == pytest.approx(fact["sales"].sum())
+    
+    def test_hash_keys_match_across_tables(self, fact):
+        """Test that a dimension and a fact written with one profile share key ids."""
+        profile = VertiPaqParquetProfile(compression="zstd", sort=False)
+        dimension = pd.DataFrame({"geography_key": fact["geography_key"].unique()[::-1]})
+        
+        fact_ids = dict(zip(fact["geography_key"], profile.prepare(fact)["geography_key"]))
+        dimension_ids = dict(zip(dimension["geography_key"], profile.prepare(dimension)["geography_key"]))
+        
+        assert fact_ids == dimension_ids
+        assert sorted(dimension_ids.values()) == list(range(len(dimension)))
+    
+    def test_key_maps_survive_a_partial_export(self, fact, tmp_path):
+        """Test that a later export of one table reuses the ids already on disk."""
+        key_map = tmp_path / "keys.parquet"
+        first = VertiPaqParquetProfile(compression="zstd", sort=False)
+        fact_ids = dict(zip(fact["geography_key"], first.prepare(fact)["geography_key"]))
+        first.save_key_maps(key_map)
+        
+        # The dimension alone, with a new member sorting before every known key
+        dimension = pd.DataFrame({"geography_key": ["0" * 32, *fact["geography_key"].unique()]})
+        second = VertiPaqParquetProfile(compression="zstd", sort=False)
+        assert second.load_key_maps(key_map) == len(fact_ids)
+        dimension_ids = dict(zip(dimension["geography_key"], second.prepare(dimension)["geography_key"]))
+        
+        assert {key: dimension_ids[key] for key in fact_ids} == fact_ids
+        assert dimension_ids["0" * 32] == len(fact_ids)
+        assert VertiPaqParquetProfile().load_key_maps(tmp_path / "missing.parquet") == 0
+    
+    def test_key_map_kept_outside_the_export(self, tmp_path):
+        """Test one key map per export directory, none inside it."""
+        export_dir = tmp_path / "processed"
+        
+        path = key_map_path(export_dir)
+        
+        assert export_dir.resolve() not in path.parents
+        assert path == key_map_path(tmp_path / "." / "processed")
+        assert path != key_map_path(tmp_path / "other" / "processed")
+    
+    def test_write_row_groups_and_report(self, fact, tmp_path):
+        """Test codec, row group size and the per-column report."""
+        path = tmp_path / "fact_orders.parquet"
+        
+        report = VertiPaqParquetProfile(compression="zstd", row_group_size=500).write(fact, path)
+        
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.num_row_groups == 4
+        assert metadata.row_group(0).column(0).compression == "ZSTD"
+        assert set(report["column"]) == set(fact.columns)
+        by_column = report.set_index("column")
+        assert by_column.loc["shipping_mode", "parquet_type"].startswith("dictionary")
+        assert by_column.loc["geography_key", "compression_ratio"] > 10
+        assert pd.read_parquet(path)["shipping_mode"].dtype == "category"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Streaming Profiler Tests
+=========================================
+
+Unit tests for the streaming profiler and its sketches.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.etl.profiling import HyperLogLog, StreamingProfiler, TDigest
+
+
+@pytest.fixture
+def orders_frame():
+    """Synthetic orders frame large enough to exercise the sketches."""
+    rng = np.random.default_rng(42)
+    rows = 60000
+    return pd.DataFrame({
+        "sales": rng.lognormal(5, 1, rows),
+        "customer_id": rng.integers(0, 5000, rows),
+        "market": rng.choice(["USCA", "Europe", "LATAM", "Pacific Asia"], rows, p=[0.4, 0.3, 0.2, 0.1]),
+        "order_date": pd.date_range("2023-01-01", periods=rows, freq="min"),
+    })
+
+
+class TestSketches:
+    """Test suite for the individual sketches."""
+    
+    def test_hyperloglog_estimate(self):
+        """Test that the distinct estimate is within a few percent."""
+        hll = HyperLogLog(precision=12)
+        values = pd.Series(np.arange(50000))
+        hll.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        
+        assert hll.estimate() == pytest.approx(50000, rel=0.05)
+    
+    def test_hyperloglog_small_range(self):
+        """Test that small cardinalities are counted almost exactly."""
+        hll = HyperLogLog()
+        values = pd.Series(["USCA", "Europe", "LATAM", "USCA"])
+        hll.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        
+        assert hll.estimate() == 3
+    
+    def test_hyperloglog_invalid_precision(self):
+        """Test that unsupported precisions are rejected."""
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=4)
+    
+    def test_tdigest_quantiles(self):
+        """Test t-digest quantiles against exact ones, including the tails."""
+        values = np.random.default_rng(0).normal(100, 15, 100000)
+        digest = TDigest()
+        for chunk in np.array_split(values, 10):
+            digest.update(chunk)
+        
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            exact = np.quantile(values, q)
+            assert digest.quantile(q, values.min(), values.max()) == pytest.approx(exact, abs=0.5)
+        assert len(digest.means) < 500
+
+
+class TestStreamingProfiler:
+    """Test suite for StreamingProfiler."""
+    
+    def test_profile_matches_exact_statistics(self, orders_frame):
+        """Test that chunked profiling reproduces exact counts and moments."""
+        chunks = (orders_frame.iloc[i:i + 7000] for i in range(0, len(orders_frame), 7000))
+        profile = StreamingProfiler.from_chunks(chunks).profile()
+        
+        assert profile["row_count"] == len(orders_frame)
+        assert profile["columns"] == list(orders_frame.columns)
+        assert profile["numeric_columns"] == ["sales", "customer_id"]
+        assert profile["categorical_columns"] == ["market"]
+        assert profile["datetime_columns"] == ["order_date"]
+        
+        stats = profile["numeric_stats"]["sales"]
+        expected = orders_frame["sales"].describe()
+        assert stats["count"] == expected["count"]
+        assert stats["mean"] == pytest.approx(expected["mean"])
+        assert stats["std"] == pytest.approx(expected["std"])
+        assert stats["min"] == expected["min"] and stats["max"] == expected["max"]
+        assert stats["50%"] == pytest.approx(expected["50%"], rel=0.01)
+        
+        assert profile["distinct_counts"]["customer_id"] == pytest.approx(5000, rel=0.05)
+        assert list(profile["top_values"]["market"])[0] == "USCA"
+    
+    def test_null_counts_and_dtype_widening(self):
+        """Test null counting across chunks whose dtypes differ."""
+        chunks = [
+            pd.DataFrame({"qty": [1, 2, 3]}),
+            pd.DataFrame({"qty": [4.0, None, None]}),
+        ]
+        profile = StreamingProfiler.from_chunks(chunks).profile()
+        
+        assert profile["dtypes"]["qty"] == "float64"
+        assert profile["null_counts"]["qty"] == 2
+        assert profile["null_percentages"]["qty"] == 33.33
+        assert profile["distinct_counts"]["qty"] == 4
+    
+    def test_merge_equals_single_pass(self, orders_frame):
+        """Test that merging per-worker profilers gives the single-pass profile."""
+        half = len(orders_frame) // 2
+        left = StreamingProfiler().update(orders_frame.iloc[:half])
+        right = StreamingProfiler().update(orders_frame.iloc[half:])
+        merged = left.merge(right).profile()
+        single = StreamingProfiler().update(orders_frame).profile()
+        
+        assert merged["row_count"] == single["row_count"]
+        assert merged["distinct_counts"] == single["distinct_counts"]
+        assert merged["top_values"]["market"] == single["top_values"]["market"]
+        assert merged["numeric_stats"]["sales"]["std"] == pytest.approx(
+            single["numeric_stats"]["sales"]["std"]
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
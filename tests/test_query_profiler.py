@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Torre Control - SQL Query Profiler Tests
+=========================================
+
+Unit tests for statement fingerprinting and the engine-event profiler
+(exercised on an in-memory SQLite engine, no PostgreSQL needed).
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.etl.query_profiler import QueryProfiler, estimate_frame_bytes, fingerprint
+
+
+class TestFingerprint:
+    """Test suite for statement fingerprinting."""
+    
+    @pytest.mark.parametrize("first, second", [
+        ("SELECT * FROM dw.fact_orders WHERE order_id = 42",
+         "select *  from dw.fact_orders\n where order_id = 7"),
+        ("SELECT * FROM dw.dim_customer WHERE customer_segment = 'Consumer'",
+         "SELECT * FROM dw.dim_customer WHERE customer_segment = 'Home Office' -- adhoc"),
+        ("INSERT INTO dw.stg_raw_orders (a, b) VALUES (%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)",
+         "INSERT INTO dw.stg_raw_orders (a, b) VALUES (%(a_m0)s, %(b_m0)s)"),
+        ("SELECT * FROM dw.fact_orders WHERE market IN (%s, %s, %s)",
+         "SELECT * FROM dw.fact_orders WHERE market IN (:m)"),
+    ])
+    def test_equivalent_statements_share_fingerprint(self, first, second):
+        """Test that literals, parameters and list lengths are normalized away."""
+        assert fingerprint(first) == fingerprint(second)
+    
+    def test_casts_are_kept(self):
+        """Test that PostgreSQL casts are not mistaken for bind parameters."""
+        assert "::date" in fingerprint("SELECT order_date::DATE FROM dw.stg_raw_orders")
+
+
+class TestQueryProfiler:
+    """Test suite for QueryProfiler."""
+    
+    @pytest.fixture
+    def engine(self):
+        """In-memory SQLite engine with a small table."""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE orders (order_id INTEGER, market TEXT)"))
+            conn.execute(text("INSERT INTO orders VALUES (1, 'USCA'), (2, 'Europe'), (3, 'LATAM')"))
+        return engine
+    
+    def test_records_calls_by_fingerprint(self, engine):
+        """Test timing and row counts aggregated per fingerprint."""
+        profiler = QueryProfiler(slow_threshold_ms=0, explain_slow=False)
+        profiler.attach(engine)
+        
+        with engine.begin() as conn:
+            for order_id in (1, 2):
+                conn.execute(text("UPDATE orders SET market = 'X' WHERE order_id = :id"), {"id": order_id})
+        
+        report = profiler.report()
+        
+        assert len(report) == 1
+        assert report[0]["calls"] == 2
+        assert report[0]["rows"] == 2
+        assert report[0]["slow_calls"] == 2
+        assert report[0]["statement"] == "update orders set market = ? where order_id = ?"
+    
+    def test_explain_sample_for_slow_statements(self, engine):
+        """Test that a plan is sampled once per slow fingerprint."""
+        profiler = QueryProfiler(slow_threshold_ms=0, explain_slow=True)
+        profiler.attach(engine)
+        
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT * FROM orders WHERE order_id > :id"), {"id": 1}).fetchall()
+        
+        assert len(rows) == 2
+        assert profiler.report()[0]["explain"]
+    
+    def test_detach_and_reset(self, engine):
+        """Test that a detached profiler stops recording."""
+        profiler = QueryProfiler(slow_threshold_ms=1000, explain_slow=False)
+        profiler.attach(engine)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT * FROM orders"))
+        profiler.detach(engine)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT * FROM orders"))
+        
+        assert profiler.report()[0]["calls"] == 1
+        profiler.reset()
+        assert profiler.report() == []
+    
+    def test_record_bytes(self, engine):
+        """Test that fetched bytes are attributed to the query's fingerprint."""
+        profiler = QueryProfiler(slow_threshold_ms=1000, explain_slow=False)
+        profiler.attach(engine)
+        
+        query = "SELECT * FROM orders WHERE order_id > :min_id"
+        with engine.connect() as conn:
+            df = pd.read_sql(text(query), conn, params={"min_id": 0})
+        profiler.record_bytes(query, estimate_frame_bytes(df))
+        
+        assert profiler.report()[0]["bytes_fetched"] > 0
+    
+    def test_record_creates_entry(self):
+        """Test that reads outside the engine events are recorded with their bytes."""
+        profiler = QueryProfiler(slow_threshold_ms=100, explain_slow=False)
+        
+        profiler.record("SELECT * FROM dw.fact_orders WHERE date_key >= 20170101", 0.25, rows=10, nbytes=800)
+        profiler.record("SELECT * FROM dw.fact_orders WHERE date_key >= 20170102", 0.05, rows=5, nbytes=400)
+        
+        report = profiler.report()
+        assert len(report) == 1
+        assert (report[0]["calls"], report[0]["rows"], report[0]["bytes_fetched"]) == (2, 15, 1200)
+        assert report[0]["slow_calls"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
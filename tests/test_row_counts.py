@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Row Count Service Tests
+========================================
+
+Unit tests for estimated, exact and cached row counts.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import pandas as pd
+import pytest
+
+from src.etl.row_counts import RowCountService, estimate_from_stats
+
+
+class StubLoader:
+    """Answers catalog and COUNT(*) queries from fixed numbers."""
+    
+    def __init__(self, exact=500, reltuples=480, n_live_tup=None):
+        self.exact = exact
+        self.stats = {"reltuples": reltuples, "n_live_tup": n_live_tup}
+        self.queries = []
+    
+    def execute_query(self, query, params=None, statement_timeout_ms=None):
+        self.queries.append(query)
+        if "pg_class" in query:
+            if self.stats["reltuples"] is None:
+                return pd.DataFrame(columns=["table_name", "reltuples", "n_live_tup"])
+            return pd.DataFrame([{"table_name": params["tables"][0], **self.stats}])
+        return pd.DataFrame({"count": [self.exact]})
+    
+    @property
+    def scans(self):
+        return sum("COUNT(*)" in query for query in self.queries)
+
+
+class TestEstimateFromStats:
+    """Test the choice between catalog statistics."""
+    
+    def test_prefers_live_tuples(self):
+        """Test that n_live_tup wins when the statistics system has seen rows."""
+        assert estimate_from_stats(reltuples=100, n_live_tup=250) == 250
+    
+    def test_falls_back_to_reltuples(self):
+        """Test that reltuples is used when there are no live-tuple stats."""
+        assert estimate_from_stats(reltuples=100, n_live_tup=None) == 100
+        assert estimate_from_stats(reltuples=100, n_live_tup=0) == 100
+    
+    def test_never_analyzed_table(self):
+        """Test reltuples = -1 (never analyzed)."""
+        assert estimate_from_stats(reltuples=-1, n_live_tup=0) == 0
+        assert estimate_from_stats(reltuples=-1, n_live_tup=None) is None
+
+
+class TestRowCountService:
+    """Test suite for RowCountService."""
+    
+    def test_estimated_mode_does_not_scan(self):
+        """Test that estimated counts come from the catalog only."""
+        loader = StubLoader(n_live_tup=510)
+        service = RowCountService(loader)
+        
+        assert service.count("fact_orders", "dw", mode="estimated") == 510
+        assert loader.scans == 0
+    
+    def test_estimated_mode_falls_back_for_unknown_table(self):
+        """Test that a table missing from the catalog is counted exactly."""
+        loader = StubLoader(reltuples=None)
+        
+        assert RowCountService(loader).count("fact_orders", "dw", mode="estimated") == 500
+        assert loader.scans == 1
+    
+    def test_cached_mode_reuses_count(self):
+        """Test that cached counts scan once until invalidated."""
+        loader = StubLoader()
+        service = RowCountService(loader)
+        
+        assert service.count("fact_orders", "dw", mode="cached") == 500
+        loader.exact = 900
+        assert service.count("fact_orders", "dw", mode="cached") == 500
+        assert loader.scans == 1
+        
+        service.invalidate("fact_orders", "dw")
+        assert service.count("fact_orders", "dw", mode="cached") == 900
+    
+    def test_write_statements_invalidate_cache(self):
+        """Test that engine writes drop cached counts and reads do not."""
+        loader = StubLoader()
+        service = RowCountService(loader)
+        service.count("fact_orders", "dw", mode="cached")
+        
+        service._after_cursor_execute(None, None, "SELECT 1", {}, None, False)
+        assert service._cache
+        
+        service._after_cursor_execute(None, None, "INSERT INTO dw.fact_orders VALUES (1)", {}, None, False)
+        assert not service._cache
+    
+    def test_count_racing_a_write_is_not_cached(self):
+        """Test that a count computed across an invalidation is not stored."""
+        loader = StubLoader()
+        service = RowCountService(loader)
+        
+        original = loader.execute_query
+        
+        def execute_during_write(query, params=None, statement_timeout_ms=None):
+            service.invalidate()
+            return original(query, params, statement_timeout_ms)
+        
+        loader.execute_query = execute_during_write
+        service.count("fact_orders", "dw", mode="cached")
+        
+        assert not service._cache
+    
+    def test_unknown_mode(self):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            RowCountService(StubLoader()).count("fact_orders", "dw", mode="approximate")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
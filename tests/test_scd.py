@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Slowly Changing Dimension Tests
+================================================
+
+Unit tests for the SCD2Engine statements and load flow.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import pytest
+
+from src.etl.scd import HISTORY_TABLES, SCD2_DIMENSIONS, SCD2Engine, key_join, row_hash_sql
+from src.etl.swap import STAR_TABLES, SWAP_TABLES
+
+
+@pytest.fixture
+def mock_loader(mocker):
+    """Provide a loader whose engine hands out one recorded connection."""
+    loader = mocker.MagicMock()
+    conn = loader.engine.begin.return_value.__enter__.return_value
+    conn.execute.return_value.rowcount = 7
+    conn.execute.return_value.one.return_value = (3, 2)
+    return loader, conn
+
+
+class TestSCD2Statements:
+    """Test suite for the generated SCD2 SQL."""
+    
+    def test_helpers(self):
+        """Test the row hash and natural key join expressions."""
+        assert row_hash_sql(["market", "order_city"]) == "MD5(ROW(market, order_city)::text)"
+        assert key_join("d", "s", ["order_id", "order_item_id"]) == (
+            "d.order_id = s.order_id AND d.order_item_id = s.order_item_id"
+        )
+    
+    def test_sources_yield_one_row_per_member(self):
+        """Test that every staging source is DISTINCT ON its natural key, so upserts touch a row once."""
+        for spec in SCD2_DIMENSIONS.values():
+            key = ", ".join(spec["natural_key"])
+            assert spec["source"].strip().startswith(f"SELECT DISTINCT ON ({key})")
+            assert f"ORDER BY {key}," in spec["source"]
+    
+    def test_changes_found_with_one_hash_join(self):
+        """Test that change detection compares hashes, not every column."""
+        statements = SCD2Engine(loader=None).statements("dim_product")
+        detect = next(s for s in statements if "CREATE TEMP TABLE scd_changes" in s)
+        
+        assert "LEFT JOIN dw.dim_product d ON d.product_card_id = s.product_card_id" in detect
+        assert "WHERE d.row_hash IS DISTINCT FROM s.row_hash" in detect
+        assert "product_name" not in detect
+    
+    def test_versions_closed_before_new_ones(self):
+        """Test that the current version is closed before the new one is inserted."""
+        statements = SCD2Engine(loader=None, schema="dw_next").statements("dim_customer")
+        
+        close = next(i for i, s in enumerate(statements) if "SET valid_to = CURRENT_TIMESTAMP" in s)
+        insert = next(i for i, s in enumerate(statements) if s.startswith("INSERT INTO dw_next.dim_customer_history"))
+        upsert = next(i for i, s in enumerate(statements) if s.startswith("INSERT INTO dw_next.dim_customer "))
+        
+        assert close < insert < upsert
+        assert "FROM scd_changes" in statements[upsert]
+    
+    def test_type1_attributes_not_versioned(self):
+        """Test that sales_per_customer is overwritten in place, outside the hash."""
+        statements = SCD2Engine(loader=None).statements("dim_customer")
+        
+        hashing = next(s for s in statements if s.startswith("UPDATE scd_stage SET row_hash"))
+        assert "sales_per_customer" not in hashing
+        assert statements[-1].startswith("UPDATE dw.dim_customer d")
+        assert "d.sales_per_customer IS DISTINCT FROM s.sales_per_customer" in statements[-1]
+        
+        product = SCD2Engine(loader=None).statements("dim_product")
+        assert not any(s.startswith("UPDATE dw.dim_product d") for s in product)
+    
+    def test_history_tables_swapped_with_dimensions(self):
+        """Test that blue/green swaps carry the history tables."""
+        assert HISTORY_TABLES == [f"{dimension}_history" for dimension in SCD2_DIMENSIONS]
+        assert set(HISTORY_TABLES) <= set(SWAP_TABLES)
+        # They only exist after the first SCD2 load, so they stay out of the star list
+        assert not set(HISTORY_TABLES) & set(STAR_TABLES)
+
+
+class TestSCD2Load:
+    """Test the load flow against a mocked database."""
+    
+    def test_load_runs_in_one_transaction(self, mock_loader):
+        """Test that every statement runs on the same transaction and counts are reported."""
+        loader, conn = mock_loader
+        loader.table_exists.return_value = True
+        engine = SCD2Engine(loader=loader)
+        
+        counts = engine.load("dim_customer")
+        
+        loader.engine.begin.assert_called_once()
+        assert conn.execute.call_count == len(engine.statements("dim_customer")) + 1
+        assert counts == {"new": 3, "changed": 2, "type1_updated": 7}
+    
+    def test_ensure_creates_history_once(self, mock_loader):
+        """Test that the history table and its index are only created when missing."""
+        loader, _ = mock_loader
+        engine = SCD2Engine(loader=loader)
+        
+        loader.table_exists.return_value = False
+        engine.ensure("dim_geography")
+        created = [call.args[0] for call in loader.execute_statement.call_args_list]
+        assert any("CREATE TABLE dw.dim_geography_history AS" in s for s in created)
+        assert any("CREATE UNIQUE INDEX ON dw.dim_geography_history (geography_key) WHERE is_current" in s
+                   for s in created)
+        
+        loader.execute_statement.reset_mock()
+        loader.table_exists.return_value = True
+        engine.ensure("dim_geography")
+        statements = [call.args[0] for call in loader.execute_statement.call_args_list]
+        assert not any("CREATE" in s for s in statements)
+    
+    def test_ensure_only_alters_when_row_hash_missing(self, mock_loader):
+        """Test that the locking ALTER TABLE is skipped once row_hash exists."""
+        loader, _ = mock_loader
+        engine = SCD2Engine(loader=loader)
+        
+        loader.missing_columns.return_value = ["row_hash"]
+        engine.ensure("dim_customer")
+        loader.execute_statement.assert_any_call("ALTER TABLE dw.dim_customer ADD COLUMN row_hash CHAR(32)")
+        
+        loader.execute_statement.reset_mock()
+        loader.missing_columns.return_value = []
+        engine.ensure("dim_customer")
+        loader.missing_columns.assert_called_with("dim_customer", ["row_hash"], schema="dw")
+        statements = [call.args[0] for call in loader.execute_statement.call_args_list]
+        assert not any("ALTER TABLE" in s for s in statements)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Semantic Model Generator Tests
+===============================================
+
+Unit tests for relationship inference, storage modes and TMDL rendering.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import pandas as pd
+import pytest
+
+from src.etl.semantic_model import (
+    DIRECT_QUERY,
+    DUAL,
+    IMPORT,
+    SemanticModelGenerator,
+    choose_storage_modes,
+    infer_relationships,
+    lineage_tag,
+    render_table,
+    tmdl_name,
+)
+
+
+TABLE_COLUMNS = {
+    "dim_customer": [("customer_id", "bigint"), ("customer_segment", "character varying")],
+    "dim_customer_history": [("customer_id", "bigint"), ("valid_from", "timestamp without time zone")],
+    "dim_date": [("date_key", "integer"), ("full_date", "date"), ("year", "integer")],
+    "dim_geography": [("geography_key", "character varying"), ("market", "character varying")],
+    "fact_orders": [
+        ("order_id", "bigint"), ("order_item_id", "bigint"), ("customer_id", "bigint"),
+        ("date_key", "integer"), ("geography_key", "character varying"), ("sales", "numeric"),
+        ("is_late", "boolean"), ("is_complete", "boolean"), ("is_canceled", "boolean"),
+    ],
+    "stg_raw_orders": [("order_id", "bigint")],
+}
+
+
+@pytest.fixture
+def catalog():
+    """information_schema rows of a small warehouse."""
+    columns = pd.DataFrame([
+        (table, column, data_type, position)
+        for table, table_columns in TABLE_COLUMNS.items()
+        for position, (column, data_type) in enumerate(table_columns, start=1)
+    ], columns=["table_name", "column_name", "data_type", "ordinal_position"])
+    keys = pd.DataFrame([
+        ("dim_customer", "dim_customer_pkey", "PRIMARY KEY", "customer_id", None, None),
+        ("dim_date", "dim_date_pkey", "PRIMARY KEY", "date_key", None, None),
+        ("fact_orders", "fact_orders_pkey", "PRIMARY KEY", "order_id", None, None),
+        ("fact_orders", "fact_orders_pkey", "PRIMARY KEY", "order_item_id", None, None),
+        ("fact_orders", "fk_customer", "FOREIGN KEY", "customer_id", "dim_customer", "customer_id"),
+    ], columns=["table_name", "constraint_name", "constraint_type", "column_name",
+                "referenced_table", "referenced_column"])
+    return {"columns": columns, "keys": keys}
+
+
+MODEL_TABLES = ["dim_customer", "dim_date", "dim_geography", "fact_orders"]
+
+
+class TestRelationships:
+    """Test suite for infer_relationships."""
+    
+    def test_declared_and_inferred_relationships(self, catalog):
+        """Test foreign keys, primary-key names and first-column keys."""
+        relationships = infer_relationships(catalog["columns"], catalog["keys"], MODEL_TABLES)
+        
+        assert {(r["from_column"], r["to_table"]) for r in relationships} == {
+            ("customer_id", "dim_customer"),
+            ("date_key", "dim_date"),
+            ("geography_key", "dim_geography"),
+        }
+        assert all(r["from_table"] == "fact_orders" for r in relationships)
+
+
+class TestStorageModes:
+    """Test suite for choose_storage_modes."""
+    
+    AGGREGATIONS = {"agg_orders_month": {"detail": "fact_orders", "columns": {}}}
+    
+    def test_small_model_is_imported(self, catalog):
+        """Test that a fact below the threshold keeps everything in Import."""
+        relationships = infer_relationships(catalog["columns"], catalog["keys"], MODEL_TABLES)
+        sizes = {"dim_customer": 20_000, "dim_date": 3_000, "dim_geography": 4_000, "fact_orders": 180_000}
+        
+        modes = choose_storage_modes(sizes, relationships, {}, 1_000_000, 0.1)
+        
+        assert set(modes.values()) == {IMPORT}
+    
+    def test_large_fact_uses_directquery_dual_and_aggregations(self, catalog):
+        """Test DirectQuery facts, Dual dimensions and the aggregation size check."""
+        relationships = infer_relationships(catalog["columns"], catalog["keys"], MODEL_TABLES)
+        sizes = {
+            "dim_customer": 20_000, "dim_date": 3_000, "dim_geography": 4_000,
+            "dim_unrelated": 10, "fact_orders": 50_000_000, "agg_orders_month": 40_000,
+        }
+        
+        modes = choose_storage_modes(sizes, relationships, self.AGGREGATIONS, 1_000_000, 0.1)
+        
+        assert modes["fact_orders"] == DIRECT_QUERY
+        assert modes["dim_customer"] == modes["dim_date"] == DUAL
+        assert modes["dim_unrelated"] == IMPORT
+        assert modes["agg_orders_month"] == IMPORT
+        
+        sizes["agg_orders_month"] = 10_000_000
+        assert "agg_orders_month" not in choose_storage_modes(
+            sizes, relationships, self.AGGREGATIONS, 1_000_000, 0.1
+        )
+
+
+class TestRendering:
+    """Test suite for the TMDL rendering helpers."""
+    
+    def test_names_and_lineage_tags(self):
+        """Test quoting and stable lineage tags."""
+        assert tmdl_name("fact_orders") == "fact_orders"
+        assert tmdl_name("OTIF %") == "'OTIF %'"
+        assert tmdl_name("Customer's") == "'Customer''s'"
+        assert lineage_tag("fact_orders", "sales") == lineage_tag("fact_orders", "sales")
+        assert lineage_tag("fact_orders", "sales") != lineage_tag("fact_orders", "order_id")
+    
+    def test_fact_table(self, catalog):
+        """Test measures, hidden keys, summarization and the partition."""
+        columns = catalog["columns"][catalog["columns"]["table_name"] == "fact_orders"]
+        
+        text = render_table("fact_orders", columns, "dw", DIRECT_QUERY, {"customer_id", "date_key"})
+        
+        assert text.startswith("table fact_orders\n")
+        assert "\tmeasure 'OTIF %' = DIVIDE([OTIF Items], [Active Items])\n\t\tformatString: 0.00%" in text
+        assert "\tcolumn sales\n\t\tdataType: decimal\n" in text
+        assert "\t\tsummarizeBy: sum\n\t\tsourceColumn: sales" in text
+        assert "\tcolumn customer_id\n\t\tdataType: int64\n\t\tformatString: 0\n\t\tisHidden\n" in text
+        assert "\t\tmode: directQuery\n" in text
+        assert 'Source{[Schema="dw", Item="fact_orders"]}[Data]' in text
+    
+    def test_aggregation_table(self):
+        """Test that aggregation columns map to their detail columns."""
+        columns = pd.DataFrame({
+            "table_name": "agg_orders_month",
+            "column_name": ["year", "sales"],
+            "data_type": ["integer", "numeric"],
+            "ordinal_position": [1, 2],
+        })
+        aggregation = {"detail": "fact_orders", "columns": {
+            "year": ("groupBy", "dim_date.year"), "sales": ("sum", "fact_orders.sales"),
+        }}
+        
+        text = render_table("agg_orders_month", columns, "dw", IMPORT, set(), aggregation)
+        
+        assert "\tisHidden\n" in text
+        assert "\t\talternateOf\n\t\t\tbaseColumn: dim_date.year\n\t\t\tsummarization: groupBy" in text
+        assert "\t\talternateOf\n\t\t\tbaseColumn: fact_orders.sales\n\t\t\tsummarization: sum" in text
+
+
+class TestSemanticModelGenerator:
+    """Test the generator against a mocked catalog."""
+    
+    def test_write_replaces_stale_tables(self, mocker, catalog, tmp_path):
+        """Test that the definition is written and hand-made table files are dropped."""
+        loader = mocker.MagicMock()
+        loader.execute_query.side_effect = [catalog["columns"], catalog["keys"]]
+        loader.row_counts.estimate.side_effect = lambda tables, schema: dict.fromkeys(tables, 1_000)
+        (tmp_path / "tables").mkdir()
+        (tmp_path / "tables" / "dim_customers.tmdl").write_text("table dim_customers\n")
+        
+        generator = SemanticModelGenerator(loader=loader, output_dir=tmp_path)
+        generator.write()
+        
+        assert sorted(path.name for path in (tmp_path / "tables").iterdir()) == [
+            f"{table}.tmdl" for table in MODEL_TABLES
+        ]
+        model = (tmp_path / "model.tmdl").read_text()
+        assert "ref table dim_date\n" in model and "ref table stg_raw_orders" not in model
+        assert "fromColumn: fact_orders.geography_key" in (tmp_path / "relationships.tmdl").read_text()
+        assert "expression PostgresServer" in (tmp_path / "expressions.tmdl").read_text()
+        assert "\tdataCategory: Time\n" in (tmp_path / "tables" / "dim_date.tmdl").read_text()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Torre Control - Blue/Green Schema Swap Tests
+=============================================
+
+Unit tests for the SchemaSwapper class.
+
+Author: Torre Control Engineering Team
+Date: 2026-02-04
+"""
+
+import pytest
+
+from src.etl.swap import SWAP_TABLES, SchemaSwapper
+from src.etl.validate import ValidationError
+
+
+def executed_sql(mock_conn):
+    """Return the SQL text of every statement executed on a mocked connection."""
+    return [str(call.args[0]) for call in mock_conn.execute.call_args_list]
+
+
+@pytest.fixture
+def mock_loader(mocker):
+    """Provide a loader whose engine hands out one recorded connection."""
+    loader = mocker.MagicMock()
+    conn = loader.engine.begin.return_value.__enter__.return_value
+    return loader, conn
+
+
+class TestSchemaSwapper:
+    """Test suite for SchemaSwapper class."""
+
+    def test_swapper_initialization(self, mock_loader):
+        """Test that SchemaSwapper uses the configured shadow schema."""
+        loader, _ = mock_loader
+        swapper = SchemaSwapper(loader=loader)
+
+        assert swapper.live_schema == "dw"
+        assert swapper.shadow_schema == swapper.settings.shadow_schema
+        assert swapper.retired_schema == "dw_old"
+        assert swapper.tables == SWAP_TABLES
+
+    def test_prepare_shadow_copies_live_tables(self, mock_loader):
+        """Test that the shadow tables are cloned (and seeded) from the live ones."""
+        loader, conn = mock_loader
+        swapper = SchemaSwapper(loader=loader, shadow_schema="dw_next", tables=["dim_date"])
+
+        swapper.prepare_shadow()
+        statements = executed_sql(conn)
+
+        assert statements[0] == "DROP SCHEMA IF EXISTS dw_next CASCADE"
+        assert "CREATE UNLOGGED TABLE dw_next.dim_date (LIKE dw.dim_date INCLUDING ALL)" in statements
+        assert "INSERT INTO dw_next.dim_date SELECT * FROM dw.dim_date" in statements
+
+    def test_swap_moves_live_out_before_shadow_in(self, mock_loader):
+        """Test the order of statements inside the swap transaction."""
+        loader, conn = mock_loader
+        swapper = SchemaSwapper(loader=loader, shadow_schema="dw_next", tables=["fact_orders"])
+
+        swapper.swap()
+        statements = executed_sql(conn)
+
+        lock_timeout = next(i for i, s in enumerate(statements) if "lock_timeout" in s)
+        retire = statements.index("ALTER TABLE dw.fact_orders SET SCHEMA dw_old")
+        promote = statements.index("ALTER TABLE dw_next.fact_orders SET SCHEMA dw")
+
+        assert lock_timeout < retire < promote
+        loader.execute_statement.assert_any_call("DROP SCHEMA IF EXISTS dw_old CASCADE")
+
+    def test_foreign_keys_survive_swap(self, mocker, mock_loader):
+        """Test that live foreign keys are recreated on the shadow tables and validated before the swap."""
+        loader, conn = mock_loader
+        swapper = SchemaSwapper(
+            loader=loader, shadow_schema="dw_next", tables=["fact_orders", "dim_customer"]
+        )
+        live_keys = [(
+            "fact_orders", "fact_orders_customer_id_fkey", "dim_customer",
+            "FOREIGN KEY (customer_id) REFERENCES dw.dim_customer(customer_id) ON DELETE RESTRICT"
+        )]
+        shadow_keys = [("fact_orders", "fact_orders_customer_id_fkey")]
+
+        def execute(statement, params=None):
+            result = mocker.MagicMock()
+            sql = str(statement)
+            if "pg_get_constraintdef" in sql:
+                result.fetchall.return_value = live_keys
+            elif "convalidated" in sql:
+                result.fetchall.return_value = shadow_keys
+            return result
+
+        conn.execute.side_effect = execute
+
+        swapper.prepare_shadow()
+        swapper.swap()
+        statements = executed_sql(conn)
+
+        add = statements.index(
+            "ALTER TABLE dw_next.fact_orders ADD CONSTRAINT fact_orders_customer_id_fkey "
+            "FOREIGN KEY (customer_id) REFERENCES dw_next.dim_customer(customer_id) "
+            "ON DELETE RESTRICT NOT VALID"
+        )
+        dim_logged = statements.index("ALTER TABLE dw_next.dim_customer SET LOGGED")
+        fact_logged = statements.index("ALTER TABLE dw_next.fact_orders SET LOGGED")
+        validate = statements.index(
+            "ALTER TABLE dw_next.fact_orders VALIDATE CONSTRAINT fact_orders_customer_id_fkey"
+        )
+        lock_timeout = next(i for i, s in enumerate(statements) if "lock_timeout" in s)
+        promote = statements.index("ALTER TABLE dw_next.fact_orders SET SCHEMA dw")
+
+        assert add < dim_logged < fact_logged < validate < lock_timeout < promote
+
+    def test_refresh_keeps_live_tables_when_validation_fails(self, mocker, mock_loader):
+        """Test that a shadow schema with ERROR-level failures is never swapped."""
+        loader, _ = mock_loader
+        swapper = SchemaSwapper(loader=loader, shadow_schema="dw_next")
+        swap = mocker.patch.object(swapper, "swap")
+
+        transformer = mocker.MagicMock(target_schema="dw")
+        validator = mocker.MagicMock()
+        validator.validate_all.return_value = {"errors": 2}
+
+        with pytest.raises(ValidationError):
+            swapper.refresh(transformer, validator)
+
+        validator.validate_all.assert_called_once_with(schema="dw_next")
+        assert transformer.target_schema == "dw"
+        swap.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -126,6 +126,18 @@ class TestDataTransformer:
         
         assert transformer.loader == mock_loader
 
+    def test_transformer_target_schema(self, mocker):
+        """Test that dimensions and facts are written into the target schema."""
+        mock_loader = mocker.MagicMock()
+        mock_loader.execute_statement.return_value = 0
+
+        transformer = DataTransformer(loader=mock_loader, target_schema="dw_next")
+        transformer.create_fact_orders()
+
+        statement = mock_loader.execute_statement.call_args.args[0]
+        assert "INSERT INTO dw_next.fact_orders" in statement
+        assert "FROM dw.stg_raw_orders" in statement
+
 
 class TestTransformationLogic:
     """Test transformation logic and calculations."""
@@ -9,10 +9,13 @@ Author: Torre Control Engineering Team
 Date: 2026-02-04
 """
 
+import threading
+import time
+
 import pandas as pd
 import pytest
 
-from src.etl.validate import DataValidator, ValidationError
+from src.etl.validate import DataValidator, ValidationError, wilson_interval
 
 
 class TestDataValidator:
@@ -204,6 +207,200 @@ class TestValidationSummary:
         assert failed == 2
         assert passed / total == 0.5
 
+class FakeLoader:
+    """In-memory stand-in for DataLoader that answers the validation queries."""
+    
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.estimates = {}
+        self.timeouts = []
+        self.count_modes = []
+    
+    def _wait(self, key):
+        time.sleep(self.delays.get(key, 0))
+    
+    def table_exists(self, table_name, schema=None):
+        self._wait(table_name)
+        return True
+    
+    def get_table_count(self, table_name, schema=None, statement_timeout_ms=None, mode="exact"):
+        self._wait(table_name)
+        self.timeouts.append(statement_timeout_ms)
+        self.count_modes.append(mode)
+        return self.estimates.get(table_name, 5000) if mode == "estimated" else 5000
+    
+    def execute_query(self, query, params=None, statement_timeout_ms=None):
+        self.timeouts.append(statement_timeout_ms)
+        if "otif_percentage" in query:
+            return pd.DataFrame({"total_orders": [100], "otif_orders": [97], "otif_percentage": [97.0]})
+        column = "null_count" if "null_count" in query else "orphan_count"
+        return pd.DataFrame({column: [0]})
+
+
+class TestParallelValidation:
+    """Test concurrent scheduling of validation checks."""
+    
+    def test_results_match_sequential_order(self):
+        """Test that parallel results are merged in declaration order."""
+        delays = {"stg_raw_orders": 0.05, "dim_customer": 0.02}
+        sequential = DataValidator(loader=FakeLoader(delays), max_workers=1).validate_all()
+        parallel = DataValidator(loader=FakeLoader(delays), max_workers=8).validate_all()
+        
+        assert [r["check"] for r in parallel["results"]] == [r["check"] for r in sequential["results"]]
+        assert parallel["results"][0]["check"] == "table_exists_stg_raw_orders"
+        assert parallel["errors"] == 0
+    
+    def test_queries_carry_statement_timeout(self):
+        """Test that each validation query is sent with the check time limit."""
+        loader = FakeLoader()
+        DataValidator(loader=loader, check_timeout=2.5).validate_all()
+        
+        assert loader.timeouts
+        assert set(loader.timeouts) == {2500}
+    
+    def test_low_estimate_is_confirmed_exactly(self):
+        """Test that a size check only fails on an exact count."""
+        loader = FakeLoader()
+        loader.estimates["fact_orders"] = 10
+        validator = DataValidator(loader=loader)
+        
+        passed, count = validator.validate_row_count("fact_orders", min_rows=1000, mode="estimated")
+        
+        assert passed is True
+        assert count == 5000
+        assert loader.count_modes == ["estimated", "exact"]
+    
+    def test_exact_counts_by_default(self):
+        """Test that size checks count exactly unless estimates are requested."""
+        loader = FakeLoader()
+        
+        DataValidator(loader=loader).validate_row_count("fact_orders", min_rows=1000)
+        
+        assert loader.count_modes == ["exact"]
+    
+    def test_slow_check_times_out(self):
+        """Test that a check exceeding its time limit is reported as failed."""
+        validator = DataValidator(loader=FakeLoader(), max_workers=2, check_timeout=0.1)
+        release = threading.Event()
+        
+        def slow():
+            release.wait(5)
+            validator._add_result("slow", True, "late", "INFO")
+        
+        try:
+            validator.run_checks([
+                ("slow", slow),
+                ("fast", lambda: validator._add_result("fast", True, "ok", "INFO")),
+            ])
+        finally:
+            release.set()
+        time.sleep(0.05)
+        
+        assert [(r["check"], r["passed"]) for r in validator.validation_results] == [
+            ("slow", False),
+            ("fast", True),
+        ]
+        assert "timed out" in validator.validation_results[0]["message"]
+    
+    def test_raising_check_is_recorded(self):
+        """Test that an exception inside a check becomes a failed result."""
+        validator = DataValidator(loader=FakeLoader(), max_workers=2)
+        
+        def broken():
+            raise RuntimeError("boom")
+        
+        validator.run_checks([("broken", broken)])
+        
+        assert validator.validation_results[0]["passed"] is False
+        assert "boom" in validator.validation_results[0]["message"]
+
+class SamplingLoader:
+    """Answers sampled and exhaustive validation queries from fixed counts."""
+    
+    def __init__(self, sampled_rows=20000, sampled_nulls=0, otif_orders=19000):
+        self.sampled_rows = sampled_rows
+        self.sampled_nulls = sampled_nulls
+        self.otif_orders = otif_orders
+        self.queries = []
+    
+    def execute_query(self, query, params=None, statement_timeout_ms=None):
+        self.queries.append(query)
+        if "TABLESAMPLE" in query:
+            if "otif_orders" in query:
+                return pd.DataFrame({"total_orders": [self.sampled_rows], "otif_orders": [self.otif_orders]})
+            column = "null_count" if "null_count" in query else "orphan_count"
+            return pd.DataFrame({"sampled_rows": [self.sampled_rows], column: [self.sampled_nulls]})
+        if "otif_percentage" in query:
+            return pd.DataFrame({"total_orders": [100000], "otif_orders": [95000], "otif_percentage": [95.0]})
+        column = "null_count" if "null_count" in query else "orphan_count"
+        return pd.DataFrame({column: [self.sampled_nulls * 50]})
+    
+    @property
+    def exhaustive_queries(self):
+        return [query for query in self.queries if "TABLESAMPLE" not in query]
+
+
+class TestSampledValidation:
+    """Test TABLESAMPLE-based validation with automatic escalation."""
+    
+    def test_wilson_interval(self):
+        """Test the confidence interval of a proportion."""
+        lower, upper = wilson_interval(0, 1000)
+        assert lower == 0.0
+        assert 0.003 < upper < 0.005
+        
+        lower, upper = wilson_interval(950, 1000)
+        assert lower < 0.95 < upper
+    
+    def test_clean_sample_settles_null_check(self):
+        """Test that a NULL-free sample passes with a rate bound and no full scan."""
+        loader = SamplingLoader()
+        validator = DataValidator(loader=loader, sample_percent=1)
+        
+        assert validator.validate_no_nulls("fact_orders", ["order_id"]) is True
+        
+        result = validator.validation_results[0]
+        assert "TABLESAMPLE SYSTEM (1) REPEATABLE (42)" in loader.queries[0]
+        assert loader.exhaustive_queries == []
+        assert result["details"]["sampled_rows"] == 20000
+        assert result["details"]["null_rate_ci"][1] < 0.001
+    
+    def test_nulls_in_sample_escalate(self):
+        """Test that NULLs seen in the sample trigger an exhaustive check."""
+        loader = SamplingLoader(sampled_nulls=3)
+        validator = DataValidator(loader=loader, sample_percent=1)
+        
+        assert not validator.validate_no_nulls("fact_orders", ["order_id"])
+        assert len(loader.exhaustive_queries) == 1
+        assert "150 NULL values" in validator.validation_results[0]["message"]
+    
+    def test_otif_clear_of_target_is_settled(self):
+        """Test that OTIF whose interval excludes the target is not recomputed."""
+        loader = SamplingLoader(otif_orders=16000)
+        validator = DataValidator(loader=loader, sample_percent=1, sample_method="bernoulli")
+        
+        assert validator.validate_otif_calculation() is True
+        
+        checks = [r["check"] for r in validator.validation_results]
+        assert checks == ["otif_calculation", "otif_target"]
+        assert loader.exhaustive_queries == []
+        assert "TABLESAMPLE BERNOULLI" in loader.queries[0]
+    
+    def test_otif_near_target_escalates(self):
+        """Test that OTIF whose interval contains the target is recomputed exactly."""
+        loader = SamplingLoader(otif_orders=19000)
+        validator = DataValidator(loader=loader, sample_percent=1)
+        
+        validator.validate_otif_calculation()
+        
+        assert len(loader.exhaustive_queries) == 1
+        assert "details" not in validator.validation_results[0]
+    
+    def test_invalid_sample_method(self):
+        """Test that an unknown TABLESAMPLE method is rejected."""
+        with pytest.raises(ValueError):
+            DataValidator(loader=SamplingLoader(), sample_method="RESERVOIR")
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])